@@ -11,7 +11,11 @@ from pathlib import Path
 # 设置 UTF-8 编码
 if sys.platform != 'win32':
     import locale
-    locale.setlocale(locale.LC_ALL, 'zh_CN.UTF-8')
+    try:
+        locale.setlocale(locale.LC_ALL, 'zh_CN.UTF-8')
+    except locale.Error:
+        # 未安装中文 locale 的环境（如 CI / 无界面测试机）继续使用默认 locale
+        pass
 
 # 添加项目根目录到 Python 路径
 project_root = Path(__file__).parent.parent
@@ -40,11 +44,15 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # 导入字体辅助工具并注册中文字体
-from app.utils.font_helper import register_chinese_font, apply_font_to_widget
+from app.utils.font_helper import register_chinese_font, install_font_rules
 
 # 注册中文字体（必须在导入使用字体的模块之前）
 chinese_font_name = register_chinese_font()
 
+# 以类级别 KV 规则为所有文本控件设置默认字体（必须在创建任何控件之前）
+if chinese_font_name:
+    install_font_rules(chinese_font_name)
+
 # 存储字体名称供其他模块使用（供各个 Screen 模块引用）
 CHINESE_FONT_NAME = chinese_font_name
 
@@ -59,7 +67,10 @@ from app.ui.screens.add_entry_screen import AddEntryScreen
 from app.ui.screens.recipes_screen import RecipesScreen
 from app.ui.screens.settings_screen import SettingsScreen
 from app.services.database import init_database
-from app.utils.logger import setup_logger
+from app.utils.clock import app_clock
+from app.utils.events import DAY_CHANGED, event_bus
+from app.utils.logger import setup_logger, shutdown_logging
+from app.utils.profiler import SamplingProfiler, profiler_enabled, profiler_interval
 from app.services.item_service import seed_example_items
 
 
@@ -79,6 +90,9 @@ class VibeFridgeApp(MDApp):
         self.items_btn = None
         self.recipes_btn = None
         self.settings_btn = None
+
+        # 采样分析器（PROFILER_ENABLED=1 或调用 start_profiler 时开启）
+        self.profiler = None
         
         # 设置中文字体（如果已注册）
         if chinese_font_name:
@@ -131,10 +145,6 @@ class VibeFridgeApp(MDApp):
         # 加载并添加各个屏幕
         self.load_screens()
 
-        # 全局应用中文字体到所有已有控件
-        if chinese_font_name:
-            apply_font_to_widget(self.screen_manager, chinese_font_name)
-
         # 设置默认屏幕
         self.screen_manager.current = "main"
 
@@ -447,16 +457,107 @@ class VibeFridgeApp(MDApp):
             seed_example_items()
         except Exception as e:
             logger.error(f"插入示例物品失败: {e}")
+        try:
+            from app.services.recipe_service import seed_example_recipes
+            seed_example_recipes()
+        except Exception as e:
+            logger.error(f"插入示例菜谱失败: {e}")
 
         # 检查环境变量配置
         api_key = os.getenv('SILICON_FLOW_API_KEY')
         if not api_key or api_key == 'your_api_key_here':
             logger.warning("硅基流动 API 密钥未配置或使用默认值")
 
+        # 后台预加载 Wiki 默认值索引，添加物品时按名称补全单位与过期日期
+        from app.services.wiki_defaults import wiki_defaults
+        wiki_defaults.load_in_background()
+        from app.services.autocomplete import autocomplete_index
+        autocomplete_index.load_in_background()
+        # 后台构建菜谱倒排索引，之后随库存变化增量更新
+        from app.services.recipe_service import recipe_matcher
+        recipe_matcher.load_in_background()
+
+        # 后台增量训练过期预测模型并刷新预测（需要 ai 可选依赖）
+        from app.services.prediction_service import prediction_service
+        prediction_service.refresh_in_background()
+
+        # 午夜发布 DAY_CHANGED：过期扫描把已过期的物品标记为 EXPIRED，首页随之刷新
+        from app.services.expiry_sweep import expiry_sweeper
+        expiry_sweeper.sweep_if_needed()
+        event_bus.subscribe(DAY_CHANGED, self._on_day_changed)
+        app_clock.start()
+
+        # 空闲时收集规划器统计并归还空闲页
+        from app.services.db_maintenance import db_maintenance
+        db_maintenance.start()
+
+        if profiler_enabled():
+            self.start_profiler()
+
+    def _on_day_changed(self, **_):
+        """跨天后在主线程刷新首页（定时器线程中调用）"""
+        def refresh(dt):
+            if self.screen_manager.has_screen('main'):
+                self.screen_manager.get_screen('main')._load_items()
+        Clock.schedule_once(refresh)
+
+    def start_profiler(self, interval: float = None):
+        """
+        开启 UI 线程采样分析，样本以当前屏幕名称作为标签
+
+        Args:
+            interval: 采样间隔（秒），默认读取 PROFILER_INTERVAL_MS
+        """
+        if self.profiler is not None and self.profiler.running:
+            return
+        self.profiler = SamplingProfiler(
+            interval=interval or profiler_interval(),
+            tag_func=self._current_screen_name,
+        )
+        self.profiler.start()
+
+    def stop_profiler(self):
+        """停止采样分析并写出 collapsed stack 文件"""
+        if self.profiler is None:
+            return None
+        path = self.profiler.stop()
+        self.profiler = None
+        return path
+
+    def _current_screen_name(self):
+        """当前屏幕名称（供采样线程读取）"""
+        screen_manager = getattr(self, 'screen_manager', None)
+        return screen_manager.current if screen_manager is not None else None
+
     def on_stop(self):
         """应用停止时调用"""
         logger = setup_logger()
         logger.info("vibe-fridge 应用停止")
+        # 写出采样分析结果
+        self.stop_profiler()
+
+        # 输出 SQL 统计（SQL_INSTRUMENTATION=1 时）
+        from app.services.database import db_service
+        if db_service.instrumentation is not None:
+            db_service.instrumentation.log_summary()
+
+        # 写入后台队列中尚未提交的物品修改
+        from app.services.write_queue import write_queue
+        write_queue.shutdown(wait=True)
+
+        app_clock.stop()
+
+        # SQLite 建议在关闭连接前执行 PRAGMA optimize
+        from app.services.db_maintenance import db_maintenance
+        db_maintenance.stop()
+        db_maintenance.optimize()
+
+        # 关闭图片识别进程池（未使用时不会启动）
+        from app.services.recognition_service import recognition_queue
+        recognition_queue.shutdown(wait=False)
+
+        # 刷新并停止后台日志线程
+        shutdown_logging()
 
 
 def main():
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+数据模型: 物品归档（已消耗/丢弃物品的历史记录）
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, Boolean, Date, DateTime, Enum as SQLEnum, ForeignKey, Index
+from app.models import Base
+from app.models.item import ItemStatus
+
+
+class ItemArchive(Base):
+    """
+    物品归档
+
+    已消耗或丢弃超过一定天数的物品从 items 表移入本表，items 只保留库存与最近的记录，
+    界面查询不受历史数据量影响。本表只保留统计与过期预测需要的字段（不含描述、提醒、
+    图片、预测结果与标签），只追加不修改。
+    """
+    __tablename__ = 'items_archive'
+
+    pk = Column(Integer, primary_key=True)
+    id = Column(String(36), nullable=False)  # 原物品的 UUID
+    wiki_pk = Column(Integer, ForeignKey('item_wikis.pk'), nullable=True)
+
+    name = Column(String(100), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    unit = Column(String(20), nullable=True)
+    status = Column(SQLEnum(ItemStatus), nullable=False)  # CONSUMED 或 WASTED
+
+    purchase_date = Column(Date, nullable=True)
+    expiry_date = Column(Date, nullable=True)
+    consumed_at = Column(DateTime, nullable=False)  # 消耗/丢弃时间
+    shelf_life_sampled = Column(Boolean, nullable=False, default=False, server_default='0')  # 见 Item
+    source_app = Column(String(50), nullable=True)
+
+    created_at = Column(DateTime, nullable=False)  # 原物品的创建时间
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # 按时间段统计消耗历史
+        Index('ix_items_archive_consumed', 'consumed_at'),
+        # 按 Wiki 查询历史（过期预测、单个物品的消耗记录）
+        Index('ix_items_archive_wiki', 'wiki_pk', 'consumed_at'),
+    )
+
+    def __repr__(self):
+        return f"<ItemArchive(id='{self.id}', name='{self.name}')>"
@@ -3,17 +3,19 @@
 数据模型: 物品
 """
 
+import hashlib
 import uuid
 import logging
-from datetime import datetime, date
+from datetime import datetime
 from enum import Enum
 from typing import Optional
 from sqlalchemy import (
     Column, String, Integer, Float, Date, DateTime,
-    Text, Boolean, Enum as SQLEnum, ForeignKey
+    Text, Boolean, Enum as SQLEnum, ForeignKey, Index, func
 )
 from sqlalchemy.orm import relationship
 from app.models import Base
+from app.utils.clock import app_clock
 
 
 class ItemStatus(Enum):
@@ -24,22 +26,44 @@ class ItemStatus(Enum):
     WASTED = "wasted"          # 已丢弃
 
 
+# 仍在库存中的状态（已过期的物品尚未被消耗或丢弃）
+IN_STOCK_STATUSES = (ItemStatus.ACTIVE, ItemStatus.EXPIRED)
+
+
+def source_line_key(*parts) -> str:
+    """
+    订单导入去重键：订单行各部分的 SHA-1（见 import_service）
+
+    Args:
+        *parts: 订单行的组成部分，None 视为空字符串
+
+    Returns:
+        str: 40 位十六进制字符串
+    """
+    text = '\x1f'.join('' if part is None else str(part) for part in parts)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
 class Item(Base):
     """
     物品模型 - 库存记录（类的实例）
 
     存储具体的物品库存记录，关联到ItemWiki条目。
+
+    pk 是内部使用的整数主键（SQLite rowid），外键与关联表都引用它；
+    id 是对外的稳定标识（UUID），服务接口、界面、同步与导出均使用 id。
     """
     __tablename__ = 'items'
 
     # 主键
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    pk = Column(Integer, primary_key=True)
+    id = Column(String(36), nullable=False, unique=True, default=lambda: str(uuid.uuid4()))
 
     # Wiki关联（类定义）
-    wiki_id = Column(String(36), ForeignKey('item_wikis.id'), nullable=True, index=True)
+    wiki_pk = Column(Integer, ForeignKey('item_wikis.pk'), nullable=True, index=True)
 
     # 基本信息
-    name = Column(String(100), nullable=False, index=True)
+    name = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
 
     # 数量信息
@@ -49,12 +73,14 @@ class Item(Base):
     # 日期信息
     purchase_date = Column(Date, nullable=True, index=True)
     expiry_date = Column(Date, nullable=True, index=True)
-    reminder_date = Column(Date, nullable=True, index=True)
+    reminder_date = Column(Date, nullable=True)
 
     # 状态信息
-    status = Column(SQLEnum(ItemStatus), nullable=False, default=ItemStatus.ACTIVE, index=True)
+    status = Column(SQLEnum(ItemStatus), nullable=False, default=ItemStatus.ACTIVE)
     is_reminder_enabled = Column(Boolean, nullable=False, default=True)
-    consumed_at = Column(DateTime, nullable=True, index=True)  # 消耗时间
+    consumed_at = Column(DateTime, nullable=True)  # 消耗时间
+    # 已按消耗时间计入过期预测的样本（恢复后再次消耗不重复计入）
+    shelf_life_sampled = Column(Boolean, nullable=False, default=False, server_default='0')
 
     # AI 预测信息
     predicted_expiry_date = Column(Date, nullable=True)
@@ -64,26 +90,54 @@ class Item(Base):
     image_path = Column(String(255), nullable=True)
     source_app = Column(String(50), nullable=True)  # 来源应用：盒马、淘宝等
     source_order_id = Column(String(100), nullable=True)  # 来源订单ID
+    source_line_key = Column(String(40), nullable=True)  # 订单导入去重键（source_line_key()）
 
     # 元数据
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # 订单导入去重：同一来源的同一订单行只导入一次
+        Index(
+            'ux_items_source_line', 'source_app', 'source_line_key',
+            unique=True, sqlite_where=source_line_key.isnot(None),
+        ),
+        # 热点查询的复合索引均以 status 开头（取代单列 status 索引）：
+        # 过期扫描、临期物品、已过期统计
+        Index('ix_items_status_expiry', 'status', 'expiry_date'),
+        # 已消耗物品的清理与归档、历史统计
+        Index('ix_items_status_consumed', 'status', 'consumed_at'),
+        # 按名称汇总库存（菜谱匹配、已登记物品），覆盖查询所需的全部列
+        Index('ix_items_stock_by_name', 'status', 'name', 'expiry_date', 'quantity'),
+        # 待提醒物品：只索引开启提醒的物品
+        Index(
+            'ix_items_reminder_pending', 'status', 'reminder_date',
+            sqlite_where=is_reminder_enabled == True,  # noqa: E712
+        ),
+        # 按名称（忽略大小写）查库存
+        Index('ix_items_name_lower', func.lower(name), 'status'),
+    )
+
     # 标签关系（多对多）
     tags = relationship('Tag', secondary='item_tags', back_populates='items')
 
     # Wiki关联（多对一）- 使用字符串形式避免循环导入
-    wiki = relationship('ItemWiki', remote_side='[ItemWiki.id]', back_populates='items', lazy='joined')
+    wiki = relationship('ItemWiki', back_populates='items', lazy='joined')
 
     def __repr__(self):
         return f"<Item(id='{self.id}', name='{self.name}')>"
 
+    @property
+    def wiki_id(self) -> Optional[str]:
+        """关联Wiki的ID（UUID）"""
+        return self.wiki.id if self.wiki is not None else None
+
     @property
     def is_expired(self) -> bool:
         """检查是否过期"""
         if not self.expiry_date:
             return False
-        return date.today() > self.expiry_date
+        return app_clock.today() > self.expiry_date
 
     @property
     def days_until_expiry(self) -> Optional[int]:
@@ -91,8 +145,7 @@ class Item(Base):
         try:
             if not self.expiry_date:
                 return None
-            delta = self.expiry_date - date.today()
-            return delta.days
+            return app_clock.days_until(self.expiry_date)
         except Exception as e:
             logging.error(f"日期计算错误: {e}, expiry_date类型: {type(self.expiry_date)}")
             return None
@@ -102,14 +155,16 @@ class Item(Base):
         """是否应该发送提醒"""
         if not self.is_reminder_enabled or not self.reminder_date:
             return False
-        return date.today() >= self.reminder_date
+        return app_clock.today() >= self.reminder_date
 
     def update_status(self) -> None:
-        """更新物品状态"""
+        """更新物品状态（修正过期日期后，已过期的物品恢复为使用中）"""
         if self.is_expired:
             self.status = ItemStatus.EXPIRED
         elif self.quantity <= 0:
             self.status = ItemStatus.CONSUMED
+        elif self.status == ItemStatus.EXPIRED:
+            self.status = ItemStatus.ACTIVE
 
 
 class Tag(Base):
@@ -118,7 +173,8 @@ class Tag(Base):
     """
     __tablename__ = 'tags'
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    pk = Column(Integer, primary_key=True)
+    id = Column(String(36), nullable=False, unique=True, default=lambda: str(uuid.uuid4()))
     name = Column(String(50), nullable=False, unique=True, index=True)
     color = Column(String(20), nullable=True)  # 标签颜色（十六进制）
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -132,11 +188,18 @@ class Tag(Base):
 class ItemTag(Base):
     """
     物品-标签关联表
+
+    只保存两端的整数主键；没有 rowid，行直接按主键 (item_pk, tag_pk) 存放。
     """
     __tablename__ = 'item_tags'
-
-    item_id = Column(String(36), ForeignKey('items.id'), primary_key=True)
-    tag_id = Column(String(36), ForeignKey('tags.id'), primary_key=True)
+    __table_args__ = (
+        # 按标签查物品（主键 (item_pk, tag_pk) 只覆盖按物品查标签）
+        Index('ix_item_tags_tag_item', 'tag_pk', 'item_pk'),
+        {'sqlite_with_rowid': False},
+    )
+
+    item_pk = Column(Integer, ForeignKey('items.pk'), primary_key=True)
+    tag_pk = Column(Integer, ForeignKey('tags.pk'), primary_key=True)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
 
@@ -146,8 +209,9 @@ class ReminderLog(Base):
     """
     __tablename__ = 'reminder_logs'
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    item_id = Column(String(36), ForeignKey('items.id'), nullable=False, index=True)
+    pk = Column(Integer, primary_key=True)
+    id = Column(String(36), nullable=False, unique=True, default=lambda: str(uuid.uuid4()))
+    item_pk = Column(Integer, ForeignKey('items.pk'), nullable=False, index=True)
     reminder_type = Column(String(50), nullable=False)  # 提醒类型：expiry_reminder, low_stock等
     message = Column(Text, nullable=False)
     sent_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -157,4 +221,4 @@ class ReminderLog(Base):
     item = relationship('Item', backref='reminder_logs')
 
     def __repr__(self):
-        return f"<ReminderLog(item_id='{self.item_id}', sent_at='{self.sent_at}')>"
\ No newline at end of file
+        return f"<ReminderLog(item_pk={self.item_pk}, sent_at='{self.sent_at}')>"
\ No newline at end of file
@@ -18,7 +18,8 @@ class ItemWikiCategory(Base):
     """
     __tablename__ = 'item_wiki_categories'
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    pk = Column(Integer, primary_key=True)  # 内部整数主键，外键引用它
+    id = Column(String(36), nullable=False, unique=True, default=lambda: str(uuid.uuid4()))
 
     name = Column(String(50), nullable=False, unique=True, index=True)
 
@@ -43,18 +44,19 @@ class ItemWiki(Base):
     物品Wiki模型 - 物品的类定义
 
     存储物品的通用属性，作为物品库存记录的模板。
-    每个库存记录(Item)关联到一个Wiki条目。
+    每个库存记录(Item)关联到一个Wiki条目（Item.wiki_pk -> ItemWiki.pk）。
     """
     __tablename__ = 'item_wikis'
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    pk = Column(Integer, primary_key=True)  # 内部整数主键，外键引用它
+    id = Column(String(36), nullable=False, unique=True, default=lambda: str(uuid.uuid4()))
 
     # 基本信息
     name = Column(String(100), nullable=False, index=True)
     description = Column(Text, nullable=True)
 
     # 分类关联
-    category_id = Column(String(36), ForeignKey('item_wiki_categories.id'), nullable=True, index=True)
+    category_pk = Column(Integer, ForeignKey('item_wiki_categories.pk'), nullable=True, index=True)
     category = relationship('ItemWikiCategory', back_populates='items', lazy='joined')
 
     # 物品属性
@@ -76,6 +78,11 @@ class ItemWiki(Base):
     def __repr__(self):
         return f"<ItemWiki(id='{self.id}', name='{self.name}', category='{self.category.name if self.category else 'None'}')>"
 
+    @property
+    def category_id(self) -> Optional[str]:
+        """所属分类的ID（UUID）"""
+        return self.category.id if self.category is not None else None
+
     @property
     def inventory_count(self) -> int:
         """获取该Wiki下的库存记录数量"""
@@ -85,7 +92,7 @@ class ItemWiki(Base):
 
             with db_service.session_scope() as session:
                 count = session.query(Item).filter(
-                    Item.wiki_id == self.id,
+                    Item.wiki_pk == self.pk,
                     Item.status != ItemStatus.CONSUMED
                 ).count()
                 return count
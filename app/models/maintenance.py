@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+数据模型: 后台维护任务的运行记录
+"""
+
+from sqlalchemy import Column, String, Date, DateTime, Integer
+from app.models import Base
+
+
+class MaintenanceState(Base):
+    """
+    维护任务状态
+
+    每个后台任务（如过期状态扫描）一行，记录最近一次运行的日期与影响行数，
+    用于判断当天是否已经运行过。
+    """
+    __tablename__ = 'maintenance_state'
+
+    name = Column(String(50), primary_key=True)  # 任务名称
+    last_run_date = Column(Date, nullable=True)  # 最近一次运行对应的日期
+    last_run_at = Column(DateTime, nullable=True)  # 最近一次运行的时间
+    rows_affected = Column(Integer, nullable=False, default=0)  # 最近一次影响的行数
+
+    def __repr__(self):
+        return f"<MaintenanceState(name='{self.name}', last_run_date='{self.last_run_date}')>"
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+数据模型: 本地菜谱及其食材
+"""
+
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, Text, DateTime, Integer, Boolean, ForeignKey
+from sqlalchemy.orm import relationship
+from app.models import Base
+
+
+class Recipe(Base):
+    """
+    菜谱模型
+
+    食材单独存放在 recipe_ingredients 表中，按规范化名称与 ItemWiki 对应，
+    用于根据当前库存推荐菜谱。
+    """
+    __tablename__ = 'recipes'
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+
+    title = Column(String(100), nullable=False, index=True)
+    description = Column(Text, nullable=True)
+    cook_minutes = Column(Integer, nullable=True)  # 烹饪时间（分钟）
+    difficulty = Column(String(20), nullable=True)  # 难度：简单、中等、困难
+
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    ingredients = relationship(
+        'RecipeIngredient', back_populates='recipe', cascade='all, delete-orphan',
+        order_by='RecipeIngredient.id',
+    )
+
+    def __repr__(self):
+        return f"<Recipe(id='{self.id}', title='{self.title}')>"
+
+
+class RecipeIngredient(Base):
+    """菜谱食材"""
+    __tablename__ = 'recipe_ingredients'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    recipe_id = Column(String(36), ForeignKey('recipes.id', ondelete='CASCADE'), nullable=False, index=True)
+
+    name = Column(String(100), nullable=False)
+    # 规范化名称（与 ItemWiki 名称的规范化结果一致），用于匹配库存
+    normalized_name = Column(String(100), nullable=False, index=True)
+    amount = Column(String(50), nullable=True)  # 用量，如 "2个"、"适量"
+    optional = Column(Boolean, nullable=False, default=False)  # 可选食材（调料等）不计入匹配度
+
+    recipe = relationship('Recipe', back_populates='ingredients')
+
+    def __repr__(self):
+        return f"<RecipeIngredient(recipe_id='{self.recipe_id}', name='{self.name}')>"
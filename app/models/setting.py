@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+数据模型: 应用设置
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, String, Text, DateTime
+from app.models import Base
+
+
+class Setting(Base):
+    """
+    应用设置（键值对）
+
+    值以 JSON 文本保存，类型与默认值由 settings_service 中的设置定义决定；
+    未修改过的设置不写入本表。
+    """
+    __tablename__ = 'settings'
+
+    key = Column(String(64), primary_key=True)  # 设置键，如 reminder.days_before
+    value = Column(Text, nullable=False)  # JSON 编码的值
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Setting(key='{self.key}', value='{self.value}')>"
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+物品归档
+
+已消耗/丢弃超过一定天数的物品按批移入 items_archive 表，而不是直接删除：
+
+- items 表只保留库存与最近的记录，首页列表、临期与统计查询的数据量不随历史增长；
+- 消耗历史仍可用于统计与过期预测（prediction_service 同时读取两张表）。
+
+每批在一个事务中执行 INSERT ... SELECT 复制到归档表、清理标签关联与提醒日志、
+DELETE 原物品，批次之间释放写锁，不会长时间阻塞界面的写入。待归档的物品通过
+ix_items_status_consumed 索引查找。
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, func, insert, literal, select, union_all
+
+from app.models.archive import ItemArchive
+from app.models.item import Item, ItemStatus, ItemTag, ReminderLog
+from app.models.item_wiki import ItemWiki
+from app.services.database import db_service
+from app.utils.events import ITEMS_CHANGED, event_bus
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 归档的状态
+ARCHIVED_STATUSES = (ItemStatus.CONSUMED, ItemStatus.WASTED)
+
+# 每批归档的物品数量（一个事务）
+ARCHIVE_CHUNK_SIZE = 500
+
+# 从 items 复制到归档表的字段
+_ARCHIVE_COLUMNS = (
+    'id', 'wiki_pk', 'name', 'quantity', 'unit', 'status',
+    'purchase_date', 'expiry_date', 'consumed_at', 'shelf_life_sampled', 'source_app', 'created_at',
+)
+
+
+class ArchiveService:
+    """物品归档服务"""
+
+    @staticmethod
+    def archive_items(days: int = 3, chunk_size: int = ARCHIVE_CHUNK_SIZE) -> int:
+        """
+        把消耗/丢弃超过指定天数的物品移入归档表
+
+        Args:
+            days: 天数阈值
+            chunk_size: 每批（每个事务）移动的物品数量
+
+        Returns:
+            int: 归档的物品数量
+        """
+        threshold = datetime.utcnow() - timedelta(days=days)
+        archived_at = datetime.utcnow()
+        total = 0
+        while True:
+            try:
+                with db_service.session_scope() as session:
+                    pks = session.execute(
+                        select(Item.pk)
+                        .where(Item.status.in_(ARCHIVED_STATUSES), Item.consumed_at < threshold)
+                        .limit(chunk_size)
+                    ).scalars().all()
+                    if not pks:
+                        break
+                    session.execute(
+                        insert(ItemArchive).from_select(
+                            [*_ARCHIVE_COLUMNS, 'archived_at'],
+                            select(*(getattr(Item, name) for name in _ARCHIVE_COLUMNS), literal(archived_at))
+                            .where(Item.pk.in_(pks)),
+                        )
+                    )
+                    session.execute(delete(ItemTag).where(ItemTag.item_pk.in_(pks)))
+                    session.execute(delete(ReminderLog).where(ReminderLog.item_pk.in_(pks)))
+                    rows = session.execute(
+                        delete(Item)
+                        .where(Item.pk.in_(pks))
+                        .returning(Item.id, Item.name)
+                        .execution_options(synchronize_session=False)
+                    ).all()
+            except Exception as e:
+                logger.error("归档物品失败: %s", e)
+                break
+
+            total += len(rows)
+            event_bus.emit(ITEMS_CHANGED, action='archived', item_ids=[row.id for row in rows],
+                           names=sorted({row.name for row in rows}))
+            if len(pks) < chunk_size:
+                break
+
+        if total:
+            logger.info("归档了 %s 个超过 %s 天的已消耗/丢弃物品", total, days)
+        return total
+
+    @staticmethod
+    def get_history(wiki_id: str = None, since: date = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        查询归档的消耗记录（按消耗时间倒序）
+
+        Args:
+            wiki_id: 只查询该 Wiki 的记录
+            since: 只查询该日期之后消耗的记录
+            limit: 最多返回的数量
+
+        Returns:
+            List[Dict]: id、name、quantity、unit、status、purchase_date、expiry_date、consumed_at，
+                失败返回空列表
+        """
+        query = select(
+            ItemArchive.id, ItemArchive.name, ItemArchive.quantity, ItemArchive.unit, ItemArchive.status,
+            ItemArchive.purchase_date, ItemArchive.expiry_date, ItemArchive.consumed_at,
+        )
+        if wiki_id is not None:
+            query = query.join(ItemWiki, ItemWiki.pk == ItemArchive.wiki_pk).where(ItemWiki.id == wiki_id)
+        if since is not None:
+            query = query.where(ItemArchive.consumed_at >= since)
+        query = query.order_by(ItemArchive.consumed_at.desc()).limit(limit)
+        try:
+            with db_service.session_scope() as session:
+                return [dict(row._mapping) for row in session.execute(query)]
+        except Exception as e:
+            logger.error("查询消耗历史失败: %s", e)
+            return []
+
+    @staticmethod
+    def get_consumption_summary(since: date = None) -> List[Dict[str, Any]]:
+        """
+        按月统计消耗与丢弃的物品数量（包括尚未归档的物品）
+
+        Args:
+            since: 只统计该日期之后的记录
+
+        Returns:
+            List[Dict]: month（YYYY-MM）、consumed、wasted，按月份升序；失败返回空列表
+        """
+        branches = []
+        for model, conditions in (
+            (Item, [Item.status.in_(ARCHIVED_STATUSES), Item.consumed_at.isnot(None)]),
+            (ItemArchive, []),
+        ):
+            if since is not None:
+                conditions.append(model.consumed_at >= since)
+            branches.append(
+                select(func.strftime('%Y-%m', model.consumed_at).label('month'), model.status.label('status'))
+                .where(*conditions)
+            )
+        history = union_all(*branches).subquery()
+        query = (
+            select(history.c.month, history.c.status, func.count())
+            .group_by(history.c.month, history.c.status)
+            .order_by(history.c.month)
+        )
+        try:
+            with db_service.session_scope() as session:
+                summary: Dict[str, Dict[str, Any]] = {}
+                for month, status, count in session.execute(query):
+                    entry = summary.setdefault(month, {'month': month, 'consumed': 0, 'wasted': 0})
+                    entry['wasted' if status == ItemStatus.WASTED else 'consumed'] += count
+                return list(summary.values())
+        except Exception as e:
+            logger.error("统计消耗历史失败: %s", e)
+            return []
+
+
+# 全局归档服务
+archive_service = ArchiveService()
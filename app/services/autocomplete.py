@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+物品名称自动补全
+
+在内存中为所有 ItemWiki 名称建立前缀树，每个名称插入三类键：
+- 规范化名称（前缀匹配，排序最靠前）；
+- 拼音首字母，如输入 "xnn" 匹配 "鲜牛奶"；
+- 名称的各个后缀，如输入 "牛奶" 匹配 "鲜牛奶"（子串匹配）。
+
+每个节点预先保存前 K 个候选，查询只需沿输入走一遍前缀树，耗时为微秒级。
+索引在启动时于后台构建，新增 Wiki 通过 WIKI_CHANGED 事件增量插入；
+修改与删除会使候选失效，并在后台合并重建。
+"""
+
+import bisect
+import threading
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from app.models.item import Item
+from app.models.item_wiki import ItemWiki
+from app.services.database import db_service
+from app.services.wiki_defaults import normalize_item_name
+from app.utils.events import WIKI_CHANGED, event_bus
+from app.utils.logger import setup_logger
+from app.utils.pinyin import pinyin_initials
+
+logger = setup_logger(__name__)
+
+# 每个节点保存的候选数量（suggest 的 limit 不应超过该值）
+TOP_K = 10
+
+# 匹配方式的排序优先级
+_MATCH_PREFIX = 0
+_MATCH_INITIALS = 1
+_MATCH_SUBSTRING = 2
+
+
+class _Node:
+    __slots__ = ('children', 'top')
+
+    def __init__(self):
+        self.children: Dict[str, '_Node'] = {}
+        # [(排序键, wiki_id)]，按排序键升序，最多 TOP_K 个
+        self.top: List[tuple] = []
+
+
+class AutocompleteIndex:
+    """物品名称前缀树索引"""
+
+    def __init__(self):
+        self._root = _Node()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dead = set()
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._rebuild_pending = threading.Event()
+        self._rebuild_thread: Optional[threading.Thread] = None
+        event_bus.subscribe(WIKI_CHANGED, self._on_wiki_changed)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    # ---------------- 构建 ----------------
+    @staticmethod
+    def _query_entries() -> List[Dict[str, Any]]:
+        """读取全部 Wiki 名称及其库存记录数（用于排序）"""
+        usage = (
+            select(Item.wiki_pk, func.count().label('uses'))
+            .group_by(Item.wiki_pk)
+            .subquery()
+        )
+        query = (
+            select(ItemWiki.id, ItemWiki.name, func.coalesce(usage.c.uses, 0))
+            .outerjoin(usage, usage.c.wiki_pk == ItemWiki.pk)
+        )
+        with db_service.session_scope() as session:
+            return [
+                {'id': wiki_id, 'name': name, 'uses': uses}
+                for wiki_id, name, uses in session.execute(query).all()
+            ]
+
+    def build(self) -> int:
+        """
+        从数据库重建索引
+
+        Returns:
+            int: 索引中的名称数量
+        """
+        try:
+            entries = self._query_entries()
+        except Exception as e:
+            logger.error("构建自动补全索引失败: %s", e)
+            return 0
+
+        root = _Node()
+        for entry in entries:
+            self._insert(root, entry)
+        with self._lock:
+            self._root = root
+            self._entries = {entry['id']: entry for entry in entries}
+            self._dead.clear()
+            self._loaded = True
+        logger.debug("自动补全索引已构建: %s 个名称", len(entries))
+        return len(entries)
+
+    def ensure_loaded(self) -> None:
+        """尚未构建时同步构建"""
+        if not self._loaded:
+            self.build()
+
+    def load_in_background(self) -> threading.Thread:
+        """在后台线程中构建索引（应用启动时调用）"""
+        thread = threading.Thread(target=self.ensure_loaded, name='autocomplete-index', daemon=True)
+        thread.start()
+        return thread
+
+    def invalidate(self) -> None:
+        """清空索引，下次使用时重新构建"""
+        with self._lock:
+            self._root = _Node()
+            self._entries = {}
+            self._dead.clear()
+            self._loaded = False
+
+    @staticmethod
+    def _keys(name: str):
+        normalized = normalize_item_name(name)
+        yield normalized, _MATCH_PREFIX
+        initials = pinyin_initials(normalized)
+        if initials and initials != normalized:
+            yield initials, _MATCH_INITIALS
+        for start in range(1, len(normalized)):
+            yield normalized[start:], _MATCH_SUBSTRING
+
+    @staticmethod
+    def _insert(root: _Node, entry: Dict[str, Any]) -> None:
+        wiki_id = entry['id']
+        for key, match in AutocompleteIndex._keys(entry['name']):
+            rank = (match, -entry['uses'], len(entry['name']), entry['name'])
+            node = root
+            for char in key:
+                node = node.children.setdefault(char, _Node())
+                AutocompleteIndex._offer(node, rank, wiki_id)
+
+    @staticmethod
+    def _offer(node: _Node, rank: tuple, wiki_id: str) -> None:
+        top = node.top
+        for index, (existing_rank, existing_id) in enumerate(top):
+            if existing_id == wiki_id:
+                if rank >= existing_rank:
+                    return
+                del top[index]
+                break
+        if len(top) < TOP_K or rank < top[-1][0]:
+            bisect.insort(top, (rank, wiki_id))
+            del top[TOP_K:]
+
+    # ---------------- 事件 ----------------
+    def _on_wiki_changed(self, action: str, wiki_ids=(), wikis: List[Dict[str, Any]] = None, **_) -> None:
+        if not self._loaded:
+            return
+        if action == 'created' and wikis:
+            with self._lock:
+                for wiki in wikis:
+                    entry = {'id': wiki['id'], 'name': wiki['name'], 'uses': 0}
+                    self._entries[entry['id']] = entry
+                    self._insert(self._root, entry)
+                rebuilding = self._rebuild_thread is not None and self._rebuild_thread.is_alive()
+            if rebuilding:
+                # 正在进行的重建可能读取于本次提交之前，需要再重建一次
+                self._schedule_rebuild()
+            return
+        # 修改、删除无法从节点的候选列表中精确撤销：先标记失效，再在后台重建
+        with self._lock:
+            self._dead.update(wiki_ids or ())
+        self._schedule_rebuild()
+
+    def _schedule_rebuild(self) -> None:
+        self._rebuild_pending.set()
+        with self._lock:
+            if self._rebuild_thread is not None and self._rebuild_thread.is_alive():
+                return
+            self._rebuild_thread = threading.Thread(target=self._rebuild_loop, name='autocomplete-rebuild', daemon=True)
+            self._rebuild_thread.start()
+
+    def _rebuild_loop(self) -> None:
+        # 重建期间到达的事件合并为下一次重建
+        while self._rebuild_pending.is_set():
+            self._rebuild_pending.clear()
+            self.build()
+
+    def wait_for_rebuild(self, timeout: float = None) -> None:
+        """等待后台重建完成（测试使用）"""
+        thread = self._rebuild_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    # ---------------- 查询 ----------------
+    def suggest(self, text: str, limit: int = 8) -> List[Dict[str, Any]]:
+        """
+        返回补全候选
+
+        Args:
+            text: 用户输入（汉字、拼音首字母或名称片段）
+            limit: 最多返回数量（不超过 TOP_K）
+
+        Returns:
+            List[Dict]: 候选 Wiki（id、name、uses），按 前缀 > 拼音首字母 > 子串、使用次数排序
+        """
+        key = normalize_item_name(text)
+        if not key:
+            return []
+        self.ensure_loaded()
+        node = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        dead = self._dead
+        result = []
+        for _, wiki_id in node.top:
+            if wiki_id in dead:
+                continue
+            entry = self._entries.get(wiki_id)
+            if entry is not None:
+                result.append(dict(entry))
+                if len(result) >= limit:
+                    break
+        return result
+
+
+# 全局自动补全索引
+autocomplete_index = AutocompleteIndex()
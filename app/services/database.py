@@ -5,16 +5,25 @@
 
 import os
 from pathlib import Path
-from sqlalchemy import create_engine, text
+from typing import Any, Dict, Iterable
+from sqlalchemy import create_engine, select, text
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.schema import CreateTable
 from sqlalchemy.exc import SQLAlchemyError
 from contextlib import contextmanager
 
-from app.models.item import Base
+from app.models.item import Base, source_line_key
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# SQLite 单条语句的绑定参数上限较低，IN 列表按此大小分批
+_IN_CHUNK_SIZE = 500
+
+# PRAGMA auto_vacuum 的取值：0 = NONE, 1 = FULL, 2 = INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+_AUTO_VACUUM_MODES = {0: 'none', 1: 'full', 2: 'incremental'}
+
 
 def get_database_url() -> str:
     """
@@ -52,6 +61,16 @@ def init_database() -> None:
 
         # 关键：先导入ItemWiki，确保SQLAlchemy在配置Item的关系之前已加载该模型
         from app.models.item_wiki import ItemWiki, ItemWikiCategory
+        from app.models.recipe import Recipe, RecipeIngredient
+        from app.models.maintenance import MaintenanceState
+        from app.models.archive import ItemArchive
+        from app.models.setting import Setting
+
+        # 新建的数据库使用增量 auto_vacuum，由 db_maintenance 在空闲时归还空闲页；
+        # 已有表的数据库设置不会生效，需要一次 VACUUM（同样由 db_maintenance 执行）
+        if db_url.startswith('sqlite'):
+            with engine.connect() as conn:
+                conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
 
         # 创建表
         Base.metadata.create_all(engine)
@@ -59,13 +78,140 @@ def init_database() -> None:
         # 添加新字段（数据库迁移）
         _migrate_database(engine)
 
-        logger.info(f"数据库初始化成功: {db_url}")
+        logger.info("数据库初始化成功: %s", db_url)
 
     except Exception as e:
-        logger.error(f"数据库初始化失败: {str(e)}")
+        logger.error("数据库初始化失败: %s", e)
         raise
 
 
+# items 表索引迁移（与 Item.__table_args__ 保持一致）
+ITEM_INDEX_MIGRATIONS = (
+    "CREATE INDEX IF NOT EXISTS ix_items_status_expiry ON items (status, expiry_date)",
+    "CREATE INDEX IF NOT EXISTS ix_items_status_consumed ON items (status, consumed_at)",
+    "CREATE INDEX IF NOT EXISTS ix_items_stock_by_name ON items (status, name, expiry_date, quantity)",
+    "CREATE INDEX IF NOT EXISTS ix_items_reminder_pending ON items (status, reminder_date) "
+    "WHERE is_reminder_enabled = 1",
+    "CREATE INDEX IF NOT EXISTS ix_items_name_lower ON items (lower(name), status)",
+    "DROP INDEX IF EXISTS ix_items_status",
+    "DROP INDEX IF EXISTS ix_items_consumed_at",
+    "DROP INDEX IF EXISTS ix_items_reminder_date",
+    "DROP INDEX IF EXISTS ix_items_name",
+)
+
+
+# 以整数主键重建的表：(表名, {新外键列: (旧外键列, 被引用的表)})，按依赖顺序排列。
+# 旧表以 UUID 文本为主键，外键、关联表和它们的索引中每一项都是 36 字节的字符串。
+INTEGER_KEY_TABLES = (
+    ('item_wiki_categories', {}),
+    ('item_wikis', {'category_pk': ('category_id', 'item_wiki_categories')}),
+    ('tags', {}),
+    ('items', {'wiki_pk': ('wiki_id', 'item_wikis')}),
+    ('item_tags', {'item_pk': ('item_id', 'items'), 'tag_pk': ('tag_id', 'tags')}),
+    ('reminder_logs', {'item_pk': ('item_id', 'items')}),
+)
+
+
+def _migrate_integer_keys(engine) -> None:
+    """
+    把 UUID 主键的旧表原地重建为整数主键（pk = 原 rowid），UUID 保留在 id 列
+
+    所有表在同一个事务中完成：旧表改名为 <表名>_old，按模型建新表，复制数据并通过
+    UUID 把外键换成整数主键，删除旧表后再按模型建索引。
+    释放的空间留在数据库文件中，需要 VACUUM 才会归还给文件系统。
+    """
+    from sqlalchemy import inspect
+
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    pending = []
+    for name, foreign_keys in INTEGER_KEY_TABLES:
+        if name not in existing:
+            continue
+        table = Base.metadata.tables[name]
+        old_columns = {col['name'] for col in inspector.get_columns(name)}
+        new_keys = {col.name for col in table.primary_key.columns} | set(foreign_keys)
+        if not new_keys <= old_columns:
+            pending.append((table, foreign_keys, old_columns))
+    if not pending:
+        return
+
+    logger.info("重建为整数主键: %s", ', '.join(table.name for table, _, _ in pending))
+    with engine.connect() as conn:
+        # 改名时不改写其他表中指向该表的外键（引用它的表同样会被重建）
+        conn.exec_driver_sql("PRAGMA legacy_alter_table = ON")
+        try:
+            # pysqlite 不会在 DDL 前自动开始事务，显式 BEGIN 保证整个重建是原子的
+            conn.exec_driver_sql("BEGIN")
+            for table, _, _ in pending:
+                for (index_name,) in conn.exec_driver_sql(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                    (table.name,),
+                ).fetchall():
+                    conn.exec_driver_sql(f'DROP INDEX "{index_name}"')
+                conn.exec_driver_sql(f'ALTER TABLE "{table.name}" RENAME TO "{table.name}_old"')
+
+            # 先建表、复制数据，再建索引（比逐行维护索引快得多）
+            for table, _, _ in pending:
+                conn.execute(CreateTable(table))
+
+            for table, foreign_keys, old_columns in pending:
+                columns, values, joins = [], [], []
+                if 'pk' in table.c:
+                    columns.append('pk')
+                    values.append('o.rowid')
+                for column in table.columns:
+                    if column.name in old_columns and column.name not in foreign_keys and column.name != 'pk':
+                        columns.append(column.name)
+                        values.append(f'o."{column.name}"')
+                for number, (new_column, (old_column, parent)) in enumerate(foreign_keys.items()):
+                    alias = f'p{number}'
+                    join = 'LEFT JOIN' if table.c[new_column].nullable else 'JOIN'
+                    columns.append(new_column)
+                    values.append(f'{alias}.pk')
+                    joins.append(f'{join} "{parent}" AS {alias} ON {alias}.id = o."{old_column}"')
+                conn.exec_driver_sql(
+                    f'INSERT INTO "{table.name}" ({", ".join(columns)}) '
+                    f'SELECT {", ".join(values)} FROM "{table.name}_old" AS o {" ".join(joins)}'
+                )
+
+            for table, _, _ in reversed(pending):
+                conn.exec_driver_sql(f'DROP TABLE "{table.name}_old"')
+                for index in table.indexes:
+                    # 旧数据中可能有重复的订单物品：去重索引在迁移的最后一步单独创建
+                    if index.name != 'ux_items_source_line':
+                        index.create(conn)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.exec_driver_sql("PRAGMA legacy_alter_table = OFF")
+    logger.info("整数主键迁移完成")
+
+
+def _backfill_source_line_keys(conn) -> None:
+    """
+    为旧版本导入的订单物品生成去重键
+
+    旧版本按 (source_app, source_order_id, name) 去重，同一订单的同名物品只有一条：
+    按订单行中第 1 个同名物品计算，与 import_service 对同一订单行生成的键一致。
+    """
+    rows = conn.execute(text(
+        "SELECT pk, source_app, source_order_id, name FROM items "
+        "WHERE source_order_id IS NOT NULL AND source_line_key IS NULL ORDER BY pk"
+    )).fetchall()
+    if not rows:
+        return
+    occurrences = {}
+    updates = []
+    for pk, source_app, order_id, name in rows:
+        number = occurrences[(source_app, order_id, name)] = occurrences.get((source_app, order_id, name), 0) + 1
+        updates.append({'pk': pk, 'key': source_line_key('order', order_id, name, number)})
+    conn.execute(text("UPDATE items SET source_line_key = :key WHERE pk = :pk"), updates)
+    logger.info("为 %s 条订单物品生成了去重键", len(updates))
+
+
 def _migrate_database(engine) -> None:
     """
     数据库迁移：添加新字段和新表
@@ -84,7 +230,18 @@ def _migrate_database(engine) -> None:
                 conn.execute(text("ALTER TABLE items ADD COLUMN consumed_at DATETIME"))
                 logger.info("consumed_at字段添加成功")
 
-            if 'wiki_id' not in items_columns:
+            if 'source_line_key' not in items_columns:
+                logger.info("添加source_line_key字段到items表")
+                conn.execute(text("ALTER TABLE items ADD COLUMN source_line_key VARCHAR(40)"))
+
+            for table in ('items', 'items_archive'):
+                if table in inspector.get_table_names() and \
+                        'shelf_life_sampled' not in {col['name'] for col in inspector.get_columns(table)}:
+                    logger.info("添加shelf_life_sampled字段到%s表", table)
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN shelf_life_sampled BOOLEAN NOT NULL DEFAULT 0"))
+
+            # 整数主键迁移之前的旧表才需要 wiki_id（之后由 wiki_pk 取代）
+            if 'wiki_id' not in items_columns and 'wiki_pk' not in items_columns:
                 logger.info("添加wiki_id字段到items表")
                 conn.execute(text("ALTER TABLE items ADD COLUMN wiki_id VARCHAR(36)"))
                 logger.info("wiki_id字段添加成功")
@@ -94,7 +251,7 @@ def _migrate_database(engine) -> None:
                     conn.execute(text("ALTER TABLE items ADD CONSTRAINT fk_wiki_id FOREIGN KEY (wiki_id) REFERENCES item_wikis(id)"))
                     logger.info("wiki_id外键约束添加成功")
                 except Exception as e:
-                    logger.warning(f"添加wiki_id外键约束失败（可能是表不存在）: {e}")
+                    logger.warning("添加wiki_id外键约束失败（可能是表不存在）: %s", e)
 
             # 检查是否需要创建 item_wikis 表
             tables = inspector.get_table_names()
@@ -120,7 +277,7 @@ def _migrate_database(engine) -> None:
                 # 检查并添加缺失的字段
                 item_wikis_columns = [col['name'] for col in inspector.get_columns('item_wikis')]
                 
-                if 'category_id' not in item_wikis_columns:
+                if 'category_id' not in item_wikis_columns and 'category_pk' not in item_wikis_columns:
                     logger.info("添加category_id字段到item_wikis表")
                     conn.execute(text("ALTER TABLE item_wikis ADD COLUMN category_id VARCHAR(36)"))
                     logger.info("category_id字段添加成功")
@@ -134,13 +291,15 @@ def _migrate_database(engine) -> None:
             if 'item_wikis' in tables and 'item_wiki_categories' in tables:
                 try:
                     constraints = inspector.get_foreign_keys('item_wikis')
-                    has_fk = any(ct['constrained_columns'] == ['category_id'] for ct in constraints)
+                    has_fk = any(
+                        ct['constrained_columns'] in (['category_id'], ['category_pk']) for ct in constraints
+                    )
                     if not has_fk:
                         logger.info("添加item_wikis.category_id外键约束")
                         conn.execute(text("ALTER TABLE item_wikis ADD CONSTRAINT fk_category_id FOREIGN KEY (category_id) REFERENCES item_wiki_categories(id)"))
                         logger.info("外键约束添加成功")
                 except Exception as e:
-                    logger.warning(f"添加外键约束失败: {e}")
+                    logger.warning("添加外键约束失败: %s", e)
 
             if 'item_wiki_categories' not in tables:
                 logger.info("创建item_wiki_categories表")
@@ -157,8 +316,87 @@ def _migrate_database(engine) -> None:
                 """))
                 logger.info("item_wiki_categories表创建成功")
 
+        # UUID 主键的旧表重建为整数主键
+        _migrate_integer_keys(engine)
+
+        with engine.begin() as conn:
+            # 按标签查物品的复合索引（主键 (item_pk, tag_pk) 只覆盖按物品查标签）
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_item_tags_tag_item ON item_tags (tag_pk, item_pk)"
+            ))
+
+            # 热点查询的复合/部分索引（依据 index_advisor 的 EXPLAIN QUERY PLAN 报告），
+            # 并删除被它们取代的单列索引：低选择性的 status 单列索引会被优先选中，
+            # 导致过期扫描、临期、提醒等查询扫描全部同状态的物品
+            for statement in ITEM_INDEX_MIGRATIONS:
+                conn.execute(text(statement))
+
+        # 订单导入去重索引；已有重复数据时创建会失败，单独处理以免影响其他迁移
+        try:
+            with engine.begin() as conn:
+                _backfill_source_line_keys(conn)
+                conn.execute(text("DROP INDEX IF EXISTS ux_items_source_order"))
+                conn.execute(text(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS ux_items_source_line "
+                    "ON items (source_app, source_line_key) WHERE source_line_key IS NOT NULL"
+                ))
+        except Exception as e:
+            logger.warning("创建订单去重索引失败（可能存在重复的订单物品）: %s", e)
+
     except Exception as e:
-        logger.warning(f"数据库迁移失败: {e}")
+        logger.warning("数据库迁移失败: %s", e)
+
+
+def insert_or_ignore(connection, table, rows, from_select=None) -> int:
+    """
+    批量插入，忽略违反唯一约束的行（INSERT OR IGNORE / ON CONFLICT DO NOTHING）
+
+    Args:
+        connection: Connection 或 Session
+        table: 目标表（Table 对象）
+        rows: 字典列表
+        from_select: 可选，(列名列表, Select)，以 INSERT ... SELECT 写入查询结果（此时忽略 rows）
+
+    Returns:
+        int: 实际插入的行数
+    """
+    if not rows and from_select is None:
+        return 0
+    dialect = connection.get_bind().dialect.name if isinstance(connection, Session) else connection.dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(table).on_conflict_do_nothing()
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table).on_conflict_do_nothing()
+    else:
+        from sqlalchemy import insert
+        stmt = insert(table).prefix_with('IGNORE')
+    if from_select is not None:
+        result = connection.execute(stmt.from_select(*from_select))
+    else:
+        result = connection.execute(stmt, rows)
+    return max(result.rowcount, 0)
+
+
+def resolve_pks(connection, model, ids: Iterable[str]) -> Dict[str, int]:
+    """
+    把对外的 UUID 批量转换为内部整数主键
+
+    Args:
+        connection: Connection 或 Session
+        model: 模型类（包含 id 与 pk 列）
+        ids: UUID 列表
+
+    Returns:
+        Dict[str, int]: UUID -> 整数主键，不存在的 ID 不包含在内
+    """
+    ids = list(dict.fromkeys(value for value in ids if value))
+    result = {}
+    for start in range(0, len(ids), _IN_CHUNK_SIZE):
+        chunk = ids[start:start + _IN_CHUNK_SIZE]
+        result.update(connection.execute(select(model.id, model.pk).where(model.id.in_(chunk))).all())
+    return result
 
 
 def get_session() -> Session:
@@ -188,7 +426,7 @@ def get_session_ctx():
         session.commit()
     except Exception as e:
         session.rollback()
-        logger.error(f"数据库操作失败: {str(e)}")
+        logger.error("数据库操作失败: %s", e)
         raise
     finally:
         session.close()
@@ -199,7 +437,32 @@ class DatabaseService:
 
     def __init__(self):
         self.engine = create_engine(get_database_url())
-        self.SessionLocal = sessionmaker(bind=self.engine)
+        # 提交后不使对象过期：服务方法会在会话关闭后把 ORM 对象返回给调用方读取
+        self.SessionLocal = sessionmaker(bind=self.engine, expire_on_commit=False)
+
+        # 全局 SQL 统计（SQL_INSTRUMENTATION=1 时开启）
+        self.instrumentation = None
+        if os.getenv('SQL_INSTRUMENTATION') == '1':
+            from app.services.sql_instrumentation import SQLInstrumentation
+            self.instrumentation = SQLInstrumentation(self.engine).enable()
+
+    @contextmanager
+    def instrument(self, slow_query_ms: float = None):
+        """
+        临时开启 SQL 统计
+
+        Args:
+            slow_query_ms: 慢查询阈值（毫秒），默认读取 SQL_SLOW_QUERY_MS
+
+        Yields:
+            SQLInstrumentation: 统计收集器，可用 report() 或 assert_max_queries() 检查结果
+        """
+        from app.services.sql_instrumentation import SQLInstrumentation
+        instrumentation = SQLInstrumentation(self.engine, slow_query_ms).enable()
+        try:
+            yield instrumentation
+        finally:
+            instrumentation.disable()
 
     def get_session(self) -> Session:
         """获取数据库会话"""
@@ -214,7 +477,7 @@ class DatabaseService:
             session.commit()
         except Exception as e:
             session.rollback()
-            logger.error(f"数据库操作失败: {str(e)}")
+            logger.error("数据库操作失败: %s", e)
             raise
         finally:
             session.close()
@@ -235,7 +498,7 @@ class DatabaseService:
                 result = session.execute(sql, params or {})
                 return result
         except SQLAlchemyError as e:
-            logger.error(f"SQL执行失败: {str(e)}")
+            logger.error("SQL执行失败: %s", e)
             raise
 
     def get_table_count(self, table_name: str) -> int:
@@ -255,9 +518,47 @@ class DatabaseService:
                 result = session.execute(sql).scalar()
                 return result or 0
         except SQLAlchemyError as e:
-            logger.error(f"获取表记录数失败: {str(e)}")
+            logger.error("获取表记录数失败: %s", e)
             return 0
 
+    def get_database_stats(self) -> Dict[str, Any]:
+        """
+        获取数据库文件的存储统计（SQLite）
+
+        Returns:
+            Dict[str, Any]: file_size（字节，包括 -wal 文件）、page_size、page_count、
+                freelist_count（空闲页数）、fragmentation（空闲页占总页数的比例）、
+                auto_vacuum（none / full / incremental）、analyzed（是否已收集规划器统计）；
+                失败返回空字典
+        """
+        try:
+            with self.engine.connect() as conn:
+                page_size = conn.exec_driver_sql("PRAGMA page_size").scalar()
+                page_count = conn.exec_driver_sql("PRAGMA page_count").scalar()
+                freelist_count = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+                auto_vacuum = conn.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+                analyzed = conn.exec_driver_sql(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+                ).first() is not None
+        except SQLAlchemyError as e:
+            logger.error("获取数据库统计失败: %s", e)
+            return {}
+
+        path = self.engine.url.database
+        if path and path != ':memory:' and os.path.exists(path):
+            file_size = sum(os.path.getsize(p) for p in (path, f"{path}-wal") if os.path.exists(p))
+        else:
+            file_size = page_size * page_count
+        return {
+            'file_size': file_size,
+            'page_size': page_size,
+            'page_count': page_count,
+            'freelist_count': freelist_count,
+            'fragmentation': freelist_count / page_count if page_count else 0.0,
+            'auto_vacuum': _AUTO_VACUUM_MODES.get(auto_vacuum, str(auto_vacuum)),
+            'analyzed': analyzed,
+        }
+
     def backup_database(self, backup_path: str = None) -> bool:
         """
         备份数据库
@@ -278,14 +579,14 @@ class DatabaseService:
                 # 简单的文件复制备份
                 import shutil
                 shutil.copy2(original_db, backup_path)
-                logger.info(f"数据库备份成功: {backup_path}")
+                logger.info("数据库备份成功: %s", backup_path)
                 return True
             else:
-                logger.warning(f"暂不支持此数据库类型的备份: {db_url.split(':')[0]}")
+                logger.warning("暂不支持此数据库类型的备份: %s", db_url.split(':')[0])
                 return False
 
         except Exception as e:
-            logger.error(f"数据库备份失败: {str(e)}")
+            logger.error("数据库备份失败: %s", e)
             return False
 
 
@@ -300,4 +601,4 @@ if __name__ == '__main__':
 
     # 获取数据库统计信息
     count = db_service.get_table_count('items')
-    logger.info(f"items表记录数: {count}")
\ No newline at end of file
+    logger.info("items表记录数: %s", count)
\ No newline at end of file
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+数据库维护（SQLite）
+
+物品表持续变动：每小时清理已消耗物品、频繁新增、批量修改与订单导入。SQLite 不会自动
+更新查询规划器的统计信息，也不会归还删除后留下的空闲页，时间一长查询计划与文件大小
+都会变差。本服务在后台定时检查，只在应用空闲（一段时间内没有物品修改）时执行：
+
+- 变动行数（ITEMS_CHANGED 事件与批量写入上报的行数，加上启动时物品数与统计行数的差）
+  超过阈值时执行 ANALYZE 更新 sqlite_stat1，否则只执行开销很小的 PRAGMA optimize；
+- 数据库使用 auto_vacuum=INCREMENTAL，每次最多归还 VACUUM_STEP_PAGES 个空闲页
+  （PRAGMA incremental_vacuum），不会长时间占用写锁；新建的数据库直接使用该模式，
+  已有的数据库在第一次空闲时执行一次完整 VACUUM 切换。
+
+运行记录保存在 maintenance_state 表中；文件大小、空闲页与碎片率通过
+db_service.get_database_stats() 查看。
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.models.maintenance import MaintenanceState
+from app.services.database import AUTO_VACUUM_INCREMENTAL, db_service
+from app.utils.clock import app_clock
+from app.utils.events import ITEMS_CHANGED, event_bus
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# maintenance_state 中的任务名称
+ANALYZE_JOB_NAME = 'analyze'
+VACUUM_JOB_NAME = 'incremental_vacuum'
+
+# 变动行数达到 max(ANALYZE_MIN_CHANGES, 上次统计行数 × ANALYZE_CHANGE_RATIO) 时重新 ANALYZE；
+# 物品少于 ANALYZE_MIN_CHANGES 时不收集统计，SQLite 的默认估计对小表已经足够
+ANALYZE_MIN_CHANGES = 1000
+ANALYZE_CHANGE_RATIO = 0.1
+
+# 空闲页少于 VACUUM_MIN_FREE_PAGES 时不整理；每次最多归还 VACUUM_STEP_PAGES 页（4KB 页约 2MB）
+VACUUM_MIN_FREE_PAGES = 64
+VACUUM_STEP_PAGES = 512
+
+
+def maintenance_interval() -> float:
+    """维护检查间隔（秒），由 DB_MAINTENANCE_INTERVAL 环境变量指定，默认 10 分钟"""
+    return float(os.getenv('DB_MAINTENANCE_INTERVAL', 600))
+
+
+class DatabaseMaintenance:
+    """空闲时执行的 ANALYZE / PRAGMA optimize / 增量 VACUUM"""
+
+    def __init__(self, interval: float = None, idle_seconds: float = 60.0):
+        """
+        Args:
+            interval: 检查间隔（秒），默认由 DB_MAINTENANCE_INTERVAL 决定
+            idle_seconds: 距离上一次物品修改超过该秒数才视为空闲
+        """
+        self.interval = interval or maintenance_interval()
+        self.idle_seconds = idle_seconds
+        self._changes = 0
+        self._last_change = 0.0
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        event_bus.subscribe(ITEMS_CHANGED, self._on_items_changed)
+
+    # ---------------- 变动统计 ----------------
+    def _on_items_changed(self, action: str, item_ids=None, names=None, count: int = None, **_) -> None:
+        if action == 'reload':
+            return
+        self.record_changes(count or len(item_ids or ()) or len(names or ()) or 1)
+
+    def record_changes(self, count: int) -> None:
+        """
+        记录物品表的变动行数
+
+        Args:
+            count: 新增、修改或删除的行数
+        """
+        with self._lock:
+            self._changes += max(int(count), 0)
+            self._last_change = time.monotonic()
+
+    @property
+    def pending_changes(self) -> int:
+        """上次 ANALYZE 之后记录的变动行数"""
+        return self._changes
+
+    def is_idle(self) -> bool:
+        """距离上一次物品修改是否已超过 idle_seconds"""
+        return time.monotonic() - self._last_change >= self.idle_seconds
+
+    def reset(self) -> None:
+        """清空变动统计"""
+        with self._lock:
+            self._changes = 0
+            self._last_change = 0.0
+
+    # ---------------- ANALYZE ----------------
+    @staticmethod
+    def analyzed_rows(connection) -> Optional[int]:
+        """
+        上次 ANALYZE 时 items 表的行数
+
+        Args:
+            connection: SQLAlchemy 连接
+
+        Returns:
+            Optional[int]: 行数，从未收集过统计返回None
+        """
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        ).first()
+        if not exists:
+            return None
+        stat = connection.exec_driver_sql("SELECT stat FROM sqlite_stat1 WHERE tbl = 'items' LIMIT 1").scalar()
+        # stat 的第一个数字是表的行数；空表 ANALYZE 后没有记录
+        return int(stat.split()[0]) if stat else 0
+
+    def needs_analyze(self) -> bool:
+        """
+        是否需要重新收集统计：从未收集且物品数达到下限，或变动行数超过阈值
+
+        Returns:
+            bool: 是否需要 ANALYZE
+        """
+        with db_service.engine.connect() as conn:
+            analyzed = self.analyzed_rows(conn)
+            count = conn.exec_driver_sql("SELECT count(*) FROM items").scalar() or 0
+        if analyzed is None:
+            return count >= ANALYZE_MIN_CHANGES
+        # 上次运行之后（包括应用未运行期间）的变动至少体现为行数的差
+        changes = self._changes + abs(count - analyzed)
+        return changes >= max(ANALYZE_MIN_CHANGES, int(analyzed * ANALYZE_CHANGE_RATIO))
+
+    def analyze(self) -> bool:
+        """
+        收集全部表的统计信息（ANALYZE）
+
+        Returns:
+            bool: 是否成功
+        """
+        started = time.perf_counter()
+        changes = self._changes
+        try:
+            with db_service.engine.connect() as conn:
+                conn.exec_driver_sql("ANALYZE")
+                conn.commit()
+                rows = self.analyzed_rows(conn) or 0
+        except Exception as e:
+            logger.error("ANALYZE 失败: %s", e)
+            return False
+
+        with self._lock:
+            self._changes = max(self._changes - changes, 0)
+        self._record(ANALYZE_JOB_NAME, rows)
+        logger.info("ANALYZE 完成: items %s 行，耗时 %.0fms", rows, (time.perf_counter() - started) * 1000)
+        return True
+
+    @staticmethod
+    def optimize() -> bool:
+        """
+        执行 PRAGMA optimize（只分析 SQLite 认为需要的表，开销很小）
+
+        Returns:
+            bool: 是否成功
+        """
+        try:
+            with db_service.engine.connect() as conn:
+                conn.exec_driver_sql("PRAGMA optimize")
+                conn.commit()
+            return True
+        except Exception as e:
+            logger.error("PRAGMA optimize 失败: %s", e)
+            return False
+
+    # ---------------- VACUUM ----------------
+    @staticmethod
+    def enable_incremental_vacuum() -> bool:
+        """
+        把已有数据库切换为 auto_vacuum=INCREMENTAL（需要一次完整 VACUUM，会重写整个文件）
+
+        Returns:
+            bool: 是否执行了切换
+        """
+        try:
+            with db_service.engine.connect() as conn:
+                if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == AUTO_VACUUM_INCREMENTAL:
+                    return False
+                started = time.perf_counter()
+                conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.exec_driver_sql("VACUUM")
+                mode = conn.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+        except Exception as e:
+            logger.error("切换增量 VACUUM 失败: %s", e)
+            return False
+        logger.info("数据库已切换为增量 VACUUM (auto_vacuum=%s)，耗时 %.0fms",
+                    mode, (time.perf_counter() - started) * 1000)
+        return mode == AUTO_VACUUM_INCREMENTAL
+
+    def incremental_vacuum(self, max_pages: int = VACUUM_STEP_PAGES) -> int:
+        """
+        归还最多 max_pages 个空闲页
+
+        Args:
+            max_pages: 本次最多归还的页数
+
+        Returns:
+            int: 实际归还的页数；未使用增量模式、空闲页不足或失败返回0
+        """
+        try:
+            with db_service.engine.connect() as conn:
+                if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() != AUTO_VACUUM_INCREMENTAL:
+                    return 0
+                before = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+                if before < VACUUM_MIN_FREE_PAGES:
+                    return 0
+                # incremental_vacuum 每执行一步归还一页；pysqlite 对不返回列的语句只执行一步，
+                # 通过 executescript（sqlite3_exec）执行到底
+                conn.commit()
+                conn.connection.driver_connection.executescript(f"PRAGMA incremental_vacuum({int(max_pages)})")
+                after = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        except Exception as e:
+            logger.error("增量 VACUUM 失败: %s", e)
+            return 0
+
+        freed = before - after
+        self._record(VACUUM_JOB_NAME, freed)
+        logger.debug("增量 VACUUM 归还 %s 页，剩余空闲页 %s", freed, after)
+        return freed
+
+    # ---------------- 调度 ----------------
+    def run(self, force: bool = False) -> Dict[str, Any]:
+        """
+        执行一次维护检查（定时器线程调用，也可手动调用）
+
+        Args:
+            force: 不检查是否空闲
+
+        Returns:
+            Dict: analyzed、optimized、converted（是否切换为增量 VACUUM）、vacuumed_pages
+        """
+        result = {'analyzed': False, 'optimized': False, 'converted': False, 'vacuumed_pages': 0}
+        if not force and not self.is_idle():
+            return result
+        # 定时器与手动调用不能同时执行
+        if not self._run_lock.acquire(blocking=False):
+            return result
+        try:
+            if self.needs_analyze():
+                result['analyzed'] = self.analyze()
+            else:
+                result['optimized'] = self.optimize()
+            result['converted'] = self.enable_incremental_vacuum()
+            if not result['converted']:
+                result['vacuumed_pages'] = self.incremental_vacuum()
+        except Exception as e:
+            logger.error("数据库维护失败: %s", e)
+        finally:
+            self._run_lock.release()
+        return result
+
+    def start(self) -> None:
+        """启动维护定时器（重复调用只保留一个定时器）"""
+        self.stop()
+        timer = threading.Timer(self.interval, self._on_timer)
+        timer.name = 'db-maintenance'
+        timer.daemon = True
+        self._timer = timer
+        timer.start()
+
+    def stop(self) -> None:
+        """停止维护定时器"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _on_timer(self) -> None:
+        try:
+            self.run()
+        finally:
+            if self._timer is not None:
+                self.start()
+
+    @staticmethod
+    def _record(name: str, rows: int) -> None:
+        try:
+            with db_service.session_scope() as session:
+                session.merge(MaintenanceState(
+                    name=name,
+                    last_run_date=app_clock.today(),
+                    last_run_at=datetime.utcnow(),
+                    rows_affected=rows,
+                ))
+        except Exception as e:
+            logger.error("记录维护状态失败: %s", e)
+
+
+# 全局数据库维护服务
+db_maintenance = DatabaseMaintenance()
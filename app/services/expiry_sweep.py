@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+过期状态扫描
+
+物品过期后不会有任何写操作触发 Item.update_status()，状态会一直停留在 ACTIVE。
+本服务每天（应用时钟发布 DAY_CHANGED 时，或跨天后第一次读取时）执行一条集合 UPDATE，
+把 expiry_date 早于今天的 ACTIVE 物品改为 EXPIRED，并在 maintenance_state 表中记录扫描日期。
+扫描之后读取方可以直接按 status 筛选（使用 status 索引），不必再逐条比较过期日期。
+"""
+
+import threading
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import update
+
+from app.models.item import Item, ItemStatus
+from app.models.maintenance import MaintenanceState
+from app.services.database import db_service
+from app.utils.clock import app_clock
+from app.utils.events import DAY_CHANGED, ITEMS_CHANGED, event_bus
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# maintenance_state 中的任务名称
+SWEEP_JOB_NAME = 'expiry_sweep'
+
+
+class ExpirySweeper:
+    """每日过期状态扫描"""
+
+    def __init__(self):
+        self._last_swept: Optional[date] = None
+        self._state_loaded = False
+        self._lock = threading.Lock()
+        event_bus.subscribe(DAY_CHANGED, self._on_day_changed)
+
+    def _on_day_changed(self, today: date, **_) -> None:
+        self.sweep_if_needed(today)
+
+    def last_swept_date(self) -> Optional[date]:
+        """
+        获取最近一次扫描的日期（首次调用时从数据库读取）
+
+        Returns:
+            Optional[date]: 扫描日期，从未扫描过返回None
+        """
+        if not self._state_loaded:
+            try:
+                with db_service.session_scope() as session:
+                    state = session.get(MaintenanceState, SWEEP_JOB_NAME)
+                    self._last_swept = state.last_run_date if state else None
+                self._state_loaded = True
+            except Exception as e:
+                logger.error("读取过期扫描状态失败: %s", e)
+        return self._last_swept
+
+    def invalidate(self) -> None:
+        """清除缓存的扫描日期，下次使用时重新读取"""
+        self._last_swept = None
+        self._state_loaded = False
+
+    def sweep(self, today: date = None) -> int:
+        """
+        将已过期的使用中物品批量标记为已过期
+
+        Args:
+            today: 基准日期，默认今天
+
+        Returns:
+            int: 状态被修改的物品数量，失败返回0
+        """
+        today = today or app_clock.today()
+        with self._lock:
+            try:
+                with db_service.session_scope() as session:
+                    rows = session.execute(
+                        update(Item)
+                        .where(
+                            Item.status == ItemStatus.ACTIVE,
+                            Item.expiry_date.isnot(None),
+                            Item.expiry_date < today,
+                        )
+                        .values(status=ItemStatus.EXPIRED)
+                        .returning(Item.id, Item.name)
+                        .execution_options(synchronize_session=False)
+                    ).all()
+                    session.merge(MaintenanceState(
+                        name=SWEEP_JOB_NAME,
+                        last_run_date=today,
+                        last_run_at=datetime.utcnow(),
+                        rows_affected=len(rows),
+                    ))
+            except Exception as e:
+                logger.error("过期状态扫描失败: %s", e)
+                return 0
+
+            self._last_swept = today
+            self._state_loaded = True
+
+        if rows:
+            event_bus.emit(ITEMS_CHANGED, action='expired', item_ids=[row.id for row in rows],
+                           names=sorted({row.name for row in rows}))
+        logger.info("过期状态扫描完成 (%s): %s 个物品标记为已过期", today, len(rows))
+        return len(rows)
+
+    def sweep_if_needed(self, today: date = None) -> int:
+        """
+        当天尚未扫描时执行扫描；已扫描时只比较内存中的日期，开销可以忽略
+
+        Args:
+            today: 基准日期，默认今天
+
+        Returns:
+            int: 状态被修改的物品数量
+        """
+        today = today or app_clock.today()
+        last = self.last_swept_date()
+        if last is not None and last >= today:
+            return 0
+        return self.sweep(today)
+
+
+# 全局过期扫描服务
+expiry_sweeper = ExpirySweeper()
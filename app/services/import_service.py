@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+"""
+订单文件导入服务
+
+以流式方式读取购物订单导出文件（CSV / JSON / JSON Lines），逐块写入物品库存：
+- 解析器可按来源应用注册（register_parser），内置通用 CSV 与 JSON 解析器；
+- 数量与日期先校验，无效的行不会创建 Wiki；
+- 物品名称通过 Wiki 默认值索引（wiki_defaults）匹配 ItemWiki，未知名称批量创建 Wiki；
+- 每个订单行生成去重键（Item.source_line_key）：有订单号时为 订单号 + 名称 + 该名称在订单中的序号，
+  没有订单号时为行内容的哈希 + 相同内容的序号；通过 (source_app, source_line_key) 唯一索引 +
+  INSERT OR IGNORE 去重，重复导入同一文件不会产生重复物品，同一订单中的多个同名物品都会导入；
+- iter_import() 在每个批次提交后产出进度，import_file() 返回最终统计。
+"""
+
+import csv
+import json
+import os
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Type, Union
+
+from dateutil import parser as date_parser
+
+from app.models.item import Item, ItemStatus, source_line_key
+from app.models.item_wiki import ItemWiki
+from app.services.database import db_service, insert_or_ignore, resolve_pks
+from app.services.settings_service import settings_service
+from app.services.wiki_defaults import normalize_item_name, wiki_defaults
+from app.utils.clock import app_clock
+from app.utils.events import ITEMS_CHANGED, WIKI_CHANGED, event_bus
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 默认每批写入的行数
+DEFAULT_CHUNK_SIZE = 500
+
+# 进度中保留的错误信息条数
+MAX_ERROR_MESSAGES = 20
+
+
+def _parse_date(value) -> Optional[date]:
+    if value in (None, ''):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date_parser.parse(str(value)).date()
+
+
+def _parse_quantity(value) -> int:
+    if value in (None, ''):
+        return 1
+    return max(int(float(value)), 1)
+
+
+# ---------------- 解析器 ----------------
+
+class OrderParser:
+    """
+    订单文件解析器基类
+
+    子类实现 parse()，逐条产出订单行字典：
+    name（必填）、quantity、unit、purchase_date、expiry_date、source_order_id、description。
+    """
+
+    # 来源应用名称，写入 Item.source_app
+    source_app = 'generic'
+
+    # 支持的文件扩展名
+    extensions = ()
+
+    def parse(self, stream: IO[str]) -> Iterator[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+_PARSERS: Dict[str, Type[OrderParser]] = {}
+
+
+def register_parser(parser_cls: Type[OrderParser]) -> Type[OrderParser]:
+    """
+    注册订单解析器（可作为类装饰器使用）
+
+    同一来源应用可注册多个解析器（按扩展名区分），键为 "来源:扩展名"。
+    """
+    for extension in parser_cls.extensions:
+        _PARSERS[f"{parser_cls.source_app}:{extension}"] = parser_cls
+    return parser_cls
+
+
+def get_parser(source_app: str = None, filename: str = None) -> OrderParser:
+    """
+    根据来源应用与文件扩展名选择解析器
+
+    Args:
+        source_app: 来源应用，为 None 时使用通用解析器
+        filename: 文件名（用于判断扩展名）
+
+    Returns:
+        OrderParser: 解析器实例
+
+    Raises:
+        ValueError: 没有匹配的解析器
+    """
+    extension = os.path.splitext(filename or '')[1].lower() or '.csv'
+    for key in (f"{source_app or 'generic'}:{extension}", f"generic:{extension}"):
+        parser_cls = _PARSERS.get(key)
+        if parser_cls is not None:
+            parser = parser_cls()
+            if source_app and parser.source_app != source_app:
+                parser.source_app = source_app
+            return parser
+    raise ValueError(f"不支持的订单文件: source_app={source_app}, 扩展名={extension}")
+
+
+@register_parser
+class CsvOrderParser(OrderParser):
+    """通用 CSV 解析器，表头支持常见的中英文列名"""
+
+    extensions = ('.csv',)
+
+    # 标准字段 -> 可接受的列名
+    COLUMN_ALIASES = {
+        'name': ('name', 'item', 'product', '名称', '商品名称', '商品', '物品名称'),
+        'quantity': ('quantity', 'qty', 'count', '数量', '购买数量'),
+        'unit': ('unit', '单位', '规格单位'),
+        'purchase_date': ('purchase_date', 'order_date', 'date', '购买日期', '下单时间', '下单日期', '订单时间'),
+        'expiry_date': ('expiry_date', 'expiry', 'best_before', '过期日期', '保质期至', '到期日期'),
+        'source_order_id': ('order_id', 'source_order_id', 'order_no', '订单号', '订单编号'),
+        'description': ('description', 'note', '备注', '描述'),
+    }
+
+    def parse(self, stream: IO[str]) -> Iterator[Dict[str, Any]]:
+        reader = csv.DictReader(stream)
+        mapping = {}
+        for field, aliases in self.COLUMN_ALIASES.items():
+            for column in reader.fieldnames or []:
+                if column and column.strip().lower() in aliases:
+                    mapping[field] = column
+                    break
+        for row in reader:
+            yield {field: row.get(column) for field, column in mapping.items()}
+
+
+@register_parser
+class JsonOrderParser(OrderParser):
+    """
+    通用 JSON 解析器
+
+    支持 JSON 数组（增量解码，不会一次性读入整个文件）与 JSON Lines，
+    字段名与 CsvOrderParser 的别名相同。
+    """
+
+    extensions = ('.json', '.jsonl')
+
+    READ_SIZE = 64 * 1024
+
+    def parse(self, stream: IO[str]) -> Iterator[Dict[str, Any]]:
+        for record in self._iter_records(stream):
+            yield {
+                field: next((record[key] for key in aliases if key in record), None)
+                for field, aliases in CsvOrderParser.COLUMN_ALIASES.items()
+            }
+
+    def _iter_records(self, stream: IO[str]) -> Iterator[Dict[str, Any]]:
+        decoder = json.JSONDecoder()
+        buffer = ''
+        position = 0
+        in_array = None
+        eof = False
+
+        while True:
+            # 跳过空白与分隔符
+            while True:
+                while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                    position += 1
+                if position < len(buffer) or eof:
+                    break
+                buffer, position = stream.read(self.READ_SIZE), 0
+                eof = not buffer
+
+            if position >= len(buffer):
+                return
+            if in_array is None:
+                in_array = buffer[position] == '['
+                if in_array:
+                    position += 1
+                    continue
+            if in_array and buffer[position] == ']':
+                return
+
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = stream.read(self.READ_SIZE)
+                eof = not chunk
+                buffer, position = buffer[position:] + chunk, 0
+                continue
+            position = end
+            if isinstance(record, dict):
+                yield record
+
+
+# ---------------- 导入 ----------------
+
+def _parse_line(line: Dict[str, Any]) -> None:
+    """校验并转换订单行的数量与日期（原地修改），无效时抛出 ValueError / OverflowError"""
+    line['quantity'] = _parse_quantity(line.get('quantity'))
+    line['purchase_date'] = _parse_date(line.get('purchase_date'))
+    line['expiry_date'] = _parse_date(line.get('expiry_date'))
+    order_id = line.get('source_order_id')
+    line['source_order_id'] = str(order_id) if order_id not in (None, '') else None
+
+
+def _resolve_wikis(session, lines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """通过 Wiki 默认值索引为每行匹配 Wiki，批量创建缺失的 Wiki，返回新建的条目"""
+    now = datetime.utcnow()
+    created = {}
+    for line in lines:
+        entry = wiki_defaults.lookup(line['name'])
+        if entry is None:
+            key = normalize_item_name(line['name'])
+            entry = created.get(key)
+            if entry is None:
+                entry = created[key] = {
+                    'id': str(uuid.uuid4()), 'name': line['name'], 'default_unit': line.get('unit'),
+                    'suggested_expiry_days': None,
+                }
+        line['wiki'] = entry
+    if created:
+        insert_or_ignore(session, ItemWiki.__table__, [
+            {'id': entry['id'], 'name': entry['name'], 'default_unit': entry['default_unit'],
+             'created_at': now, 'updated_at': now}
+            for entry in created.values()
+        ])
+    return list(created.values())
+
+
+def _line_key(line: Dict[str, Any], name: str, occurrences: Dict[tuple, int]) -> str:
+    """
+    订单行的去重键
+
+    有订单号时由订单号、名称和该名称在订单中的序号组成；没有订单号时由行内容组成，
+    相同内容的行按出现序号区分。序号在一次导入的全部批次中累计（occurrences）。
+    """
+    if line['source_order_id'] is not None:
+        parts = ('order', line['source_order_id'], name)
+    else:
+        parts = ('row', name, line['quantity'], line.get('unit') or '', line['purchase_date'],
+                 line['expiry_date'], line.get('description') or '')
+    number = occurrences[parts] = occurrences.get(parts, 0) + 1
+    return source_line_key(*parts, number)
+
+
+def _build_item_row(line: Dict[str, Any], source_app: str, reminder_days: int, now: datetime,
+                    wiki_pks: Dict[str, int], occurrences: Dict[tuple, int]) -> Dict[str, Any]:
+    wiki = line['wiki']
+    purchase_date = line['purchase_date']
+    expiry_date = line['expiry_date']
+    if expiry_date is None and purchase_date and wiki['suggested_expiry_days']:
+        expiry_date = purchase_date + timedelta(days=wiki['suggested_expiry_days'])
+    return {
+        'id': str(uuid.uuid4()),
+        'wiki_pk': wiki_pks.get(wiki['id']),
+        # 统一使用 Wiki 中的名称，保证去重键一致
+        'name': wiki['name'],
+        'description': line.get('description') or None,
+        'quantity': line['quantity'],
+        'unit': line.get('unit') or wiki['default_unit'],
+        'purchase_date': purchase_date,
+        'expiry_date': expiry_date,
+        'reminder_date': expiry_date - timedelta(days=reminder_days) if expiry_date else None,
+        'status': ItemStatus.EXPIRED if expiry_date and expiry_date < app_clock.today() else ItemStatus.ACTIVE,
+        'is_reminder_enabled': True,
+        'source_app': source_app,
+        'source_order_id': line['source_order_id'],
+        'source_line_key': _line_key(line, wiki['name'], occurrences),
+        'created_at': now,
+        'updated_at': now,
+    }
+
+
+class ImportService:
+    """订单导入服务类"""
+
+    @staticmethod
+    def iter_import(
+        source: Union[str, IO[str]],
+        source_app: str = None,
+        parser: OrderParser = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        流式导入订单文件，每提交一个批次产出一次进度
+
+        Args:
+            source: 文件路径或已打开的文本流
+            source_app: 来源应用（盒马、淘宝等），决定解析器与 Item.source_app
+            parser: 指定解析器，为 None 时按来源与扩展名选择
+            chunk_size: 每批写入的行数
+
+        Yields:
+            Dict: 进度，包含 processed、inserted、duplicates、errors、created_wikis、
+                  error_messages 与 done（最后一次为 True）
+        """
+        filename = source if isinstance(source, str) else getattr(source, 'name', '')
+        parser = parser or get_parser(source_app, filename)
+        source_app = source_app or parser.source_app
+        reminder_days = settings_service.reminder_days_before()
+
+        progress = {
+            'processed': 0, 'inserted': 0, 'duplicates': 0, 'errors': 0,
+            'created_wikis': 0, 'error_messages': [], 'done': False,
+        }
+        # 去重键的序号：同一订单中的同名物品、没有订单号的相同行
+        occurrences: Dict[tuple, int] = {}
+
+        stream = open(source, 'r', encoding='utf-8-sig', newline='') if isinstance(source, str) else source
+        try:
+            wiki_defaults.ensure_loaded()
+
+            batch = []
+            for line_number, line in enumerate(parser.parse(stream), start=1):
+                progress['processed'] += 1
+                name = str(line.get('name') or '').strip()
+                if not name:
+                    _record_error(progress, line_number, '缺少物品名称')
+                    continue
+                line['name'] = name
+                # 写入前校验，无效的行不会创建 Wiki
+                try:
+                    _parse_line(line)
+                except (ValueError, OverflowError) as e:
+                    _record_error(progress, line_number, e)
+                    continue
+                batch.append(line)
+                if len(batch) >= chunk_size:
+                    ImportService._write_batch(batch, source_app, reminder_days, progress, occurrences)
+                    batch = []
+                    yield dict(progress)
+
+            if batch:
+                ImportService._write_batch(batch, source_app, reminder_days, progress, occurrences)
+        finally:
+            if isinstance(source, str):
+                stream.close()
+
+        progress['done'] = True
+        logger.info(
+            "订单导入完成: 处理 %s 条, 新增 %s 条, 重复 %s 条, 错误 %s 条",
+            progress['processed'], progress['inserted'], progress['duplicates'], progress['errors'],
+        )
+        yield dict(progress)
+
+    @staticmethod
+    def _write_batch(batch: List[Dict[str, Any]], source_app: str, reminder_days: int,
+                     progress: Dict[str, Any], occurrences: Dict[tuple, int]) -> None:
+        """在单个事务中写入一个批次：匹配/创建 Wiki 后批量插入物品，重复的订单行被忽略"""
+        now = datetime.utcnow()
+        with db_service.session_scope() as session:
+            created_wikis = _resolve_wikis(session, batch)
+            # 物品通过整数主键关联 Wiki：一次查询取得本批次用到的全部 Wiki 主键
+            wiki_pks = resolve_pks(session, ItemWiki, [line['wiki']['id'] for line in batch])
+            rows = [
+                _build_item_row(line, source_app, reminder_days, now, wiki_pks, occurrences) for line in batch
+            ]
+            inserted = insert_or_ignore(session, Item.__table__, rows)
+
+        if created_wikis:
+            # 提交后通知索引，后续批次即可匹配到新建的 Wiki
+            event_bus.emit(WIKI_CHANGED, action='created', wiki_ids=[w['id'] for w in created_wikis],
+                           wikis=created_wikis)
+        if inserted:
+            # 重复行被忽略，无法区分具体插入了哪些行：只通知受影响的名称
+            event_bus.emit(ITEMS_CHANGED, action='created', item_ids=[], names=sorted({row['name'] for row in rows}),
+                           count=inserted)
+        progress['created_wikis'] += len(created_wikis)
+        progress['inserted'] += inserted
+        progress['duplicates'] += len(rows) - inserted
+
+    @staticmethod
+    def import_file(
+        source: Union[str, IO[str]],
+        source_app: str = None,
+        parser: OrderParser = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        on_progress: Callable[[Dict[str, Any]], None] = None,
+    ) -> Dict[str, Any]:
+        """
+        导入订单文件并返回最终统计
+
+        Args:
+            source: 文件路径或已打开的文本流
+            source_app: 来源应用
+            parser: 指定解析器
+            chunk_size: 每批写入的行数
+            on_progress: 每个批次提交后的回调
+
+        Returns:
+            Dict: 最终进度统计；导入失败时 done 为 False 并包含 error 字段
+        """
+        progress = {}
+        try:
+            for progress in ImportService.iter_import(source, source_app, parser, chunk_size):
+                if on_progress is not None:
+                    on_progress(progress)
+            return progress
+        except Exception as e:
+            logger.error("订单导入失败: %s", e)
+            return dict(progress, done=False, error=str(e))
+
+
+def _record_error(progress: Dict[str, Any], line_number: int, message) -> None:
+    progress['errors'] += 1
+    if len(progress['error_messages']) < MAX_ERROR_MESSAGES:
+        progress['error_messages'].append(f"第 {line_number} 条: {message}")
+
+
+# 全局订单导入服务实例
+import_service = ImportService()
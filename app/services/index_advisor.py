@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+索引建议（SQLite）
+
+运行一组代表性的服务层查询（物品列表、临期、提醒、统计、Wiki 列表等），记录实际执行的
+SQL，再逐条执行 EXPLAIN QUERY PLAN，报告：
+
+- 每条查询使用的索引、是否全表扫描、是否需要临时 B 树排序；
+- 冗余索引：非唯一、非部分索引，其列是另一个索引的最左前缀；
+- 未被任何查询使用的索引。
+
+迁移中新增/删除的索引以这份报告为依据。可以直接对当前数据库运行:
+
+    python -m app.services.index_advisor
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from sqlalchemy import event
+
+from app.services.database import db_service
+from app.services.sql_instrumentation import fingerprint
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_USING_INDEX = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+_FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+
+def default_workload() -> List[Tuple[str, Callable[[], Any]]]:
+    """
+    代表性的查询：首页列表、临期与提醒、统计、Wiki 列表、菜谱匹配的库存汇总
+
+    Returns:
+        List[Tuple[str, Callable]]: (名称, 无参调用)
+    """
+    from app.models.item import ItemStatus
+    from app.services.item_service import item_service, statistics_service
+    from app.services.recipe_service import recipe_matcher
+    from app.services.wiki_service import wiki_service
+
+    return [
+        ('get_items', item_service.get_items),
+        ('get_items_consumed', lambda: item_service.get_items(status=ItemStatus.CONSUMED)),
+        ('get_expiring_items', lambda: item_service.get_expiring_items(days=7)),
+        ('get_items_needing_reminder', item_service.get_items_needing_reminder),
+        ('get_registered_items', item_service.get_registered_items),
+        ('get_inventory_by_name', lambda: item_service.get_inventory_by_name('鲜牛奶')),
+        ('get_expiry_stats', statistics_service.get_expiry_stats),
+        ('get_category_stats', statistics_service.get_category_stats),
+        ('get_all_wikis', lambda: wiki_service.get_all_wikis(limit=20)),
+        ('wiki_statistics', wiki_service.get_statistics),
+        ('recipe_inventory', recipe_matcher.build),
+    ]
+
+
+def explain(connection, statement: str, parameters=()) -> List[str]:
+    """
+    获取一条 SQL 的执行计划
+
+    Args:
+        connection: SQLAlchemy 连接
+        statement: SQL 语句（带 ? 占位符）
+        parameters: 参数
+
+    Returns:
+        List[str]: 执行计划每一步的描述
+    """
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters or ())).fetchall()
+    return [str(row[-1]) for row in rows]
+
+
+def analyze_plan(plan: Iterable[str]) -> Dict[str, Any]:
+    """
+    分析执行计划
+
+    Args:
+        plan: explain() 的结果
+
+    Returns:
+        Dict: indexes（使用的索引）、full_scans（全表扫描的表）、temp_sort（是否临时排序）
+    """
+    plan = list(plan)
+    indexes = sorted({match for line in plan for match in _USING_INDEX.findall(line)})
+    full_scans = sorted({m.group(1) for m in (_FULL_SCAN.match(line.strip()) for line in plan) if m})
+    return {
+        'indexes': indexes,
+        'full_scans': full_scans,
+        'temp_sort': any('USE TEMP B-TREE' in line for line in plan),
+    }
+
+
+def capture_statements(workload: Iterable[Tuple[str, Callable[[], Any]]], engine=None) -> List[Dict[str, Any]]:
+    """
+    执行查询并记录其中的 SELECT/UPDATE/DELETE（同一指纹只保留第一条）
+
+    Args:
+        workload: (名称, 调用) 列表
+        engine: 数据库引擎，默认 db_service.engine
+
+    Returns:
+        List[Dict]: name、fingerprint、statement、parameters
+    """
+    engine = engine or db_service.engine
+    captured: Dict[str, Dict[str, Any]] = {}
+    current = {'name': None}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if executemany or statement.lstrip()[:6].upper() not in ('SELECT', 'UPDATE', 'DELETE'):
+            return
+        key = fingerprint(statement)
+        if key not in captured:
+            captured[key] = {
+                'name': current['name'], 'fingerprint': key,
+                'statement': statement, 'parameters': parameters,
+            }
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        for name, call in workload:
+            current['name'] = name
+            try:
+                call()
+            except Exception as e:
+                logger.warning("索引检查查询 %s 执行失败: %s", name, e)
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    return list(captured.values())
+
+
+def list_indexes(connection, table: str) -> List[Dict[str, Any]]:
+    """
+    列出表上的索引
+
+    Args:
+        connection: SQLAlchemy 连接
+        table: 表名
+
+    Returns:
+        List[Dict]: name、columns（表达式列为 None）、unique、partial、origin
+    """
+    indexes = []
+    for row in connection.exec_driver_sql(f"PRAGMA index_list('{table}')").fetchall():
+        _, name, unique, origin, partial = row[:5]
+        columns = [info[2] for info in connection.exec_driver_sql(f"PRAGMA index_info('{name}')").fetchall()]
+        indexes.append({
+            'name': name, 'columns': columns, 'unique': bool(unique),
+            'partial': bool(partial), 'origin': origin,
+        })
+    return indexes
+
+
+def redundant_indexes(connection, table: str) -> List[Dict[str, str]]:
+    """
+    查找冗余索引：其列是同表另一个非部分索引的最左前缀
+
+    唯一索引、部分索引与主键不会被判定为冗余。
+
+    Args:
+        connection: SQLAlchemy 连接
+        table: 表名
+
+    Returns:
+        List[Dict]: index（冗余索引）、covered_by（覆盖它的索引）
+    """
+    indexes = list_indexes(connection, table)
+    result = []
+    for index in indexes:
+        columns = index['columns']
+        if index['unique'] or index['partial'] or index['origin'] != 'c' or not columns or None in columns:
+            continue
+        for other in indexes:
+            if other is index or other['partial']:
+                continue
+            if len(other['columns']) > len(columns) and other['columns'][:len(columns)] == columns:
+                result.append({'index': index['name'], 'covered_by': other['name']})
+                break
+    return result
+
+
+def review(workload: Iterable[Tuple[str, Callable[[], Any]]] = None, tables: Iterable[str] = ('items',),
+           engine=None) -> Dict[str, Any]:
+    """
+    运行查询并生成索引报告
+
+    Args:
+        workload: (名称, 调用) 列表，默认 default_workload()
+        tables: 检查冗余与未使用索引的表
+        engine: 数据库引擎，默认 db_service.engine
+
+    Returns:
+        Dict: queries（每条 SQL 的执行计划分析）、redundant、unused
+    """
+    engine = engine or db_service.engine
+    statements = capture_statements(workload if workload is not None else default_workload(), engine)
+    queries = []
+    used = set()
+    with engine.connect() as conn:
+        for captured in statements:
+            try:
+                plan = explain(conn, captured['statement'], captured['parameters'])
+            except Exception as e:
+                logger.warning("EXPLAIN 失败: %s (%s)", captured['fingerprint'], e)
+                continue
+            analysis = analyze_plan(plan)
+            used.update(analysis['indexes'])
+            queries.append(dict(name=captured['name'], fingerprint=captured['fingerprint'], plan=plan, **analysis))
+
+        redundant, unused = [], []
+        for table in tables:
+            redundant.extend(redundant_indexes(conn, table))
+            unused.extend(
+                index['name'] for index in list_indexes(conn, table)
+                if index['origin'] == 'c' and not index['unique'] and index['name'] not in used
+            )
+    return {'queries': queries, 'redundant': redundant, 'unused': unused}
+
+
+def format_report(report: Dict[str, Any]) -> List[str]:
+    """把 review() 的结果格式化为文本行"""
+    lines = []
+    for query in report['queries']:
+        flags = []
+        if query['full_scans']:
+            flags.append(f"全表扫描 {','.join(query['full_scans'])}")
+        if query['temp_sort']:
+            flags.append('临时排序')
+        lines.append(f"[{query['name']}] {query['fingerprint'][:120]} | "
+                     f"索引: {','.join(query['indexes']) or '-'} {' '.join(flags)}".rstrip())
+    for item in report['redundant']:
+        lines.append(f"冗余索引 {item['index']}（被 {item['covered_by']} 覆盖）")
+    if report['unused']:
+        lines.append(f"未被上述查询使用的索引: {', '.join(report['unused'])}")
+    return lines
+
+
+if __name__ == '__main__':
+    from app.services.database import init_database
+
+    init_database()
+    for line in format_report(review()):
+        print(line)
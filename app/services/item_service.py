@@ -3,25 +3,90 @@
 物品服务
 """
 
-import os
 from datetime import datetime, date, timedelta
 from typing import List, Optional, Dict, Any
-from sqlalchemy import desc, or_, and_, func
-from sqlalchemy.orm import Session, object_session
+from sqlalchemy import desc, or_, and_, func, case, literal, null, update, delete, select
+from sqlalchemy.orm import Session
 
-from app.models.item import Item, ItemStatus, Tag
+from app.models.item import IN_STOCK_STATUSES, Item, ItemStatus, ItemTag, ReminderLog
 from app.models.item_wiki import ItemWiki, ItemWikiCategory
-from app.services.database import db_service
+from app.services.archive_service import archive_service
+from app.services.database import db_service, resolve_pks
+from app.services.expiry_sweep import expiry_sweeper
+from app.services.settings_service import EXPIRY_REMINDER_ENABLED, REMINDER_DAYS_BEFORE, settings_service
 from app.services.wiki_service import wiki_service
-from app.utils.logger import setup_logger
+from app.services.tag_service import tag_service
+from app.utils.clock import app_clock
+from app.utils.events import ITEMS_CHANGED, SETTINGS_CHANGED, event_bus
+from app.utils.logger import setup_logger, log_operation
 
 logger = setup_logger(__name__)
 
+# 批量删除时按ID清理关联行的每批数量（低于 SQLite 的参数个数上限）
+BATCH_CHUNK_SIZE = 500
+
+
+def restored_status_expression():
+    """
+    恢复已消耗物品时的状态表达式：已过期的物品恢复为 EXPIRED，其余恢复为 ACTIVE
+
+    Returns:
+        Case: 可用于 UPDATE ... SET status 的 SQL 表达式
+    """
+    return case(
+        (Item.expiry_date < app_clock.today(), literal(ItemStatus.EXPIRED, Item.status.type)),
+        else_=literal(ItemStatus.ACTIVE, Item.status.type),
+    )
+
+
+def quantity_update_statement(item_id: str, delta: int, restore: bool = False):
+    """
+    构造原子增减数量的 UPDATE 语句
+
+    数量不足时不更新任何行；状态按 Item.update_status 的规则在同一语句中同步。
+    数量减到 0 而变为已消耗时同时记录消耗时间（归档与过期预测都依赖 consumed_at）。
+
+    Args:
+        item_id: 物品ID
+        delta: 数量变化
+        restore: 同时恢复已消耗的物品（未过期且数量大于 0 时为 ACTIVE，并清空消耗时间）
+
+    Returns:
+        Update: 返回 (quantity, status, name, consumed_at) 的 UPDATE ... RETURNING 语句
+    """
+    new_quantity = Item.quantity + delta
+    expired = Item.expiry_date < app_clock.today()
+    consumed = literal(ItemStatus.CONSUMED, Item.status.type)
+    active = literal(ItemStatus.ACTIVE, Item.status.type)
+    status = case(
+        (expired, literal(ItemStatus.EXPIRED, Item.status.type)),
+        (new_quantity <= 0, consumed),
+        # 未过期且有剩余：已过期的物品（过期日期已修正）恢复为使用中
+        (Item.status == literal(ItemStatus.EXPIRED, Item.status.type), active),
+        else_=active if restore else Item.status,
+    )
+    # 已经是已消耗状态的物品保留原来的消耗时间（恢复时重新计算）
+    previous_consumed_at = null() if restore else Item.consumed_at
+    becomes_consumed = new_quantity <= 0 if restore else and_(new_quantity <= 0, Item.status != consumed)
+    consumed_at = case(
+        (expired, previous_consumed_at),
+        (becomes_consumed, literal(datetime.utcnow(), Item.consumed_at.type)),
+        else_=previous_consumed_at,
+    )
+    return (
+        update(Item)
+        .where(Item.id == item_id, new_quantity >= 0)
+        .values(quantity=new_quantity, status=status, consumed_at=consumed_at)
+        .returning(Item.quantity, Item.status, Item.name, Item.consumed_at)
+        .execution_options(synchronize_session=False)
+    )
+
 
 class ItemService:
     """物品服务类"""
 
     @staticmethod
+    @log_operation('create', 'item')
     def create_item(
         name: str,
         category: str = None,
@@ -31,6 +96,7 @@ class ItemService:
         description: str = None,
         unit: str = None,
         tags: List[str] = None,
+        use_suggested_expiry: bool = False,
         **kwargs
     ) -> Optional[Item]:
         """
@@ -43,8 +109,9 @@ class ItemService:
             expiry_date: 过期日期
             purchase_date: 购买日期
             description: 描述
-            unit: 单位
+            unit: 单位，未填写时使用Wiki默认单位
             tags: 标签列表
+            use_suggested_expiry: 未填写过期日期时按Wiki建议保质期推算
             **kwargs: 其他参数
 
         Returns:
@@ -64,7 +131,7 @@ class ItemService:
                         default_unit=unit
                     )
                     if not wiki:
-                        logger.error(f"创建ItemWiki失败: {name}")
+                        logger.error("创建ItemWiki失败: %s", name)
                         return None
 
                 # 如果传入了category参数，更新ItemWiki的分类
@@ -79,10 +146,17 @@ class ItemService:
                         wiki_service.update_wiki(wiki['id'], category_id=category_id)
                         wiki['category_id'] = category_id
 
+                # 未填写单位时使用Wiki的默认单位；过期日期只在调用方要求时按建议保质期推算
+                # （添加物品界面已用 wiki_defaults 预填，用户清空过期日期时不应再被填回）
+                if not unit:
+                    unit = wiki.get('default_unit')
+                if use_suggested_expiry and expiry_date is None and wiki.get('suggested_expiry_days'):
+                    expiry_date = (purchase_date or app_clock.today()) + timedelta(days=wiki['suggested_expiry_days'])
+
                 # 创建物品对象，关联到ItemWiki
                 item = Item(
                     name=name,
-                    wiki_id=wiki['id'],
+                    wiki_pk=resolve_pks(session, ItemWiki, [wiki['id']]).get(wiki['id']),
                     quantity=quantity,
                     expiry_date=expiry_date,
                     purchase_date=purchase_date,
@@ -91,9 +165,13 @@ class ItemService:
                     **kwargs
                 )
 
+                # 录入时已过期的物品直接标记为已过期（每日扫描只处理跨天后过期的物品）
+                if item.is_expired:
+                    item.status = ItemStatus.EXPIRED
+
                 # 设置提醒日期
                 if expiry_date:
-                    reminder_days = int(os.getenv('REMINDER_DAYS_BEFORE', 3))
+                    reminder_days = settings_service.reminder_days_before()
                     item.reminder_date = expiry_date - timedelta(days=reminder_days)
 
                 # 先保存到数据库，确保物品在会话中
@@ -102,19 +180,24 @@ class ItemService:
 
                 # 处理标签（现在item已经在会话中）
                 if tags:
-                    ItemService._add_tags_to_item(session, item, tags)
+                    tag_service.add_tags([item.id], tags, session=session)
+                    session.refresh(item, attribute_names=['tags'])
 
-                logger.info(f"物品创建成功: {item.name} (ID: {item.id})")
+                logger.debug("物品创建成功: %s (ID: %s)", item.name, item.id)
                 # 此处不再手动 expunge；在 with 块结束时会话会提交并关闭，
                 # item 会自然变为 detached，对调用方读取基础字段是安全的，
                 # 且不会影响关系同步，避免在提交阶段出现 SAWarning。
-                return item
+
+            # 提交后通知内存索引
+            event_bus.emit(ITEMS_CHANGED, action='created', item_ids=[item.id], names=[item.name])
+            return item
 
         except Exception as e:
-            logger.error(f"创建物品失败: {str(e)}")
+            logger.error("创建物品失败: %s", e)
             return None
 
     @staticmethod
+    @log_operation('get', 'item', id_arg='item_id')
     def get_item(item_id: str) -> Optional[Item]:
         """
         获取物品
@@ -144,10 +227,11 @@ class ItemService:
                     session.expunge(item)  # 从会话中移除，避免detached错误
                 return item
         except Exception as e:
-            logger.error(f"获取物品失败: {str(e)}")
+            logger.error("获取物品失败: %s", e)
             return None
 
     @staticmethod
+    @log_operation('update', 'item', id_arg='item_id')
     def update_item(item_id: str, **updates) -> bool:
         """
         更新物品
@@ -163,8 +247,13 @@ class ItemService:
             with db_service.session_scope() as session:
                 item = session.query(Item).filter(Item.id == item_id).first()
                 if not item:
-                    logger.warning(f"物品不存在: {item_id}")
+                    logger.warning("物品不存在: %s", item_id)
                     return False
+                names = {item.name}
+
+                # 标签通过关联表单独更新
+                if 'tags' in updates:
+                    tag_service.set_tags(item_id, updates.pop('tags') or [], session=session)
 
                 # 更新字段
                 for key, value in updates.items():
@@ -173,20 +262,24 @@ class ItemService:
 
                 # 如果过期日期更新，重新计算提醒日期
                 if 'expiry_date' in updates and updates['expiry_date']:
-                    reminder_days = int(db_service.get_reminder_days_before())
+                    reminder_days = settings_service.reminder_days_before()
                     item.reminder_date = updates['expiry_date'] - timedelta(days=reminder_days)
 
                 # 更新状态
                 item.update_status()
+                names.add(item.name)
+
+                logger.debug("物品更新成功: %s (ID: %s)", item.name, item_id)
 
-                logger.info(f"物品更新成功: {item.name} (ID: {item_id})")
-                return True
+            event_bus.emit(ITEMS_CHANGED, action='updated', item_ids=[item_id], names=sorted(names))
+            return True
 
         except Exception as e:
-            logger.error(f"更新物品失败: {str(e)}")
+            logger.error("更新物品失败: %s", e)
             return False
 
     @staticmethod
+    @log_operation('delete', 'item', id_arg='item_id')
     def delete_item(item_id: str) -> bool:
         """
         删除物品
@@ -201,18 +294,21 @@ class ItemService:
             with db_service.session_scope() as session:
                 item = session.query(Item).filter(Item.id == item_id).first()
                 if not item:
-                    logger.warning(f"物品不存在: {item_id}")
+                    logger.warning("物品不存在: %s", item_id)
                     return False
 
                 session.delete(item)
-                logger.info(f"物品删除成功: {item.name} (ID: {item_id})")
-                return True
+                logger.debug("物品删除成功: %s (ID: %s)", item.name, item_id)
+
+            event_bus.emit(ITEMS_CHANGED, action='deleted', item_ids=[item_id], names=[item.name])
+            return True
 
         except Exception as e:
-            logger.error(f"删除物品失败: {str(e)}")
+            logger.error("删除物品失败: %s", e)
             return False
 
     @staticmethod
+    @log_operation('consume', 'item', id_arg='item_id')
     def mark_as_consumed(item_id: str) -> bool:
         """
         标记物品为已消耗
@@ -227,19 +323,22 @@ class ItemService:
             with db_service.session_scope() as session:
                 item = session.query(Item).filter(Item.id == item_id).first()
                 if not item:
-                    logger.warning(f"物品不存在: {item_id}")
+                    logger.warning("物品不存在: %s", item_id)
                     return False
 
                 item.status = ItemStatus.CONSUMED
                 item.consumed_at = datetime.utcnow()
-                logger.info(f"物品标记为已消耗: {item.name} (ID: {item_id})")
-                return True
+                logger.debug("物品标记为已消耗: %s (ID: %s)", item.name, item_id)
+
+            event_bus.emit(ITEMS_CHANGED, action='consumed', item_ids=[item_id], names=[item.name])
+            return True
 
         except Exception as e:
-            logger.error(f"标记物品为已消耗失败: {str(e)}")
+            logger.error("标记物品为已消耗失败: %s", e)
             return False
 
     @staticmethod
+    @log_operation('restore', 'item', id_arg='item_id')
     def restore_item(item_id: str) -> bool:
         """
         恢复物品状态为使用中（取消已消耗状态）
@@ -254,55 +353,239 @@ class ItemService:
             with db_service.session_scope() as session:
                 item = session.query(Item).filter(Item.id == item_id).first()
                 if not item:
-                    logger.warning(f"物品不存在: {item_id}")
+                    logger.warning("物品不存在: %s", item_id)
                     return False
 
-                item.status = ItemStatus.ACTIVE
+                item.status = ItemStatus.EXPIRED if item.is_expired else ItemStatus.ACTIVE
                 item.consumed_at = None
-                logger.info(f"物品已恢复为使用中状态: {item.name} (ID: {item_id})")
-                return True
+                logger.debug("物品已恢复为使用中状态: %s (ID: %s)", item.name, item_id)
+
+            event_bus.emit(ITEMS_CHANGED, action='restored', item_ids=[item_id], names=[item.name])
+            return True
 
         except Exception as e:
-            logger.error(f"恢复物品状态失败: {str(e)}")
+            logger.error("恢复物品状态失败: %s", e)
             return False
 
     @staticmethod
+    @log_operation('cleanup', 'item')
     def cleanup_consumed_items(days: int = 3) -> int:
         """
-        清理超过指定天数的已消耗物品
+        把超过指定天数的已消耗/丢弃物品移入归档表（保留消耗历史，items 表只保留近期记录）
 
         Args:
             days: 天数阈值
 
         Returns:
-            int: 删除的物品数量
+            int: 归档的物品数量
+        """
+        return archive_service.archive_items(days)
+
+    @staticmethod
+    def _batch_conditions(
+        session: Session,
+        item_ids: List[str] = None,
+        category: str = None,
+        expiry_from: date = None,
+        expiry_to: date = None,
+        tags: List[str] = None,
+        tag_match: str = 'any',
+    ) -> Optional[list]:
+        """
+        构造批量操作的筛选条件（各条件同时满足）
+
+        Args:
+            session: 数据库会话
+            item_ids: 物品ID列表
+            category: Wiki 分类名称
+            expiry_from: 过期日期下限（含）
+            expiry_to: 过期日期上限（含）
+            tags: 标签名称列表
+            tag_match: 'any' 匹配任一标签，'all' 需包含全部标签
+
+        Returns:
+            Optional[list]: 条件列表；标签不存在导致不可能匹配时返回None
+
+        Raises:
+            ValueError: 没有指定任何筛选条件（避免误操作全部物品）
         """
+        conditions = []
+        if item_ids is not None:
+            conditions.append(Item.id.in_(list(item_ids)))
+        if category:
+            conditions.append(Item.wiki_pk.in_(
+                select(ItemWiki.pk)
+                .join(ItemWikiCategory, ItemWiki.category_pk == ItemWikiCategory.pk)
+                .where(ItemWikiCategory.name == category)
+            ))
+        if expiry_from is not None:
+            conditions.append(Item.expiry_date >= expiry_from)
+        if expiry_to is not None:
+            conditions.append(Item.expiry_date <= expiry_to)
+        if tags:
+            tagged_ids = tag_service.tagged_item_ids_query(session, tags, tag_match)
+            if tagged_ids is None:
+                return None
+            conditions.append(Item.pk.in_(tagged_ids))
+        if not conditions:
+            raise ValueError("批量操作需要指定物品ID或筛选条件")
+        return conditions
+
+    @staticmethod
+    def _run_batch(action: str, build_statement, filters: Dict[str, Any], after=None) -> List[Dict[str, Any]]:
+        """在一个事务中执行批量 UPDATE/DELETE ... RETURNING，提交后发布 ITEMS_CHANGED"""
+        with db_service.session_scope() as session:
+            conditions = ItemService._batch_conditions(session, **filters)
+            if conditions is None:
+                return []
+            rows = [dict(row._mapping) for row in session.execute(build_statement(conditions))]
+            if after is not None and rows:
+                after(session, rows)
+
+        if rows:
+            event_bus.emit(ITEMS_CHANGED, action=action, item_ids=[row['id'] for row in rows],
+                           names=sorted({row['name'] for row in rows}))
+        logger.debug("批量%s物品: %s 条", action, len(rows))
+        return rows
+
+    @staticmethod
+    @log_operation('consume_batch', 'item')
+    def consume_items(item_ids: List[str] = None, **filters) -> List[Dict[str, Any]]:
+        """
+        批量标记物品为已消耗（单条 UPDATE）
+
+        Args:
+            item_ids: 物品ID列表
+            **filters: 其他筛选条件：category、expiry_from、expiry_to、tags、tag_match
+
+        Returns:
+            List[Dict]: 受影响的物品（id、name、status），失败返回空列表
+        """
+        def build(conditions):
+            return (
+                update(Item)
+                .where(Item.status.in_(IN_STOCK_STATUSES), *conditions)
+                .values(status=ItemStatus.CONSUMED, consumed_at=datetime.utcnow())
+                .returning(Item.id, Item.name, Item.status)
+                .execution_options(synchronize_session=False)
+            )
+
         try:
-            threshold_date = datetime.utcnow() - timedelta(days=days)
-            with db_service.session_scope() as session:
-                items = session.query(Item).filter(
-                    Item.status == ItemStatus.CONSUMED,
-                    Item.consumed_at < threshold_date
-                ).all()
+            return ItemService._run_batch('consumed', build, dict(filters, item_ids=item_ids))
+        except Exception as e:
+            logger.error("批量标记物品为已消耗失败: %s", e)
+            return []
 
-                count = len(items)
-                for item in items:
-                    session.delete(item)
+    @staticmethod
+    @log_operation('restore_batch', 'item')
+    def restore_items(item_ids: List[str] = None, **filters) -> List[Dict[str, Any]]:
+        """
+        批量恢复已消耗的物品为使用中（单条 UPDATE）
+
+        Args:
+            item_ids: 物品ID列表
+            **filters: 其他筛选条件：category、expiry_from、expiry_to、tags、tag_match
 
-                logger.info(f"清理了 {count} 个超过 {days} 天的已消耗物品")
-                return count
+        Returns:
+            List[Dict]: 受影响的物品（id、name、status），失败返回空列表
+        """
+        def build(conditions):
+            return (
+                update(Item)
+                .where(Item.status == ItemStatus.CONSUMED, *conditions)
+                .values(status=restored_status_expression(), consumed_at=None)
+                .returning(Item.id, Item.name, Item.status)
+                .execution_options(synchronize_session=False)
+            )
 
+        try:
+            return ItemService._run_batch('restored', build, dict(filters, item_ids=item_ids))
         except Exception as e:
-            logger.error(f"清理已消耗物品失败: {str(e)}")
-            return 0
+            logger.error("批量恢复物品失败: %s", e)
+            return []
 
     @staticmethod
+    @log_operation('delete_batch', 'item')
+    def delete_items(item_ids: List[str] = None, **filters) -> List[Dict[str, Any]]:
+        """
+        批量删除物品（单条 DELETE ... RETURNING），随后按返回的ID清理标签关联与提醒日志
+
+        Args:
+            item_ids: 物品ID列表
+            **filters: 其他筛选条件：category、expiry_from、expiry_to、tags、tag_match
+
+        Returns:
+            List[Dict]: 被删除的物品（id、name），失败返回空列表
+        """
+        def build(conditions):
+            return (
+                delete(Item)
+                .where(*conditions)
+                .returning(Item.id, Item.name, Item.pk)
+                .execution_options(synchronize_session=False)
+            )
+
+        def cleanup(session, rows):
+            # 筛选条件可能引用标签关联，因此在删除物品之后再清理关联行；
+            # 内部主键只用于清理，不返回给调用方
+            pks = [row.pop('pk') for row in rows]
+            for start in range(0, len(pks), BATCH_CHUNK_SIZE):
+                chunk = pks[start:start + BATCH_CHUNK_SIZE]
+                session.execute(delete(ItemTag).where(ItemTag.item_pk.in_(chunk)))
+                session.execute(delete(ReminderLog).where(ReminderLog.item_pk.in_(chunk)))
+
+        try:
+            return ItemService._run_batch('deleted', build, dict(filters, item_ids=item_ids), after=cleanup)
+        except Exception as e:
+            logger.error("批量删除物品失败: %s", e)
+            return []
+
+    @staticmethod
+    @log_operation('retag_batch', 'item')
+    def retag_items(
+        item_ids: List[str] = None,
+        add_tags: List[str] = None,
+        remove_tags: List[str] = None,
+        **filters
+    ) -> List[Dict[str, Any]]:
+        """
+        批量添加/移除标签（按集合插入与删除关联，不逐个物品处理）
+
+        Args:
+            item_ids: 物品ID列表
+            add_tags: 要添加的标签
+            remove_tags: 要移除的标签
+            **filters: 其他筛选条件：category、expiry_from、expiry_to、tags、tag_match
+
+        Returns:
+            List[Dict]: 匹配的物品（id、name），失败返回空列表
+        """
+        try:
+            with db_service.session_scope() as session:
+                conditions = ItemService._batch_conditions(session, item_ids=item_ids, **filters)
+                if conditions is None:
+                    return []
+                rows = [dict(row._mapping) for row in session.execute(select(Item.id, Item.name).where(*conditions))]
+                ids = [row['id'] for row in rows]
+                if remove_tags:
+                    tag_service.remove_tags(ids, remove_tags, session=session)
+                if add_tags:
+                    tag_service.add_tags(ids, add_tags, session=session)
+            return rows
+        except Exception as e:
+            logger.error("批量修改物品标签失败: %s", e)
+            return []
+
+    @staticmethod
+    @log_operation('list', 'item')
     def get_items(
         category: str = None,
         status: ItemStatus = None,
         keyword: str = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        tags: List[str] = None,
+        tag_match: str = 'any'
     ) -> List[Item]:
         """
         获取物品列表
@@ -313,6 +596,8 @@ class ItemService:
             keyword: 关键词搜索
             limit: 限制数量
             offset: 偏移量
+            tags: 按标签筛选
+            tag_match: 'any' 匹配任一标签，'all' 需包含全部标签
 
         Returns:
             List[Item]: 物品列表
@@ -320,6 +605,9 @@ class ItemService:
         try:
             from sqlalchemy.orm import joinedload
 
+            # 跨天后先把已过期的物品标记为 EXPIRED，保证按状态筛选与排序的结果正确
+            expiry_sweeper.sweep_if_needed()
+
             # 手动管理session，避免session_scope提前关闭导致预加载失效
             session = db_service.get_session()
             try:
@@ -331,13 +619,19 @@ class ItemService:
                 # 当需要按分类筛选时，使用join连接ItemWiki和ItemWikiCategory
                 if category:
                     query = query.join(
-                        ItemWiki, Item.wiki_id == ItemWiki.id
+                        ItemWiki, Item.wiki_pk == ItemWiki.pk
                     ).join(
-                        ItemWikiCategory, ItemWiki.category_id == ItemWikiCategory.id
+                        ItemWikiCategory, ItemWiki.category_pk == ItemWikiCategory.pk
                     ).filter(
                         ItemWikiCategory.name == category
                     )
 
+                if tags:
+                    tagged_ids = tag_service.tagged_item_ids_query(session, tags, tag_match)
+                    if tagged_ids is None:
+                        return []
+                    query = query.filter(Item.pk.in_(tagged_ids))
+
                 # 应用其他筛选条件
                 if status:
                     query = query.filter(Item.status == status)
@@ -350,11 +644,16 @@ class ItemService:
                     )
 
                 # 排序和分页
-                # 1. 按状态排序：已消耗(CONSUMED)的物品在最下面
+                # 1. 按状态排序：使用中与已过期的物品在前，已消耗(CONSUMED)、已丢弃的物品在最下面
                 # 2. 对于未消耗的物品：按保质期排序，保质期越短的越在上面
                 # 3. 对于已消耗的物品：按消耗时间排序，消耗时间越长的越在下面
+                status_rank = case(
+                    (Item.status == ItemStatus.CONSUMED, 1),
+                    (Item.status == ItemStatus.WASTED, 2),
+                    else_=0,
+                )
                 items = query.order_by(
-                    Item.status,
+                    status_rank,
                     desc(Item.expiry_date.is_(None)),
                     Item.expiry_date,
                     desc(Item.consumed_at.is_(None)),
@@ -384,10 +683,11 @@ class ItemService:
                 session.close()
 
         except Exception as e:
-            logger.error(f"获取物品列表失败: {str(e)}")
+            logger.error("获取物品列表失败: %s", e)
             return []
 
     @staticmethod
+    @log_operation('list_registered', 'item')
     def get_registered_items() -> List[Dict[str, Any]]:
         """
         获取所有已注册的独特物品（按名称去重），用于物品wiki目录
@@ -403,11 +703,11 @@ class ItemService:
                     ItemWikiCategory.name.label('category'),
                     func.count(Item.id).label('total_count')
                 ).outerjoin(
-                    ItemWiki, Item.wiki_id == ItemWiki.id
+                    ItemWiki, Item.wiki_pk == ItemWiki.pk
                 ).outerjoin(
-                    ItemWikiCategory, ItemWiki.category_id == ItemWikiCategory.id
+                    ItemWikiCategory, ItemWiki.category_pk == ItemWikiCategory.pk
                 ).filter(
-                    Item.status == ItemStatus.ACTIVE
+                    Item.status.in_(IN_STOCK_STATUSES)
                 ).group_by(Item.name, ItemWikiCategory.name).order_by(Item.name).all()
 
                 result = []
@@ -421,7 +721,7 @@ class ItemService:
                 return result
 
         except Exception as e:
-            logger.error(f"获取已注册物品失败: {str(e)}")
+            logger.error("获取已注册物品失败: %s", e)
             return []
 
     @staticmethod
@@ -445,7 +745,7 @@ class ItemService:
                 if status:
                     query = query.filter(Item.status == status)
                 else:
-                    query = query.filter(Item.status == ItemStatus.ACTIVE)
+                    query = query.filter(Item.status.in_(IN_STOCK_STATUSES))
 
                 items = query.order_by(
                     desc(Item.expiry_date.is_(None)),
@@ -458,10 +758,11 @@ class ItemService:
                 return items
 
         except Exception as e:
-            logger.error(f"获取物品库存失败: {str(e)}")
+            logger.error("获取物品库存失败: %s", e)
             return []
 
     @staticmethod
+    @log_operation('list_expiring', 'item')
     def get_expiring_items(days: int = 7) -> List[Item]:
         """
         获取即将过期的物品
@@ -474,7 +775,7 @@ class ItemService:
         """
         try:
             with db_service.session_scope() as session:
-                today = date.today()
+                today = app_clock.today()
                 expiry_threshold = today + timedelta(days=days)
 
                 items = session.query(Item).filter(
@@ -493,7 +794,7 @@ class ItemService:
                 return items
 
         except Exception as e:
-            logger.error(f"获取即将过期物品失败: {str(e)}")
+            logger.error("获取即将过期物品失败: %s", e)
             return []
 
     @staticmethod
@@ -502,18 +803,20 @@ class ItemService:
         获取需要提醒的物品
 
         Returns:
-            List[Item]: 需要提醒的物品列表
+            List[Item]: 需要提醒的物品列表，关闭过期提醒时为空
         """
+        if not settings_service.get(EXPIRY_REMINDER_ENABLED):
+            return []
         try:
             with db_service.session_scope() as session:
-                today = date.today()
+                today = app_clock.today()
 
                 items = session.query(Item).filter(
                     and_(
                         Item.reminder_date.isnot(None),
                         Item.reminder_date <= today,
                         Item.is_reminder_enabled == True,
-                        Item.status == ItemStatus.ACTIVE
+                        Item.status.in_(IN_STOCK_STATUSES)
                     )
                 ).all()
 
@@ -524,69 +827,66 @@ class ItemService:
                 return items
 
         except Exception as e:
-            logger.error(f"获取需要提醒的物品失败: {str(e)}")
+            logger.error("获取需要提醒的物品失败: %s", e)
             return []
 
     @staticmethod
-    def update_item_quantity(item_id: str, delta: int) -> bool:
+    def recompute_reminder_dates(days_before: int) -> int:
         """
-        更新物品数量
+        按新的提醒提前天数，用一条 UPDATE 重新计算所有在库物品的提醒日期
 
         Args:
-            item_id: 物品ID
-            delta: 数量变化（正数增加，负数减少）
+            days_before: 过期前几天提醒
 
         Returns:
-            bool: 是否更新成功
+            int: 更新的物品数量，失败返回0
         """
         try:
             with db_service.session_scope() as session:
-                item = session.query(Item).filter(Item.id == item_id).first()
-                if not item:
-                    logger.warning(f"物品不存在: {item_id}")
-                    return False
-
-                new_quantity = item.quantity + delta
-                if new_quantity < 0:
-                    logger.warning(f"物品数量不能为负数: {item.name}")
-                    return False
-
-                item.quantity = new_quantity
-                item.update_status()
-
-                logger.info(f"物品数量更新: {item.name} {delta:+d} (当前: {item.quantity})")
-                return True
-
+                result = session.execute(
+                    update(Item)
+                    .where(Item.status.in_(IN_STOCK_STATUSES), Item.expiry_date.isnot(None))
+                    .values(reminder_date=func.date(Item.expiry_date, f'-{int(days_before)} days'))
+                    .execution_options(synchronize_session=False)
+                )
+                count = result.rowcount
+            logger.info("提醒提前天数改为 %s 天，已更新 %s 个物品的提醒日期", days_before, count)
+            return count
         except Exception as e:
-            logger.error(f"更新物品数量失败: {str(e)}")
-            return False
+            logger.error("重新计算提醒日期失败: %s", e)
+            return 0
 
     @staticmethod
-    def _add_tags_to_item(session: Session, item: Item, tag_names: List[str]) -> None:
+    @log_operation('update_quantity', 'item', id_arg='item_id')
+    def update_item_quantity(item_id: str, delta: int) -> Optional[Dict[str, Any]]:
         """
-        为物品添加标签
+        更新物品数量
+
+        使用单条条件 UPDATE ... RETURNING 在数据库中原子地增减数量并同步状态
+        （规则与 Item.update_status 一致），并发的增减不会互相覆盖。
 
         Args:
-            session: 数据库会话
-            item: 物品对象
-            tag_names: 标签名称列表
+            item_id: 物品ID
+            delta: 数量变化（正数增加，负数减少）
+
+        Returns:
+            Optional[Dict]: 更新后的 {quantity, status}；物品不存在或数量将变为负数时返回None
         """
-        # 确保物品绑定到当前会话
-        # 使用 object_session 判断 item 当前隶属的会话，而不是使用 "item in session" 这种不可靠的方式，
-        # 避免在向 item.tags 追加标签时触发 SAWarning（对象不在会话中）。
-        current_session = object_session(item)
-        if current_session is not session:
-            item = session.merge(item)
+        try:
+            with db_service.session_scope() as session:
+                row = session.execute(quantity_update_statement(item_id, delta)).first()
+
+            if row is None:
+                logger.warning("物品不存在或数量不能为负数: %s (%+d)", item_id, delta)
+                return None
 
-        for tag_name in tag_names:
-            tag = session.query(Tag).filter(Tag.name == tag_name).first()
-            if not tag:
-                tag = Tag(name=tag_name)
-                session.add(tag)
-                session.flush()  # 获取tag的ID
+            logger.debug("物品数量更新: %s %+d (当前: %s)", row.name, delta, row.quantity)
+            event_bus.emit(ITEMS_CHANGED, action='updated', item_ids=[item_id], names=[row.name])
+            return {'quantity': row.quantity, 'status': row.status}
 
-            if tag not in item.tags:
-                item.tags.append(tag)
+        except Exception as e:
+            logger.error("更新物品数量失败: %s", e)
+            return None
 
 
 class ItemStatisticsService:
@@ -601,6 +901,7 @@ class ItemStatisticsService:
             Dict[str, int]: 类别统计字典
         """
         try:
+            expiry_sweeper.sweep_if_needed()
             with db_service.session_scope() as session:
                 result = {}
                 # 从数据库获取所有类别
@@ -608,13 +909,13 @@ class ItemStatisticsService:
                 for category in categories:
                     count = session.query(Item).filter(
                         Item.wiki.has(category=category),
-                        Item.status == ItemStatus.ACTIVE
+                        Item.status.in_(IN_STOCK_STATUSES)
                     ).count()
                     result[category.name] = count
 
                 return result
         except Exception as e:
-            logger.error(f"获取类别统计失败: {str(e)}")
+            logger.error("获取类别统计失败: %s", e)
             return {}
 
     @staticmethod
@@ -626,17 +927,10 @@ class ItemStatisticsService:
             Dict[str, Any]: 过期统计字典
         """
         try:
+            expiry_sweeper.sweep_if_needed()
             with db_service.session_scope() as session:
-                today = date.today()
-
-                # 已过期
-                expired = session.query(Item).filter(
-                    and_(
-                        Item.expiry_date.isnot(None),
-                        Item.expiry_date < today,
-                        Item.status != ItemStatus.CONSUMED
-                    )
-                ).count()
+                # 已过期（每日扫描维护 EXPIRED 状态，可直接使用 status 索引）
+                expired = session.query(Item).filter(Item.status == ItemStatus.EXPIRED).count()
 
                 # 即将过期（7天内）
                 soon_expiring = len(ItemService.get_expiring_items(days=7))
@@ -650,7 +944,7 @@ class ItemStatisticsService:
                     'weekly_stats': weekly_stats
                 }
         except Exception as e:
-            logger.error(f"获取过期统计失败: {str(e)}")
+            logger.error("获取过期统计失败: %s", e)
             return {}
 
     @staticmethod
@@ -662,7 +956,7 @@ class ItemStatisticsService:
             List[Dict[str, Any]]: 每周统计列表
         """
         stats = []
-        today = date.today()
+        today = app_clock.today()
 
         for i in range(4):  # 未来4周
             week_start = today + timedelta(weeks=i)
@@ -699,7 +993,7 @@ def seed_example_items():
         if item_service.get_items(limit=1):
             return
 
-        today = date.today()
+        today = app_clock.today()
 
         examples = [
             {
@@ -829,7 +1123,7 @@ def seed_example_items():
 
         logger.info("已插入示例物品数据，用于首次体验")
     except Exception as e:
-        logger.error(f"插入示例数据失败: {e}")
+        logger.error("插入示例数据失败: %s", e)
 
 
 # 全局服务实例
@@ -837,6 +1131,14 @@ item_service = ItemService()
 statistics_service = ItemStatisticsService()
 
 
+def _on_settings_changed(key: str, value=None, **_) -> None:
+    if key == REMINDER_DAYS_BEFORE:
+        item_service.recompute_reminder_dates(value)
+
+
+event_bus.subscribe(SETTINGS_CHANGED, _on_settings_changed)
+
+
 if __name__ == '__main__':
     # 测试服务功能
 
@@ -846,19 +1148,19 @@ if __name__ == '__main__':
         name="测试牛奶",
         category="食品",
         quantity=2,
-        expiry_date=date.today() + timedelta(days=5),
+        expiry_date=app_clock.today() + timedelta(days=5),
         description="测试用物品"
     )
 
     if test_item:
-        logger.info(f"创建成功: {test_item.name}")
-        logger.info(f"物品ID: {test_item.id}")
-        logger.info(f"过期天数: {test_item.days_until_expiry}")
+        logger.info("创建成功: %s", test_item.name)
+        logger.info("物品ID: %s", test_item.id)
+        logger.info("过期天数: %s", test_item.days_until_expiry)
 
         # 获取即将过期物品
         expiring = item_service.get_expiring_items(days=7)
-        logger.info(f"即将过期物品数量: {len(expiring)}")
+        logger.info("即将过期物品数量: %s", len(expiring))
 
         # 获取统计信息
         stats = statistics_service.get_category_stats()
-        logger.info(f"类别统计: {stats}")
\ No newline at end of file
+        logger.info("类别统计: %s", stats)
\ No newline at end of file
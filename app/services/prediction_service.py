@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+"""
+过期日期预测服务
+
+从历史物品的 购买日期 → 过期日期（没有过期日期时用消耗时间）学习保质期分布，
+按 Wiki、分类、全局三级汇总，批量为所有使用中的物品填写
+predicted_expiry_date 与 prediction_confidence。
+
+保质期在对数空间中以充分统计量（样本数、和、平方和）保存，新样本可直接累加，
+因此支持增量训练；模型以 JSON 保存，启动时加载即可预测，无需重新训练。
+按消耗时间计入的样本在物品上标记 shelf_life_sampled：物品恢复后再次消耗时消耗时间晚于
+上次训练，但不会被重复计入，模型文件的大小与物品数量无关。
+
+依赖 ai 可选依赖（numpy、pandas），未安装时服务不可用，各方法直接返回。
+
+环境变量:
+    EXPIRY_MODEL_PATH: 模型文件路径，默认 data/expiry_model.json
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, bindparam, case, or_, select, union_all, update
+
+from app.models.archive import ItemArchive
+from app.models.item import IN_STOCK_STATUSES, Item, ItemStatus
+from app.models.item_wiki import ItemWiki, ItemWikiCategory
+from app.services.database import db_service
+from app.utils.logger import setup_logger
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # 未安装 ai 可选依赖
+    np = None
+    pd = None
+
+logger = setup_logger(__name__)
+
+MODEL_VERSION = 1
+
+# 某一级别至少需要的样本数，不足时退回上一级
+MIN_SAMPLES = 3
+
+# 置信度中样本数的先验强度：n / (n + PRIOR_SAMPLES)
+PRIOR_SAMPLES = 5
+
+# 各级别的置信度折扣
+LEVEL_WEIGHTS = {'wiki': 1.0, 'category': 0.8, 'global': 0.5}
+
+# 只有 Wiki 建议保质期时的置信度
+SUGGESTED_CONFIDENCE = 0.4
+
+# 合理的保质期范围（天），超出的样本视为录入错误
+MAX_SHELF_LIFE_DAYS = 3650
+
+# 批量更新的行数
+_UPDATE_CHUNK_SIZE = 5000
+
+# 标记样本时每条语句 IN 列表的物品数（低于 SQLite 的参数个数上限）
+_MARK_CHUNK_SIZE = 500
+
+
+def prediction_available() -> bool:
+    """是否安装了预测所需的 numpy / pandas"""
+    return pd is not None
+
+
+class ShelfLifeModel:
+    """
+    保质期模型：每个分组保存 [样本数, log1p(天数) 之和, log1p(天数) 平方和]
+    """
+
+    def __init__(self, wiki: Dict[str, list] = None, category: Dict[str, list] = None,
+                 global_stats: list = None, trained_until: Optional[datetime] = None):
+        self.wiki = wiki or {}
+        self.category = category or {}
+        self.global_stats = global_stats or [0, 0.0, 0.0]
+        self.trained_until = trained_until
+
+    @property
+    def sample_count(self) -> int:
+        return int(self.global_stats[0])
+
+    def update(self, observations: 'pd.DataFrame') -> int:
+        """
+        累加新样本
+
+        Args:
+            observations: 包含 wiki_id、category_id、days 列的 DataFrame
+
+        Returns:
+            int: 有效样本数
+        """
+        days = observations['days']
+        observations = observations[(days > 0) & (days <= MAX_SHELF_LIFE_DAYS)].copy()
+        if observations.empty:
+            return 0
+        observations['log_days'] = np.log1p(observations['days'].astype(float))
+        observations['log_days_sq'] = observations['log_days'] ** 2
+
+        for column, stats in (('wiki_id', self.wiki), ('category_id', self.category)):
+            grouped = observations.dropna(subset=[column]).groupby(column).agg(
+                n=('log_days', 'size'), s=('log_days', 'sum'), ss=('log_days_sq', 'sum'),
+            )
+            for key, row in zip(grouped.index, grouped.itertuples(index=False)):
+                current = stats.get(key, [0, 0.0, 0.0])
+                stats[key] = [current[0] + int(row.n), current[1] + float(row.s), current[2] + float(row.ss)]
+
+        self.global_stats = [
+            self.global_stats[0] + len(observations),
+            self.global_stats[1] + float(observations['log_days'].sum()),
+            self.global_stats[2] + float(observations['log_days_sq'].sum()),
+        ]
+        return len(observations)
+
+    @staticmethod
+    def _stats_frame(stats: Dict[str, list], prefix: str) -> 'pd.DataFrame':
+        frame = pd.DataFrame.from_dict(stats, orient='index', columns=['n', 's', 'ss'])
+        return frame.add_prefix(prefix)
+
+    def predict(self, items: 'pd.DataFrame') -> 'pd.DataFrame':
+        """
+        向量化预测
+
+        Args:
+            items: 包含 wiki_id、category_id、suggested_expiry_days 列的 DataFrame
+
+        Returns:
+            pd.DataFrame: days（预测保质期天数，无法预测为 NaN）与 confidence 两列
+        """
+        frame = items[['wiki_id', 'category_id', 'suggested_expiry_days']].copy()
+        frame = frame.join(self._stats_frame(self.wiki, 'w_'), on='wiki_id')
+        frame = frame.join(self._stats_frame(self.category, 'c_'), on='category_id')
+        g_n, g_s, g_ss = self.global_stats
+        frame['g_n'], frame['g_s'], frame['g_ss'] = g_n, g_s, g_ss
+
+        days = pd.Series(np.nan, index=frame.index)
+        confidence = pd.Series(np.nan, index=frame.index)
+        undecided = pd.Series(True, index=frame.index)
+
+        for prefix, level in (('w_', 'wiki'), ('c_', 'category')):
+            n = frame[f'{prefix}n'].fillna(0)
+            use = undecided & (n >= MIN_SAMPLES)
+            self._fill(frame, prefix, level, use, days, confidence)
+            undecided &= ~use
+
+        # Wiki 有建议保质期时优先于全局分布
+        suggested = frame['suggested_expiry_days']
+        use = undecided & suggested.notna() & (suggested > 0)
+        days[use] = suggested[use].astype(float)
+        confidence[use] = SUGGESTED_CONFIDENCE
+        undecided &= ~use
+
+        if g_n >= MIN_SAMPLES:
+            self._fill(frame, 'g_', 'global', undecided, days, confidence)
+
+        return pd.DataFrame({'days': days.round(), 'confidence': confidence.round(3)})
+
+    @staticmethod
+    def _fill(frame, prefix, level, mask, days, confidence) -> None:
+        if not mask.any():
+            return
+        n = frame.loc[mask, f'{prefix}n'].astype(float)
+        mean = frame.loc[mask, f'{prefix}s'] / n
+        variance = (frame.loc[mask, f'{prefix}ss'] / n - mean ** 2).clip(lower=0)
+        days[mask] = np.expm1(mean)
+        # 样本越多、分布越集中（对数标准差越小）置信度越高
+        confidence[mask] = (n / (n + PRIOR_SAMPLES)) * np.exp(-np.sqrt(variance)) * LEVEL_WEIGHTS[level]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': MODEL_VERSION,
+            'trained_until': self.trained_until.isoformat() if self.trained_until else None,
+            'global': self.global_stats,
+            'wiki': self.wiki,
+            'category': self.category,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ShelfLifeModel':
+        trained_until = data.get('trained_until')
+        return cls(
+            wiki=data.get('wiki'),
+            category=data.get('category'),
+            global_stats=data.get('global'),
+            trained_until=datetime.fromisoformat(trained_until) if trained_until else None,
+        )
+
+
+class PredictionService:
+    """过期日期预测服务类"""
+
+    def __init__(self, model_path: str = None):
+        self.model_path = Path(model_path or os.getenv('EXPIRY_MODEL_PATH', 'data/expiry_model.json'))
+        self._model: Optional[ShelfLifeModel] = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> ShelfLifeModel:
+        """当前模型，首次访问时从文件加载"""
+        if self._model is None:
+            self._model = self.load_model() or ShelfLifeModel()
+        return self._model
+
+    def load_model(self) -> Optional[ShelfLifeModel]:
+        """
+        从文件加载模型
+
+        Returns:
+            Optional[ShelfLifeModel]: 模型；文件不存在、损坏或版本不符时返回 None
+        """
+        try:
+            with open(self.model_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != MODEL_VERSION:
+                return None
+            return ShelfLifeModel.from_dict(data)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("加载预测模型失败: %s", e)
+            return None
+
+    def save_model(self) -> bool:
+        """将模型写入文件（先写临时文件再替换，避免中途退出留下损坏的文件）"""
+        try:
+            self.model_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.model_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.model.to_dict(), f)
+            os.replace(tmp_path, self.model_path)
+            return True
+        except OSError as e:
+            logger.error("保存预测模型失败: %s", e)
+            return False
+
+    @staticmethod
+    def _load_observations(since: Optional[datetime]) -> 'pd.DataFrame':
+        """
+        读取训练样本：有过期日期的物品按创建时间计入，其余已消耗/丢弃的物品按消耗时间计入；
+        包括已移入归档表的物品
+        """
+        branches = []
+        for model in (Item, ItemArchive):
+            observed_at = case(
+                (model.expiry_date.isnot(None), model.created_at),
+                else_=model.consumed_at,
+            )
+            branch = (
+                select(
+                    model.id, ItemWiki.id, ItemWikiCategory.id, model.purchase_date,
+                    model.expiry_date, model.consumed_at, observed_at,
+                )
+                .select_from(model)
+                .outerjoin(ItemWiki, ItemWiki.pk == model.wiki_pk)
+                .outerjoin(ItemWikiCategory, ItemWikiCategory.pk == ItemWiki.category_pk)
+                .where(
+                    model.purchase_date.isnot(None),
+                    or_(
+                        model.expiry_date.isnot(None),
+                        and_(
+                            model.consumed_at.isnot(None),
+                            model.status.in_([ItemStatus.CONSUMED, ItemStatus.WASTED]),
+                        ),
+                    ),
+                )
+            )
+            if since is not None:
+                # 增量训练：已按消耗时间计入的物品不再重复计入
+                branch = branch.where(
+                    observed_at > since,
+                    or_(model.expiry_date.isnot(None), model.shelf_life_sampled == False),  # noqa: E712
+                )
+            branches.append(branch)
+        query = union_all(*branches)
+
+        with db_service.session_scope() as session:
+            rows = session.execute(query).all()
+
+        frame = pd.DataFrame(
+            rows, columns=[
+                'item_id', 'wiki_id', 'category_id', 'purchase_date', 'expiry_date', 'consumed_at', 'observed_at',
+            ],
+        )
+        purchase = pd.to_datetime(frame['purchase_date'])
+        end = pd.to_datetime(frame['expiry_date']).fillna(pd.to_datetime(frame['consumed_at']).dt.normalize())
+        frame['days'] = (end - purchase).dt.days
+        return frame
+
+    def train(self, full: bool = False) -> int:
+        """
+        训练模型并保存
+
+        Args:
+            full: 为 True 时丢弃已有模型重新训练，否则只累加上次训练后的新样本
+
+        Returns:
+            int: 本次加入的有效样本数
+        """
+        if not prediction_available():
+            logger.warning("未安装 numpy/pandas，跳过过期预测训练")
+            return 0
+        try:
+            with self._lock:
+                model = ShelfLifeModel() if full else self.model
+                observations = self._load_observations(model.trained_until)
+                added = model.update(observations)
+                if not observations.empty:
+                    model.trained_until = pd.to_datetime(observations['observed_at']).max().to_pydatetime()
+                self._model = model
+                self.save_model()
+                self._mark_sampled(observations.loc[observations['expiry_date'].isna(), 'item_id'].tolist())
+            logger.info("过期预测模型训练完成: 新增 %s 个样本, 共 %s 个样本", added, model.sample_count)
+            return added
+        except Exception as e:
+            logger.error("训练过期预测模型失败: %s", e)
+            return 0
+
+    @staticmethod
+    def _mark_sampled(item_ids: List[str]) -> None:
+        """标记已按消耗时间计入模型的物品（归档表中的记录不再变化，无需标记）"""
+        if not item_ids:
+            return
+        with db_service.session_scope() as session:
+            for start in range(0, len(item_ids), _MARK_CHUNK_SIZE):
+                session.execute(
+                    update(Item)
+                    .where(Item.id.in_(item_ids[start:start + _MARK_CHUNK_SIZE]))
+                    .values(shelf_life_sampled=True)
+                    .execution_options(synchronize_session=False)
+                )
+
+    def predict_active_items(self) -> int:
+        """
+        为所有在库物品（含已过期）批量写入预测过期日期与置信度
+
+        Returns:
+            int: 更新的物品数量
+        """
+        if not prediction_available():
+            return 0
+        try:
+            with db_service.session_scope() as session:
+                rows = session.execute(
+                    select(
+                        Item.pk, ItemWiki.id, ItemWikiCategory.id, ItemWiki.suggested_expiry_days,
+                        Item.purchase_date, Item.created_at,
+                    )
+                    .select_from(Item)
+                    .outerjoin(ItemWiki, ItemWiki.pk == Item.wiki_pk)
+                    .outerjoin(ItemWikiCategory, ItemWikiCategory.pk == ItemWiki.category_pk)
+                    .where(Item.status.in_(IN_STOCK_STATUSES))
+                ).all()
+                if not rows:
+                    return 0
+
+                items = pd.DataFrame(rows, columns=[
+                    'pk', 'wiki_id', 'category_id', 'suggested_expiry_days', 'purchase_date', 'created_at',
+                ])
+                prediction = self.model.predict(items)
+                base_date = pd.to_datetime(items['purchase_date']).fillna(
+                    pd.to_datetime(items['created_at']).dt.normalize()
+                )
+                predicted = base_date + pd.to_timedelta(prediction['days'], unit='D')
+
+                updates = [
+                    {
+                        'b_pk': int(item_pk),
+                        'b_date': None if pd.isna(day) else day.date(),
+                        'b_confidence': None if pd.isna(conf) else float(conf),
+                    }
+                    for item_pk, day, conf in zip(items['pk'], predicted, prediction['confidence'])
+                ]
+
+                table = Item.__table__
+                stmt = (
+                    update(table)
+                    .where(table.c.pk == bindparam('b_pk'))
+                    .values(
+                        predicted_expiry_date=bindparam('b_date'),
+                        prediction_confidence=bindparam('b_confidence'),
+                        # 预测不算用户修改，保持 updated_at 不变（否则会触发 onupdate）
+                        updated_at=table.c.updated_at,
+                    )
+                )
+                connection = session.connection()
+                for start in range(0, len(updates), _UPDATE_CHUNK_SIZE):
+                    connection.execute(stmt, updates[start:start + _UPDATE_CHUNK_SIZE])
+
+            logger.info("已为 %s 个物品更新过期预测", len(updates))
+            return len(updates)
+        except Exception as e:
+            logger.error("批量预测过期日期失败: %s", e)
+            return 0
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        增量训练后重新预测（启动时在后台线程中调用）
+
+        Args:
+            full: 是否完整重新训练
+
+        Returns:
+            int: 更新的物品数量
+        """
+        self.train(full=full)
+        return self.predict_active_items()
+
+    def refresh_in_background(self) -> Optional[threading.Thread]:
+        """在后台线程中执行 refresh()，未安装依赖时不启动"""
+        if not prediction_available():
+            return None
+        thread = threading.Thread(target=self.refresh, name='expiry-prediction', daemon=True)
+        thread.start()
+        return thread
+
+
+# 全局预测服务实例
+prediction_service = PredictionService()
@@ -0,0 +1,563 @@
+# -*- coding: utf-8 -*-
+"""
+菜谱服务与库存匹配
+
+菜谱保存在本地数据库（recipes / recipe_ingredients 表），食材按 ItemWiki 的
+规范化名称匹配库存。匹配引擎在内存中维护：
+- 倒排索引：规范化食材名称 -> 使用该食材的菜谱；
+- 库存快照：每种在库食材的数量与最近的过期日期；
+- 每个菜谱已匹配的必需食材数量与权重之和。
+
+食材的权重为 1 加上临期加成（越接近过期加成越大），菜谱得分为已匹配食材权重之和
+除以必需食材数量：食材齐全且多为临期食材的菜谱排在最前。库存变化时（ITEMS_CHANGED）
+只重新查询受影响的食材，并通过倒排索引更新用到这些食材的菜谱，不需要扫描全部菜谱；
+推荐时只对至少匹配一种食材的菜谱取前 N 个。
+"""
+
+import heapq
+import threading
+import uuid
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func, or_, select
+
+from app.models.item import Item, ItemStatus
+from app.models.recipe import Recipe, RecipeIngredient
+from app.services.database import db_service
+from app.services.wiki_defaults import normalize_item_name
+from app.utils.clock import app_clock
+from app.utils.events import ITEMS_CHANGED, RECIPES_CHANGED, event_bus
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 距离过期不超过该天数的食材视为临期，获得权重加成
+URGENT_DAYS = 3
+
+# 批量写入菜谱时每批的数量
+BULK_CHUNK_SIZE = 1000
+
+
+def ingredient_weight(days_left: Optional[int]) -> float:
+    """
+    计算在库食材的权重
+
+    Args:
+        days_left: 距离过期的天数，None 表示没有过期日期
+
+    Returns:
+        float: 权重，普通食材为 1，今天过期的食材为 2，临期加成随天数线性递减
+    """
+    if days_left is None or days_left > URGENT_DAYS:
+        return 1.0
+    return 1.0 + (URGENT_DAYS + 1 - max(days_left, 0)) / (URGENT_DAYS + 1)
+
+
+def _ingredient_dict(ingredient) -> Dict[str, Any]:
+    """把字符串或字典形式的食材整理为统一的字典"""
+    if isinstance(ingredient, str):
+        ingredient = {'name': ingredient}
+    name = str(ingredient.get('name') or '').strip()
+    if not name:
+        raise ValueError("食材名称不能为空")
+    return {
+        'name': name,
+        'key': normalize_item_name(name),
+        'amount': ingredient.get('amount'),
+        'optional': bool(ingredient.get('optional', False)),
+    }
+
+
+class RecipeService:
+    """菜谱存储服务"""
+
+    @staticmethod
+    def _write_recipes(session, recipes: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """批量写入菜谱及其食材，返回写入的菜谱字典"""
+        recipe_rows, ingredient_rows, result = [], [], []
+        now = datetime.utcnow()
+        for data in recipes:
+            title = str(data.get('title') or '').strip()
+            if not title:
+                raise ValueError("菜谱名称不能为空")
+            ingredients = [_ingredient_dict(ing) for ing in data.get('ingredients') or []]
+            recipe = {
+                'id': data.get('id') or str(uuid.uuid4()),
+                'title': title,
+                'description': data.get('description'),
+                'cook_minutes': data.get('cook_minutes'),
+                'difficulty': data.get('difficulty'),
+            }
+            recipe_rows.append(dict(recipe, created_at=now, updated_at=now))
+            ingredient_rows.extend(
+                {
+                    'recipe_id': recipe['id'], 'name': ing['name'], 'normalized_name': ing['key'],
+                    'amount': ing['amount'], 'optional': ing['optional'],
+                }
+                for ing in ingredients
+            )
+            recipe['ingredients'] = ingredients
+            result.append(recipe)
+
+        if recipe_rows:
+            session.execute(Recipe.__table__.insert(), recipe_rows)
+        if ingredient_rows:
+            session.execute(RecipeIngredient.__table__.insert(), ingredient_rows)
+        return result
+
+    @staticmethod
+    def create_recipe(
+        title: str,
+        ingredients: List[Any],
+        description: str = None,
+        cook_minutes: int = None,
+        difficulty: str = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        创建菜谱
+
+        Args:
+            title: 菜谱名称
+            ingredients: 食材列表，元素为名称字符串或 {name, amount, optional} 字典
+            description: 描述
+            cook_minutes: 烹饪时间（分钟）
+            difficulty: 难度
+
+        Returns:
+            Optional[Dict]: 创建的菜谱字典，失败返回None
+        """
+        created = RecipeService.bulk_create_recipes([{
+            'title': title, 'ingredients': ingredients, 'description': description,
+            'cook_minutes': cook_minutes, 'difficulty': difficulty,
+        }])
+        return created[0] if created else None
+
+    @staticmethod
+    def bulk_create_recipes(recipes: Iterable[Dict[str, Any]], chunk_size: int = BULK_CHUNK_SIZE) -> List[Dict[str, Any]]:
+        """
+        批量创建菜谱（用于导入菜谱库），每批一个事务
+
+        Args:
+            recipes: 菜谱字典（title、ingredients、description、cook_minutes、difficulty）的可迭代对象
+            chunk_size: 每批数量
+
+        Returns:
+            List[Dict]: 创建的菜谱字典列表，失败返回已成功写入的部分
+        """
+        created: List[Dict[str, Any]] = []
+        batch: List[Dict[str, Any]] = []
+
+        def flush():
+            with db_service.session_scope() as session:
+                written = RecipeService._write_recipes(session, batch)
+            created.extend(written)
+            # 提交后通知匹配引擎
+            event_bus.emit(RECIPES_CHANGED, action='created', recipe_ids=[r['id'] for r in written], recipes=written)
+
+        try:
+            for data in recipes:
+                batch.append(data)
+                if len(batch) >= chunk_size:
+                    flush()
+                    batch = []
+            if batch:
+                flush()
+        except Exception as e:
+            logger.error("创建菜谱失败: %s", e)
+        return created
+
+    @staticmethod
+    def delete_recipe(recipe_id: str) -> bool:
+        """
+        删除菜谱
+
+        Args:
+            recipe_id: 菜谱ID
+
+        Returns:
+            bool: 是否删除成功
+        """
+        try:
+            with db_service.session_scope() as session:
+                recipe = session.query(Recipe).filter(Recipe.id == recipe_id).first()
+                if not recipe:
+                    logger.warning("菜谱不存在: %s", recipe_id)
+                    return False
+                session.delete(recipe)
+
+            event_bus.emit(RECIPES_CHANGED, action='deleted', recipe_ids=[recipe_id])
+            return True
+
+        except Exception as e:
+            logger.error("删除菜谱失败: %s", e)
+            return False
+
+    @staticmethod
+    def load_all_recipes() -> List[Dict[str, Any]]:
+        """
+        读取全部菜谱及其食材（两次查询，不经过 ORM 对象）
+
+        Returns:
+            List[Dict]: 菜谱字典列表，ingredients 为食材字典列表
+        """
+        try:
+            with db_service.session_scope() as session:
+                recipes = {
+                    row.id: {
+                        'id': row.id, 'title': row.title, 'description': row.description,
+                        'cook_minutes': row.cook_minutes, 'difficulty': row.difficulty, 'ingredients': [],
+                    }
+                    for row in session.execute(select(
+                        Recipe.id, Recipe.title, Recipe.description, Recipe.cook_minutes, Recipe.difficulty,
+                    ))
+                }
+                ingredients = session.execute(
+                    select(
+                        RecipeIngredient.recipe_id, RecipeIngredient.name, RecipeIngredient.normalized_name,
+                        RecipeIngredient.amount, RecipeIngredient.optional,
+                    ).order_by(RecipeIngredient.id)
+                )
+                for recipe_id, name, key, amount, optional in ingredients:
+                    recipe = recipes.get(recipe_id)
+                    if recipe is not None:
+                        recipe['ingredients'].append(
+                            {'name': name, 'key': key, 'amount': amount, 'optional': bool(optional)}
+                        )
+                return list(recipes.values())
+        except Exception as e:
+            logger.error("读取菜谱失败: %s", e)
+            return []
+
+
+class RecipeMatcher:
+    """基于倒排索引的菜谱与库存匹配引擎"""
+
+    def __init__(self):
+        self._recipes: Dict[str, Dict[str, Any]] = {}
+        # 规范化食材名称 -> 以其为必需食材的菜谱ID
+        self._postings: Dict[str, set] = {}
+        # 规范化食材名称 -> {'name', 'quantity', 'expiry_date'}
+        self._inventory: Dict[str, Dict[str, Any]] = {}
+        # 规范化食材名称 -> 库存中对应的原始物品名称
+        self._item_names: Dict[str, set] = {}
+        self._weights: Dict[str, float] = {}
+        # 菜谱ID -> [已匹配的必需食材数, 已匹配权重之和, 必需食材数]，只包含至少匹配一种食材的菜谱
+        self._matched: Dict[str, List[float]] = {}
+        self._as_of: Optional[date] = None
+        self._loaded = False
+        self._lock = threading.RLock()
+        event_bus.subscribe(ITEMS_CHANGED, self._on_items_changed)
+        event_bus.subscribe(RECIPES_CHANGED, self._on_recipes_changed)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    # ---------------- 加载 ----------------
+    def build(self) -> int:
+        """
+        读取全部菜谱与当前库存，重建索引
+
+        Returns:
+            int: 索引中的菜谱数量
+        """
+        recipes = RecipeService.load_all_recipes()
+        with self._lock:
+            self._recipes = {}
+            self._postings = {}
+            self._inventory = {}
+            self._item_names = {}
+            self._weights = {}
+            self._matched = {}
+            for recipe in recipes:
+                self._add_recipe(recipe)
+            self._loaded = True
+            self._reload_inventory()
+        logger.debug("菜谱索引已构建: %s 道菜谱, %s 种在库食材", len(self._recipes), len(self._inventory))
+        return len(self._recipes)
+
+    def ensure_loaded(self) -> None:
+        """尚未构建时同步构建"""
+        if not self._loaded:
+            self.build()
+
+    def load_in_background(self) -> threading.Thread:
+        """在后台线程中构建索引（应用启动时调用）"""
+        thread = threading.Thread(target=self.ensure_loaded, name='recipe-index', daemon=True)
+        thread.start()
+        return thread
+
+    def invalidate(self) -> None:
+        """清空索引，下次使用时重新构建"""
+        with self._lock:
+            self._recipes = {}
+            self._postings = {}
+            self._inventory = {}
+            self._item_names = {}
+            self._weights = {}
+            self._matched = {}
+            self._as_of = None
+            self._loaded = False
+
+    # ---------------- 菜谱索引 ----------------
+    def _add_recipe(self, recipe: Dict[str, Any]) -> None:
+        required = sorted({ing['key'] for ing in recipe['ingredients'] if not ing['optional'] and ing['key']})
+        if not required:
+            return
+        self._recipes[recipe['id']] = dict(recipe, required=required)
+        count, weight = 0, 0.0
+        for key in required:
+            self._postings.setdefault(key, set()).add(recipe['id'])
+            if key in self._weights:
+                count += 1
+                weight += self._weights[key]
+        if count:
+            self._matched[recipe['id']] = [count, weight, len(required)]
+
+    def _remove_recipe(self, recipe_id: str) -> None:
+        recipe = self._recipes.pop(recipe_id, None)
+        if recipe is None:
+            return
+        for key in recipe['required']:
+            postings = self._postings.get(key)
+            if postings is not None:
+                postings.discard(recipe_id)
+                if not postings:
+                    del self._postings[key]
+        self._matched.pop(recipe_id, None)
+
+    def _on_recipes_changed(self, action: str, recipe_ids=(), recipes: List[Dict[str, Any]] = None, **_) -> None:
+        if not self._loaded:
+            return
+        with self._lock:
+            if action == 'created' and recipes:
+                for recipe in recipes:
+                    self._add_recipe(recipe)
+            elif action == 'deleted':
+                for recipe_id in recipe_ids or ():
+                    self._remove_recipe(recipe_id)
+
+    # ---------------- 库存 ----------------
+    @staticmethod
+    def _query_inventory(today: date, names: Iterable[str] = None) -> List[tuple]:
+        """按物品名称汇总未过期的在库物品：(名称, 数量, 最近的过期日期)"""
+        query = (
+            select(Item.name, func.sum(Item.quantity), func.min(Item.expiry_date))
+            .where(
+                Item.status == ItemStatus.ACTIVE,
+                Item.quantity > 0,
+                or_(Item.expiry_date.is_(None), Item.expiry_date >= today),
+            )
+            .group_by(Item.name)
+        )
+        if names is not None:
+            query = query.where(Item.name.in_(list(names)))
+        with db_service.session_scope() as session:
+            return session.execute(query).all()
+
+    def _set_weight(self, key: str, weight: float) -> None:
+        """更新一种食材的权重，并通过倒排索引更新用到它的菜谱"""
+        old = self._weights.get(key, 0.0)
+        if weight == old:
+            return
+        if weight:
+            self._weights[key] = weight
+        else:
+            self._weights.pop(key, None)
+        for recipe_id in self._postings.get(key, ()):
+            acc = self._matched.get(recipe_id)
+            if acc is None:
+                acc = self._matched[recipe_id] = [0, 0.0, len(self._recipes[recipe_id]['required'])]
+            acc[0] += (weight > 0) - (old > 0)
+            acc[1] += weight - old
+            if acc[0] <= 0:
+                del self._matched[recipe_id]
+
+    def _apply_inventory(self, keys: Iterable[str], rows: List[tuple]) -> None:
+        """用查询结果替换指定食材的库存快照"""
+        merged: Dict[str, Dict[str, Any]] = {}
+        names: Dict[str, set] = {}
+        for name, quantity, expiry_date in rows:
+            key = normalize_item_name(name)
+            names.setdefault(key, set()).add(name)
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = {'name': name, 'quantity': quantity or 0, 'expiry_date': expiry_date}
+                continue
+            entry['quantity'] += quantity or 0
+            if expiry_date is not None and (entry['expiry_date'] is None or expiry_date < entry['expiry_date']):
+                entry['expiry_date'] = expiry_date
+
+        for key in set(keys) | set(merged):
+            entry = merged.get(key)
+            if entry is None:
+                self._inventory.pop(key, None)
+                self._item_names.pop(key, None)
+                self._set_weight(key, 0.0)
+            else:
+                self._inventory[key] = entry
+                self._item_names[key] = names[key]
+                self._set_weight(key, ingredient_weight(self._days_left(entry['expiry_date'])))
+
+    def _days_left(self, expiry_date: Optional[date]) -> Optional[int]:
+        return None if expiry_date is None else (expiry_date - self._as_of).days
+
+    def _reload_inventory(self) -> None:
+        """重新读取全部库存（构建索引或日期变化时）"""
+        today = app_clock.today()
+        try:
+            rows = self._query_inventory(today)
+        except Exception as e:
+            logger.error("读取库存失败: %s", e)
+            return
+        with self._lock:
+            self._as_of = today
+            self._apply_inventory(list(self._inventory), rows)
+
+    def _on_items_changed(self, action: str, names=(), **_) -> None:
+        if not self._loaded:
+            return
+        if action == 'reload' or not names or self._as_of != app_clock.today():
+            self._reload_inventory()
+            return
+        keys = {normalize_item_name(name) for name in names}
+        with self._lock:
+            # 同一规范化名称下可能有多个原始名称，一并重新查询
+            query_names = set(names)
+            for key in keys:
+                query_names.update(self._item_names.get(key, ()))
+        try:
+            rows = self._query_inventory(self._as_of, query_names)
+        except Exception as e:
+            logger.error("更新库存快照失败: %s", e)
+            return
+        with self._lock:
+            self._apply_inventory(keys, [row for row in rows if normalize_item_name(row[0]) in keys])
+
+    def _refresh_if_stale(self) -> None:
+        self.ensure_loaded()
+        if self._as_of != app_clock.today():
+            # 跨天后临期权重改变，且可能有食材已过期
+            self._reload_inventory()
+
+    # ---------------- 查询 ----------------
+    def _result(self, recipe_id: str, count: int, weight: float) -> Dict[str, Any]:
+        recipe = self._recipes[recipe_id]
+        required = recipe['required']
+        matched, missing, expiring = [], [], []
+        for ing in recipe['ingredients']:
+            if ing['optional']:
+                continue
+            entry = self._inventory.get(ing['key'])
+            if entry is None:
+                missing.append(ing['name'])
+                continue
+            matched.append(ing['name'])
+            days_left = self._days_left(entry['expiry_date'])
+            if days_left is not None and days_left <= URGENT_DAYS:
+                expiring.append(ing['name'])
+        result = {key: value for key, value in recipe.items() if key != 'required'}
+        result.update({
+            'score': weight / len(required),
+            'coverage': count / len(required),
+            'matched': matched,
+            'missing': missing,
+            'expiring': expiring,
+        })
+        return result
+
+    def recommend(self, limit: int = 20, min_coverage: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        根据当前库存推荐菜谱
+
+        Args:
+            limit: 最多返回数量
+            min_coverage: 最低食材覆盖率（0-1），例如 1 表示只返回食材齐全的菜谱
+
+        Returns:
+            List[Dict]: 菜谱字典（含 ingredients），附加 score、coverage、matched、missing、expiring，
+                按得分降序排列
+        """
+        try:
+            self._refresh_if_stale()
+            with self._lock:
+                candidates = self._matched.items()
+                if min_coverage > 0:
+                    candidates = [pair for pair in candidates if pair[1][0] >= min_coverage * pair[1][2]]
+                # 得分相同时覆盖率高的优先
+                top = heapq.nlargest(
+                    limit, candidates, key=lambda pair: (pair[1][1] / pair[1][2], pair[1][0] / pair[1][2]),
+                )
+                return [self._result(recipe_id, int(acc[0]), acc[1]) for recipe_id, acc in top]
+        except Exception as e:
+            logger.error("推荐菜谱失败: %s", e)
+            return []
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        获取菜谱页面的统计数据
+
+        Returns:
+            Dict[str, int]: available_ingredients（在库食材种数）、makeable_recipes（食材齐全的菜谱数）、
+                expiring_ingredients（临期食材种数）
+        """
+        try:
+            self._refresh_if_stale()
+            with self._lock:
+                makeable = sum(
+                    1 for acc in self._matched.values() if acc[0] >= acc[2]
+                )
+                expiring = sum(
+                    1 for entry in self._inventory.values()
+                    if entry['expiry_date'] is not None and self._days_left(entry['expiry_date']) <= URGENT_DAYS
+                )
+                return {
+                    'available_ingredients': len(self._inventory),
+                    'makeable_recipes': makeable,
+                    'expiring_ingredients': expiring,
+                }
+        except Exception as e:
+            logger.error("获取菜谱统计失败: %s", e)
+            return {'available_ingredients': 0, 'makeable_recipes': 0, 'expiring_ingredients': 0}
+
+
+# 示例数据工具
+def seed_example_recipes():
+    """在数据库没有菜谱时插入一些家常菜谱"""
+    try:
+        with db_service.session_scope() as session:
+            if session.query(Recipe.id).first():
+                return
+
+        examples = [
+            ("番茄炒蛋", "经典家常菜，5分钟搞定", 15, "简单",
+             ["番茄", "鸡蛋", {"name": "葱", "optional": True}]),
+            ("蒜蓉西兰花", "清爽健康，低脂美味", 10, "简单",
+             ["西兰花", {"name": "蒜", "optional": True}, {"name": "盐", "optional": True}]),
+            ("蛋花汤", "暖胃养身，营养丰富", 12, "中等",
+             ["鸡蛋", "紫菜", {"name": "葱", "optional": True}]),
+            ("凉拌黄瓜", "夏日开胃小菜", 5, "简单",
+             ["黄瓜", {"name": "蒜", "optional": True}, {"name": "醋", "optional": True}]),
+            ("法式吐司", "用掉快过期的面包和牛奶", 15, "简单",
+             ["面包", "鸡蛋", "鲜牛奶", {"name": "黄油", "optional": True}]),
+            ("牛奶蒸蛋", "嫩滑香甜的早餐", 20, "简单",
+             ["鲜牛奶", "鸡蛋", {"name": "糖", "optional": True}]),
+            ("水果酸奶杯", "无需开火的快手甜品", 5, "简单",
+             ["酸奶", "水果", {"name": "燕麦", "optional": True}]),
+            ("可乐鸡翅", "甜咸适口，老少皆宜", 30, "中等",
+             ["鸡翅", "可口可乐", {"name": "姜", "optional": True}]),
+        ]
+        recipe_service.bulk_create_recipes(
+            {'title': title, 'description': desc, 'cook_minutes': minutes, 'difficulty': difficulty,
+             'ingredients': ingredients}
+            for title, desc, minutes, difficulty, ingredients in examples
+        )
+        logger.info("已插入示例菜谱数据")
+    except Exception as e:
+        logger.error("插入示例菜谱失败: %s", e)
+
+
+# 全局服务实例
+recipe_service = RecipeService()
+recipe_matcher = RecipeMatcher()
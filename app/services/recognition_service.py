@@ -0,0 +1,513 @@
+# -*- coding: utf-8 -*-
+"""
+图片识别服务
+
+订单截图与包装日期标签的识别任务队列：
+- 识别器可插拔（register_recognizer），内置基于 pytesseract 的本地 OCR 与用于测试的确定性识别器；
+- 识别与文本解析在进程池中执行，调度线程按 max_workers 限制同时运行的任务数，不阻塞 UI 线程；
+- 排队中的任务可取消；相同图片（按 SHA-256）命中结果缓存，不会重复识别；
+- 记录排队、哈希、识别、解析各阶段耗时。
+
+任务完成回调在后台线程中调用，UI 代码应通过 Clock.schedule_once 切回主线程更新界面。
+
+环境变量:
+    RECOGNIZER: 默认识别器名称，默认 tesseract
+    RECOGNITION_WORKERS: 最大并发识别数，默认 2
+"""
+
+import hashlib
+import itertools
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Optional, Type
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 各阶段耗时保留的样本数
+_TIMING_SAMPLES = 1000
+
+
+# ---------------- 文本解析 ----------------
+
+_DATE_PATTERN = re.compile(r'(20\d{2})\s*[年\-/.]\s*(\d{1,2})\s*[月\-/.]\s*(\d{1,2})\s*日?|(20\d{2})(\d{2})(\d{2})')
+_PRODUCTION_KEYWORDS = ('生产日期', '生产', '制造日期', 'mfd', 'prd', 'mfg')
+_EXPIRY_KEYWORDS = ('保质期至', '有效期至', '到期', '过期', 'exp', 'best before', 'bb')
+_SHELF_LIFE_PATTERN = re.compile(r'保质期\s*[:：]?\s*(\d+)\s*(天|日|个月|月|年)')
+_PRICE_PATTERN = re.compile(r'[¥￥]\s*\d+(?:\.\d+)?')
+_UNITS = '个|盒|瓶|袋|包|罐|支|根|颗|块|斤|箱|杯|kg|g|ml|L'
+_ITEM_PATTERN = re.compile(
+    rf'^(?P<name>.+?)\s*(?:[xX×*]\s*(?P<qty>\d+)\s*(?P<unit>{_UNITS})?|\s(?P<qty2>\d+)\s*(?P<unit2>{_UNITS}))$'
+)
+_SHELF_LIFE_DAYS = {'天': 1, '日': 1, '个月': 30, '月': 30, '年': 365}
+
+
+def _parse_date_match(match) -> Optional[date]:
+    year, month, day = (match.group(1), match.group(2), match.group(3)) if match.group(1) \
+        else (match.group(4), match.group(5), match.group(6))
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def parse_recognized_text(text: str) -> Dict[str, Any]:
+    """
+    从识别出的文本中解析物品、数量与日期
+
+    订单截图中形如 "鲜牛奶 950ml ×2 ¥12.90" 的行解析为物品；日期标签中按关键字区分
+    生产日期与到期日期，只有生产日期和保质期时推算到期日期。
+
+    Args:
+        text: 识别出的文本
+
+    Returns:
+        Dict: items（name/quantity/unit 列表）、production_date、expiry_date、shelf_life_days
+    """
+    items = []
+    production_date = None
+    expiry_date = None
+    shelf_life_days = None
+    undated = []
+
+    for raw_line in (text or '').splitlines():
+        line = _PRICE_PATTERN.sub('', raw_line).strip()
+        if not line:
+            continue
+        lowered = line.lower()
+
+        shelf_life = _SHELF_LIFE_PATTERN.search(line)
+        if shelf_life:
+            shelf_life_days = int(shelf_life.group(1)) * _SHELF_LIFE_DAYS[shelf_life.group(2)]
+
+        dates = [d for d in (_parse_date_match(m) for m in _DATE_PATTERN.finditer(line)) if d]
+        if dates:
+            if any(keyword in lowered for keyword in _EXPIRY_KEYWORDS):
+                expiry_date = dates[0]
+            elif any(keyword in lowered for keyword in _PRODUCTION_KEYWORDS):
+                production_date = dates[0]
+            else:
+                undated.extend(dates)
+            continue
+        if shelf_life:
+            continue
+
+        match = _ITEM_PATTERN.match(line)
+        if match:
+            items.append({
+                'name': match.group('name').strip(),
+                'quantity': int(match.group('qty') or match.group('qty2')),
+                'unit': match.group('unit') or match.group('unit2'),
+            })
+
+    # 没有关键字时：两个日期按先后视为生产/到期日期，一个日期视为生产日期
+    undated.sort()
+    if production_date is None and undated:
+        production_date = undated.pop(0)
+    if expiry_date is None and undated:
+        expiry_date = undated[-1]
+    if expiry_date is None and production_date and shelf_life_days:
+        expiry_date = production_date + timedelta(days=shelf_life_days)
+
+    return {
+        'items': items,
+        'production_date': production_date,
+        'expiry_date': expiry_date,
+        'shelf_life_days': shelf_life_days,
+    }
+
+
+# ---------------- 识别器 ----------------
+
+class Recognizer:
+    """
+    识别器基类
+
+    子类实现 recognize()，返回图片中的文本（按行分隔）。
+    识别器实例会被传入工作进程，必须可以 pickle（不要在实例上保存打开的句柄）。
+    """
+
+    name = 'base'
+
+    def recognize(self, image_path: str) -> str:
+        raise NotImplementedError
+
+
+_RECOGNIZERS: Dict[str, Type[Recognizer]] = {}
+
+
+def register_recognizer(recognizer_cls: Type[Recognizer]) -> Type[Recognizer]:
+    """注册识别器（可作为类装饰器使用）"""
+    _RECOGNIZERS[recognizer_cls.name] = recognizer_cls
+    return recognizer_cls
+
+
+def get_recognizer(name: str = None) -> Recognizer:
+    """
+    按名称创建识别器
+
+    Args:
+        name: 识别器名称，默认读取环境变量 RECOGNIZER
+
+    Returns:
+        Recognizer: 识别器实例
+
+    Raises:
+        ValueError: 未注册的识别器
+    """
+    name = name or os.getenv('RECOGNIZER', 'tesseract')
+    recognizer_cls = _RECOGNIZERS.get(name)
+    if recognizer_cls is None:
+        raise ValueError(f"未注册的识别器: {name}")
+    return recognizer_cls()
+
+
+@register_recognizer
+class TesseractRecognizer(Recognizer):
+    """本地 Tesseract OCR（需要安装 ocr 可选依赖与 tesseract 中文语言包）"""
+
+    name = 'tesseract'
+
+    def __init__(self, lang: str = 'chi_sim+eng'):
+        self.lang = lang
+
+    def recognize(self, image_path: str) -> str:
+        try:
+            import pytesseract
+            from PIL import Image
+        except ImportError as e:
+            raise RuntimeError("未安装 OCR 依赖，请执行 pip install vibe-fridge[ocr]") from e
+        with Image.open(image_path) as image:
+            return pytesseract.image_to_string(image, lang=self.lang)
+
+
+@register_recognizer
+class SidecarTextRecognizer(Recognizer):
+    """
+    确定性识别器：读取与图片同名的 .txt 文件作为识别结果
+
+    用于测试与开发，不依赖 OCR 引擎。
+    """
+
+    name = 'sidecar'
+
+    def recognize(self, image_path: str) -> str:
+        with open(os.path.splitext(image_path)[0] + '.txt', 'r', encoding='utf-8') as f:
+            return f.read()
+
+
+def _run_recognition(recognizer: Recognizer, image_path: str) -> Dict[str, Any]:
+    """在工作进程中执行识别与解析，返回结果与耗时"""
+    start = time.perf_counter()
+    text = recognizer.recognize(image_path)
+    recognized = time.perf_counter()
+    result = parse_recognized_text(text)
+    result['text'] = text
+    result['timings'] = {
+        'recognize': (recognized - start) * 1000,
+        'parse': (time.perf_counter() - recognized) * 1000,
+    }
+    return result
+
+
+def image_hash(image_path: str) -> str:
+    """计算图片文件的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(image_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ---------------- 任务队列 ----------------
+
+class RecognitionJob:
+    """单个识别任务"""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    def __init__(
+        self,
+        job_id: int,
+        image_path: str,
+        callback: Callable[['RecognitionJob'], None] = None,
+        on_finish: Callable[['RecognitionJob'], None] = None,
+    ):
+        self.id = job_id
+        self.image_path = image_path
+        self.status = self.PENDING
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.cached = False
+        self.timings: Dict[str, float] = {}
+        self.callback = callback
+        self._on_finish = on_finish
+        self.submitted_at = time.perf_counter()
+        self._future = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> bool:
+        """
+        取消任务
+
+        排队中的任务不会再执行；已在工作进程中运行的任务无法中断，其结果会被丢弃。
+
+        Returns:
+            bool: 是否取消成功（已完成的任务返回 False）
+        """
+        if not self._finish(self.CANCELLED):
+            return False
+        if self._future is not None:
+            self._future.cancel()
+        return True
+
+    def _mark_running(self) -> bool:
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.status = self.RUNNING
+            return True
+
+    def wait(self, timeout: float = None) -> bool:
+        """等待任务结束，返回是否已结束"""
+        return self._event.wait(timeout)
+
+    def _finish(self, status: str, result: Dict[str, Any] = None, error: str = None) -> bool:
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.status = status
+            self.result = result
+            self.error = error
+            self.timings['total'] = (time.perf_counter() - self.submitted_at) * 1000
+            self._event.set()
+        if self._on_finish is not None:
+            self._on_finish(self)
+        if self.callback is not None:
+            try:
+                self.callback(self)
+            except Exception as e:
+                logger.error("识别任务回调失败: %s", e)
+        return True
+
+
+class RecognitionQueue:
+    """
+    识别任务队列
+
+    submit() 只把任务放入队列并立即返回；调度线程负责计算图片哈希、查询缓存，
+    并在并发数未满时把任务交给进程池。
+    """
+
+    def __init__(
+        self,
+        recognizer: Recognizer = None,
+        max_workers: int = None,
+        max_queue: int = 100,
+        cache_size: int = 256,
+        use_processes: bool = True,
+    ):
+        """
+        Args:
+            recognizer: 识别器，默认按环境变量 RECOGNIZER 创建
+            max_workers: 最大并发识别数，默认读取环境变量 RECOGNITION_WORKERS
+            max_queue: 排队任务上限，超过时 submit 返回 None
+            cache_size: 缓存的识别结果数量
+            use_processes: 是否使用进程池（False 时使用线程池，便于调试）
+        """
+        self._recognizer = recognizer
+        self.max_workers = max_workers or int(os.getenv('RECOGNITION_WORKERS', 2))
+        self.cache_size = cache_size
+        self.use_processes = use_processes
+        self._pending = queue.Queue(maxsize=max_queue)
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        # 保护缓存以及计数与耗时样本（调度线程、执行器回调线程与调用方线程都会访问）
+        self._cache_lock = threading.Lock()
+        self._timings = defaultdict(lambda: deque(maxlen=_TIMING_SAMPLES))
+        self._counters = defaultdict(int)
+        self._ids = itertools.count(1)
+        self._executor = None
+        self._dispatcher = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def recognizer(self) -> Recognizer:
+        if self._recognizer is None:
+            self._recognizer = get_recognizer()
+        return self._recognizer
+
+    def _ensure_started(self) -> None:
+        with self._start_lock:
+            if self._dispatcher is not None:
+                return
+            executor_cls = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self._executor = executor_cls(max_workers=self.max_workers)
+            self._dispatcher = threading.Thread(target=self._dispatch, name='recognition-dispatcher', daemon=True)
+            self._dispatcher.start()
+
+    def submit(self, image_path: str, callback: Callable[[RecognitionJob], None] = None) -> Optional[RecognitionJob]:
+        """
+        提交识别任务
+
+        Args:
+            image_path: 图片路径
+            callback: 任务结束（完成、失败或取消）时在后台线程中调用
+
+        Returns:
+            Optional[RecognitionJob]: 任务；队列已满时返回 None
+        """
+        self._ensure_started()
+        job = RecognitionJob(next(self._ids), image_path, callback, on_finish=self._record)
+        try:
+            self._pending.put_nowait(job)
+        except queue.Full:
+            logger.warning("识别队列已满，拒绝任务: %s", image_path)
+            return None
+        with self._cache_lock:
+            self._counters['submitted'] += 1
+        return job
+
+    def _dispatch(self) -> None:
+        while True:
+            job = self._pending.get()
+            if job is None:
+                return
+            if job.done:
+                continue
+            self._slots.acquire()
+            if not job._mark_running():
+                self._slots.release()
+                continue
+            self._start_job(job)
+
+    def _start_job(self, job: RecognitionJob) -> None:
+        """计算哈希并查询缓存，未命中时交给执行器（调用前已占用一个并发名额）"""
+        start = time.perf_counter()
+        job.timings['queue'] = (start - job.submitted_at) * 1000
+        try:
+            key = f"{self.recognizer.name}:{image_hash(job.image_path)}"
+        except OSError as e:
+            self._slots.release()
+            self._complete(job, error=f"无法读取图片: {e}")
+            return
+        job.timings['hash'] = (time.perf_counter() - start) * 1000
+
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._counters['cache_hits'] += 1
+        if cached is not None:
+            self._slots.release()
+            job.cached = True
+            self._complete(job, result=cached)
+            return
+
+        try:
+            job._future = self._executor.submit(_run_recognition, self.recognizer, job.image_path)
+        except RuntimeError as e:
+            # 执行器已关闭
+            self._slots.release()
+            self._complete(job, error=str(e))
+            return
+        job._future.add_done_callback(lambda future: self._on_future_done(job, key, future))
+
+    def _on_future_done(self, job: RecognitionJob, key: str, future) -> None:
+        self._slots.release()
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.error("图片识别失败 %s: %s", job.image_path, error)
+            self._complete(job, error=str(error))
+            return
+
+        result = future.result()
+        job.timings.update(result.pop('timings'))
+        with self._cache_lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        self._complete(job, result=result)
+
+    def _complete(self, job: RecognitionJob, result: Dict[str, Any] = None, error: str = None) -> None:
+        # 任务已被取消时 _finish 不生效，识别结果（仍已缓存）被丢弃
+        status = RecognitionJob.FAILED if error else RecognitionJob.DONE
+        job._finish(status, result=dict(result) if result else None, error=error)
+
+    def _record(self, job: RecognitionJob) -> None:
+        """任务结束时更新计数与阶段耗时"""
+        with self._cache_lock:
+            self._counters[job.status] += 1
+            if job.status != RecognitionJob.CANCELLED:
+                for stage, duration_ms in job.timings.items():
+                    self._timings[stage].append(duration_ms)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        任务计数与各阶段耗时统计
+
+        Returns:
+            Dict: submitted/done/failed/cancelled/cache_hits 计数，以及 stages
+                  （queue、hash、recognize、parse、total 的次数、平均与 p95 耗时，毫秒）
+        """
+        with self._cache_lock:
+            counters = dict(self._counters)
+            samples_by_stage = {stage: list(samples) for stage, samples in self._timings.items()}
+        stages = {}
+        for stage, samples in samples_by_stage.items():
+            ordered = sorted(samples)
+            if not ordered:
+                continue
+            stages[stage] = {
+                'count': len(ordered),
+                'avg_ms': round(sum(ordered) / len(ordered), 3),
+                'p95_ms': round(ordered[max(int(len(ordered) * 0.95 + 0.5) - 1, 0)], 3),
+            }
+        return {
+            'submitted': counters.get('submitted', 0),
+            'done': counters.get(RecognitionJob.DONE, 0),
+            'failed': counters.get(RecognitionJob.FAILED, 0),
+            'cancelled': counters.get(RecognitionJob.CANCELLED, 0),
+            'cache_hits': counters.get('cache_hits', 0),
+            'stages': stages,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """取消排队中的任务并关闭调度线程与执行器"""
+        with self._start_lock:
+            if self._dispatcher is None:
+                return
+            while True:
+                try:
+                    job = self._pending.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None:
+                    job.cancel()
+            self._pending.put(None)
+            self._dispatcher.join(timeout=5 if wait else 0)
+            self._executor.shutdown(wait=wait)
+            self._dispatcher = None
+            self._executor = None
+
+
+# 全局识别队列实例（首次提交任务时才启动进程池）
+recognition_queue = RecognitionQueue()
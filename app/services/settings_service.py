@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+应用设置
+
+设置以键值对保存在 settings 表中，每个键在 SETTING_DEFINITIONS 中声明类型与默认值。
+首次读取时把全部设置（包括默认值）加载到内存缓存，之后的 get() 不访问数据库，
+可以放心地在创建物品、导入订单等频繁调用的路径中使用。
+
+set() 写入数据库并更新缓存，值发生变化时发布 SETTINGS_CHANGED(key, value, previous)，
+依赖设置的服务通过订阅该事件更新（如提醒提前天数变化时重新计算提醒日期）。
+"""
+
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, NamedTuple
+
+from app.models.setting import Setting
+from app.services.database import db_service
+from app.utils.events import SETTINGS_CHANGED, event_bus
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class SettingDefinition(NamedTuple):
+    """设置定义：值类型、默认值与说明"""
+    type: type
+    default: Callable[[], Any]
+    description: str
+
+
+# 设置键
+REMINDER_DAYS_BEFORE = 'reminder.days_before'
+EXPIRY_REMINDER_ENABLED = 'reminder.expiry_enabled'
+SHOPPING_REMINDER_ENABLED = 'reminder.shopping_enabled'
+SYNC_ENABLED = 'sync.enabled'
+THEME_COLOR = 'appearance.theme_color'
+FONT_SIZE = 'appearance.font_size'
+
+SETTING_DEFINITIONS: Dict[str, SettingDefinition] = {
+    # 环境变量 REMINDER_DAYS_BEFORE 仍作为未设置时的默认值
+    REMINDER_DAYS_BEFORE: SettingDefinition(int, lambda: int(os.getenv('REMINDER_DAYS_BEFORE', 3)), '过期前几天提醒'),
+    EXPIRY_REMINDER_ENABLED: SettingDefinition(bool, lambda: True, '物品即将过期时提醒'),
+    SHOPPING_REMINDER_ENABLED: SettingDefinition(bool, lambda: False, '库存不足时提醒购买'),
+    SYNC_ENABLED: SettingDefinition(bool, lambda: False, '跨设备同步数据'),
+    THEME_COLOR: SettingDefinition(str, lambda: 'default', '主题颜色'),
+    FONT_SIZE: SettingDefinition(str, lambda: 'medium', '字体大小（small / medium / large）'),
+}
+
+
+def coerce_setting(key: str, value: Any) -> Any:
+    """
+    按设置定义检查并转换值的类型
+
+    Args:
+        key: 设置键
+        value: 设置值
+
+    Returns:
+        Any: 转换后的值
+
+    Raises:
+        ValueError: 未定义的设置键，或值无法转换为定义的类型
+    """
+    definition = SETTING_DEFINITIONS.get(key)
+    if definition is None:
+        raise ValueError(f"未定义的设置: {key}")
+    if definition.type is bool:
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.lower() in ('true', '1', 'false', '0'):
+            return value.lower() in ('true', '1')
+        raise ValueError(f"设置 {key} 需要布尔值: {value!r}")
+    if definition.type is int and isinstance(value, bool):
+        raise ValueError(f"设置 {key} 需要整数: {value!r}")
+    try:
+        return definition.type(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"设置 {key} 的值类型错误: {value!r}") from None
+
+
+class SettingsService:
+    """带内存缓存的设置服务"""
+
+    def __init__(self):
+        self._values: Dict[str, Any] = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def ensure_loaded(self) -> None:
+        """首次使用时从数据库加载全部设置"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            # 默认值只计算一次，之后读取设置不再访问环境变量
+            values = {key: definition.default() for key, definition in SETTING_DEFINITIONS.items()}
+            try:
+                with db_service.session_scope() as session:
+                    for row in session.query(Setting).all():
+                        try:
+                            values[row.key] = coerce_setting(row.key, json.loads(row.value))
+                        except ValueError as e:
+                            # 旧版本遗留或手工修改的无效值，使用默认值
+                            logger.warning("忽略无效的设置 %s: %s", row.key, e)
+            except Exception as e:
+                # 数据库不可用时先使用默认值，下次读取时重试
+                logger.error("加载设置失败: %s", e)
+                self._values = values
+                return
+            self._values = values
+            self._loaded = True
+
+    def invalidate(self) -> None:
+        """清空缓存，下次读取时重新加载"""
+        with self._lock:
+            self._values = {}
+            self._loaded = False
+
+    def get(self, key: str) -> Any:
+        """
+        读取设置（未设置时返回默认值），只访问内存缓存
+
+        Args:
+            key: 设置键
+
+        Returns:
+            Any: 设置值
+
+        Raises:
+            ValueError: 未定义的设置键
+        """
+        if key not in SETTING_DEFINITIONS:
+            raise ValueError(f"未定义的设置: {key}")
+        self.ensure_loaded()
+        return self._values[key]
+
+    def set(self, key: str, value: Any) -> bool:
+        """
+        修改设置并持久化，值变化时发布 SETTINGS_CHANGED
+
+        Args:
+            key: 设置键
+            value: 新值
+
+        Returns:
+            bool: 是否保存成功
+
+        Raises:
+            ValueError: 未定义的设置键，或值类型错误
+        """
+        value = coerce_setting(key, value)
+        with self._lock:
+            previous = self.get(key)
+            try:
+                with db_service.session_scope() as session:
+                    session.merge(Setting(key=key, value=json.dumps(value)))
+            except Exception as e:
+                logger.error("保存设置失败: %s", e)
+                return False
+            self._values[key] = value
+
+        if value != previous:
+            logger.info("设置已修改: %s = %s", key, value)
+            event_bus.emit(SETTINGS_CHANGED, key=key, value=value, previous=previous)
+        return True
+
+    def reset(self, key: str) -> bool:
+        """
+        恢复设置为默认值
+
+        Args:
+            key: 设置键
+
+        Returns:
+            bool: 是否成功
+        """
+        with self._lock:
+            previous = self.get(key)
+            try:
+                with db_service.session_scope() as session:
+                    session.query(Setting).filter(Setting.key == key).delete()
+            except Exception as e:
+                logger.error("重置设置失败: %s", e)
+                return False
+            value = self._values[key] = SETTING_DEFINITIONS[key].default()
+
+        if value != previous:
+            event_bus.emit(SETTINGS_CHANGED, key=key, value=value, previous=previous)
+        return True
+
+    def get_all(self) -> Dict[str, Any]:
+        """获取全部设置（包括默认值）"""
+        return {key: self.get(key) for key in SETTING_DEFINITIONS}
+
+    def reminder_days_before(self) -> int:
+        """过期前几天提醒"""
+        return self.get(REMINDER_DAYS_BEFORE)
+
+
+# 全局设置服务
+settings_service = SettingsService()
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+SQL 执行统计
+
+通过 SQLAlchemy 的 before/after_cursor_execute 事件记录每条 SQL 的指纹、执行次数、
+总耗时、p95 耗时与影响/返回行数；慢查询会连同 EXPLAIN QUERY PLAN 一起记录到日志。
+
+默认关闭，可通过环境变量 SQL_INSTRUMENTATION=1 全局开启，或在测试中使用
+db_service.instrument() 上下文管理器临时开启:
+
+    with db_service.instrument() as stats:
+        item_service.get_items()
+    stats.assert_max_queries(2)
+
+环境变量:
+    SQL_INSTRUMENTATION: 设为 1 时 DatabaseService 启动即开启统计
+    SQL_SLOW_QUERY_MS: 慢查询阈值（毫秒），默认 100
+"""
+
+import math
+import os
+import re
+import threading
+import time
+import weakref
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# 当前线程是否正在执行 EXPLAIN（避免统计自身产生的查询）
+_local = threading.local()
+
+# 连接 info 中保存语句开始时间的键
+_START_KEY = 'vf_sql_start'
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> str:
+    """
+    生成 SQL 指纹：去掉字面量、合并 IN 列表与空白，使同类查询归为一组
+
+    Args:
+        statement: SQL 语句
+
+    Returns:
+        str: 规范化后的 SQL
+    """
+    sql = _STRING_LITERAL.sub('?', statement)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _IN_LIST.sub('(?, ...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    """计算百分位数（最近秩法）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(math.ceil(percent / 100 * len(ordered))) - 1, 0)
+    return ordered[rank]
+
+
+class QueryStats:
+    """单个 SQL 指纹的统计数据"""
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.rows = 0
+        self.durations_ms: List[float] = []
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.durations_ms)
+
+    @property
+    def p95_ms(self) -> float:
+        return _percentile(self.durations_ms, 95)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'fingerprint': self.fingerprint,
+            'count': self.count,
+            'total_ms': round(self.total_ms, 3),
+            'p95_ms': round(self.p95_ms, 3),
+            'rows': self.rows,
+        }
+
+
+class _EngineHooks:
+    """
+    每个引擎只注册一组事件监听，计时与行数分发给当前开启的全部收集器
+
+    多个 instrument() 同时开启（如嵌套使用）时不会重复计时或互相覆盖行数统计。
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.collectors: List['SQLInstrumentation'] = []
+        self._count_rows = engine.dialect.name == 'sqlite'
+
+    def add(self, collector: 'SQLInstrumentation') -> None:
+        if not self.collectors:
+            event.listen(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(self.engine, 'after_cursor_execute', self._after_cursor_execute)
+        self.collectors.append(collector)
+
+    def remove(self, collector: 'SQLInstrumentation') -> None:
+        self.collectors.remove(collector)
+        if not self.collectors:
+            event.remove(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.remove(self.engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(_local, 'explaining', False):
+            return
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+        key = fingerprint(statement)
+        if self._count_rows and not executemany:
+            # 返回结果集的语句（SELECT、UPDATE/DELETE ... RETURNING 等）的 rowcount 不可用：
+            # 通过 sqlite3 游标的 row_factory 在取出每一行时计数，不返回行的语句不会触发；
+            # 不缓冲结果集，未取出的行也不会被计入
+            collectors = list(self.collectors)
+
+            def count_row(_cursor, row):
+                for collector in collectors:
+                    collector._add_rows(key, 1)
+                return row
+
+            cursor.row_factory = count_row
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get(_START_KEY)
+        if not starts or getattr(_local, 'explaining', False):
+            return
+        duration_ms = (time.perf_counter() - starts.pop()) * 1000
+        key = fingerprint(statement)
+        rows = 0
+        # 有 description 的语句返回结果集，其行数已由 row_factory 计入
+        if cursor.description is None and cursor.rowcount and cursor.rowcount > 0:
+            rows = cursor.rowcount
+
+        collectors = list(self.collectors)
+        for collector in collectors:
+            collector._record(key, duration_ms, rows)
+        if collectors and duration_ms >= min(collector.slow_query_ms for collector in collectors):
+            self._log_slow_query(cursor, statement, parameters, duration_ms, executemany)
+
+    def _log_slow_query(self, cursor, statement, parameters, duration_ms, executemany):
+        """记录慢查询及其执行计划（仅 SQLite 的单条 SELECT）"""
+        plan = None
+        if not executemany and self.engine.dialect.name == 'sqlite' \
+                and statement.lstrip()[:6].upper() == 'SELECT':
+            _local.explaining = True
+            try:
+                rows = cursor.connection.execute(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters or ()
+                ).fetchall()
+                plan = '; '.join(str(row[-1]) for row in rows)
+            except Exception as e:
+                plan = f'EXPLAIN 失败: {e}'
+            finally:
+                _local.explaining = False
+        logger.warning("慢查询 %.1f ms: %s | 执行计划: %s", duration_ms, fingerprint(statement), plan)
+
+
+# 每个引擎的事件分发器
+_engine_hooks: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+_hooks_lock = threading.Lock()
+
+
+class SQLInstrumentation:
+    """
+    SQL 执行统计收集器
+
+    返回结果集的语句（SELECT、... RETURNING）在取出行时计数（SQLite），
+    其余 INSERT/UPDATE/DELETE 使用游标的 rowcount。
+    """
+
+    def __init__(self, engine, slow_query_ms: float = None):
+        self.engine = engine
+        if slow_query_ms is None:
+            slow_query_ms = float(os.getenv('SQL_SLOW_QUERY_MS', 100))
+        self.slow_query_ms = slow_query_ms
+        self.stats: Dict[str, QueryStats] = {}
+        self._lock = threading.Lock()
+        self._enabled = False
+
+    # ---------------- 开关 ----------------
+    def enable(self) -> 'SQLInstrumentation':
+        """开始统计"""
+        with _hooks_lock:
+            if not self._enabled:
+                hooks = _engine_hooks.get(self.engine)
+                if hooks is None:
+                    hooks = _engine_hooks[self.engine] = _EngineHooks(self.engine)
+                hooks.add(self)
+                self._enabled = True
+        return self
+
+    def disable(self) -> None:
+        """停止统计"""
+        with _hooks_lock:
+            if self._enabled:
+                _engine_hooks[self.engine].remove(self)
+                self._enabled = False
+
+    def reset(self) -> None:
+        """清空统计数据"""
+        with self._lock:
+            self.stats.clear()
+
+    # ---------------- 记录 ----------------
+    def _stats_for(self, key: str) -> QueryStats:
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = QueryStats(key)
+        return stats
+
+    def _record(self, key: str, duration_ms: float, rows: int) -> None:
+        with self._lock:
+            stats = self._stats_for(key)
+            stats.count += 1
+            stats.durations_ms.append(duration_ms)
+            stats.rows += rows
+
+    def _add_rows(self, key: str, rows: int) -> None:
+        if not self._enabled:
+            return
+        with self._lock:
+            self._stats_for(key).rows += rows
+
+    # ---------------- 结果 ----------------
+    @property
+    def query_count(self) -> int:
+        """已执行的 SQL 总数"""
+        with self._lock:
+            return sum(stats.count for stats in self.stats.values())
+
+    def report(self) -> Dict[str, Any]:
+        """
+        汇总统计结果
+
+        Returns:
+            Dict: 总次数、总耗时、p95 耗时、行数及按总耗时排序的各指纹明细
+        """
+        with self._lock:
+            queries = [stats.to_dict() for stats in self.stats.values()]
+            durations = [d for stats in self.stats.values() for d in stats.durations_ms]
+        queries.sort(key=lambda q: q['total_ms'], reverse=True)
+        return {
+            'query_count': sum(q['count'] for q in queries),
+            'total_ms': round(sum(durations), 3),
+            'p95_ms': round(_percentile(durations, 95), 3),
+            'rows': sum(q['rows'] for q in queries),
+            'queries': queries,
+        }
+
+    def log_summary(self, top: int = 10) -> None:
+        """将统计结果中耗时最多的查询写入日志"""
+        summary = self.report()
+        logger.info(
+            "SQL 统计: %s 条查询, 总耗时 %.1f ms, p95 %.2f ms, %s 行",
+            summary['query_count'], summary['total_ms'], summary['p95_ms'], summary['rows'],
+        )
+        for query in summary['queries'][:top]:
+            logger.info(
+                "  %5d 次 %8.1f ms p95 %.2f ms %6d 行 | %s",
+                query['count'], query['total_ms'], query['p95_ms'], query['rows'], query['fingerprint'],
+            )
+
+    def assert_max_queries(self, limit: int, fingerprint_contains: Optional[str] = None) -> None:
+        """
+        断言执行的 SQL 数量不超过 limit（用于测试 N+1 查询）
+
+        Args:
+            limit: 允许的最大查询数
+            fingerprint_contains: 只统计包含该片段的 SQL（如表名）
+
+        Raises:
+            AssertionError: 查询数超过限制
+        """
+        with self._lock:
+            matched = [
+                stats for stats in self.stats.values()
+                if fingerprint_contains is None or fingerprint_contains in stats.fingerprint
+            ]
+        count = sum(stats.count for stats in matched)
+        if count > limit:
+            details = '\n'.join(f"  {stats.count} x {stats.fingerprint}" for stats in matched)
+            raise AssertionError(f"执行了 {count} 条 SQL，超过上限 {limit}:\n{details}")
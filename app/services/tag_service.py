@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+"""
+标签服务
+
+标签名称到整数主键的映射缓存在内存中（标签表很小），新增标签与物品-标签关联均使用
+INSERT OR IGNORE 批量写入；批量添加/移除标签以集合方式一次处理多个物品。
+接口接收物品的 UUID，关联表只保存物品与标签的整数主键。
+
+事务中新建的标签主键先记在会话上，提交后才写入全局缓存，回滚时丢弃，缓存中不会
+出现已回滚的主键。
+"""
+
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, event, func, literal, select, true
+from sqlalchemy.orm import Session
+
+from app.models.item import Item, ItemStatus, ItemTag, Tag
+from app.services.database import db_service, insert_or_ignore, resolve_pks
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# SQLite 单条语句的绑定参数上限较低，IN 列表按此大小分批
+_CHUNK_SIZE = 500
+
+# session.info 中保存本事务内解析到、尚未提交的标签主键
+_PENDING_KEY = 'vf_pending_tag_pks'
+
+
+def _chunks(values: List, size: int = _CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def normalize_tag_names(tag_names: Iterable[str]) -> List[str]:
+    """
+    规范化标签名称：去除首尾空白、去掉空值和重复值，保持原有顺序
+
+    Args:
+        tag_names: 标签名称列表
+
+    Returns:
+        List[str]: 规范化后的标签名称
+    """
+    seen = set()
+    result = []
+    for name in tag_names or []:
+        name = (name or '').strip()
+        if name and name not in seen:
+            seen.add(name)
+            result.append(name)
+    return result
+
+
+class _TagCache:
+    """标签名称 -> 整数主键的进程内缓存"""
+
+    def __init__(self):
+        self._ids: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+
+    def get_all(self, session: Session) -> Dict[str, int]:
+        pending = session.info.get(_PENDING_KEY, {})
+        with self._lock:
+            if self._ids is None:
+                rows = session.execute(select(Tag.name, Tag.pk)).all()
+                # 本事务尚未提交的标签不放入全局缓存
+                self._ids = {name: tag_pk for name, tag_pk in rows if name not in pending}
+            return dict(self._ids, **pending) if pending else self._ids
+
+    def update(self, mapping: Dict[str, int]) -> None:
+        with self._lock:
+            if self._ids is not None:
+                self._ids.update(mapping)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._ids = None
+
+
+_tag_cache = _TagCache()
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_pending_tags(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        _tag_cache.update(pending)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_pending_tags(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+class TagService:
+    """标签服务类"""
+
+    @staticmethod
+    def invalidate_cache() -> None:
+        """清空标签缓存（直接修改 tags 表后调用）"""
+        _tag_cache.invalidate()
+
+    @staticmethod
+    def resolve_tag_pks(session: Session, tag_names: Iterable[str], create: bool = True) -> Dict[str, int]:
+        """
+        将标签名称解析为标签的整数主键，缺失的标签批量创建
+
+        Args:
+            session: 数据库会话
+            tag_names: 标签名称列表
+            create: 是否创建不存在的标签
+
+        Returns:
+            Dict[str, int]: 标签名称 -> 标签主键（不创建时只包含已存在的标签）
+        """
+        names = normalize_tag_names(tag_names)
+        if not names:
+            return {}
+
+        known = _tag_cache.get_all(session)
+        missing = [name for name in names if name not in known]
+        if missing:
+            if create:
+                now = datetime.utcnow()
+                insert_or_ignore(session, Tag.__table__, [
+                    {'id': str(uuid.uuid4()), 'name': name, 'created_at': now} for name in missing
+                ])
+            # 重新读取主键：包括刚插入的，以及被其他连接抢先插入的同名标签
+            found = {}
+            for chunk in _chunks(missing):
+                rows = session.execute(select(Tag.name, Tag.pk).where(Tag.name.in_(chunk))).all()
+                found.update({name: tag_pk for name, tag_pk in rows})
+            # 提交后才写入全局缓存（见 _publish_pending_tags）
+            session.info.setdefault(_PENDING_KEY, {}).update(found)
+            known = dict(known, **found)
+
+        return {name: known[name] for name in names if name in known}
+
+    @staticmethod
+    def add_tags(item_ids: Iterable[str], tag_names: Iterable[str], session: Session = None) -> int:
+        """
+        为多个物品批量添加标签（已存在的关联会被忽略）
+
+        Args:
+            item_ids: 物品ID列表
+            tag_names: 标签名称列表
+            session: 可选，复用调用方的会话（此时出错直接抛出异常）
+
+        Returns:
+            int: 新增的关联数量
+        """
+        item_ids = list(dict.fromkeys(item_ids or []))
+        if not item_ids or not normalize_tag_names(tag_names):
+            return 0
+
+        def _add(current: Session) -> int:
+            tag_pks = list(TagService.resolve_tag_pks(current, tag_names).values())
+            now = datetime.utcnow()
+            added = 0
+            # INSERT ... SELECT 直接把物品 UUID 换成主键，不需要先查询物品主键
+            for chunk in _chunks(item_ids):
+                pairs = (
+                    select(Item.pk, Tag.pk, literal(now))
+                    .select_from(Item)
+                    .join(Tag, true())
+                    .where(Item.id.in_(chunk), Tag.pk.in_(tag_pks))
+                )
+                added += insert_or_ignore(
+                    current, ItemTag.__table__, None, from_select=(['item_pk', 'tag_pk', 'created_at'], pairs)
+                )
+            return added
+
+        # 复用调用方的会话时异常交给调用方处理（回滚整个事务）
+        if session is not None:
+            return _add(session)
+        try:
+            with db_service.session_scope() as new_session:
+                return _add(new_session)
+        except Exception as e:
+            logger.error("批量添加标签失败: %s", e)
+            return 0
+
+    @staticmethod
+    def remove_tags(item_ids: Iterable[str], tag_names: Iterable[str], session: Session = None) -> int:
+        """
+        从多个物品批量移除标签
+
+        Args:
+            item_ids: 物品ID列表
+            tag_names: 标签名称列表
+            session: 可选，复用调用方的会话（此时出错直接抛出异常）
+
+        Returns:
+            int: 删除的关联数量
+        """
+        item_ids = list(dict.fromkeys(item_ids or []))
+        if not item_ids or not normalize_tag_names(tag_names):
+            return 0
+
+        def _remove(current: Session) -> int:
+            tag_pks = list(TagService.resolve_tag_pks(current, tag_names, create=False).values())
+            if not tag_pks:
+                return 0
+            removed = 0
+            for chunk in _chunks(list(resolve_pks(current, Item, item_ids).values())):
+                result = current.execute(
+                    delete(ItemTag).where(ItemTag.item_pk.in_(chunk), ItemTag.tag_pk.in_(tag_pks))
+                )
+                removed += result.rowcount
+            return removed
+
+        if session is not None:
+            return _remove(session)
+        try:
+            with db_service.session_scope() as new_session:
+                return _remove(new_session)
+        except Exception as e:
+            logger.error("批量移除标签失败: %s", e)
+            return 0
+
+    @staticmethod
+    def set_tags(item_id: str, tag_names: Iterable[str], session: Session = None) -> bool:
+        """
+        将物品的标签替换为给定列表
+
+        Args:
+            item_id: 物品ID
+            tag_names: 新的标签名称列表
+            session: 可选，复用调用方的会话（此时出错直接抛出异常）
+
+        Returns:
+            bool: 是否成功
+        """
+        def _set(current: Session) -> None:
+            item_pk = resolve_pks(current, Item, [item_id]).get(item_id)
+            if item_pk is None:
+                raise ValueError(f"物品不存在: {item_id}")
+            tag_pks = list(TagService.resolve_tag_pks(current, tag_names).values())
+            stale = delete(ItemTag).where(ItemTag.item_pk == item_pk)
+            if tag_pks:
+                stale = stale.where(ItemTag.tag_pk.not_in(tag_pks))
+            current.execute(stale)
+            now = datetime.utcnow()
+            insert_or_ignore(current, ItemTag.__table__, [
+                {'item_pk': item_pk, 'tag_pk': tag_pk, 'created_at': now} for tag_pk in tag_pks
+            ])
+
+        if session is not None:
+            _set(session)
+            return True
+        try:
+            with db_service.session_scope() as new_session:
+                _set(new_session)
+            return True
+        except Exception as e:
+            logger.error("设置物品标签失败: %s", e)
+            return False
+
+    @staticmethod
+    def tagged_item_ids_query(session: Session, tag_names: Iterable[str], match: str = 'any'):
+        """
+        构造按标签筛选物品ID的子查询
+
+        Args:
+            session: 数据库会话
+            tag_names: 标签名称列表
+            match: 'any' 匹配任一标签，'all' 需包含全部标签
+
+        Returns:
+            Select: 返回物品整数主键 item_pk 的查询；标签不存在导致不可能匹配时返回 None
+        """
+        names = normalize_tag_names(tag_names)
+        tag_pks = list(TagService.resolve_tag_pks(session, names, create=False).values())
+        if not tag_pks or (match == 'all' and len(tag_pks) < len(names)):
+            return None
+
+        query = select(ItemTag.item_pk).where(ItemTag.tag_pk.in_(tag_pks))
+        if match == 'all':
+            query = query.group_by(ItemTag.item_pk).having(
+                func.count(ItemTag.tag_pk) == len(tag_pks)
+            )
+        else:
+            query = query.distinct()
+        return query
+
+    @staticmethod
+    def find_item_ids(tag_names: Iterable[str], match: str = 'any', status: ItemStatus = None) -> List[str]:
+        """
+        查找带有指定标签的物品ID
+
+        Args:
+            tag_names: 标签名称列表
+            match: 'any' 匹配任一标签，'all' 需包含全部标签
+            status: 可选，按物品状态筛选
+
+        Returns:
+            List[str]: 物品ID列表
+        """
+        try:
+            with db_service.session_scope() as session:
+                tagged = TagService.tagged_item_ids_query(session, tag_names, match)
+                if tagged is None:
+                    return []
+                query = select(Item.id).where(Item.pk.in_(tagged))
+                if status is not None:
+                    query = query.where(Item.status == status)
+                return list(session.execute(query).scalars())
+        except Exception as e:
+            logger.error("按标签查找物品失败: %s", e)
+            return []
+
+    @staticmethod
+    def get_tag_counts(status: ItemStatus = ItemStatus.ACTIVE) -> Dict[str, int]:
+        """
+        统计每个标签关联的物品数量
+
+        Args:
+            status: 只统计该状态的物品，为 None 时统计全部
+
+        Returns:
+            Dict[str, int]: 标签名称 -> 物品数量
+        """
+        try:
+            with db_service.session_scope() as session:
+                query = (
+                    select(Tag.name, func.count(ItemTag.item_pk))
+                    .join(ItemTag, ItemTag.tag_pk == Tag.pk)
+                    .group_by(Tag.name)
+                )
+                if status is not None:
+                    query = query.join(Item, Item.pk == ItemTag.item_pk).where(Item.status == status)
+                return {name: count for name, count in session.execute(query).all()}
+        except Exception as e:
+            logger.error("统计标签失败: %s", e)
+            return {}
+
+
+# 全局标签服务实例
+tag_service = TagService()
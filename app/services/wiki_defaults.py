@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+Wiki 默认值解析
+
+把所有 ItemWiki 的默认单位、建议保质期、存放位置等预加载到内存索引中，
+按规范化名称精确查找、按前缀查找。添加物品表单输入时与订单批量导入时都通过该索引
+补全默认值，不需要每次查询数据库。
+
+索引在应用启动时于后台加载，之后订阅 WIKI_CHANGED 事件增量更新。
+"""
+
+import bisect
+import re
+import threading
+import unicodedata
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+
+from app.models.item_wiki import ItemWiki, ItemWikiCategory
+from app.services.database import db_service
+from app.utils.clock import app_clock
+from app.utils.events import WIKI_CHANGED, event_bus
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 索引条目中保存的 Wiki 字段
+DEFAULT_FIELDS = (
+    'id', 'name', 'category_id', 'category_name', 'default_unit',
+    'suggested_expiry_days', 'storage_location',
+)
+
+
+def normalize_item_name(name: str) -> str:
+    """
+    规范化物品名称，用于与 ItemWiki 匹配
+
+    全角转半角、去除空白并转为小写，例如 " 鲜牛奶 " 与 "鲜牛奶" 视为同一物品。
+
+    Args:
+        name: 物品名称
+
+    Returns:
+        str: 规范化后的名称
+    """
+    return re.sub(r'\s+', '', unicodedata.normalize('NFKC', name or '')).lower()
+
+
+class WikiDefaultsResolver:
+    """Wiki 默认值内存索引"""
+
+    def __init__(self):
+        self._by_key: Dict[str, Dict[str, Any]] = {}
+        self._key_by_id: Dict[str, str] = {}
+        self._sorted_keys: Optional[List[str]] = None
+        self._loaded = False
+        self._lock = threading.RLock()
+        event_bus.subscribe(WIKI_CHANGED, self._on_wiki_changed)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    # ---------------- 加载与更新 ----------------
+    @staticmethod
+    def _query_entries(wiki_ids: Iterable[str] = None) -> List[Dict[str, Any]]:
+        query = (
+            select(
+                ItemWiki.id, ItemWiki.name, ItemWikiCategory.id, ItemWikiCategory.name,
+                ItemWiki.default_unit, ItemWiki.suggested_expiry_days, ItemWiki.storage_location,
+            )
+            .outerjoin(ItemWikiCategory, ItemWikiCategory.pk == ItemWiki.category_pk)
+            # 同名 Wiki 以最早创建的为准（与 get_wiki_by_name 一致）
+            .order_by(ItemWiki.created_at)
+        )
+        if wiki_ids is not None:
+            query = query.where(ItemWiki.id.in_(list(wiki_ids)))
+        with db_service.session_scope() as session:
+            return [dict(zip(DEFAULT_FIELDS, row)) for row in session.execute(query).all()]
+
+    def load(self) -> int:
+        """
+        从数据库（重新）加载全部 Wiki
+
+        新索引在单独的字典中构建完成后整体替换，加载期间不加锁的 lookup 仍读取旧索引。
+
+        Returns:
+            int: 索引中的 Wiki 数量
+        """
+        with self._lock:
+            try:
+                entries = self._query_entries()
+            except Exception as e:
+                logger.error("加载Wiki默认值失败: %s", e)
+                return 0
+            by_key, key_by_id = {}, {}
+            self._add_entries(entries, by_key, key_by_id)
+            self._by_key, self._key_by_id, self._sorted_keys = by_key, key_by_id, sorted(by_key)
+            self._loaded = True
+        logger.debug("Wiki默认值索引已加载: %s 条", len(by_key))
+        return len(by_key)
+
+    def ensure_loaded(self) -> None:
+        """尚未加载时同步加载（后台加载进行中时等待其完成，不会重复加载）"""
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                self.load()
+
+    def load_in_background(self) -> threading.Thread:
+        """在后台线程中加载索引（应用启动时调用）"""
+        thread = threading.Thread(target=self.ensure_loaded, name='wiki-defaults', daemon=True)
+        thread.start()
+        return thread
+
+    def invalidate(self) -> None:
+        """清空索引，下次使用时重新加载（直接修改 item_wikis 表后调用）"""
+        with self._lock:
+            self._loaded = False
+            self._by_key, self._key_by_id, self._sorted_keys = {}, {}, None
+
+    def _add_entries(self, entries: Iterable[Dict[str, Any]], by_key: Dict[str, Dict[str, Any]] = None,
+                     key_by_id: Dict[str, str] = None) -> None:
+        """加入条目，默认加入当前索引（需持有锁），也可写入正在构建的新索引"""
+        if by_key is None:
+            by_key, key_by_id = self._by_key, self._key_by_id
+            self._sorted_keys = None
+        for entry in entries:
+            entry = {field: entry.get(field) for field in DEFAULT_FIELDS}
+            key = normalize_item_name(entry['name'])
+            if not key:
+                continue
+            self._remove_id(entry['id'], by_key, key_by_id)
+            existing = by_key.get(key)
+            if existing is None or existing['id'] == entry['id']:
+                by_key[key] = entry
+                key_by_id[entry['id']] = key
+
+    def _remove_id(self, wiki_id: str, by_key: Dict[str, Dict[str, Any]] = None,
+                   key_by_id: Dict[str, str] = None) -> None:
+        if by_key is None:
+            by_key, key_by_id = self._by_key, self._key_by_id
+            self._sorted_keys = None
+        key = key_by_id.pop(wiki_id, None)
+        if key is not None and by_key.get(key, {}).get('id') == wiki_id:
+            del by_key[key]
+
+    def _on_wiki_changed(self, action: str, wiki_ids: Iterable[str] = (), wikis: List[Dict[str, Any]] = None,
+                         **_) -> None:
+        if not self._loaded:
+            return
+        if action == 'reload':
+            self.invalidate()
+            return
+        wiki_ids = list(wiki_ids or [])
+        if action == 'deleted':
+            with self._lock:
+                for wiki_id in wiki_ids:
+                    self._remove_id(wiki_id)
+                # 删除的 Wiki 可能遮住了同名的其他 Wiki，下次使用时重新加载
+                if wiki_ids:
+                    self._loaded = False
+            return
+        if wikis is None:
+            wikis = self._query_entries(wiki_ids)
+        with self._lock:
+            self._add_entries(wikis)
+
+    def add(self, wikis: List[Dict[str, Any]]) -> None:
+        """直接加入新建的 Wiki（批量导入时使用）"""
+        with self._lock:
+            if self._loaded:
+                self._add_entries(wikis)
+
+    # ---------------- 查询 ----------------
+    def lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        按规范化名称精确查找 Wiki
+
+        Args:
+            name: 物品名称
+
+        Returns:
+            Optional[Dict]: Wiki 默认值条目，不存在返回 None
+        """
+        self.ensure_loaded()
+        entry = self._by_key.get(normalize_item_name(name))
+        return dict(entry) if entry else None
+
+    def prefix_search(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        按名称前缀查找 Wiki（按规范化名称排序）
+
+        Args:
+            prefix: 名称前缀
+            limit: 最多返回数量
+
+        Returns:
+            List[Dict]: Wiki 默认值条目列表
+        """
+        key = normalize_item_name(prefix)
+        if not key:
+            return []
+        self.ensure_loaded()
+        with self._lock:
+            if self._sorted_keys is None:
+                self._sorted_keys = sorted(self._by_key)
+            keys = self._sorted_keys
+            result = []
+            for index in range(bisect.bisect_left(keys, key), len(keys)):
+                if not keys[index].startswith(key) or len(result) >= limit:
+                    break
+                result.append(dict(self._by_key[keys[index]]))
+        return result
+
+    def resolve_defaults(self, name: str, purchase_date: date = None) -> Dict[str, Any]:
+        """
+        计算物品的默认单位、过期日期与存放位置
+
+        Args:
+            name: 物品名称
+            purchase_date: 购买日期，默认今天（用于推算过期日期）
+
+        Returns:
+            Dict: wiki（条目或 None）、unit、expiry_date、storage_location、category_name
+        """
+        entry = self.lookup(name)
+        if entry is None:
+            return {'wiki': None, 'unit': None, 'expiry_date': None, 'storage_location': None, 'category_name': None}
+        expiry_date = None
+        if entry['suggested_expiry_days']:
+            expiry_date = (purchase_date or app_clock.today()) + timedelta(days=entry['suggested_expiry_days'])
+        return {
+            'wiki': entry,
+            'unit': entry['default_unit'],
+            'expiry_date': expiry_date,
+            'storage_location': entry['storage_location'],
+            'category_name': entry['category_name'],
+        }
+
+
+# 全局 Wiki 默认值索引
+wiki_defaults = WikiDefaultsResolver()
@@ -6,12 +6,13 @@
 import os
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from sqlalchemy import desc, or_, func
+from sqlalchemy import desc, or_, func, update
 from sqlalchemy.orm import Session, make_transient, joinedload, noload
 
 from app.models.item_wiki import ItemWiki, ItemWikiCategory
-from app.services.database import db_service
-from app.utils.logger import setup_logger
+from app.services.database import db_service, resolve_pks
+from app.utils.events import WIKI_CHANGED, event_bus
+from app.utils.logger import setup_logger, log_operation
 
 logger = setup_logger(__name__)
 
@@ -20,6 +21,14 @@ class WikiService:
     """物品Wiki服务类"""
 
     @staticmethod
+    def _resolve_category(session: Session, fields: Dict[str, Any]) -> None:
+        """把字段中的 category_id（UUID）替换为分类的整数主键 category_pk"""
+        if 'category_id' in fields:
+            category_id = fields.pop('category_id')
+            fields['category_pk'] = resolve_pks(session, ItemWikiCategory, [category_id]).get(category_id)
+
+    @staticmethod
+    @log_operation('create', 'wiki')
     def create_wiki(
         name: str,
         description: str = None,
@@ -46,6 +55,7 @@ class WikiService:
         """
         try:
             with db_service.session_scope() as session:
+                WikiService._resolve_category(session, kwargs)
                 wiki = ItemWiki(
                     name=name,
                     description=description,
@@ -74,14 +84,18 @@ class WikiService:
                     'updated_at': wiki.updated_at.isoformat() if wiki.updated_at else None,
                 }
 
-                logger.info(f"物品Wiki创建成功: {wiki.name} (ID: {wiki.id})")
-                return result
+                logger.debug("物品Wiki创建成功: %s (ID: %s)", wiki.name, wiki.id)
+
+            # 提交后通知内存索引
+            event_bus.emit(WIKI_CHANGED, action='created', wiki_ids=[result['id']], wikis=[result])
+            return result
 
         except Exception as e:
-            logger.error(f"创建物品Wiki失败: {str(e)}")
+            logger.error("创建物品Wiki失败: %s", e)
             return None
 
     @staticmethod
+    @log_operation('get', 'wiki', id_arg='wiki_id')
     def get_wiki(wiki_id: str) -> Optional[Dict[str, Any]]:
         """
         获取物品Wiki
@@ -118,7 +132,7 @@ class WikiService:
                 return result
 
         except Exception as e:
-            logger.error(f"获取物品Wiki失败: {str(e)}")
+            logger.error("获取物品Wiki失败: %s", e)
             return None
 
     @staticmethod
@@ -160,10 +174,11 @@ class WikiService:
                 return result
 
         except Exception as e:
-            logger.error(f"根据名称获取物品Wiki失败: {str(e)}")
+            logger.error("根据名称获取物品Wiki失败: %s", e)
             return None
 
     @staticmethod
+    @log_operation('update', 'wiki', id_arg='wiki_id')
     def update_wiki(wiki_id: str, **updates) -> bool:
         """
         更新物品Wiki
@@ -176,30 +191,34 @@ class WikiService:
             bool: 是否更新成功
         """
         try:
-            logger.info(f"开始更新Wiki: wiki_id={wiki_id}, updates={updates}")
+            logger.debug("开始更新Wiki: wiki_id=%s, updates=%s", wiki_id, updates)
             with db_service.session_scope() as session:
                 wiki = session.query(ItemWiki).filter(ItemWiki.id == wiki_id).first()
                 if not wiki:
-                    logger.warning(f"物品Wiki不存在: {wiki_id}")
+                    logger.warning("物品Wiki不存在: %s", wiki_id)
                     return False
 
-                logger.info(f"找到Wiki对象: {wiki}")
+                logger.debug("找到Wiki对象: %s", wiki)
+                WikiService._resolve_category(session, updates)
                 for key, value in updates.items():
                     if hasattr(wiki, key):
-                        logger.info(f"设置属性: {key} = {value}")
+                        logger.debug("设置属性: %s = %s", key, value)
                         setattr(wiki, key, value)
                     else:
-                        logger.warning(f"Wiki对象没有属性: {key}")
+                        logger.warning("Wiki对象没有属性: %s", key)
 
                 session.flush()
-                logger.info(f"物品Wiki更新成功: {wiki.name} (ID: {wiki_id})")
-                return True
+                logger.debug("物品Wiki更新成功: %s (ID: %s)", wiki.name, wiki_id)
+
+            event_bus.emit(WIKI_CHANGED, action='updated', wiki_ids=[wiki_id])
+            return True
 
         except Exception as e:
-            logger.error(f"更新物品Wiki失败: {str(e)}", exc_info=True)
+            logger.error("更新物品Wiki失败: %s", e, exc_info=True)
             return False
 
     @staticmethod
+    @log_operation('delete', 'wiki', id_arg='wiki_id')
     def delete_wiki(wiki_id: str, force: bool = False) -> Dict[str, Any]:
         """
         删除物品Wiki
@@ -212,16 +231,17 @@ class WikiService:
             Dict[str, Any]: 删除结果信息
         """
         try:
+            from app.models.archive import ItemArchive
             from app.models.item import Item, ItemStatus
 
             with db_service.session_scope() as session:
                 wiki = session.query(ItemWiki).filter(ItemWiki.id == wiki_id).first()
                 if not wiki:
-                    logger.warning(f"物品Wiki不存在: {wiki_id}")
+                    logger.warning("物品Wiki不存在: %s", wiki_id)
                     return {'success': False, 'message': 'Wiki不存在'}
 
                 inventory_count = session.query(Item).filter(
-                    Item.wiki_id == wiki_id,
+                    Item.wiki_pk == wiki.pk,
                     Item.status != ItemStatus.CONSUMED
                 ).count()
 
@@ -233,12 +253,19 @@ class WikiService:
                     }
 
                 wiki_name = wiki.name
+                # 归档记录只保存 Wiki 的整数主键：SQLite 会复用被删除的主键，
+                # 不解除关联的话新建的 Wiki 会继承这些历史记录
+                session.execute(
+                    update(ItemArchive).where(ItemArchive.wiki_pk == wiki.pk).values(wiki_pk=None)
+                )
                 session.delete(wiki)
-                logger.info(f"物品Wiki删除成功: {wiki_name} (ID: {wiki_id})")
-                return {'success': True, 'message': f'已删除Wiki: {wiki_name}'}
+                logger.debug("物品Wiki删除成功: %s (ID: %s)", wiki_name, wiki_id)
+
+            event_bus.emit(WIKI_CHANGED, action='deleted', wiki_ids=[wiki_id])
+            return {'success': True, 'message': f'已删除Wiki: {wiki_name}'}
 
         except Exception as e:
-            logger.error(f"删除物品Wiki失败: {str(e)}")
+            logger.error("删除物品Wiki失败: %s", e)
             return {'success': False, 'message': str(e)}
 
     @staticmethod
@@ -271,10 +298,10 @@ class WikiService:
                 session.add(category)
                 session.flush()
                 session.expunge(category)
-                logger.info(f"物品分类创建成功: {name} (ID: {category.id})")
+                logger.debug("物品分类创建成功: %s (ID: %s)", name, category.id)
                 return category
         except Exception as e:
-            logger.error(f"创建物品分类失败: {str(e)}")
+            logger.error("创建物品分类失败: %s", e)
             return None
 
     @staticmethod
@@ -297,7 +324,7 @@ class WikiService:
                     session.expunge(category)
                 return category
         except Exception as e:
-            logger.error(f"获取物品分类失败: {str(e)}")
+            logger.error("获取物品分类失败: %s", e)
             return None
 
     @staticmethod
@@ -317,7 +344,7 @@ class WikiService:
                     make_transient(category)
                 return categories
         except Exception as e:
-            logger.error(f"获取所有物品分类失败: {str(e)}")
+            logger.error("获取所有物品分类失败: %s", e)
             return []
 
     @staticmethod
@@ -338,17 +365,20 @@ class WikiService:
                     ItemWikiCategory.id == category_id
                 ).first()
                 if not category:
-                    logger.warning(f"物品分类不存在: {category_id}")
+                    logger.warning("物品分类不存在: %s", category_id)
                     return False
 
                 for key, value in updates.items():
                     if hasattr(category, key):
                         setattr(category, key, value)
 
-                logger.info(f"物品分类更新成功: {category.name} (ID: {category_id})")
-                return True
+                logger.debug("物品分类更新成功: %s (ID: %s)", category.name, category_id)
+
+            # 分类名称会影响该分类下所有 Wiki 的索引条目
+            event_bus.emit(WIKI_CHANGED, action='reload', wiki_ids=[])
+            return True
         except Exception as e:
-            logger.error(f"更新物品分类失败: {str(e)}")
+            logger.error("更新物品分类失败: %s", e)
             return False
 
     @staticmethod
@@ -369,11 +399,11 @@ class WikiService:
                     ItemWikiCategory.id == category_id
                 ).first()
                 if not category:
-                    logger.warning(f"物品分类不存在: {category_id}")
+                    logger.warning("物品分类不存在: %s", category_id)
                     return {'success': False, 'message': '分类不存在'}
 
                 item_count = session.query(ItemWiki).filter(
-                    ItemWiki.category_id == category_id
+                    ItemWiki.category_pk == category.pk
                 ).count()
 
                 if item_count > 0 and not force:
@@ -385,13 +415,17 @@ class WikiService:
 
                 category_name = category.name
                 session.delete(category)
-                logger.info(f"物品分类删除成功: {category_name} (ID: {category_id})")
-                return {'success': True, 'message': f'已删除分类: {category_name}'}
+                logger.debug("物品分类删除成功: %s (ID: %s)", category_name, category_id)
+
+            # 分类下的 Wiki 随分类级联删除
+            event_bus.emit(WIKI_CHANGED, action='reload', wiki_ids=[])
+            return {'success': True, 'message': f'已删除分类: {category_name}'}
         except Exception as e:
-            logger.error(f"删除物品分类失败: {str(e)}")
+            logger.error("删除物品分类失败: %s", e)
             return {'success': False, 'message': str(e)}
 
     @staticmethod
+    @log_operation('list', 'wiki')
     def get_all_wikis(
         keyword: str = None,
         category_id: str = None,
@@ -449,7 +483,7 @@ class WikiService:
                     if include_inventory_count:
                         from app.models.item import Item, ItemStatus
                         count = session.query(Item).filter(
-                            Item.wiki_id == wiki.id,
+                            Item.wiki_pk == wiki.pk,
                             Item.status != ItemStatus.CONSUMED
                         ).count()
                         wiki_dict['inventory_count'] = count
@@ -460,7 +494,7 @@ class WikiService:
                 return result
 
         except Exception as e:
-            logger.error(f"获取物品Wiki列表失败: {str(e)}")
+            logger.error("获取物品Wiki列表失败: %s", e)
             return []
 
     @staticmethod
@@ -478,6 +512,7 @@ class WikiService:
         return WikiService.get_all_wikis(keyword=keyword, limit=limit)
 
     @staticmethod
+    @log_operation('get_or_create', 'wiki')
     def get_or_create_wiki(
         name: str,
         description: str = None,
@@ -537,7 +572,7 @@ class WikiService:
                 }
 
         except Exception as e:
-            logger.error(f"获取Wiki统计失败: {str(e)}")
+            logger.error("获取Wiki统计失败: %s", e)
             return {}
 
 
@@ -659,7 +694,7 @@ def seed_example_wikis():
         logger.info("已插入示例物品Wiki数据")
 
     except Exception as e:
-        logger.error(f"插入示例Wiki数据失败: {e}")
+        logger.error("插入示例Wiki数据失败: %s", e)
 
 
 # 全局服务实例
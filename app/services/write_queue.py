@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+界面修改的后台写入队列（write-behind）
+
+勾选已消耗、切换提醒、点击数量 +/- 等操作不再在界面线程同步提交：界面先更新显示，
+再把修改交给本队列。队列只有一个写入线程，每隔 WRITE_BEHIND_INTERVAL_MS 毫秒
+把积累的修改在一个事务中提交。同一物品的连续修改会先合并：
+消耗后又恢复相互抵消，数量变化累加，字段取最后一次的值。
+
+提交结果（成功或失败原因）通过回调 callback(item_id, ok, error) 在写入线程中返回，
+界面回调需要通过 Clock.schedule_once 切回主线程。
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.item import Item, ItemStatus
+from app.services.database import db_service
+from app.services.item_service import quantity_update_statement
+from app.utils.events import ITEMS_CHANGED, event_bus
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 状态修改
+STATUS_CONSUMED = 'consumed'
+STATUS_ACTIVE = 'active'
+_INVERSE_STATUS = {STATUS_CONSUMED: STATUS_ACTIVE, STATUS_ACTIVE: STATUS_CONSUMED}
+
+WriteCallback = Callable[[str, bool, Optional[str]], None]
+
+
+class _PendingMutation:
+    """同一物品尚未提交的合并修改"""
+    __slots__ = ('status', 'quantity_delta', 'fields', 'callbacks')
+
+    def __init__(self):
+        self.status: Optional[str] = None
+        self.quantity_delta = 0
+        self.fields: Dict[str, Any] = {}
+        self.callbacks: List[WriteCallback] = []
+
+    def merge(self, status: str = None, quantity_delta: int = 0, fields: Dict[str, Any] = None) -> None:
+        if status:
+            # 相反的状态修改相互抵消
+            self.status = None if self.status == _INVERSE_STATUS[status] else status
+        self.quantity_delta += quantity_delta
+        if fields:
+            self.fields.update(fields)
+
+    @property
+    def is_noop(self) -> bool:
+        return self.status is None and not self.quantity_delta and not self.fields
+
+
+class WriteBehindQueue:
+    """单写入线程的合并写入队列"""
+
+    def __init__(self, interval_ms: float = None):
+        self.interval = (interval_ms if interval_ms is not None
+                         else float(os.getenv('WRITE_BEHIND_INTERVAL_MS', 300))) / 1000
+        self._pending: Dict[str, _PendingMutation] = {}
+        self._cond = threading.Condition()
+        self._flush_requested = False
+        self._in_flight = False
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {'submitted': 0, 'written': 0, 'coalesced': 0, 'failed': 0, 'batches': 0}
+
+    # ---------------- 提交修改 ----------------
+    def submit(
+        self,
+        item_id: str,
+        status: str = None,
+        quantity_delta: int = 0,
+        fields: Dict[str, Any] = None,
+        callback: WriteCallback = None,
+    ) -> None:
+        """
+        提交一个物品修改，与该物品尚未写入的修改合并
+
+        Args:
+            item_id: 物品ID
+            status: 状态修改（STATUS_CONSUMED 或 STATUS_ACTIVE）
+            quantity_delta: 数量变化
+            fields: 直接设置的字段
+            callback: 写入完成后的回调 callback(item_id, ok, error)
+        """
+        if status is not None and status not in _INVERSE_STATUS:
+            raise ValueError(f"不支持的状态修改: {status}")
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("写入队列已关闭")
+            pending = self._pending.get(item_id)
+            if pending is None:
+                pending = self._pending[item_id] = _PendingMutation()
+            else:
+                self._stats['coalesced'] += 1
+            pending.merge(status, quantity_delta, fields)
+            if callback is not None:
+                pending.callbacks.append(callback)
+            self._stats['submitted'] += 1
+            self._ensure_thread()
+            self._cond.notify_all()
+
+    def consume(self, item_id: str, callback: WriteCallback = None) -> None:
+        """标记物品为已消耗"""
+        self.submit(item_id, status=STATUS_CONSUMED, callback=callback)
+
+    def restore(self, item_id: str, callback: WriteCallback = None) -> None:
+        """恢复物品为使用中"""
+        self.submit(item_id, status=STATUS_ACTIVE, callback=callback)
+
+    def change_quantity(self, item_id: str, delta: int, callback: WriteCallback = None) -> None:
+        """增减物品数量"""
+        self.submit(item_id, quantity_delta=delta, callback=callback)
+
+    def update_fields(self, item_id: str, callback: WriteCallback = None, **fields) -> None:
+        """设置物品字段，如 is_reminder_enabled"""
+        self.submit(item_id, fields=fields, callback=callback)
+
+    def has_pending(self, item_id: str) -> bool:
+        """物品是否还有未写入的修改（界面据此决定是否用数据库中的值刷新显示）"""
+        with self._cond:
+            return item_id in self._pending
+
+    # ---------------- 写入线程 ----------------
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                # 等待一个批次间隔，期间到达的修改合并进同一事务
+                deadline = time.monotonic() + self.interval
+                while not self._flush_requested and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending, {}
+                self._flush_requested = False
+                self._in_flight = True
+            try:
+                self._apply(batch)
+            finally:
+                with self._cond:
+                    self._in_flight = False
+                    self._cond.notify_all()
+
+    @staticmethod
+    def _apply_one(session, item: Item, mutation: _PendingMutation) -> Optional[str]:
+        """在事务中应用一个物品的修改，返回错误信息"""
+        restore = mutation.status == STATUS_ACTIVE
+        if mutation.quantity_delta:
+            # 数量使用与 update_item_quantity 相同的原子语句，数量不足时整条修改跳过；
+            # 恢复在同一语句中按新数量计算状态，之后不再覆盖
+            row = session.execute(quantity_update_statement(item.id, mutation.quantity_delta, restore=restore)).first()
+            if row is None:
+                return "数量不能为负数"
+            # 语句不同步会话中的对象：写回结果，后续按新的数量与状态判断
+            set_committed_value(item, 'quantity', row.quantity)
+            set_committed_value(item, 'status', row.status)
+            set_committed_value(item, 'consumed_at', row.consumed_at)
+        for key, value in mutation.fields.items():
+            if hasattr(item, key):
+                setattr(item, key, value)
+        if mutation.status == STATUS_CONSUMED:
+            item.status = ItemStatus.CONSUMED
+            item.consumed_at = datetime.utcnow()
+        elif restore and not mutation.quantity_delta:
+            item.status = ItemStatus.EXPIRED if item.is_expired else ItemStatus.ACTIVE
+            item.consumed_at = None
+        elif mutation.fields:
+            item.update_status()
+        return None
+
+    def _apply(self, batch: Dict[str, _PendingMutation]) -> None:
+        """在一个事务中写入一批修改，提交后发布事件并回调"""
+        errors: Dict[str, Optional[str]] = {}
+        names = set()
+        written = []
+        try:
+            with db_service.session_scope() as session:
+                ids = [item_id for item_id, mutation in batch.items() if not mutation.is_noop]
+                items = {item.id: item for item in session.query(Item).filter(Item.id.in_(ids))} if ids else {}
+                for item_id, mutation in batch.items():
+                    if mutation.is_noop:
+                        errors[item_id] = None
+                        continue
+                    item = items.get(item_id)
+                    if item is None:
+                        errors[item_id] = "物品不存在"
+                        continue
+                    errors[item_id] = self._apply_one(session, item, mutation)
+                    if errors[item_id] is None:
+                        names.add(item.name)
+                        written.append(item_id)
+        except Exception as e:
+            logger.error("后台写入物品修改失败: %s", e)
+            errors = {item_id: str(e) for item_id in batch}
+            names.clear()
+            written = []
+
+        failed = [item_id for item_id, error in errors.items() if error]
+        with self._cond:
+            self._stats['batches'] += 1
+            self._stats['written'] += len(written)
+            self._stats['failed'] += len(failed)
+        if failed:
+            logger.warning("后台写入 %s 个物品失败: %s", len(failed), {i: errors[i] for i in failed})
+        if written:
+            event_bus.emit(ITEMS_CHANGED, action='updated', item_ids=written, names=sorted(names))
+
+        for item_id, mutation in batch.items():
+            for callback in mutation.callbacks:
+                try:
+                    callback(item_id, errors.get(item_id) is None, errors.get(item_id))
+                except Exception as e:
+                    logger.error("写入回调执行失败: %s", e)
+
+    # ---------------- 控制 ----------------
+    def flush(self, timeout: float = None) -> bool:
+        """
+        立即写入所有待提交的修改并等待完成
+
+        Args:
+            timeout: 最长等待秒数，None 表示一直等待
+
+        Returns:
+            bool: 是否在超时前全部写入
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        停止写入线程；已提交的修改会先写入
+
+        Args:
+            wait: 是否等待写入线程结束
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        thread = self._thread
+        if wait and thread is not None:
+            thread.join()
+
+    def metrics(self) -> Dict[str, int]:
+        """返回队列统计：提交、合并、写入、失败的修改数与批次数"""
+        with self._cond:
+            return dict(self._stats, pending=len(self._pending))
+
+
+# 全局写入队列
+write_queue = WriteBehindQueue()
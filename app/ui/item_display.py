@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+物品列表项的显示文本（不依赖 Kivy，界面与测试共用）
+"""
+
+from typing import Optional
+
+# 剩余天数不超过该值时显示为“即将过期”
+EXPIRING_SOON_DAYS = 3
+
+# 过期程度
+LEVEL_NONE = 'none'          # 没有过期日期
+LEVEL_EXPIRED = 'expired'    # 已过期
+LEVEL_SOON = 'soon'          # 即将过期
+LEVEL_NORMAL = 'normal'      # 正常
+
+
+def expiry_level(days_until_expiry: Optional[int]) -> str:
+    """
+    根据距离过期的天数判断过期程度
+
+    Args:
+        days_until_expiry: 距离过期的天数，没有过期日期时为None
+
+    Returns:
+        str: LEVEL_NONE / LEVEL_EXPIRED / LEVEL_SOON / LEVEL_NORMAL
+    """
+    if days_until_expiry is None:
+        return LEVEL_NONE
+    if days_until_expiry < 0:
+        return LEVEL_EXPIRED
+    if days_until_expiry <= EXPIRING_SOON_DAYS:
+        return LEVEL_SOON
+    return LEVEL_NORMAL
+
+
+def status_text(days_until_expiry: Optional[int]) -> str:
+    """列表项第二行的状态文本"""
+    return {
+        LEVEL_NONE: '无过期',
+        LEVEL_EXPIRED: '已过期',
+        LEVEL_SOON: '即将过期',
+        LEVEL_NORMAL: '正常',
+    }[expiry_level(days_until_expiry)]
+
+
+def days_text(days_until_expiry: int) -> str:
+    """列表项第三行的剩余天数文本"""
+    if days_until_expiry < 0:
+        return f"过期{-days_until_expiry}天"
+    if days_until_expiry == 0:
+        return "今天过期"
+    return f"剩余{days_until_expiry}天"
+
+
+def headline_text(name: str, quantity: int) -> str:
+    """列表项标题：名称，数量大于 1 时附加数量"""
+    return f"{name} ×{quantity}" if quantity > 1 else name
+
+
+def category_name(item) -> str:
+    """物品所属 Wiki 分类的名称，未分类时为“其他”"""
+    return item.wiki.category.name if item.wiki and item.wiki.category else "其他"
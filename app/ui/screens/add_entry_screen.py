@@ -14,7 +14,7 @@ from kivymd.app import MDApp
 from kivymd.uix.card import MDCard
 from kivymd.uix.button import MDButton, MDIconButton, MDButtonText
 
-from app.utils.font_helper import apply_font_to_widget, CHINESE_FONT_NAME
+from app.utils.font_helper import CHINESE_FONT_NAME
 
 CHINESE_FONT = CHINESE_FONT_NAME
 
@@ -173,16 +173,3 @@ class AddEntryScreen(Screen):
         app = MDApp.get_running_app()
         if hasattr(app, "screen_manager"):
             app.screen_manager.current = "add_item"
-
-    def on_enter(self):
-        """进入时为整个屏幕应用中文字体"""
-        try:
-            import app.main as main_module
-
-            font = getattr(main_module, "CHINESE_FONT_NAME", None)
-        except Exception:
-            font = None
-        if font:
-            apply_font_to_widget(self, font)
-
-
@@ -8,8 +8,10 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
+from kivy.uix.button import Button
 from kivy.uix.scrollview import ScrollView
 from kivy.metrics import dp
+from kivy.clock import Clock
 from kivy.properties import StringProperty, ObjectProperty
 from kivymd.app import MDApp
 from kivymd.uix.card import MDCard
@@ -24,8 +26,11 @@ from kivy.properties import StringProperty
 from datetime import date, datetime
 import os
 
+from app.services.autocomplete import autocomplete_index
 from app.services.item_service import item_service
+from app.services.wiki_defaults import wiki_defaults
 
+from app.utils.clock import app_clock
 from app.utils.logger import setup_logger
 from app.utils.font_helper import apply_font_to_widget, CHINESE_FONT_NAME as CHINESE_FONT
 
@@ -83,14 +88,13 @@ class AddItemScreen(Screen):
         # 日期选择器
         self.date_picker = None
 
-        # 尝试为整个屏幕应用中文字体（再次获取，避免导入时 CHINESE_FONT 仍为 None）
-        try:
-            import app.main as main_module
-            runtime_font = getattr(main_module, 'CHINESE_FONT_NAME', None)
-        except Exception:
-            runtime_font = None
-        if runtime_font:
-            apply_font_to_widget(self, runtime_font)
+        # 根据名称自动填写的默认值（用户手动修改后不再覆盖）
+        self._auto_defaults = {'unit': None, 'expiry_date': None}
+        # 输入停顿后再查找 Wiki 默认值（内存索引，不查询数据库）
+        self._defaults_trigger = Clock.create_trigger(self._apply_wiki_defaults, 0.15)
+        self._suggest_trigger = Clock.create_trigger(self._update_suggestions, 0.1)
+        self._selecting_suggestion = False
+        self.name_input.bind(text=self._on_name_text)
 
     def _build_ui(self):
         """构建UI界面"""
@@ -190,7 +194,7 @@ class AddItemScreen(Screen):
         """创建基本信息卡片"""
         card = MDCard(
             size_hint_y=None,
-            height=dp(200),
+            height=dp(240),
             padding=dp(16),
             radius=[dp(8), dp(8), dp(8), dp(8)]
         )
@@ -215,6 +219,10 @@ class AddItemScreen(Screen):
         name_layout.add_widget(self.name_input)
         layout.add_widget(name_layout)
 
+        # 名称补全候选（点击后填入名称）
+        self.suggestion_bar = BoxLayout(size_hint_y=None, height=dp(32), spacing=dp(6), padding=[dp(60), 0, 0, 0])
+        layout.add_widget(self.suggestion_bar)
+
         # 类别选择
         category_layout = BoxLayout(size_hint_y=None, height=dp(40))
         category_layout.add_widget(Label(
@@ -548,8 +556,7 @@ class AddItemScreen(Screen):
 
     def _show_date_picker(self, date_type: str):
         """显示日期选择器"""
-        from datetime import date
-        today = date.today()
+        today = app_clock.today()
         self.date_picker = MDModalDatePicker(
             year=today.year,
             month=today.month,
@@ -568,8 +575,6 @@ class AddItemScreen(Screen):
 
     def _on_date_ok(self, picker_instance, *args, date_type: str | None = None):
         """MDModalDatePicker 确认按钮回调，兼容不同参数签名"""
-        from datetime import date as _date
-
         # KivyMD 可能会把选中的日期作为 args[0] 传入
         selected = None
         if args:
@@ -582,7 +587,7 @@ class AddItemScreen(Screen):
                     selected = getattr(picker_instance, attr)
                     break
         if selected is None:
-            selected = _date.today()
+            selected = app_clock.today()
 
         if date_type:
             self._on_date_selected(selected, date_type)
@@ -608,10 +613,78 @@ class AddItemScreen(Screen):
             if hasattr(self, 'purchase_date_label'):
                 self.purchase_date_label.text = date_str
             self.form_data['purchase_date'] = selected_date
+            # 购买日期变化后重新推算建议的过期日期
+            self._defaults_trigger()
         else:  # expiry
             if hasattr(self, 'expiry_date_label'):
                 self.expiry_date_label.text = date_str
             self.form_data['expiry_date'] = selected_date
+            self._auto_defaults['expiry_date'] = None
+
+    def _on_name_text(self, instance, text):
+        """名称变化：合并连续输入后再补全候选与默认值"""
+        self._defaults_trigger()
+        if self._selecting_suggestion:
+            self._selecting_suggestion = False
+            self._show_suggestions([])
+        else:
+            self._suggest_trigger()
+
+    def _update_suggestions(self, *args):
+        """按当前输入查询补全候选（内存前缀树）"""
+        text = self.name_input.text.strip()
+        suggestions = autocomplete_index.suggest(text, limit=4) if text else []
+        # 输入已与唯一候选完全一致时不再提示
+        if len(suggestions) == 1 and suggestions[0]['name'] == text:
+            suggestions = []
+        self._show_suggestions(suggestions)
+
+    def _show_suggestions(self, suggestions):
+        """显示补全候选按钮"""
+        self.suggestion_bar.clear_widgets()
+        for suggestion in suggestions:
+            btn = Button(
+                text=suggestion['name'],
+                size_hint_x=None,
+                width=dp(72),
+                background_normal='',
+                background_color=(0.9, 0.94, 0.98, 1),
+                color=(0.2, 0.4, 0.6, 1),
+                shorten=True,
+            )
+            if CHINESE_FONT:
+                btn.font_name = CHINESE_FONT
+            btn.bind(on_release=lambda _btn, name=suggestion['name']: self._select_suggestion(name))
+            self.suggestion_bar.add_widget(btn)
+
+    def _select_suggestion(self, name: str):
+        """选择补全候选"""
+        if self.name_input.text == name:
+            self._show_suggestions([])
+        else:
+            self._selecting_suggestion = True
+            self.name_input.text = name
+        self.name_input.focus = True
+
+    def _apply_wiki_defaults(self, *args):
+        """按名称匹配 Wiki，自动填写默认单位与建议过期日期"""
+        defaults = wiki_defaults.resolve_defaults(self.name_input.text, self.form_data['purchase_date'])
+
+        # 单位为空或仍是上次自动填写的值时才更新
+        if self.unit_input.text in ('', self._auto_defaults['unit']):
+            self.unit_input.text = defaults['unit'] or ''
+            self._auto_defaults['unit'] = defaults['unit'] or ''
+
+        # 过期日期未选择或仍是上次自动填写的值时才更新
+        current_expiry = self.form_data['expiry_date']
+        if current_expiry is None or current_expiry == self._auto_defaults['expiry_date']:
+            expiry_date = defaults['expiry_date']
+            self.form_data['expiry_date'] = expiry_date
+            self._auto_defaults['expiry_date'] = expiry_date
+            if hasattr(self, 'expiry_date_label'):
+                self.expiry_date_label.text = (
+                    f"{expiry_date.strftime('%Y-%m-%d')}（建议）" if expiry_date else "点击选择日期"
+                )
 
     def _change_quantity(self, delta: int):
         """改变数量"""
@@ -862,6 +935,7 @@ class AddItemScreen(Screen):
             self.expiry_date_label.text = "点击选择日期"
 
         # 重置表单数据
+        self._auto_defaults = {'unit': None, 'expiry_date': None}
         self.form_data = {
             'name': '',
             'category': "食品",
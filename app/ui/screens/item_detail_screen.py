@@ -30,10 +30,11 @@ from datetime import date, datetime
 import os
 
 from app.services.item_service import item_service
+from app.services.write_queue import write_queue
 from app.services.wiki_service import wiki_service
 from app.models.item import ItemStatus
 from app.utils.logger import setup_logger
-from app.utils.font_helper import apply_font_to_widget, CHINESE_FONT_NAME as CHINESE_FONT
+from app.utils.font_helper import CHINESE_FONT_NAME as CHINESE_FONT
 
 logger = setup_logger(__name__)
 
@@ -386,12 +387,14 @@ class ItemDetailScreen(Screen):
 
     def _create_ai_card(self) -> MDCard:
         """创建AI预测卡片"""
+        # KivyMD 的波纹效果在创建时按当前尺寸分配 FBO，零高度会初始化失败：先按展开高度创建再收起
         card = MDCard(
             size_hint_y=None,
-            height=dp(0),
+            height=dp(80),
             padding=dp(16),
             radius=[dp(8), dp(8), dp(8), dp(8)]
         )
+        card.height = dp(0)
 
         self.ai_layout = BoxLayout(orientation='vertical')
         ai_title_label = Label(
@@ -421,12 +424,14 @@ class ItemDetailScreen(Screen):
 
     def _create_source_card(self) -> MDCard:
         """创建来源信息卡片"""
+        # KivyMD 的波纹效果在创建时按当前尺寸分配 FBO，零高度会初始化失败：先按展开高度创建再收起
         card = MDCard(
             size_hint_y=None,
-            height=dp(0),
+            height=dp(80),
             padding=dp(16),
             radius=[dp(8), dp(8), dp(8), dp(8)]
         )
+        card.height = dp(0)
 
         self.source_layout = BoxLayout(orientation='vertical')
         source_title_label = Label(
@@ -907,24 +912,30 @@ class ItemDetailScreen(Screen):
             self.delete_dialog.dismiss()
 
     def _change_quantity(self, delta: int):
-        """改变数量"""
-        try:
-            if item_service.update_item_quantity(self.item_id, delta):
-                # 重新加载物品数据
-                self._load_item(self.item_id)
-        except Exception as e:
-            logger.error(f"更新物品数量失败: {str(e)}")
+        """改变数量：立即更新显示，由后台队列合并连续点击后写入数据库"""
+        if not self.item_id or self.item_quantity + delta < 0:
+            return
+        self.item_quantity += delta
+        self.quantity_label.text = str(self.item_quantity)
+        write_queue.change_quantity(self.item_id, delta, callback=self._on_write_done)
 
     def _toggle_reminder(self, instance):
         """切换提醒开关"""
-        try:
-            if self.current_item:
-                new_value = not self.current_item.is_reminder_enabled
-                if item_service.update_item(self.item_id, is_reminder_enabled=new_value):
-                    # 重新加载物品数据
-                    self._load_item(self.item_id)
-        except Exception as e:
-            logger.error(f"切换提醒开关失败: {str(e)}")
+        if self.current_item:
+            new_value = not self.current_item.is_reminder_enabled
+            self.current_item.is_reminder_enabled = new_value
+            write_queue.update_fields(self.item_id, callback=self._on_write_done, is_reminder_enabled=new_value)
+
+    def _on_write_done(self, item_id, ok, error):
+        """后台写入完成（在写入线程中回调）"""
+        if not ok:
+            logger.error(f"更新物品失败: {item_id} ({error})")
+        Clock.schedule_once(lambda dt: self._reload_after_write(item_id))
+
+    def _reload_after_write(self, item_id):
+        # 仍有未写入的修改时保留当前显示，避免数量回跳；失败时恢复为数据库中的值
+        if item_id == self.item_id and not write_queue.has_pending(item_id):
+            self._load_item(item_id)
 
     def on_enter(self):
         """进入屏幕时调用"""
@@ -932,14 +943,6 @@ class ItemDetailScreen(Screen):
         app = MDApp.get_running_app()
         if hasattr(app, 'current_item_id'):
             self.item_id = app.current_item_id
-        # 每次进入详情页后，为整个详情页重新应用中文字体，避免从其他页面返回后字体被还原
-        try:
-            import app.main as main_module
-            chinese_font = getattr(main_module, "CHINESE_FONT_NAME", None)
-        except Exception:
-            chinese_font = None
-        if chinese_font:
-            apply_font_to_widget(self, chinese_font)
 
     def on_leave(self):
         """离开屏幕时调用"""
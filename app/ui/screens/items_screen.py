@@ -20,7 +20,7 @@ from app.services.wiki_service import wiki_service
 from app.models.item import ItemStatus
 from app.models.item_wiki import ItemWikiCategory
 from app.utils.logger import setup_logger
-from app.utils.font_helper import apply_font_to_widget, CHINESE_FONT_NAME as CHINESE_FONT
+from app.utils.font_helper import CHINESE_FONT_NAME as CHINESE_FONT
 from app.ui.theme.design_tokens import COLOR_PALETTE, DESIGN_TOKENS
 
 logger = setup_logger(__name__)
@@ -979,13 +979,6 @@ class ItemsScreen(Screen):
     def on_enter(self):
         self._load_categories()
         self._load_wiki_items()
-        try:
-            import app.main as main_module
-            font = getattr(main_module, "CHINESE_FONT_NAME", None)
-        except Exception:
-            font = None
-        if font:
-            apply_font_to_widget(self, font)
 
     def refresh_data(self):
         self._load_categories()
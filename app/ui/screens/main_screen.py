@@ -30,9 +30,12 @@ from datetime import date, timedelta
 import os
 
 from app.services.item_service import item_service, statistics_service
+from app.services.write_queue import write_queue
 from app.models.item import ItemStatus
+from app.ui.item_display import category_name, days_text, headline_text, status_text
+from app.utils.clock import app_clock
 from app.utils.logger import setup_logger
-from app.utils.font_helper import apply_font_to_widget, CHINESE_FONT_NAME as CHINESE_FONT
+from app.utils.font_helper import CHINESE_FONT_NAME as CHINESE_FONT
 from app.ui.theme.design_tokens import COLOR_PALETTE, DESIGN_TOKENS
 
 logger = setup_logger(__name__)
@@ -297,7 +300,7 @@ class StatCard(BoxLayout):
             color=self._stat_color,
             font_size=dp(28),
             bold=True,
-            font_name=None if not CHINESE_FONT else CHINESE_FONT,
+            font_name=CHINESE_FONT or "Roboto",
         )
         self.value_label.bind(size=lambda inst, val: setattr(inst, "text_size", (val[0], val[1])))
 
@@ -313,7 +316,7 @@ class StatCard(BoxLayout):
             valign="top",
             color=COLORS['text_hint'],
             font_size=dp(11),
-            font_name=None if not CHINESE_FONT else CHINESE_FONT,
+            font_name=CHINESE_FONT or "Roboto",
         )
         title_label.bind(size=lambda inst, val: setattr(inst, "text_size", (val[0], val[1])))
 
@@ -432,16 +435,10 @@ class ItemListItem(BoxLayout):
         super().__init__(**kwargs)
         self.item_id = item_data.id
         self.item_name = item_data.name
-        self.category = item_data.wiki.category.name if item_data.wiki and item_data.wiki.category else "其他"
+        self.category = category_name(item_data)
         self.expiry_date = item_data.expiry_date.strftime('%Y-%m-%d') if item_data.expiry_date else '无'
         
-        if item_data.expiry_date:
-            from datetime import date
-            today = date.today()
-            delta = item_data.expiry_date - today
-            self.days_until_expiry = delta.days
-        else:
-            self.days_until_expiry = 0
+        self.days_until_expiry = app_clock.days_until(item_data.expiry_date) or 0
         
         self.quantity = item_data.quantity
         self.status = item_data.status.value
@@ -449,6 +446,7 @@ class ItemListItem(BoxLayout):
         
         self.is_hovering = False
         self.is_pressed = False
+        self.is_selected = False
         self.checkbox_widget = None
         self.item_name_label = None
         self.strikethrough_line = None
@@ -468,9 +466,6 @@ class ItemListItem(BoxLayout):
         
         if self.is_consumed:
             self._show_consumed_state()
-        
-        if CHINESE_FONT:
-            apply_font_to_widget(self, CHINESE_FONT)
     
     def _setup_ui(self):
         self._add_icon()
@@ -525,12 +520,8 @@ class ItemListItem(BoxLayout):
         )
         text_box.bind(minimum_height=lambda inst, val: setattr(inst, "height", val))
         
-        headline_text = f"{self.item_name}"
-        if self.quantity > 1:
-            headline_text += f" ×{self.quantity}"
-        
         self.item_name_label = Label(
-            text=headline_text,
+            text=headline_text(self.item_name, self.quantity),
             size_hint_y=None,
             height=dp(28),
             halign="left",
@@ -538,7 +529,7 @@ class ItemListItem(BoxLayout):
             color=COLORS['text_primary'],
             font_size=dp(18),
             bold=True,
-            font_name=None if not CHINESE_FONT else CHINESE_FONT,
+            font_name=CHINESE_FONT or "Roboto",
         )
         self.item_name_label.bind(size=lambda inst, val: setattr(inst, "text_size", (val[0], None)))
         text_box.add_widget(self.item_name_label)
@@ -546,9 +537,7 @@ class ItemListItem(BoxLayout):
         category_text = self.category
         
         status_color = self._get_status_color()
-        status_text = self._get_status_text()
-        
-        supporting_text = f"{category_text}  ·  {status_text}"
+        supporting_text = f"{category_text}  ·  {self._get_status_text()}"
         supporting_label = Label(
             text=supporting_text,
             size_hint_y=None,
@@ -565,8 +554,7 @@ class ItemListItem(BoxLayout):
         text_box.add_widget(supporting_label)
         
         if self.expiry_date != "无":
-            days_text = self._get_days_text()
-            tertiary_text = f"{self.expiry_date}  ·  {days_text}"
+            tertiary_text = f"{self.expiry_date}  ·  {self._get_days_text()}"
             tertiary_color = self._get_days_color()
             
             tertiary_label = Label(
@@ -620,22 +608,10 @@ class ItemListItem(BoxLayout):
             return COLORS['text_secondary']
     
     def _get_status_text(self):
-        if self.expiry_date == "无":
-            return "无过期"
-        elif self.days_until_expiry < 0:
-            return "已过期"
-        elif self.days_until_expiry <= 3:
-            return "即将过期"
-        else:
-            return "正常"
+        return status_text(None if self.expiry_date == "无" else self.days_until_expiry)
     
     def _get_days_text(self):
-        if self.days_until_expiry < 0:
-            return f"过期{-self.days_until_expiry}天"
-        elif self.days_until_expiry == 0:
-            return "今天过期"
-        else:
-            return f"剩余{self.days_until_expiry}天"
+        return days_text(self.days_until_expiry)
     
     def _get_days_color(self):
         if self.days_until_expiry < 0:
@@ -653,7 +629,14 @@ class ItemListItem(BoxLayout):
             RoundedRectangle(pos=self.pos, size=self.size, radius=[dp(16)])
         self.bind(pos=self._update_rect, size=self._update_rect)
     
+    def set_selected(self, selected):
+        """多选模式下切换选中高亮"""
+        self.is_selected = selected
+        self._update_rect()
+    
     def _get_bg_color(self):
+        if self.is_selected:
+            return COLORS['primary_container']
         if self.is_consumed:
             return COLORS['surface_variant']
         elif self.expiry_date == "无":
@@ -738,14 +721,19 @@ class ItemListItem(BoxLayout):
                 self._restore_item()
     
     def _mark_as_consumed(self):
-        item_service.mark_as_consumed(self.item_id)
+        # 先更新显示，由后台队列写入；快速反复勾选会在写入前相互抵消
         self._show_consumed_state()
-        self.dispatch('on_status_changed')
+        write_queue.consume(self.item_id, callback=self._on_write_done)
     
     def _restore_item(self):
-        item_service.restore_item(self.item_id)
         self._hide_consumed_state()
-        self.dispatch('on_status_changed')
+        write_queue.restore(self.item_id, callback=self._on_write_done)
+    
+    def _on_write_done(self, item_id, ok, error):
+        # 回调在写入线程中执行，切回主线程后刷新列表（失败时列表恢复为数据库中的状态）
+        if not ok:
+            logger.error(f"更新物品状态失败: {item_id} ({error})")
+        Clock.schedule_once(lambda dt: self.dispatch('on_status_changed'))
     
     def _show_consumed_state(self):
         self.canvas.before.clear()
@@ -785,6 +773,8 @@ class MainScreen(Screen):
         super().__init__(**kwargs)
         self.size_hint = (1, 1)  # 确保 Screen 填满父容器
         self.name = 'main'
+        self.selection_mode = False
+        self.selected_ids = set()
         self._build_ui()
         self._load_items()
         self._create_category_menu()
@@ -968,8 +958,6 @@ class MainScreen(Screen):
         close_btn.bind(pos=update_close_btn_bg, size=update_close_btn_bg)
         close_btn.bind(on_release=lambda x: self.category_menu.dismiss())
 
-        if CHINESE_FONT:
-            apply_font_to_widget(close_btn, CHINESE_FONT)
         content_box.add_widget(close_btn)
 
         main_box.add_widget(content_box)
@@ -1329,6 +1317,20 @@ class MainScreen(Screen):
         separator_right.bind(pos=update_sep_right_pos, size=update_sep_right_pos)
         list_header.add_widget(separator_right)
         
+        self.select_button = Button(
+            text="多选",
+            font_size=dp(13),
+            color=COLORS['primary'],
+            background_normal='',
+            background_color=(0, 0, 0, 0),
+            size_hint_x=None,
+            width=dp(56),
+        )
+        if CHINESE_FONT:
+            self.select_button.font_name = CHINESE_FONT
+        self.select_button.bind(on_release=lambda *_: self._set_selection_mode(not self.selection_mode))
+        list_header.add_widget(self.select_button)
+        
         self.item_count_label = Label(
             text="0 项",
             font_size=dp(13),
@@ -1370,6 +1372,156 @@ class MainScreen(Screen):
         
         scroll_view.add_widget(self.item_list_layout)
         parent.add_widget(scroll_view)
+        
+        self._create_batch_bar(parent)
+    
+    def _create_batch_bar(self, parent):
+        """多选模式下的批量操作栏（默认隐藏）"""
+        self.batch_bar = BoxLayout(
+            size_hint_y=None,
+            height=0,
+            opacity=0,
+            disabled=True,
+            padding=(dp(12), dp(6)),
+            spacing=dp(8),
+        )
+        with self.batch_bar.canvas.before:
+            Color(*COLORS['surface'])
+            batch_bg = Rectangle(pos=self.batch_bar.pos, size=self.batch_bar.size)
+        self.batch_bar.bind(
+            pos=lambda inst, val: setattr(batch_bg, 'pos', val),
+            size=lambda inst, val: setattr(batch_bg, 'size', val),
+        )
+        
+        self.selected_count_label = Label(
+            text="已选 0 项",
+            font_size=dp(13),
+            color=COLORS['text_secondary'],
+        )
+        if CHINESE_FONT:
+            self.selected_count_label.font_name = CHINESE_FONT
+        self.batch_bar.add_widget(self.selected_count_label)
+        
+        for text, action, color in (
+            ("已消耗", 'consume', COLORS['primary']),
+            ("恢复", 'restore', COLORS['primary']),
+            ("删除", 'delete', COLORS['error']),
+        ):
+            btn = Button(
+                text=text,
+                font_size=dp(13),
+                color=color,
+                background_normal='',
+                background_color=(0, 0, 0, 0),
+                size_hint_x=None,
+                width=dp(64),
+            )
+            if CHINESE_FONT:
+                btn.font_name = CHINESE_FONT
+            btn.bind(on_release=lambda inst, a=action: self._run_batch_action(a))
+            self.batch_bar.add_widget(btn)
+        
+        parent.add_widget(self.batch_bar)
+    
+    def _set_selection_mode(self, enabled):
+        """进入/退出多选模式"""
+        self.selection_mode = enabled
+        self.selected_ids.clear()
+        self.select_button.text = "取消" if enabled else "多选"
+        self.batch_bar.height = dp(52) if enabled else 0
+        self.batch_bar.opacity = 1 if enabled else 0
+        self.batch_bar.disabled = not enabled
+        self._update_selected_count()
+        for widget in self.item_list_layout.children:
+            if isinstance(widget, ItemListItem):
+                widget.set_selected(False)
+    
+    def _toggle_item_selection(self, widget):
+        if widget.item_id in self.selected_ids:
+            self.selected_ids.discard(widget.item_id)
+            widget.set_selected(False)
+        else:
+            self.selected_ids.add(widget.item_id)
+            widget.set_selected(True)
+        self._update_selected_count()
+    
+    def _update_selected_count(self):
+        self.selected_count_label.text = f"已选 {len(self.selected_ids)} 项"
+    
+    def _run_batch_action(self, action):
+        """对选中的物品执行批量操作（单条 UPDATE/DELETE）；删除前先确认"""
+        if not self.selected_ids:
+            return
+        if action == 'delete':
+            self._show_batch_delete_dialog()
+            return
+        self._apply_batch_action(action)
+
+    def _show_batch_delete_dialog(self):
+        """批量删除确认对话框（与物品详情页的删除确认一致）"""
+        dialog = ModalView(size_hint=(0.8, None), height=dp(180), auto_dismiss=False)
+        root = BoxLayout(orientation="vertical", padding=dp(20), spacing=dp(16))
+
+        title_label = Label(
+            text="确认删除",
+            size_hint_y=None,
+            height=dp(32),
+            bold=True,
+            color=(0.2, 0.2, 0.2, 1),
+            font_name=CHINESE_FONT or "Roboto",
+        )
+        root.add_widget(title_label)
+
+        content_label = Label(
+            text=f"确定要删除选中的 {len(self.selected_ids)} 项物品吗？",
+            size_hint_y=None,
+            height=dp(60),
+            color=(0.3, 0.3, 0.3, 1),
+            font_name=CHINESE_FONT or "Roboto",
+        )
+        root.add_widget(content_label)
+
+        btn_bar = BoxLayout(orientation="horizontal", size_hint_y=None, height=dp(44), spacing=dp(16))
+
+        cancel_btn = MDButton(on_release=lambda x: dialog.dismiss())
+        cancel_text = MDButtonText(text="取消")
+        if CHINESE_FONT:
+            cancel_text.font_name = CHINESE_FONT
+        cancel_btn.add_widget(cancel_text)
+        btn_bar.add_widget(cancel_btn)
+
+        def _on_confirm(instance):
+            dialog.dismiss()
+            self._apply_batch_action('delete')
+
+        confirm_btn = MDButton(on_release=_on_confirm)
+        confirm_text = MDButtonText(text="确定")
+        if CHINESE_FONT:
+            confirm_text.font_name = CHINESE_FONT
+        confirm_btn.add_widget(confirm_text)
+        btn_bar.add_widget(confirm_btn)
+
+        root.add_widget(btn_bar)
+        dialog.add_widget(root)
+        dialog.open()
+
+    def _apply_batch_action(self, action):
+        """执行批量操作并退出多选模式"""
+        if not self.selected_ids:
+            return
+        ids = list(self.selected_ids)
+        handlers = {
+            'consume': item_service.consume_items,
+            'restore': item_service.restore_items,
+            'delete': item_service.delete_items,
+        }
+        try:
+            affected = handlers[action](ids)
+            logger.info(f"批量操作 {action}: {len(affected)}/{len(ids)} 项")
+        except Exception as e:
+            logger.error(f"批量操作失败: {e}")
+        self._set_selection_mode(False)
+        self._load_items()
     
     def _update_scroll_bg(self, instance, value):
         pass
@@ -1393,14 +1545,15 @@ class MainScreen(Screen):
                 self._show_empty_state()
                 return
             
-            from datetime import date
-            
+            # 整次刷新使用同一个日期，跨越午夜时筛选与排序结果保持一致
+            today = app_clock.today()
+
             if self.selected_filter == 'expiring':
                 items = [item for item in items if item.expiry_date and 
-                         0 <= (item.expiry_date - date.today()).days <= 3]
+                         0 <= (item.expiry_date - today).days <= 3]
             elif self.selected_filter == 'expired':
-                items = [item for item in items if item.expiry_date and 
-                         (item.expiry_date - date.today()).days < 0]
+                # 过期状态由每日扫描维护（get_items 读取前已检查）
+                items = [item for item in items if item.status == ItemStatus.EXPIRED]
             
             if not items:
                 self._show_empty_state()
@@ -1408,7 +1561,7 @@ class MainScreen(Screen):
             
             def sort_key(item):
                 if item.expiry_date:
-                    days_until = (item.expiry_date - date.today()).days
+                    days_until = (item.expiry_date - today).days
                     if days_until < 0:
                         return (0, days_until)
                     elif days_until <= 3:
@@ -1422,8 +1575,10 @@ class MainScreen(Screen):
             
             for i, item in enumerate(items):
                 item_widget = ItemListItem(item)
+                if item.id in self.selected_ids:
+                    item_widget.set_selected(True)
                 item_widget.bind(
-                    on_release=lambda inst, item_id=item.id: self._on_item_click(item_id),
+                    on_release=lambda inst, item_id=item.id: self._on_item_click(item_id, inst),
                     on_status_changed=lambda inst: self._load_items()
                 )
                 item_widget.opacity = 0
@@ -1491,10 +1646,15 @@ class MainScreen(Screen):
         self.item_list_layout.add_widget(empty_container)
         self.item_count_label.text = "0 项"
     
-    def _on_item_click(self, item_id):
+    def _on_item_click(self, item_id, widget=None):
+        if self.selection_mode and widget is not None:
+            self._toggle_item_selection(widget)
+            return
         self.show_item_detail(item_id)
     
     def _refresh_items(self, dt):
+        # 午夜定时器在系统休眠后可能延迟触发，每分钟的刷新同时检查跨天
+        app_clock.check_rollover()
         self._load_items()
     
     def _cleanup_consumed_items(self, dt):
@@ -13,7 +13,8 @@ from kivy.animation import Animation
 from kivy.properties import ColorProperty
 from kivy.clock import Clock
 
-from app.utils.font_helper import apply_font_to_widget, CHINESE_FONT_NAME as CHINESE_FONT
+from app.services.recipe_service import recipe_matcher
+from app.utils.font_helper import CHINESE_FONT_NAME as CHINESE_FONT
 
 
 COLORS = {
@@ -134,9 +135,15 @@ class RecipesScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = "recipes"
+        self._stat_labels = {}
+        self.recipes_layout = None
         self._build_ui()
         Clock.schedule_once(lambda *_: self._animate_entrance(), 0.1)
 
+    def on_enter(self, *args):
+        """进入页面时按当前库存刷新推荐（索引随库存变化增量更新，这里只取前 N 个）"""
+        self.refresh_recipes()
+
     def _build_ui(self):
         from kivymd.uix.label import MDIcon
         from kivy.uix.scrollview import ScrollView
@@ -188,11 +195,11 @@ class RecipesScreen(Screen):
             spacing=dp(12),
         )
         stat_cards = [
-            ("🥬", "可用食材", "8种"),
-            ("🍳", "可做菜谱", "12道"),
-            ("⏰", "即将过期", "2种"),
+            ("🥬", "可用食材", "available_ingredients"),
+            ("🍳", "可做菜谱", "makeable_recipes"),
+            ("⏰", "即将过期", "expiring_ingredients"),
         ]
-        for icon, label, value in stat_cards:
+        for icon, label, stat_key in stat_cards:
             card = BoxLayout(
                 orientation="vertical",
                 size_hint_x=1,
@@ -212,7 +219,7 @@ class RecipesScreen(Screen):
                 icon_color=COLORS["primary"],
             ))
             lbl = Label(
-                text=f"{value}",
+                text="-",
                 font_size=dp(16),
                 bold=True,
                 color=COLORS["text_primary"],
@@ -226,6 +233,7 @@ class RecipesScreen(Screen):
                 size_hint_y=None,
                 height=dp(16),
             )
+            self._stat_labels[stat_key] = lbl
             card.add_widget(lbl)
             card.add_widget(sub_lbl)
             stats_row.add_widget(card)
@@ -246,26 +254,11 @@ class RecipesScreen(Screen):
         recipes_layout = GridLayout(
             cols=1,
             size_hint_y=None,
-            height=dp(500),
             padding=(dp(16), dp(0), dp(16), dp(16)),
             spacing=dp(12),
         )
-
-        sample_recipes = [
-            ("番茄炒蛋", "经典家常菜，5分钟搞定", "15分钟", "简单", "番茄+鸡蛋+葱"),
-            ("蒜蓉西兰花", "清爽健康，低脂美味", "10分钟", "简单", "西兰花+蒜+盐"),
-            ("蛋花汤", "暖胃养身，营养丰富", "12分钟", "中等", "鸡蛋+紫菜+葱"),
-            ("凉拌黄瓜", "夏日开胃小菜", "5分钟", "简单", "黄瓜+蒜+醋"),
-        ]
-        for title, desc, time, diff, ings in sample_recipes:
-            recipe_card = RecipeCard(
-                title=title,
-                description=desc,
-                time=time,
-                difficulty=diff,
-                ingredients=ings,
-            )
-            recipes_layout.add_widget(recipe_card)
+        recipes_layout.bind(minimum_height=recipes_layout.setter('height'))
+        self.recipes_layout = recipes_layout
 
         scroll = ScrollView(
             size_hint=(1, 0.58),
@@ -278,6 +271,39 @@ class RecipesScreen(Screen):
 
         self.add_widget(root)
 
+    def refresh_recipes(self, limit=20):
+        """刷新统计卡片与推荐菜谱列表"""
+        stats = recipe_matcher.get_stats()
+        units = {"available_ingredients": "种", "makeable_recipes": "道", "expiring_ingredients": "种"}
+        for key, lbl in self._stat_labels.items():
+            lbl.text = f"{stats.get(key, 0)}{units[key]}"
+
+        self.recipes_layout.clear_widgets()
+        recipes = recipe_matcher.recommend(limit=limit)
+        if not recipes:
+            self.recipes_layout.add_widget(Label(
+                text="冰箱里还没有可以匹配菜谱的食材",
+                font_size=dp(14),
+                color=COLORS["text_hint"],
+                size_hint_y=None,
+                height=dp(60),
+            ))
+            return
+        for recipe in recipes:
+            ingredients = "+".join(recipe["matched"] + recipe["missing"])
+            if recipe["missing"]:
+                ingredients += f"（缺{'、'.join(recipe['missing'])}）"
+            description = recipe.get("description") or ""
+            if recipe["expiring"]:
+                description = f"用掉临期的{'、'.join(recipe['expiring'])}  {description}".strip()
+            self.recipes_layout.add_widget(RecipeCard(
+                title=recipe["title"],
+                description=description,
+                time=f"{recipe['cook_minutes']}分钟" if recipe.get("cook_minutes") else "-",
+                difficulty=recipe.get("difficulty") or "-",
+                ingredients=ingredients,
+            ))
+
     def _animate_entrance(self):
         for i, child in enumerate(self.children):
             if isinstance(child, FloatLayout):
@@ -290,10 +316,6 @@ class RecipesScreen(Screen):
                     )
                     anim.start(subchild)
 
-    def on_enter(self):
-        if CHINESE_FONT:
-            apply_font_to_widget(self, CHINESE_FONT)
-
 
 from kivy.core.window import Window
 
@@ -16,11 +16,20 @@ from kivy.properties import ColorProperty, BooleanProperty, StringProperty
 from kivy.clock import Clock
 from kivy.graphics import Color, Rectangle, RoundedRectangle
 
-from app.utils.font_helper import apply_font_to_widget, CHINESE_FONT_NAME as CHINESE_FONT
+from app.services.settings_service import (
+    EXPIRY_REMINDER_ENABLED, FONT_SIZE, REMINDER_DAYS_BEFORE, SHOPPING_REMINDER_ENABLED,
+    SYNC_ENABLED, THEME_COLOR, settings_service,
+)
+from app.utils.font_helper import CHINESE_FONT_NAME as CHINESE_FONT
 from app.ui.theme.design_tokens import COLOR_PALETTE, DESIGN_TOKENS
 
 COLORS = COLOR_PALETTE
 
+# 可选值设置：点击后依次切换
+THEME_CHOICES = [('default', '默认绿'), ('blue', '海洋蓝'), ('orange', '暖橙'), ('dark', '深色')]
+FONT_SIZE_CHOICES = [('small', '小'), ('medium', '标准'), ('large', '大')]
+REMINDER_DAYS_CHOICES = [(days, f'过期前 {days} 天提醒') for days in (1, 2, 3, 5, 7)]
+
 
 class AnimatedCard(BoxLayout):
     bg_color = ColorProperty((1, 1, 1, 1))
@@ -75,8 +84,19 @@ class SettingsSection(BoxLayout):
 
 
 class SettingsItem(BoxLayout):
-    def __init__(self, icon="", title="", subtitle="", show_switch=False, **kwargs):
+    """
+    设置项
+
+    指定 setting_key 时与设置服务绑定：开关项读取并保存布尔值；
+    带 choices 的设置项点击后切换到下一个可选值，副标题显示当前值。
+    """
+
+    def __init__(self, icon="", title="", subtitle="", show_switch=False,
+                 setting_key=None, choices=None, **kwargs):
         super().__init__(**kwargs)
+        self.setting_key = setting_key
+        self.choices = choices or []
+        self.subtitle_lbl = None
         self.orientation = "horizontal"
         self.size_hint_y = None
         self.height = dp(56)
@@ -113,6 +133,9 @@ class SettingsItem(BoxLayout):
         )
         title_lbl.bind(size=lambda ins, val: setattr(ins, 'text_size', val))
 
+        if self.choices:
+            subtitle = self._choice_label(settings_service.get(setting_key))
+
         if subtitle:
             subtitle_lbl = Label(
                 text=subtitle,
@@ -124,6 +147,7 @@ class SettingsItem(BoxLayout):
                 valign="top",
             )
             subtitle_lbl.bind(size=lambda ins, val: setattr(ins, 'text_size', val))
+            self.subtitle_lbl = subtitle_lbl
             text_layout.add_widget(title_lbl)
             text_layout.add_widget(subtitle_lbl)
         else:
@@ -132,7 +156,8 @@ class SettingsItem(BoxLayout):
         self.add_widget(text_layout)
 
         if show_switch:
-            switch = Switch(active=False, size_hint_x=None, width=dp(44))
+            active = bool(settings_service.get(setting_key)) if setting_key else False
+            switch = Switch(active=active, size_hint_x=None, width=dp(44))
             switch.bind(active=self._on_switch)
             self.add_widget(switch)
 
@@ -143,6 +168,25 @@ class SettingsItem(BoxLayout):
             duration=0.1,
         )
         anim.start(instance)
+        if self.setting_key:
+            settings_service.set(self.setting_key, value)
+
+    def _choice_label(self, value):
+        for choice, label in self.choices:
+            if choice == value:
+                return label
+        return str(value)
+
+    def on_touch_up(self, touch):
+        if self.choices and self.collide_point(*touch.pos):
+            values = [choice for choice, _ in self.choices]
+            current = settings_service.get(self.setting_key)
+            index = values.index(current) + 1 if current in values else 0
+            value = values[index % len(values)]
+            if settings_service.set(self.setting_key, value) and self.subtitle_lbl is not None:
+                self.subtitle_lbl.text = self._choice_label(value)
+            return True
+        return super().on_touch_up(touch)
 
 
 class SettingsActionButton(BoxLayout):
@@ -246,7 +290,7 @@ class SettingsScreen(Screen):
         content = GridLayout(
             cols=1,
             size_hint_y=None,
-            height=dp(800),
+            height=dp(860),
             spacing=dp(4),
         )
 
@@ -261,6 +305,7 @@ class SettingsScreen(Screen):
             title="数据同步",
             subtitle="跨设备同步冰箱数据",
             show_switch=True,
+            setting_key=SYNC_ENABLED,
         ))
 
         content.add_widget(SettingsSection(title="通知"))
@@ -269,24 +314,34 @@ class SettingsScreen(Screen):
             title="过期提醒",
             subtitle="物品即将过期时通知我",
             show_switch=True,
+            setting_key=EXPIRY_REMINDER_ENABLED,
+        ))
+        content.add_widget(SettingsItem(
+            icon="calendar-clock",
+            title="提醒时间",
+            setting_key=REMINDER_DAYS_BEFORE,
+            choices=REMINDER_DAYS_CHOICES,
         ))
         content.add_widget(SettingsItem(
             icon="cart",
             title="购物提醒",
             subtitle="库存不足时提醒购买",
             show_switch=True,
+            setting_key=SHOPPING_REMINDER_ENABLED,
         ))
 
         content.add_widget(SettingsSection(title="外观"))
         content.add_widget(SettingsItem(
             icon="palette",
             title="主题颜色",
-            subtitle="选择应用主题色",
+            setting_key=THEME_COLOR,
+            choices=THEME_CHOICES,
         ))
         content.add_widget(SettingsItem(
             icon="format-size",
             title="字体大小",
-            subtitle="调整界面文字大小",
+            setting_key=FONT_SIZE,
+            choices=FONT_SIZE_CHOICES,
         ))
 
         content.add_widget(SettingsSection(title="数据"))
@@ -338,8 +393,4 @@ class SettingsScreen(Screen):
                     )
                     anim.start(subchild)
 
-    def on_enter(self):
-        if CHINESE_FONT:
-            apply_font_to_widget(self, CHINESE_FONT)
-
 
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+应用时钟：缓存“今天”并在跨天时发布 DAY_CHANGED 事件
+
+过期判断、提醒、统计与界面排序都通过 app_clock.today() 获取当前日期，
+而不是各自调用 date.today()：
+
+- 当天内只比较一次墙上时钟（time.time），刷新列表时成千上万次调用几乎没有开销；
+  系统休眠时单调时钟不前进，缓存必须以墙上时钟判断是否已过午夜；
+- 同一次刷新使用同一个日期，跨越午夜时结果不会前后不一致；
+- 时区由 APP_TIMEZONE 环境变量指定（如 Asia/Shanghai），默认使用系统时区；
+- 测试可以用 travel_to() 固定日期，验证过期相关的行为。
+
+start() 启动后台定时器，在每天午夜发布 DAY_CHANGED(today, previous)；定时器在休眠后
+可能延迟触发，界面每分钟的刷新也会调用 check_rollover()。
+订阅者在定时器线程中执行，界面回调需要通过 Clock.schedule_once 切回主线程。
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, tzinfo
+from typing import Callable, Iterator, Optional
+
+from dateutil import tz
+
+from app.utils.events import DAY_CHANGED, event_bus
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 午夜后稍等片刻再检查，避免定时器提前触发时仍停留在前一天
+ROLLOVER_GRACE_SECONDS = 1.0
+
+
+def resolve_timezone(name: str = None) -> tzinfo:
+    """
+    解析时区名称
+
+    Args:
+        name: IANA 时区名称，默认读取 APP_TIMEZONE 环境变量
+
+    Returns:
+        tzinfo: 时区，名称为空或无法识别时返回系统时区
+    """
+    name = name if name is not None else os.getenv('APP_TIMEZONE', '')
+    if name:
+        zone = tz.gettz(name)
+        if zone is not None:
+            return zone
+        logger.warning("无法识别的时区 %s，使用系统时区", name)
+    return tz.tzlocal()
+
+
+class AppClock:
+    """带日期缓存与跨天事件的应用时钟"""
+
+    def __init__(self, timezone: tzinfo = None, now_func: Callable[[tzinfo], datetime] = None):
+        """
+        Args:
+            timezone: 时区，默认由 APP_TIMEZONE 决定
+            now_func: 获取当前时间的函数 now_func(tz)，默认 datetime.now
+        """
+        self.timezone = timezone or resolve_timezone()
+        self._now_func = now_func or datetime.now
+        self._lock = threading.Lock()
+        self._today: Optional[date] = None
+        self._valid_until = 0.0
+        self._frozen: Optional[date] = None
+        self._announced: Optional[date] = None
+        self._timer: Optional[threading.Timer] = None
+
+    # ---------------- 读取 ----------------
+    def now(self) -> datetime:
+        """当前时间（带时区）"""
+        if self._frozen is not None:
+            return datetime.combine(self._frozen, datetime.now(self.timezone).timetz())
+        return self._now_func(self.timezone)
+
+    def today(self) -> date:
+        """
+        当前日期；缓存到下一个午夜为止
+
+        Returns:
+            date: 应用时区中的今天
+        """
+        if self._frozen is not None:
+            return self._frozen
+        if time.time() < self._valid_until:
+            return self._today
+        with self._lock:
+            now = self._now_func(self.timezone)
+            self._today = now.date()
+            self._valid_until = time.time() + self._seconds_until_midnight(now)
+            if self._announced is None:
+                self._announced = self._today
+            return self._today
+
+    def days_until(self, day: Optional[date]) -> Optional[int]:
+        """
+        距离某个日期的天数（负数表示已经过去）
+
+        Args:
+            day: 日期，可以为空
+
+        Returns:
+            Optional[int]: 天数，日期为空返回None
+        """
+        if day is None:
+            return None
+        return (day - self.today()).days
+
+    @staticmethod
+    def _seconds_until_midnight(now: datetime) -> float:
+        # 同一 tzinfo 的带时区时间相减不考虑夏令时切换，按时间戳计算
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=now.tzinfo)
+        return max(midnight.timestamp() - now.timestamp(), 0.0)
+
+    # ---------------- 跨天 ----------------
+    def check_rollover(self) -> bool:
+        """
+        检查日期是否变化，变化时发布 DAY_CHANGED 事件
+
+        Returns:
+            bool: 是否发生跨天
+        """
+        self._valid_until = 0.0
+        today = self.today()
+        with self._lock:
+            previous, self._announced = self._announced, today
+        if previous == today:
+            return False
+        logger.info("日期变更: %s -> %s", previous, today)
+        event_bus.emit(DAY_CHANGED, today=today, previous=previous)
+        return True
+
+    def start(self) -> None:
+        """启动午夜定时器（重复调用只保留一个定时器）"""
+        self.stop()
+        self.today()
+        delay = self._seconds_until_midnight(self.now()) + ROLLOVER_GRACE_SECONDS
+        timer = threading.Timer(delay, self._on_timer)
+        timer.name = 'day-rollover'
+        timer.daemon = True
+        self._timer = timer
+        timer.start()
+
+    def stop(self) -> None:
+        """停止午夜定时器"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _on_timer(self) -> None:
+        try:
+            self.check_rollover()
+        except Exception as e:
+            logger.error("跨天检查失败: %s", e)
+        finally:
+            if self._timer is not None:
+                self.start()
+
+    # ---------------- 测试 ----------------
+    def set_today(self, day: Optional[date]) -> None:
+        """
+        固定当前日期（None 恢复真实时间）；日期变化时发布 DAY_CHANGED
+
+        Args:
+            day: 固定的日期
+        """
+        self.today()
+        self._frozen = day
+        self.check_rollover()
+
+    @contextmanager
+    def travel_to(self, day: date) -> Iterator['AppClock']:
+        """在 with 块内把当前日期固定为 day，退出后恢复"""
+        previous = self._frozen
+        self.set_today(day)
+        try:
+            yield self
+        finally:
+            self.set_today(previous)
+
+
+# 全局应用时钟
+app_clock = AppClock()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+进程内事件总线
+
+服务层在数据提交后发布事件，内存索引、缓存与界面通过订阅事件增量更新，
+而不是轮询数据库。回调在发布事件的线程中同步执行；界面回调需要自行通过
+Clock.schedule_once 切回主线程。
+
+    event_bus.subscribe(WIKI_CHANGED, on_wiki_changed)
+    event_bus.emit(WIKI_CHANGED, action='created', wiki_ids=[...], wikis=[...])
+"""
+
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Wiki 新增/修改/删除；参数: action ('created' | 'updated' | 'deleted' | 'reload'),
+# wiki_ids（reload 时为空），可选 wikis（包含字段的 Wiki 字典列表）
+WIKI_CHANGED = 'wiki_changed'
+
+# 库存物品新增/修改/删除/消耗/过期；参数: action ('created' | 'updated' | 'deleted' | 'consumed'
+# | 'restored' | 'expired' | 'archived' | 'reload'), item_ids, names（受影响的物品名称，改名时包含新旧名称），
+# 可选 count（item_ids 为空的批量写入给出的行数）
+ITEMS_CHANGED = 'items_changed'
+
+# 菜谱新增/删除；参数: action ('created' | 'deleted'), recipe_ids, 可选 recipes（菜谱字典列表）
+RECIPES_CHANGED = 'recipes_changed'
+
+# 日期跨天（午夜定时器或测试固定日期时发布）；参数: today, previous
+DAY_CHANGED = 'day_changed'
+
+# 设置修改；参数: key, value, previous
+SETTINGS_CHANGED = 'settings_changed'
+
+
+class EventBus:
+    """简单的发布/订阅事件总线"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[Callable]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, event: str, callback: Callable[..., None]) -> None:
+        """
+        订阅事件（同一回调重复订阅只生效一次）
+
+        Args:
+            event: 事件名称
+            callback: 回调，以关键字参数接收事件数据
+        """
+        with self._lock:
+            if callback not in self._subscribers[event]:
+                self._subscribers[event].append(callback)
+
+    def unsubscribe(self, event: str, callback: Callable[..., None]) -> None:
+        """取消订阅"""
+        with self._lock:
+            if callback in self._subscribers[event]:
+                self._subscribers[event].remove(callback)
+
+    def emit(self, event: str, **payload) -> None:
+        """
+        发布事件；单个回调出错只记录日志，不影响其他订阅者与发布方
+
+        Args:
+            event: 事件名称
+            **payload: 事件数据
+        """
+        with self._lock:
+            callbacks = list(self._subscribers.get(event, ()))
+        for callback in callbacks:
+            try:
+                callback(**payload)
+            except Exception as e:
+                logger.error("事件 %s 的回调 %s 执行失败: %s", event, getattr(callback, '__qualname__', callback), e)
+
+
+# 全局事件总线
+event_bus = EventBus()
@@ -4,6 +4,7 @@
 """
 from kivy.core.text import LabelBase
 from kivy.config import Config
+import json
 import os
 import sys
 
@@ -16,103 +17,184 @@ CHINESE_FONT_NAME = None
 # 已注册的字体名称缓存
 _REGISTERED_FONT_NAME = None
 
+# 字体路径缓存文件（记录上次解析到的字体路径及其 mtime，避免每次启动都探测/调用 fc-list）
+FONT_CACHE_PATH = os.getenv('FONT_CACHE_PATH', os.path.join('data', 'font_cache.json'))
 
-def register_chinese_font():
-    """注册中文字体并返回字体名称"""
+# 各平台候选中文字体
+_PLATFORM_FONT_PATHS = {
+    'darwin': [
+        '/System/Library/Fonts/STHeiti Light.ttc',  # 黑体-简
+        '/System/Library/Fonts/Supplemental/Songti.ttc',  # 宋体
+    ],
+    'linux': [
+        '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
+        '/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc',
+        '/usr/share/fonts/truetype/arphic/uming.ttc',
+    ],
+    'win32': [
+        'C:/Windows/Fonts/msyh.ttc',
+        'C:/Windows/Fonts/simsun.ttc',
+        'C:/Windows/Fonts/simhei.ttf',
+    ],
+}
+
+# 图标控件类名（包括其子类），它们依赖自己的 icon 字体
+_ICON_CLASS_NAMES = frozenset({
+    'MDIcon',
+    'MDIconButton',
+    'MDListItemLeadingIcon',
+    'MDListItemTrailingIcon',
+    'MDListItemIcon',
+    'MDCheckbox',
+})
+
+# 控件类型分类表：type -> 'icon' | 'text' | 'other'
+_WIDGET_KIND_CACHE = {}
+
+# 需要使用中文字体的文本控件类名（子类通过 KV 规则自动继承）
+_TEXT_CLASS_NAMES = ('Label', 'TextInput', 'MDButtonText')
+
+# 生成的字体 KV 规则的文件名（用于重复加载时先卸载）
+_FONT_RULES_FILENAME = 'vibe_fridge_font_rules.kv'
+
+# 在加载字体规则前需导入的 KivyMD 模块，确保其自带 KV 规则先于字体规则加载
+_KIVYMD_STYLE_MODULES = (
+    'kivymd.uix.label',
+    'kivymd.uix.button',
+    'kivymd.uix.list',
+    'kivymd.uix.textfield',
+    'kivymd.uix.selectioncontrol',
+)
+
+
+def _platform_key():
+    """返回当前平台在候选字体表中的键"""
+    if sys.platform.startswith('linux'):
+        return 'linux'
+    return sys.platform
+
+
+def _find_fc_list_font():
+    """macOS 下通过 fc-list 查找 PingFang 字体文件"""
+    try:
+        import subprocess
+        result = subprocess.run(['fc-list', ':lang=zh'],
+                                capture_output=True, text=True, timeout=2)
+        if result.returncode == 0 and result.stdout:
+            for line in result.stdout.split('\n'):
+                if 'pingfang' in line.lower() and ':' in line:
+                    potential_path = line.split(':')[0].strip()
+                    if os.path.exists(potential_path) and potential_path.endswith(('.ttc', '.ttf')):
+                        logger.debug("通过 fc-list 找到字体路径: %s", potential_path)
+                        return potential_path
+    except Exception as e:
+        logger.debug("使用 fc-list 查找字体失败: %s", e)
+    return None
+
+
+def _candidate_font_paths():
+    """生成当前平台的候选字体路径（按优先级）"""
+    platform_key = _platform_key()
+    if platform_key == 'darwin':
+        fc_path = _find_fc_list_font()
+        if fc_path:
+            yield fc_path
+    for font_path in _PLATFORM_FONT_PATHS.get(platform_key, []):
+        yield font_path
+
+
+def _load_cached_font_path():
+    """
+    读取字体路径缓存
+
+    缓存仅在平台一致、文件仍存在且 mtime 未变化时有效。
+
+    Returns:
+        缓存的字体路径，无效时返回 None
+    """
+    try:
+        with open(FONT_CACHE_PATH, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        font_path = cache.get('font_path')
+        if cache.get('platform') != sys.platform or not font_path:
+            return None
+        if os.path.getmtime(font_path) != cache.get('mtime'):
+            return None
+        return font_path
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _save_cached_font_path(font_path):
+    """写入字体路径缓存，失败时静默忽略"""
+    try:
+        cache_dir = os.path.dirname(FONT_CACHE_PATH)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        with open(FONT_CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump({
+                'platform': sys.platform,
+                'font_path': font_path,
+                'mtime': os.path.getmtime(font_path),
+            }, f, ensure_ascii=False)
+    except OSError as e:
+        logger.debug("写入字体缓存失败: %s", e)
+
+
+def _register_font_file(font_path):
+    """注册单个字体文件，成功返回 True"""
+    try:
+        LabelBase.register(name='ChineseFont',
+                           fn_regular=font_path,
+                           fn_bold=font_path)
+        logger.debug("成功注册中文字体文件: %s", font_path)
+        return True
+    except Exception as e:
+        logger.debug("注册字体文件失败 %s: %s", font_path, e)
+        return False
+
+
+def register_chinese_font(use_cache=True):
+    """
+    注册中文字体并返回字体名称
+
+    优先使用缓存的字体路径（按 mtime 校验），缓存失效时再按平台探测。
+
+    Args:
+        use_cache: 是否读写字体路径缓存
+
+    Returns:
+        注册成功的字体名称，失败返回 None
+    """
     chinese_font_name = None
-    
+
     try:
-        # macOS 中文字体
-        if sys.platform == 'darwin':
-            font_paths = [
-                '/System/Library/Fonts/STHeiti Light.ttc',  # 黑体-简
-                '/System/Library/Fonts/Supplemental/Songti.ttc',  # 宋体
-            ]
-            
-            # 尝试通过 fc-list 查找 PingFang 字体文件
-            try:
-                import subprocess
-                result = subprocess.run(['fc-list', ':lang=zh'], 
-                                      capture_output=True, text=True, timeout=2)
-                if result.returncode == 0 and result.stdout:
-                    for line in result.stdout.split('\n'):
-                        if 'PingFang' in line or 'pingfang' in line.lower():
-                            if ':' in line:
-                                potential_path = line.split(':')[0].strip()
-                                if os.path.exists(potential_path) and potential_path.endswith(('.ttc', '.ttf')):
-                                    font_paths.insert(0, potential_path)
-                                    logger.debug(f"通过 fc-list 找到字体路径: {potential_path}")
-                                    break
-            except Exception as e:
-                logger.debug(f"使用 fc-list 查找字体失败: {e}")
-            
-            # 尝试注册找到的字体文件
-            for font_path in font_paths:
-                if os.path.exists(font_path):
-                    try:
-                        LabelBase.register(name='ChineseFont',
-                                          fn_regular=font_path,
-                                          fn_bold=font_path)
-                        chinese_font_name = 'ChineseFont'
-                        logger.debug(f"成功注册中文字体文件: {font_path}")
-                        break
-                    except Exception as e:
-                        logger.debug(f"注册字体文件失败 {font_path}: {e}")
-                        continue
-        
-        # Linux 中文字体
-        elif sys.platform.startswith('linux'):
-            font_paths = [
-                '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
-                '/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc',
-                '/usr/share/fonts/truetype/arphic/uming.ttc',
-            ]
-            for font_path in font_paths:
-                if os.path.exists(font_path):
-                    try:
-                        LabelBase.register(name='ChineseFont',
-                                          fn_regular=font_path,
-                                          fn_bold=font_path)
-                        chinese_font_name = 'ChineseFont'
-                        logger.debug(f"成功注册中文字体文件: {font_path}")
-                        break
-                    except Exception as e:
-                        continue
-
-        # Windows 中文字体
-        elif sys.platform == 'win32':
-            font_paths = [
-                'C:/Windows/Fonts/msyh.ttc',
-                'C:/Windows/Fonts/simsun.ttc',
-                'C:/Windows/Fonts/simhei.ttf',
-            ]
-            for font_path in font_paths:
-                if os.path.exists(font_path):
-                    try:
-                        LabelBase.register(name='ChineseFont',
-                                          fn_regular=font_path,
-                                          fn_bold=font_path)
-                        chinese_font_name = 'ChineseFont'
-                        logger.debug(f"成功注册中文字体文件: {font_path}")
-                        break
-                    except Exception as e:
-                        continue
+        cached_path = _load_cached_font_path() if use_cache else None
+        if cached_path and _register_font_file(cached_path):
+            chinese_font_name = 'ChineseFont'
+        else:
+            for font_path in _candidate_font_paths():
+                if os.path.exists(font_path) and _register_font_file(font_path):
+                    chinese_font_name = 'ChineseFont'
+                    if use_cache:
+                        _save_cached_font_path(font_path)
+                    break
 
         # 设置默认字体
         if chinese_font_name:
             Config.set('kivy', 'default_font', [chinese_font_name, 'Roboto'])
-            logger.debug(f"已设置默认字体为: {chinese_font_name}")
+            logger.debug("已设置默认字体为: %s", chinese_font_name)
         else:
             logger.warning("无法找到中文字体文件，中文可能显示为方框")
 
     except Exception as e:
-        logger.warning(f"无法注册中文字体: {e}")
-    
+        logger.warning("无法注册中文字体: %s", e)
+
     # 将字体名称存储到全局变量
     global CHINESE_FONT_NAME, _REGISTERED_FONT_NAME
     CHINESE_FONT_NAME = chinese_font_name
     _REGISTERED_FONT_NAME = chinese_font_name
-    
+
     return chinese_font_name
 
 
@@ -122,10 +204,109 @@ def get_chinese_font_name():
     return _REGISTERED_FONT_NAME
 
 
+def _get_icon_font_name():
+    """获取 KivyMD 图标字体名称，无法获取时返回 'Icons'"""
+    try:
+        from kivymd.font_definitions import theme_font_styles
+        return theme_font_styles['Icon']['large']['font-name']
+    except Exception:
+        return 'Icons'
+
+
+def build_font_rules(font_name, icon_font_name=None):
+    """
+    生成类级别字体规则的 KV 字符串
+
+    Kivy 按加载顺序应用规则，因此图标控件的规则放在文本控件规则之后，
+    用于恢复图标字体（MDIcon 等继承自 Label）。
+
+    Args:
+        font_name: 文本控件使用的字体名称
+        icon_font_name: 图标控件使用的字体名称，默认使用 KivyMD 图标字体
+
+    Returns:
+        KV 规则字符串
+    """
+    icon_font_name = icon_font_name or _get_icon_font_name()
+    return (
+        f"<{','.join(_TEXT_CLASS_NAMES)}>:\n"
+        f"    font_name: {font_name!r}\n"
+        f"\n"
+        f"<{','.join(sorted(_ICON_CLASS_NAMES))}>:\n"
+        f"    font_name: {icon_font_name!r}\n"
+    )
+
+
+def install_font_rules(font_name):
+    """
+    以 KV 规则的方式为所有文本控件设置默认字体
+
+    规则在控件创建时生效，无需在构建或进入屏幕时递归遍历组件树。
+    需在创建任何控件之前调用，可重复调用（会先卸载旧规则）。
+
+    Args:
+        font_name: 文本控件使用的字体名称
+
+    Returns:
+        是否安装成功
+    """
+    if not font_name:
+        return False
+
+    try:
+        import importlib
+        from kivy.lang import Builder
+
+        for module_name in _KIVYMD_STYLE_MODULES:
+            try:
+                importlib.import_module(module_name)
+            except Exception:
+                continue
+
+        Builder.unload_file(_FONT_RULES_FILENAME)
+        Builder.load_string(build_font_rules(font_name), filename=_FONT_RULES_FILENAME)
+        logger.debug("已安装类级别字体规则: %s", font_name)
+        return True
+    except Exception as e:
+        logger.warning("安装字体规则失败: %s", e)
+        return False
+
+
+def _classify_widget_type(widget_type):
+    """
+    判断控件类型应如何处理字体（结果按类型缓存）
+
+    图标控件按 MRO 中的类名判断，子类同样视为图标控件，
+    避免导入 KivyMD 以及 isinstance 检查失败的问题。
+
+    Returns:
+        'icon'、'text' 或 'other'
+    """
+    kind = _WIDGET_KIND_CACHE.get(widget_type)
+    if kind is not None:
+        return kind
+
+    from kivy.uix.label import Label
+    from kivy.uix.textinput import TextInput
+
+    if any(cls.__name__ in _ICON_CLASS_NAMES for cls in widget_type.__mro__):
+        kind = 'icon'
+    elif issubclass(widget_type, (Label, TextInput)):
+        # MDButtonText、Button 等均继承自 Label
+        kind = 'text'
+    else:
+        kind = 'other'
+    _WIDGET_KIND_CACHE[widget_type] = kind
+    return kind
+
+
 def apply_font_to_widget(widget, font_name):
     """
     为组件应用中文字体。
 
+    常规控件已由 install_font_rules() 的类级别规则覆盖，此函数仅用于
+    规则无法覆盖的场景（如第三方弹窗在创建后改写了字体）。
+
     注意：不要改写图标控件（如 MDIconButton、MDIcon、MDListItemLeadingIcon、MDListItemTrailingIcon），
     它们依赖自己的 icon 字体，否则左侧图标会变成乱码。
     """
@@ -133,58 +314,16 @@ def apply_font_to_widget(widget, font_name):
         return
 
     try:
-        from kivy.uix.label import Label
-        from kivy.uix.textinput import TextInput
-        try:
-            from kivymd.uix.button import MDButtonText, MDIconButton
-            from kivymd.uix.label import MDIcon
-            from kivymd.uix.list import (
-                MDListItemLeadingIcon, MDListItemTrailingIcon, 
-                MDListItemIcon
-            )
-        except Exception:
-            MDButtonText = type("Dummy", (), {})
-            MDIconButton = type("Dummy", (), {})
-            MDIcon = type("Dummy", (), {})
-            MDListItemLeadingIcon = type("Dummy", (), {})
-            MDListItemTrailingIcon = type("Dummy", (), {})
-            MDListItemIcon = type("Dummy", (), {})
-
-        # 排除所有图标控件，避免影响图标显示
-        # 使用类名检查，避免isinstance检查失败的问题
-        widget_type_name = type(widget).__name__
-        
-        # 检查是否是图标控件
-        is_icon_widget = (
-            widget_type_name == 'MDIcon' or
-            widget_type_name == 'MDIconButton' or
-            widget_type_name == 'MDListItemLeadingIcon' or
-            widget_type_name == 'MDListItemTrailingIcon' or
-            widget_type_name == 'MDListItemIcon' or
-            widget_type_name == 'MDCheckbox'  # 添加MDCheckbox到图标控件排除列表
-        )
-        
-        if is_icon_widget:
-            return  # 直接返回，不处理子组件
-
-        # 只对纯文本类控件设置字体
-        text_types = (Label, TextInput, MDButtonText)
-
-        # 确保不是图标控件（因为MDIcon可能继承自Label）
-        if isinstance(widget, text_types) and not is_icon_widget:
-            if hasattr(widget, "font_name"):
-                widget.font_name = font_name
-        
-        # 特别处理Button控件
-        from kivy.uix.button import Button
-        if isinstance(widget, Button) and not is_icon_widget:
-            if hasattr(widget, "font_name"):
-                widget.font_name = font_name
-
-        # 递归处理子组件
-        if hasattr(widget, "children"):
-            for child in widget.children:
-                apply_font_to_widget(child, font_name)
+        stack = [widget]
+        while stack:
+            current = stack.pop()
+            kind = _classify_widget_type(type(current))
+            if kind == 'icon':
+                continue  # 不处理图标控件及其子组件
+            if kind == 'text' and current.font_name != font_name:
+                current.font_name = font_name
+            children = getattr(current, 'children', None)
+            if children:
+                stack.extend(children)
     except Exception:
         return
-
@@ -1,14 +1,51 @@
 # -*- coding: utf-8 -*-
 """
 日志工具
+
+所有日志记录器共享同一套处理器：调用线程只把日志记录放入队列（QueueHandler），
+由后台 QueueListener 线程负责格式化并写入控制台与滚动日志文件，避免磁盘 I/O 阻塞 UI 线程。
+
+环境变量:
+    LOG_DIR: 日志目录，默认 logs
+    LOG_ROTATION: 滚动方式，time（按天，默认）或 size（按大小）
+    LOG_MAX_BYTES: 按大小滚动时单个文件的最大字节数，默认 5MB
+    LOG_BACKUP_COUNT: 保留的历史日志文件数量，默认 7
+    LOG_FORMAT: 日志格式，text（默认）或 json（每行一个 JSON 对象）
+    LOG_OPERATIONS: 设为 1 时以 INFO 级别记录每次服务操作（默认只记录失败的操作）
 """
 
+import atexit
+import copy
+import functools
+import inspect
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 
 
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 结构化操作日志字段（由 log_operation 通过 extra 写入日志记录）
+OPERATION_FIELDS = ('operation', 'entity', 'id', 'duration_ms', 'rows', 'outcome')
+
+# 操作日志使用的记录器名称
+OPERATION_LOGGER_NAME = 'vibe-fridge.operations'
+
+# 共享的日志队列、队列处理器与后台监听器（首次调用 setup_logger 时创建）
+_log_queue = None
+_queue_handler = None
+_queue_listener = None
+_config_lock = threading.Lock()
+
+
 class ColoredFormatter(logging.Formatter):
     """彩色日志格式化器"""
 
@@ -28,10 +65,144 @@ class ColoredFormatter(logging.Formatter):
         return f"{color}{log_message}{self.COLORS['RESET']}"
 
 
+class JsonFormatter(logging.Formatter):
+    """JSON 日志格式化器，每条记录输出为一行 JSON，并带上结构化操作字段"""
+
+    def format(self, record):
+        """格式化日志记录"""
+        payload = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in OPERATION_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                payload[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exception'] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    仅在调用线程中合并消息参数的队列处理器
+
+    标准 QueueHandler 会在调用线程中完整格式化记录（包括时间戳），
+    这里只做必要的 msg % args 合并与异常文本化，完整格式化交给后台监听线程。
+    """
+
+    _exception_formatter = logging.Formatter()
+
+    def handle(self, record):
+        # 父子记录器都挂着这个共享处理器时，向上传播的同一条记录只入队一次
+        if getattr(record, '_enqueued', False):
+            return False
+        record._enqueued = True
+        return super().handle(record)
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _create_file_handler(log_dir):
+    """根据环境变量创建按时间或按大小滚动的文件处理器"""
+    log_file = log_dir / 'vibe-fridge.log'
+    backup_count = int(os.getenv('LOG_BACKUP_COUNT', 7))
+
+    if os.getenv('LOG_ROTATION', 'time').lower() == 'size':
+        return logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=int(os.getenv('LOG_MAX_BYTES', 5 * 1024 * 1024)),
+            backupCount=backup_count,
+            encoding='utf-8',
+        )
+    return logging.handlers.TimedRotatingFileHandler(
+        log_file,
+        when='midnight',
+        backupCount=backup_count,
+        encoding='utf-8',
+    )
+
+
+def _ensure_logging_configured():
+    """
+    创建共享的队列处理器与后台监听器（仅执行一次）
+
+    Returns:
+        logging.Handler: 共享的队列处理器
+    """
+    global _log_queue, _queue_handler, _queue_listener
+
+    if _queue_handler is not None:
+        return _queue_handler
+
+    with _config_lock:
+        if _queue_handler is not None:
+            return _queue_handler
+
+        # 创建日志目录（仅在首次配置时）
+        log_dir = Path(os.getenv('LOG_DIR', 'logs'))
+        log_dir.mkdir(parents=True, exist_ok=True)
+
+        console_handler = logging.StreamHandler()
+        file_handler = _create_file_handler(log_dir)
+        if os.getenv('LOG_FORMAT', 'text').lower() == 'json':
+            console_handler.setFormatter(JsonFormatter())
+            file_handler.setFormatter(JsonFormatter())
+        else:
+            console_handler.setFormatter(ColoredFormatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT))
+            file_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT))
+
+        _log_queue = queue.SimpleQueue()
+        _queue_listener = logging.handlers.QueueListener(
+            _log_queue, console_handler, file_handler, respect_handler_level=True
+        )
+        _queue_listener.start()
+        atexit.register(shutdown_logging)
+
+        _queue_handler = _LazyQueueHandler(_log_queue)
+        return _queue_handler
+
+
+def shutdown_logging():
+    """停止后台监听器并刷新队列中剩余的日志"""
+    global _log_queue, _queue_handler, _queue_listener
+
+    with _config_lock:
+        listener = _queue_listener
+        handler = _queue_handler
+        _log_queue = None
+        _queue_handler = None
+        _queue_listener = None
+
+    if listener is None:
+        return
+
+    listener.stop()
+    for target in listener.handlers:
+        target.close()
+    for logger in list(logging.Logger.manager.loggerDict.values()):
+        if isinstance(logger, logging.Logger) and handler in logger.handlers:
+            logger.removeHandler(handler)
+
+
 def setup_logger(name='vibe-fridge', level=logging.INFO):
     """
     设置日志记录器
 
+    所有记录器共用同一个队列处理器，重复调用只会设置级别，开销很小。
+
     Args:
         name: 日志记录器名称
         level: 日志级别
@@ -39,48 +210,14 @@ def setup_logger(name='vibe-fridge', level=logging.INFO):
     Returns:
         logging.Logger: 配置好的日志记录器
     """
-    # 创建日志目录
-    log_dir = Path('logs')
-    log_dir.mkdir(exist_ok=True)
+    handler = _ensure_logging_configured()
 
-    # 创建日志文件名（按日期）
-    log_filename = f"{datetime.now().strftime('%Y%m%d')}.log"
-    log_file = log_dir / log_filename
-
-    # 创建日志记录器
     logger = logging.getLogger(name)
     logger.setLevel(level)
 
     # 避免重复添加处理器
-    if logger.handlers:
-        return logger
-
-    # 创建控制台处理器
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(level)
-
-    # 创建文件处理器
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
-    file_handler.setLevel(level)
-
-    # 创建格式化器
-    console_formatter = ColoredFormatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-
-    # 设置格式化器
-    console_handler.setFormatter(console_formatter)
-    file_handler.setFormatter(file_formatter)
-
-    # 添加处理器到记录器
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    if handler not in logger.handlers:
+        logger.addHandler(handler)
 
     return logger
 
@@ -99,10 +236,98 @@ def get_logger(name=None):
     return logging.getLogger(name)
 
 
+def _operation_outcome(result):
+    """根据服务方法的返回值推断操作结果与影响行数"""
+    if isinstance(result, dict) and 'success' in result:
+        return ('success' if result['success'] else 'failure'), None
+    if isinstance(result, (list, tuple)):
+        return 'success', len(result)
+    if isinstance(result, bool):
+        return ('success' if result else 'failure'), (1 if result else 0)
+    if isinstance(result, int):
+        return 'success', result
+    if result is None:
+        return 'not_found', 0
+    return 'success', 1
+
+
+def _result_identity(result):
+    """获取返回对象的 id，只读取实例字典，避免对已分离或已过期的对象触发刷新"""
+    return getattr(result, '__dict__', {}).get('id')
+
+
+def log_operation(operation, entity, id_arg=None):
+    """
+    记录服务操作的结构化日志（operation、entity、id、duration_ms、rows、outcome）
+
+    成功的操作与未找到结果（返回 None）仅在 LOG_OPERATIONS=1 时以 INFO 级别记录，
+    失败或抛出异常的操作以 WARNING 级别记录。
+    配合 LOG_FORMAT=json 可得到机器可读的操作日志。
+
+    Args:
+        operation: 操作名称，如 create、get、update
+        entity: 实体名称，如 item、wiki
+        id_arg: 作为 id 字段记录的参数名，为 None 时尝试从返回值中取 id
+
+    Returns:
+        装饰器
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        op_logger = setup_logger(
+            OPERATION_LOGGER_NAME,
+            logging.INFO if os.getenv('LOG_OPERATIONS') == '1' else logging.WARNING,
+        )
+        # 操作日志已由自身的处理器写出，不再传播到 vibe-fridge 记录器
+        op_logger.propagate = False
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                outcome, rows, result = 'error', 0, None
+                raise
+            else:
+                outcome, rows = _operation_outcome(result)
+                return result
+            finally:
+                level = logging.INFO if outcome in ('success', 'not_found') else logging.WARNING
+                if op_logger.isEnabledFor(level):
+                    entity_id = None
+                    if id_arg:
+                        try:
+                            entity_id = signature.bind_partial(*args, **kwargs).arguments.get(id_arg)
+                        except TypeError:
+                            entity_id = None
+                    elif isinstance(result, dict):
+                        entity_id = result.get('id')
+                    elif result is not None:
+                        entity_id = _result_identity(result)
+                    duration_ms = round((time.perf_counter() - start) * 1000, 3)
+                    op_logger.log(
+                        level, "%s %s %s in %.3f ms",
+                        operation, entity, outcome, duration_ms,
+                        extra={
+                            'operation': operation,
+                            'entity': entity,
+                            'id': entity_id,
+                            'duration_ms': duration_ms,
+                            'rows': rows,
+                            'outcome': outcome,
+                        },
+                    )
+
+        return wrapper
+
+    return decorator
+
+
 if __name__ == '__main__':
     # 测试日志功能
     logger = setup_logger()
     logger.debug('这是一条调试信息')
     logger.info('这是一条普通信息')
     logger.warning('这是一条警告信息')
-    logger.error('这是一条错误信息')
\ No newline at end of file
+    logger.error('这是一条错误信息')
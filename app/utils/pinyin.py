@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+汉字拼音首字母
+
+安装了 pypinyin 时使用其词典（覆盖全部汉字与常见多音字）；否则按 GB2312 一级汉字
+按拼音排序的编码区间推算首字母，覆盖 3755 个常用字，其余汉字原样跳过。
+"""
+
+import bisect
+from functools import lru_cache
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:  # pypinyin 为可选依赖
+    lazy_pinyin = None
+
+# GB2312 一级汉字中每个首字母的起始编码（I、U、V 没有对应的汉字）
+_GB2312_BOUNDARIES = (
+    (0xB0A1, 'a'), (0xB0C5, 'b'), (0xB2C1, 'c'), (0xB4EE, 'd'), (0xB6EA, 'e'),
+    (0xB7A2, 'f'), (0xB8C1, 'g'), (0xB9FE, 'h'), (0xBBF7, 'j'), (0xBFA6, 'k'),
+    (0xC0AC, 'l'), (0xC2E8, 'm'), (0xC4C3, 'n'), (0xC5B6, 'o'), (0xC5BE, 'p'),
+    (0xC6DA, 'q'), (0xC8BB, 'r'), (0xC8F6, 's'), (0xCBFA, 't'), (0xCDDA, 'w'),
+    (0xCEF4, 'x'), (0xD1B9, 'y'), (0xD4D1, 'z'),
+)
+_GB2312_CODES = [code for code, _ in _GB2312_BOUNDARIES]
+_GB2312_LEVEL1_END = 0xD7F9
+
+
+def _gb2312_initial(char: str) -> str:
+    try:
+        encoded = char.encode('gb2312')
+    except UnicodeEncodeError:
+        return ''
+    if len(encoded) != 2:
+        return ''
+    code = (encoded[0] << 8) | encoded[1]
+    if code < _GB2312_CODES[0] or code > _GB2312_LEVEL1_END:
+        return ''
+    return _GB2312_BOUNDARIES[bisect.bisect_right(_GB2312_CODES, code) - 1][1]
+
+
+@lru_cache(maxsize=4096)
+def pinyin_initials(text: str) -> str:
+    """
+    获取文本的拼音首字母（小写），非汉字的字母和数字原样保留，其余字符忽略
+
+    例如 "鲜牛奶" -> "xnn"，"AD钙奶" -> "adgn"。
+
+    Args:
+        text: 文本
+
+    Returns:
+        str: 首字母串；没有可识别的字符时返回空字符串
+    """
+    if lazy_pinyin is not None:
+        parts = lazy_pinyin(text, style=Style.FIRST_LETTER, errors=lambda chars: list(chars))
+        return ''.join(part for part in parts if part.isascii() and part.isalnum()).lower()
+
+    result = []
+    for char in text:
+        if char.isascii():
+            if char.isalnum():
+                result.append(char.lower())
+        else:
+            result.append(_gb2312_initial(char))
+    return ''.join(result)
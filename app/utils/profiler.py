@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+采样分析器
+
+后台线程按固定间隔采样目标线程（默认主线程 / UI 线程）的调用栈，
+按 collapsed stack 格式（"帧1;帧2;...;帧N 次数"）写入日志目录，可直接用于 flamegraph.pl / speedscope。
+每个样本以当前标签（如 screen_manager.current）作为根帧，便于按屏幕区分热点。
+
+环境变量:
+    PROFILER_ENABLED: 设为 1 时应用启动即开启采样
+    PROFILER_INTERVAL_MS: 采样间隔（毫秒），默认 10
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class SamplingProfiler:
+    """对单个线程做定时栈采样的分析器"""
+
+    def __init__(
+        self,
+        interval: float = 0.01,
+        output_dir: str = None,
+        tag_func: Callable[[], Optional[str]] = None,
+        thread_id: int = None,
+        max_depth: int = 128,
+    ):
+        """
+        Args:
+            interval: 采样间隔（秒）
+            output_dir: 输出目录，默认为日志目录
+            tag_func: 返回当前标签的函数（在采样线程中调用，需保证只读且快速）
+            thread_id: 被采样线程的 ident，默认为创建分析器的线程
+            max_depth: 记录的最大栈深度
+        """
+        self.interval = interval
+        self.output_dir = Path(output_dir or os.getenv('LOG_DIR', 'logs'))
+        self.tag_func = tag_func
+        self.thread_id = thread_id or threading.get_ident()
+        self.max_depth = max_depth
+        self.samples = Counter()
+        self.sample_count = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._frame_labels = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """启动采样线程"""
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        logger.info("采样分析器已启动，间隔 %.1f ms", self.interval * 1000)
+
+    def stop(self) -> Optional[Path]:
+        """
+        停止采样并写出结果
+
+        Returns:
+            Optional[Path]: collapsed stack 文件路径，没有样本时返回 None
+        """
+        if self._thread is None:
+            return None
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        return self.dump()
+
+    def dump(self) -> Optional[Path]:
+        """将当前累计的样本写入 collapsed stack 文件"""
+        if not self.samples:
+            return None
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.collapsed"
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        logger.info("采样结果已写入: %s（%s 个样本）", path, self.sample_count)
+        return path
+
+    def _frame_label(self, code) -> str:
+        """帧标签：函数名 (文件名:定义行号)，按 code 对象缓存"""
+        label = self._frame_labels.get(code)
+        if label is None:
+            filename = os.path.basename(code.co_filename)
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(';', ':').replace(' ', '_')
+            self._frame_labels[code] = label
+        return label
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            stack.append(self._frame_label(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+
+        tag = None
+        if self.tag_func is not None:
+            try:
+                tag = self.tag_func()
+            except Exception:
+                tag = None
+        if tag:
+            stack.insert(0, f"[{tag}]")
+
+        self.samples[';'.join(stack)] += 1
+        self.sample_count += 1
+
+    def _run(self) -> None:
+        next_sample = time.perf_counter()
+        while not self._stop_event.is_set():
+            next_sample += self.interval
+            self._sample()
+            delay = next_sample - time.perf_counter()
+            if delay > 0:
+                self._stop_event.wait(delay)
+            else:
+                # 采样落后时重新对齐，避免连续补采
+                next_sample = time.perf_counter()
+
+
+def profiler_enabled() -> bool:
+    """是否通过环境变量开启了采样分析器"""
+    return os.getenv('PROFILER_ENABLED') == '1'
+
+
+def profiler_interval() -> float:
+    """采样间隔（秒），来自 PROFILER_INTERVAL_MS"""
+    return float(os.getenv('PROFILER_INTERVAL_MS', 10)) / 1000
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+字体辅助工具基准测试
+
+在 1000 个控件的组件树上比较旧版递归遍历与新版（类型分类表 + 迭代遍历）
+apply_font_to_widget 的耗时，比较"构建 + 遍历"与"类级别 KV 字体规则"的构建耗时，
+并比较字体探测冷启动与缓存命中的耗时。
+
+进入屏幕的耗时在离屏窗口中启动 VibeFridgeApp 测量：从切换屏幕开始，到 on_enter 执行完毕
+并完成首次布局与绘制为止。旧版方式（进入屏幕时递归遍历设置字体）与 KV 规则各在独立的
+子进程中运行，互不影响。
+
+运行方式:
+    KIVY_NO_ARGS=1 python benchmarks/bench_font_helper.py
+    KIVY_NO_ARGS=1 python benchmarks/bench_font_helper.py --items 500 --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
+from kivy.uix.label import Label
+from kivy.uix.textinput import TextInput
+
+from app.utils import font_helper
+
+
+def _legacy_apply_font_to_widget(widget, font_name):
+    """旧版实现：每次调用都导入控件类并按类名比较"""
+    if not font_name or widget is None:
+        return
+    try:
+        from kivy.uix.label import Label
+        from kivy.uix.textinput import TextInput
+        try:
+            from kivymd.uix.button import MDButtonText, MDIconButton
+            from kivymd.uix.label import MDIcon
+            from kivymd.uix.list import (
+                MDListItemLeadingIcon, MDListItemTrailingIcon,
+                MDListItemIcon
+            )
+        except Exception:
+            MDButtonText = type("Dummy", (), {})
+        widget_type_name = type(widget).__name__
+        is_icon_widget = widget_type_name in (
+            'MDIcon', 'MDIconButton', 'MDListItemLeadingIcon',
+            'MDListItemTrailingIcon', 'MDListItemIcon', 'MDCheckbox',
+        )
+        if is_icon_widget:
+            return
+        if isinstance(widget, (Label, TextInput, MDButtonText)):
+            widget.font_name = font_name
+        from kivy.uix.button import Button
+        if isinstance(widget, Button):
+            widget.font_name = font_name
+        for child in widget.children:
+            _legacy_apply_font_to_widget(child, font_name)
+    except Exception:
+        return
+
+
+def build_tree(widget_count=1000):
+    """构建约 widget_count 个控件的组件树（每行 1 个容器 + 3 个子控件）"""
+    root = BoxLayout(orientation='vertical')
+    count = 1
+    while count < widget_count:
+        row = BoxLayout()
+        row.add_widget(Label(text='牛奶'))
+        row.add_widget(Button(text='消耗'))
+        row.add_widget(TextInput(text='1'))
+        root.add_widget(row)
+        count += 4
+    return root, count
+
+
+def _best_of(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_apply_font(widget_count=1000):
+    root, count = build_tree(widget_count)
+    font_names = iter(['Roboto', 'RobotoMono'] * 100)
+    legacy = _best_of(lambda: _legacy_apply_font_to_widget(root, next(font_names)))
+    current = _best_of(lambda: font_helper.apply_font_to_widget(root, next(font_names)))
+    print(f"apply_font_to_widget ({count} widgets)")
+    print(f"  legacy : {legacy * 1000:8.2f} ms")
+    print(f"  current: {current * 1000:8.2f} ms  ({legacy / current:.1f}x)")
+
+
+def bench_font_rules(widget_count=1000):
+    """构建组件树后遍历设置字体 vs. 安装 KV 规则后直接构建"""
+    from kivy.core.text import LabelBase
+    from kivy.lang import Builder
+
+    roboto = LabelBase._fonts['Roboto'][0]
+    LabelBase.register('BenchFont', roboto)
+
+    def build_and_walk():
+        root, _ = build_tree(widget_count)
+        font_helper.apply_font_to_widget(root, 'BenchFont')
+
+    walk = _best_of(build_and_walk)
+    font_helper.install_font_rules('BenchFont')
+    rules = _best_of(lambda: build_tree(widget_count))
+    Builder.unload_file(font_helper._FONT_RULES_FILENAME)
+    print(f"build + font ({widget_count} widgets)")
+    print(f"  build + walk: {walk * 1000:8.2f} ms")
+    print(f"  kv rules    : {rules * 1000:8.2f} ms  (saves {(walk - rules) * 1000:.2f} ms)")
+
+
+def bench_register_font():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        font_helper.FONT_CACHE_PATH = os.path.join(tmp_dir, 'font_cache.json')
+        cold = _best_of(lambda: font_helper.register_chinese_font(use_cache=False))
+        font_helper.register_chinese_font()
+        cached = _best_of(font_helper.register_chinese_font)
+    print("register_chinese_font")
+    print(f"  discovery: {cold * 1000:8.2f} ms")
+    print(f"  cached   : {cached * 1000:8.2f} ms")
+
+
+SCREEN_ENTER_SCENARIO = ['items', 'item_detail', 'add_entry', 'recipes', 'settings']
+
+
+def _register_bench_font():
+    """将 Roboto 注册为 BenchFont，使字体设置在没有中文字体的环境中也会真正改变控件"""
+    from kivy.core.text import LabelBase
+
+    roboto = LabelBase._fonts['Roboto'][0]
+    LabelBase.register('BenchFont', roboto)
+
+
+def measure_screen_enter(mode, n_items, repeat, data_dir):
+    """
+    在当前进程中启动应用，测量各屏幕进入耗时
+
+    Args:
+        mode: 'legacy' 在每次 on_enter 后递归遍历屏幕设置字体，'rules' 使用 KV 字体规则
+        n_items: 预置物品数量
+        repeat: 每个屏幕进入的次数
+        data_dir: 数据库目录
+
+    Returns:
+        Dict: 屏幕名称 -> 每次进入耗时（毫秒）列表
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+    from benchmarks.bench_ui import open_screen, pick_targets, prepare_database
+
+    prepare_database(n_items, data_dir)
+    targets = pick_targets()
+
+    from kivy.config import Config
+    Config.set('graphics', 'maxfps', '0')
+
+    _register_bench_font()
+    if mode == 'rules':
+        # 与 app.main 一致：在创建任何控件之前安装规则
+        font_helper.install_font_rules('BenchFont')
+
+    import app.main as main_module
+    from kivy.base import EventLoop, runTouchApp, stopTouchApp
+    from kivy.uix.screenmanager import NoTransition
+
+    app = main_module.VibeFridgeApp()
+    app._run_prepare()
+    runTouchApp(embedded=True)
+    manager = app.screen_manager
+    # 只测量进入与布局，不计入切换动画时长
+    manager.transition = NoTransition()
+
+    entered = set()
+    for screen in manager.screens:
+        original_on_enter = screen.on_enter
+
+        def on_enter(*args, screen=screen, original_on_enter=original_on_enter):
+            original_on_enter(*args)
+            if mode == 'legacy':
+                font_helper.apply_font_to_widget(screen, 'BenchFont')
+            entered.add(screen.name)
+
+        # dispatch 通过 getattr 获取默认处理函数，实例属性可覆盖类方法
+        screen.on_enter = on_enter
+
+    if mode == 'legacy':
+        font_helper.apply_font_to_widget(manager, 'BenchFont')
+
+    def pump_until(done, limit=600):
+        for _ in range(limit):
+            EventLoop.idle()
+            if done():
+                break
+
+    pump_until(lambda: False, limit=10)
+    timings = {name: [] for name in SCREEN_ENTER_SCENARIO}
+    for _ in range(repeat):
+        for name in SCREEN_ENTER_SCENARIO:
+            if manager.current != 'main':
+                app.switch_to_screen('main')
+                pump_until(lambda: 'main' in entered and not manager.transition.is_active)
+            entered.clear()
+
+            start = time.perf_counter()
+            open_screen(app, name, targets)
+            pump_until(lambda: name in entered and not manager.transition.is_active)
+            EventLoop.idle()  # 首次布局与绘制
+            timings[name].append((time.perf_counter() - start) * 1000)
+
+    app.stop()
+    stopTouchApp()
+    return timings
+
+
+def bench_screen_enter(n_items=200, repeat=5):
+    """分别在子进程中以旧版遍历与 KV 规则两种方式测量进入屏幕的耗时（取中位数）"""
+    results = {}
+    for mode in ('legacy', 'rules'):
+        with tempfile.TemporaryDirectory() as data_dir:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--screen-enter', mode,
+                 '--items', str(n_items), '--repeat', str(repeat), '--data-dir', data_dir],
+                check=True, capture_output=True, text=True,
+            ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"screen enter + first layout ({n_items} items, median of {repeat})")
+    total = {'legacy': 0.0, 'rules': 0.0}
+    for name in SCREEN_ENTER_SCENARIO:
+        legacy = statistics.median(results['legacy'][name])
+        rules = statistics.median(results['rules'][name])
+        total['legacy'] += legacy
+        total['rules'] += rules
+        print(f"  {name:<12} walk: {legacy:8.2f} ms  kv rules: {rules:8.2f} ms")
+    print(f"  {'total':<12} walk: {total['legacy']:8.2f} ms  kv rules: {total['rules']:8.2f} ms"
+          f"  (saves {total['legacy'] - total['rules']:.2f} ms)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='字体辅助工具基准测试')
+    parser.add_argument('--items', type=int, default=200, help='进入屏幕测试的预置物品数量')
+    parser.add_argument('--repeat', type=int, default=5, help='每个屏幕进入的次数')
+    parser.add_argument('--screen-enter', choices=('legacy', 'rules'), help=argparse.SUPPRESS)
+    parser.add_argument('--data-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.screen_enter:
+        # 子进程：输出 JSON 结果供父进程汇总
+        print(json.dumps(measure_screen_enter(args.screen_enter, args.items, args.repeat, args.data_dir)))
+    else:
+        bench_apply_font()
+        bench_font_rules()
+        bench_register_font()
+        bench_screen_enter(args.items, args.repeat)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+日志基准测试
+
+比较旧版同步日志（每个记录器各自的 StreamHandler + FileHandler，在调用线程中格式化并写盘）
+与队列日志（调用线程只入队，后台线程写盘）的每秒日志调用次数，以及 setup_logger 的调用开销。
+
+运行方式:
+    python benchmarks/bench_logging.py
+"""
+import contextlib
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import logger as logger_module
+
+CALLS = 20000
+SETUP_CALLS = 20000
+
+
+def _legacy_setup_logger(name, log_dir):
+    """旧版实现：每次调用都 mkdir，并为每个记录器创建同步处理器"""
+    log_dir = Path(log_dir)
+    log_dir.mkdir(exist_ok=True)
+    log_file = log_dir / f"{datetime.now().strftime('%Y%m%d')}.log"
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    if logger.handlers:
+        return logger
+    console_handler = logging.StreamHandler()
+    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    console_handler.setFormatter(logger_module.ColoredFormatter(logger_module.LOG_FORMAT))
+    file_handler.setFormatter(logging.Formatter(logger_module.LOG_FORMAT))
+    logger.addHandler(console_handler)
+    logger.addHandler(file_handler)
+    return logger
+
+
+def _rate(func, count):
+    start = time.perf_counter()
+    for i in range(count):
+        func(i)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            open(os.devnull, 'w') as devnull, \
+            contextlib.redirect_stderr(devnull):
+        legacy_dir = os.path.join(tmp_dir, 'legacy')
+        legacy = _legacy_setup_logger('bench.legacy', legacy_dir)
+        legacy.propagate = False
+        legacy_log = _rate(lambda i: legacy.info("物品更新成功: %s (ID: %s)", '牛奶', i), CALLS)
+        legacy_setup = _rate(lambda i: _legacy_setup_logger('bench.legacy', legacy_dir), SETUP_CALLS)
+
+        os.environ['LOG_DIR'] = os.path.join(tmp_dir, 'queued')
+        queued = logger_module.setup_logger('bench.queued')
+        queued.propagate = False
+        start = time.perf_counter()
+        queued_log = _rate(lambda i: queued.info("物品更新成功: %s (ID: %s)", '牛奶', i), CALLS)
+        logger_module.shutdown_logging()
+        queued_drained = CALLS / (time.perf_counter() - start)
+        queued_setup = _rate(lambda i: logger_module.setup_logger('bench.queued'), SETUP_CALLS)
+        logger_module.shutdown_logging()
+
+    print(f"logger.info() calls/sec ({CALLS} calls)")
+    print(f"  legacy sync        : {legacy_log:12,.0f}")
+    print(f"  queued (caller)    : {queued_log:12,.0f}  ({queued_log / legacy_log:.1f}x)")
+    print(f"  queued (drained)   : {queued_drained:12,.0f}")
+    print(f"setup_logger() calls/sec ({SETUP_CALLS} calls)")
+    print(f"  legacy             : {legacy_setup:12,.0f}")
+    print(f"  queued             : {queued_setup:12,.0f}  ({queued_setup / legacy_setup:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+无界面 UI 性能测试
+
+在离屏窗口中启动 VibeFridgeApp，预置 N 条物品数据，依次切换各屏幕（详情页加载一条预置物品及其 Wiki），
+记录应用构建耗时、控件数量、Clock 事件数量与帧耗时分位数，并输出 JSON 报告。
+
+运行方式:
+    python benchmarks/bench_ui.py --items 1000 --output ui_report.json
+
+默认使用 SDL 的 offscreen 视频驱动；在不支持的环境中可用 xvfb-run 并设置 SDL_VIDEODRIVER=x11。
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_SCENARIO = [
+    'main', 'items', 'item_wiki_detail', 'item_detail', 'add_entry', 'add_item', 'recipes', 'settings', 'main',
+]
+
+
+def percentile(values, percent):
+    """计算百分位数（最近秩法）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(-(-percent * len(ordered) // 100)) - 1, 0)
+    return ordered[rank]
+
+
+def frame_summary(frame_times_ms):
+    """帧耗时统计"""
+    return {
+        'frames': len(frame_times_ms),
+        'p50_ms': round(percentile(frame_times_ms, 50), 3),
+        'p90_ms': round(percentile(frame_times_ms, 90), 3),
+        'p99_ms': round(percentile(frame_times_ms, 99), 3),
+        'max_ms': round(max(frame_times_ms, default=0.0), 3),
+    }
+
+
+def count_widgets(widget):
+    """统计组件树中的控件数量"""
+    return sum(1 for _ in widget.walk(restrict=True))
+
+
+def prepare_database(n_items, data_dir):
+    """创建临时数据库并写入家庭数据（必须在导入 app 模块之前调用）"""
+    db_path = os.path.join(data_dir, f'ui_{n_items}.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ.setdefault('LOG_DIR', os.path.join(data_dir, 'logs'))
+
+    from app.services.database import db_service, init_database
+    from benchmarks.household import generate_household
+
+    init_database()
+    if not db_service.get_table_count('items'):
+        generate_household(db_service.engine, n_items)
+
+
+def pick_targets():
+    """选取详情页要显示的物品与 Wiki：一条使用中且关联了 Wiki 的物品"""
+    from app.models.item import Item, ItemStatus
+    from app.services.database import db_service
+
+    with db_service.session_scope() as session:
+        item = (
+            session.query(Item)
+            .filter(Item.status == ItemStatus.ACTIVE, Item.wiki_pk.isnot(None))
+            .order_by(Item.pk)
+            .first()
+        )
+        return {'item_id': item.id, 'wiki_name': item.wiki.name} if item else {}
+
+
+def open_screen(app, name, targets):
+    """按界面中的导航方式打开屏幕：详情页先切换再加载数据（与 show_item_detail 等一致）"""
+    manager = app.screen_manager
+    if name == 'item_detail' and targets:
+        manager.current = name
+        detail = manager.get_screen(name)
+        detail.item_id = targets['item_id']
+        detail._load_item(targets['item_id'])
+    elif name == 'item_wiki_detail' and targets:
+        manager.current = name
+        manager.get_screen(name).load_wiki_item(targets['wiki_name'])
+    else:
+        app.switch_to_screen(name)
+
+
+def run(n_items, scenario, frames_per_screen, data_dir):
+    prepare_database(n_items, data_dir)
+    targets = pick_targets()
+
+    from kivy.config import Config
+    Config.set('graphics', 'maxfps', '0')  # 不限制帧率，帧耗时即实际渲染耗时
+
+    start = time.perf_counter()
+    import app.main as main_module
+    import_ms = (time.perf_counter() - start) * 1000
+
+    from kivy.base import EventLoop, runTouchApp, stopTouchApp
+    from kivy.clock import Clock
+
+    app = main_module.VibeFridgeApp()
+    start = time.perf_counter()
+    app._run_prepare()
+    build_ms = (time.perf_counter() - start) * 1000
+    runTouchApp(embedded=True)
+
+    def pump(frames, until=None):
+        """驱动若干帧并返回每帧耗时；until 返回 True 时提前结束"""
+        frame_times = []
+        for _ in range(frames):
+            frame_start = time.perf_counter()
+            EventLoop.idle()
+            frame_times.append((time.perf_counter() - frame_start) * 1000)
+            if until is not None and until():
+                break
+        return frame_times
+
+    # 首屏稳定
+    startup_frames = pump(frames_per_screen)
+    report = {
+        'items': n_items,
+        'python': platform.python_version(),
+        'import_ms': round(import_ms, 3),
+        'build_ms': round(build_ms, 3),
+        'startup': {
+            'widget_count': count_widgets(app.root),
+            'clock_events': len(Clock.get_events()),
+            'frame_times': frame_summary(startup_frames),
+        },
+        'screens': [],
+    }
+
+    manager = app.screen_manager
+    all_frames = list(startup_frames)
+    for name in scenario:
+        start = time.perf_counter()
+        open_screen(app, name, targets)
+        switch_ms = (time.perf_counter() - start) * 1000
+
+        # 等待切换动画结束，再继续渲染若干帧
+        transition_frames = pump(600, until=lambda: not manager.transition.is_active)
+        steady_frames = pump(frames_per_screen)
+        all_frames.extend(transition_frames + steady_frames)
+
+        report['screens'].append({
+            'screen': name,
+            'switch_ms': round(switch_ms, 3),
+            'transition_frames': len(transition_frames),
+            'widget_count': count_widgets(manager.current_screen),
+            'total_widget_count': count_widgets(app.root),
+            'clock_events': len(Clock.get_events()),
+            'frame_times': frame_summary(transition_frames + steady_frames),
+        })
+
+    report['frame_times'] = frame_summary(all_frames)
+    report['total_switch_ms'] = round(sum(s['switch_ms'] for s in report['screens']), 3)
+
+    app.stop()
+    stopTouchApp()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='vibe-fridge 无界面 UI 性能测试')
+    parser.add_argument('--items', type=int, default=100, help='预置物品数量')
+    parser.add_argument('--frames', type=int, default=30, help='每个屏幕稳定后渲染的帧数')
+    parser.add_argument('--screens', default=','.join(DEFAULT_SCENARIO), help='依次切换的屏幕名称，逗号分隔')
+    parser.add_argument('--data-dir', default=None, help='数据库目录，默认使用临时目录')
+    parser.add_argument('--output', default='ui_report.json', help='JSON 报告输出路径')
+    args = parser.parse_args()
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='vibe-fridge-ui-')
+    report = run(args.items, args.screens.split(','), args.frames, data_dir)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(json.dumps({
+        'items': report['items'],
+        'build_ms': report['build_ms'],
+        'startup_widgets': report['startup']['widget_count'],
+        'total_switch_ms': report['total_switch_ms'],
+    }, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+服务层基准测试配置（pytest-benchmark）
+
+运行方式:
+    pytest benchmarks                        # 默认 100 / 10k 条物品
+    BENCH_SIZES=100,10000,1000000 pytest benchmarks
+
+结果默认自动保存为 JSON（.benchmarks/ 目录），也可用 --benchmark-json=<file> 指定输出文件。
+设置 BENCH_DATA_DIR 可复用已生成的数据库文件（生成 100 万条记录较慢）。
+"""
+import os
+import tempfile
+
+import pytest
+
+_BENCH_DIR = tempfile.mkdtemp(prefix='vibe-fridge-bench-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_BENCH_DIR, 'bench.db')}"
+os.environ.setdefault('LOG_DIR', os.path.join(_BENCH_DIR, 'logs'))
+
+from sqlalchemy import create_engine  # noqa: E402
+
+from app.services.database import db_service, init_database  # noqa: E402
+from benchmarks.household import generate_household  # noqa: E402
+
+BENCH_SIZES = [int(size) for size in os.getenv('BENCH_SIZES', '100,10000').split(',') if size]
+
+
+def size_id(size):
+    """把数据量转换为易读的测试 ID（100、10k、1M）"""
+    if size >= 1000000 and size % 1000000 == 0:
+        return f'{size // 1000000}M'
+    if size >= 1000 and size % 1000 == 0:
+        return f'{size // 1000}k'
+    return str(size)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # 未指定输出文件时自动保存 JSON 结果
+    option = config.option
+    if hasattr(option, 'benchmark_save') and not (
+        option.benchmark_json or option.benchmark_save or option.benchmark_autosave
+    ):
+        option.benchmark_save = 'services'
+
+
+@pytest.fixture(scope='module')
+def household_db(request):
+    """生成（或复用）指定数据量的家庭数据库，并让 db_service 指向它"""
+    size = request.param
+    data_dir = os.getenv('BENCH_DATA_DIR', _BENCH_DIR)
+    os.makedirs(data_dir, exist_ok=True)
+    db_path = os.path.join(data_dir, f'household_{size}.db')
+    exists = os.path.exists(db_path)
+
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    init_database()
+    db_service.engine.dispose()
+    db_service.engine = create_engine(os.environ['DATABASE_URL'])
+    db_service.SessionLocal.configure(bind=db_service.engine)
+
+    if not exists:
+        generate_household(db_service.engine, size)
+    yield size
+    db_service.engine.dispose()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+物品 / Wiki 服务基准测试
+
+每个用例在 BENCH_SIZES 指定的每种数据量下各运行一次。
+"""
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.models.item import Item, ItemStatus
+from app.services.autocomplete import autocomplete_index
+from app.services.database import db_service
+from app.services.item_service import item_service, statistics_service
+from app.services.recipe_service import recipe_matcher, recipe_service
+from app.services.wiki_service import wiki_service
+from benchmarks.conftest import BENCH_SIZES, size_id
+from benchmarks.household import HOUSEHOLD_CATALOG
+
+pytestmark = pytest.mark.parametrize(
+    'household_db', BENCH_SIZES, ids=[size_id(size) for size in BENCH_SIZES], indirect=True
+)
+
+
+def test_create_item(benchmark, household_db):
+    expiry_date = date.today() + timedelta(days=7)
+    result = benchmark(
+        item_service.create_item, name='鲜牛奶', category='乳制品', quantity=2, expiry_date=expiry_date
+    )
+    assert result is not None
+
+
+def test_get_items(benchmark, household_db):
+    items = benchmark(item_service.get_items)
+    assert items
+
+
+def test_get_items_keyword(benchmark, household_db):
+    benchmark(item_service.get_items, keyword='牛奶')
+
+
+def test_get_expiring_items(benchmark, household_db):
+    benchmark(item_service.get_expiring_items, days=7)
+
+
+def test_get_items_needing_reminder(benchmark, household_db):
+    benchmark(item_service.get_items_needing_reminder)
+
+
+def test_get_inventory_by_name(benchmark, household_db):
+    benchmark(item_service.get_inventory_by_name, '鲜牛奶')
+
+
+def test_get_registered_items(benchmark, household_db):
+    items = benchmark(item_service.get_registered_items)
+    assert items
+
+
+def test_get_all_wikis(benchmark, household_db):
+    wikis = benchmark(wiki_service.get_all_wikis)
+    assert wikis
+
+
+def test_search_wikis_keyword(benchmark, household_db):
+    benchmark(wiki_service.search_wikis, '牛奶', 8)
+
+
+def test_autocomplete_suggest(benchmark, household_db):
+    autocomplete_index.build()
+    suggestions = benchmark(autocomplete_index.suggest, '牛奶', 8)
+    assert suggestions
+
+
+RECIPE_COUNT = 20000
+
+
+def _ensure_recipes(count=RECIPE_COUNT):
+    """生成一个大型菜谱库（每道菜 3-6 种食材），已存在时跳过"""
+    import random
+
+    if recipe_matcher.recommend(limit=1) or recipe_service.load_all_recipes():
+        return
+    rng = random.Random(7)
+    names = [name for entries in HOUSEHOLD_CATALOG.values() for name, _, _ in entries]
+    names += [f'食材{i}' for i in range(500)]
+    recipe_service.bulk_create_recipes(
+        {'title': f'菜谱{i}', 'ingredients': rng.sample(names, rng.randint(3, 6))} for i in range(count)
+    )
+
+
+def test_recipe_recommend(benchmark, household_db):
+    _ensure_recipes()
+    recipe_matcher.build()
+    recipes = benchmark(recipe_matcher.recommend, 20)
+    assert recipes
+
+
+def test_recipe_inventory_update(benchmark, household_db):
+    _ensure_recipes()
+    recipe_matcher.ensure_loaded()
+    benchmark(recipe_matcher._on_items_changed, 'updated', names=['鸡蛋', '鲜牛奶'])
+
+
+def test_category_stats(benchmark, household_db):
+    stats = benchmark(statistics_service.get_category_stats)
+    assert stats
+
+
+def test_expiry_stats(benchmark, household_db):
+    stats = benchmark(statistics_service.get_expiry_stats)
+    assert 'weekly_stats' in stats
+
+
+def _insert_old_consumed_items(count=100):
+    """插入一批超过清理期限的已消耗物品，供清理用例使用"""
+    consumed_at = datetime.utcnow() - timedelta(days=10)
+    rows = [{
+        'id': str(uuid.uuid4()), 'name': '过期酸奶', 'quantity': 0, 'status': ItemStatus.CONSUMED,
+        'is_reminder_enabled': False, 'consumed_at': consumed_at,
+        'created_at': consumed_at, 'updated_at': consumed_at,
+    } for _ in range(count)]
+    with db_service.engine.begin() as conn:
+        conn.execute(insert(Item.__table__), rows)
+    return (), {}
+
+
+def test_cleanup_consumed_items(benchmark, household_db):
+    removed = benchmark.pedantic(
+        item_service.cleanup_consumed_items, setup=_insert_old_consumed_items, rounds=5
+    )
+    assert removed >= 100
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+测试公共配置
+
+在导入任何 app 模块之前把 DATABASE_URL 与日志目录指向临时目录，
+避免测试读写开发数据库；每个测试结束后清空所有表。
+"""
+import os
+import shutil
+import tempfile
+
+import pytest
+
+_TEST_DIR = tempfile.mkdtemp(prefix='vibe-fridge-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_TEST_DIR, 'test.db')}"
+os.environ.setdefault('LOG_DIR', os.path.join(_TEST_DIR, 'logs'))
+os.environ.setdefault('FONT_CACHE_PATH', os.path.join(_TEST_DIR, 'font_cache.json'))
+os.environ.setdefault('EXPIRY_MODEL_PATH', os.path.join(_TEST_DIR, 'expiry_model.json'))
+
+from app.models import Base  # noqa: E402
+from app.services.database import db_service, init_database  # noqa: E402
+from app.services.autocomplete import autocomplete_index  # noqa: E402
+from app.services.db_maintenance import db_maintenance  # noqa: E402
+from app.services.expiry_sweep import expiry_sweeper  # noqa: E402
+from app.services.recipe_service import recipe_matcher  # noqa: E402
+from app.services.settings_service import settings_service  # noqa: E402
+from app.services.tag_service import tag_service  # noqa: E402
+from app.services.wiki_defaults import wiki_defaults  # noqa: E402
+
+
+@pytest.fixture(scope='session', autouse=True)
+def _test_database():
+    init_database()
+    yield
+    db_service.engine.dispose()
+    shutil.rmtree(_TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def db():
+    """提供干净的数据库，测试结束后清空所有表"""
+    yield db_service
+    with db_service.engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    tag_service.invalidate_cache()
+    wiki_defaults.invalidate()
+    autocomplete_index.invalidate()
+    recipe_matcher.invalidate()
+    expiry_sweeper.invalidate()
+    settings_service.invalidate()
+    db_maintenance.reset()
+
+
+@pytest.fixture
+def seeded_db(db):
+    """插入示例 Wiki 与物品数据"""
+    from app.services.item_service import seed_example_items
+    from app.services.wiki_service import seed_example_wikis
+
+    seed_example_wikis()
+    seed_example_items()
+    return db
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""测试 - 已消耗物品归档"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.models.archive import ItemArchive
+from app.models.item import Item, ItemStatus, ItemTag
+from app.services.archive_service import archive_service
+from app.services.item_service import item_service
+from app.services.wiki_service import wiki_service
+from app.utils.events import ITEMS_CHANGED, event_bus
+
+
+def test_old_consumed_items_are_moved_to_archive_in_chunks(db):
+    milk = [item_service.create_item(name='鲜牛奶', tags=['早餐']) for _ in range(3)]
+    bread = item_service.create_item(name='面包')
+    recent = item_service.create_item(name='酸奶')
+    active = item_service.create_item(name='鸡蛋')
+    item_service.consume_items([item.id for item in milk + [recent]])
+    old = datetime.utcnow() - timedelta(days=10)
+    with db.session_scope() as session:
+        session.execute(update(Item).where(Item.id.in_([item.id for item in milk])).values(consumed_at=old))
+        session.execute(update(Item).where(Item.id == bread.id).values(status=ItemStatus.WASTED, consumed_at=old))
+
+    events = []
+    handler = lambda **kwargs: events.append(kwargs)
+    event_bus.subscribe(ITEMS_CHANGED, handler)
+    try:
+        assert archive_service.archive_items(days=3, chunk_size=3) == 4
+    finally:
+        event_bus.unsubscribe(ITEMS_CHANGED, handler)
+    assert [len(event['item_ids']) for event in events] == [3, 1]
+    assert {event['action'] for event in events} == {'archived'}
+
+    with db.session_scope() as session:
+        remaining = {item.id for item in session.query(Item)}
+        archived = {row.id: row.status for row in session.query(ItemArchive)}
+        assert session.query(ItemTag).count() == 0
+    assert remaining == {recent.id, active.id}
+    assert archived == {**{item.id: ItemStatus.CONSUMED for item in milk}, bread.id: ItemStatus.WASTED}
+
+    # 历史查询按 Wiki 使用归档表的索引；月度统计同时包含尚未归档的物品
+    history = archive_service.get_history(wiki_id=wiki_service.get_wiki_by_name('鲜牛奶')['id'])
+    assert sorted(row['id'] for row in history) == sorted(item.id for item in milk)
+    summary = archive_service.get_consumption_summary()
+    assert sum(month['consumed'] for month in summary) == 4
+    assert sum(month['wasted'] for month in summary) == 1
+    assert item_service.cleanup_consumed_items() == 0
+
+
+def test_deleted_wiki_history_is_not_inherited_by_reused_pk(db):
+    banana = item_service.create_item(name='香蕉')
+    item_service.mark_as_consumed(banana.id)
+    assert item_service.cleanup_consumed_items(days=0) == 1
+    banana_wiki = wiki_service.get_wiki_by_name('香蕉')
+    assert len(archive_service.get_history(wiki_id=banana_wiki['id'])) == 1
+
+    assert wiki_service.delete_wiki(banana_wiki['id'], force=True)['success']
+    # SQLite 会把被删除的最大主键分配给新建的 Wiki
+    milk_wiki = wiki_service.create_wiki(name='牛奶')
+    assert archive_service.get_history(wiki_id=milk_wiki['id']) == []
+    # 归档记录本身保留
+    assert [row['name'] for row in archive_service.get_history()] == ['香蕉']
+
+
+def test_items_used_up_by_quantity_changes_are_archived(db):
+    milk = item_service.create_item(name='鲜牛奶', quantity=2)
+    assert item_service.update_item_quantity(milk.id, -2)['status'] == ItemStatus.CONSUMED
+    consumed_at = item_service.get_item(milk.id).consumed_at
+    assert consumed_at is not None
+
+    # 已消耗的物品再增加数量不会改写消耗时间
+    assert item_service.update_item_quantity(milk.id, 1)['status'] == ItemStatus.CONSUMED
+    assert item_service.get_item(milk.id).consumed_at == consumed_at
+
+    assert archive_service.archive_items(days=0) == 1
+    assert [row['name'] for row in archive_service.get_history()] == ['鲜牛奶']
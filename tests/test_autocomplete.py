@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""测试 - 物品名称自动补全"""
+from app.services.autocomplete import autocomplete_index
+from app.services.item_service import item_service
+from app.services.wiki_service import wiki_service
+from app.utils.pinyin import pinyin_initials
+
+
+def _names(text, limit=8):
+    return [entry['name'] for entry in autocomplete_index.suggest(text, limit)]
+
+
+def test_pinyin_initials():
+    assert pinyin_initials('鲜牛奶') == 'xnn'
+    assert pinyin_initials('AD钙奶') == 'adgn'
+    assert pinyin_initials('') == ''
+
+
+def test_suggest_by_prefix_initials_and_substring(seeded_db):
+    wiki_service.create_wiki(name='牛肉')
+    autocomplete_index.build()
+
+    # 前缀匹配排在子串匹配之前
+    assert _names('牛') == ['牛肉', '鲜牛奶']
+    assert _names('xnn') == ['鲜牛奶']
+    assert _names('sn') == ['酸奶']
+    assert set(_names('奶')) == {'酸奶', '鲜牛奶'}
+    assert _names('不存在') == []
+    assert len(_names('n', limit=1)) == 1
+
+
+def test_ranks_by_usage_and_follows_wiki_events(db):
+    wiki_service.create_wiki(name='苹果')
+    wiki_service.create_wiki(name='苹果汁')
+    for _ in range(3):
+        item_service.create_item(name='苹果汁')
+    autocomplete_index.build()
+    assert _names('苹果') == ['苹果汁', '苹果']
+
+    # 新建的 Wiki 立即可补全
+    created = wiki_service.create_wiki(name='苹果醋')
+    assert '苹果醋' in _names('pg')
+
+    # 改名与删除在后台重建后生效，重建前失效的候选不会返回
+    wiki_service.update_wiki(created['id'], name='米醋')
+    assert '苹果醋' not in _names('苹果')
+    autocomplete_index.wait_for_rebuild(5)
+    assert _names('米') == ['米醋']
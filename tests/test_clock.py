@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""测试 - 应用时钟与跨天事件"""
+from datetime import date, datetime, timedelta
+
+from dateutil import tz
+
+from app.models.item import ItemStatus
+from app.services.item_service import item_service
+from app.utils.clock import AppClock, app_clock, resolve_timezone
+from app.utils.events import DAY_CHANGED, event_bus
+
+
+def test_today_is_cached_until_rollover():
+    shanghai = resolve_timezone('Asia/Shanghai')
+    current = [datetime(2024, 5, 1, 23, 59, 59, tzinfo=shanghai)]
+    calls = []
+
+    def now_func(zone):
+        calls.append(zone)
+        return current[0]
+
+    clock = AppClock(timezone=shanghai, now_func=now_func)
+    events = []
+    handler = lambda **kwargs: events.append(kwargs)
+    event_bus.subscribe(DAY_CHANGED, handler)
+    try:
+        assert [clock.today() for _ in range(1000)] == [date(2024, 5, 1)] * 1000
+        assert calls == [shanghai]
+        assert clock.days_until(date(2024, 5, 4)) == 3 and clock.days_until(None) is None
+
+        current[0] += timedelta(seconds=2)
+        assert clock.check_rollover()
+        assert not clock.check_rollover()
+    finally:
+        event_bus.unsubscribe(DAY_CHANGED, handler)
+
+    assert clock.today() == date(2024, 5, 2)
+    assert events == [{'today': date(2024, 5, 2), 'previous': date(2024, 5, 1)}]
+    assert resolve_timezone('Not/AZone') == tz.tzlocal()
+
+
+def test_time_travel_expires_items(db):
+    today = date.today()
+    milk = item_service.create_item(name='鲜牛奶', expiry_date=today + timedelta(days=2))
+    assert not milk.is_expired and milk.days_until_expiry == 2
+
+    # 跨天事件触发过期扫描
+    with app_clock.travel_to(today + timedelta(days=3)):
+        assert milk.is_expired and milk.days_until_expiry == -1
+        assert item_service.get_item(milk.id).status == ItemStatus.EXPIRED
+        assert [item.status for item in item_service.get_items()] == [ItemStatus.EXPIRED]
+
+    assert app_clock.today() == today and not milk.is_expired
+
+
+def test_seconds_until_midnight_on_dst_days():
+    new_york = resolve_timezone('America/New_York')
+    # 夏令时开始的一天只有 23 小时，结束的一天有 25 小时
+    assert AppClock._seconds_until_midnight(datetime(2024, 3, 10, tzinfo=new_york)) == 23 * 3600
+    assert AppClock._seconds_until_midnight(datetime(2024, 11, 3, tzinfo=new_york)) == 25 * 3600
+    assert AppClock._seconds_until_midnight(datetime(2024, 5, 1, 12, tzinfo=new_york)) == 12 * 3600
+
+
+def test_today_cache_follows_wall_clock(monkeypatch):
+    shanghai = resolve_timezone('Asia/Shanghai')
+    current = [datetime(2024, 5, 1, 23, 0, tzinfo=shanghai)]
+    clock = AppClock(timezone=shanghai, now_func=lambda zone: current[0])
+    wall = [1_000_000.0]
+    monkeypatch.setattr('app.utils.clock.time.time', lambda: wall[0])
+    assert clock.today() == date(2024, 5, 1)
+
+    # 系统休眠两小时：单调时钟不前进，墙上时钟已过午夜
+    current[0] += timedelta(hours=2)
+    wall[0] += 2 * 3600
+    assert clock.today() == date(2024, 5, 2)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""测试 - 数据库维护：ANALYZE 与增量 VACUUM"""
+from app.models.item import Item
+from app.models.maintenance import MaintenanceState
+from app.services.db_maintenance import ANALYZE_JOB_NAME, ANALYZE_MIN_CHANGES, db_maintenance
+from app.services.item_service import item_service
+
+
+def _insert_items(db, count, description=None):
+    with db.engine.begin() as conn:
+        conn.execute(Item.__table__.insert(), [
+            {'name': f'物品{i}', 'quantity': 1, 'description': description} for i in range(count)
+        ])
+
+
+def test_incremental_vacuum_reclaims_free_pages_in_bounded_steps(db):
+    stats = db.get_database_stats()
+    assert stats['auto_vacuum'] == 'incremental'
+    assert stats['file_size'] > 0
+
+    _insert_items(db, 500, description='x' * 2000)
+    with db.engine.begin() as conn:
+        conn.execute(Item.__table__.delete())
+    fragmented = db.get_database_stats()
+    assert fragmented['freelist_count'] > 300
+    assert 0 < fragmented['fragmentation'] < 1
+
+    assert db_maintenance.incremental_vacuum(max_pages=100) == 100
+    assert db.get_database_stats()['freelist_count'] == fragmented['freelist_count'] - 100
+    # 空闲时的维护归还剩余的空闲页，文件随之变小
+    while db_maintenance.run(force=True)['vacuumed_pages']:
+        pass
+    stats = db.get_database_stats()
+    assert stats['freelist_count'] < 64
+    assert stats['page_count'] < fragmented['page_count']
+
+
+def test_analyze_runs_after_significant_churn(db):
+    db_maintenance.reset()
+    try:
+        _insert_items(db, ANALYZE_MIN_CHANGES)
+        assert db_maintenance.needs_analyze()
+        assert db_maintenance.run(force=True)['analyzed']
+        assert db.get_database_stats()['analyzed']
+        with db.session_scope() as session:
+            assert session.get(MaintenanceState, ANALYZE_JOB_NAME).rows_affected == ANALYZE_MIN_CHANGES
+
+        # 少量修改只执行 PRAGMA optimize；修改后不空闲时不维护
+        item_service.create_item(name='鲜牛奶')
+        assert db_maintenance.pending_changes == 1
+        assert not db_maintenance.run()['optimized']
+        assert db_maintenance.run(force=True) == {
+            'analyzed': False, 'optimized': True, 'converted': False, 'vacuumed_pages': 0,
+        }
+
+        db_maintenance.record_changes(ANALYZE_MIN_CHANGES)
+        assert db_maintenance.run(force=True)['analyzed']
+        assert db_maintenance.pending_changes == 0
+    finally:
+        # 统计信息不随表清空，删除后其他测试仍使用 SQLite 的默认估计
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE IF EXISTS sqlite_stat1")
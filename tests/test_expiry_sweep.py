@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""测试 - 每日过期状态扫描"""
+from datetime import date, timedelta
+
+from sqlalchemy import update
+
+from app.models.item import Item, ItemStatus
+from app.services.database import db_service
+from app.services.expiry_sweep import expiry_sweeper
+from app.services.item_service import item_service, statistics_service
+from app.utils.events import ITEMS_CHANGED, event_bus
+
+
+def test_sweep_marks_expired_items_once_per_day(db):
+    today = date.today()
+    milk = item_service.create_item(name='鲜牛奶', expiry_date=today + timedelta(days=1))
+    egg = item_service.create_item(name='鸡蛋', expiry_date=today + timedelta(days=10))
+    rice = item_service.create_item(name='大米')
+    events = []
+    handler = lambda **kwargs: events.append(kwargs)
+    event_bus.subscribe(ITEMS_CHANGED, handler)
+    try:
+        # 两天后牛奶过期
+        assert expiry_sweeper.sweep(today + timedelta(days=2)) == 1
+        assert expiry_sweeper.sweep_if_needed(today + timedelta(days=2)) == 0
+    finally:
+        event_bus.unsubscribe(ITEMS_CHANGED, handler)
+
+    assert events == [{'action': 'expired', 'item_ids': [milk.id], 'names': ['鲜牛奶']}]
+    assert item_service.get_item(milk.id).status == ItemStatus.EXPIRED
+    assert item_service.get_item(egg.id).status == ItemStatus.ACTIVE
+    assert item_service.get_item(rice.id).status == ItemStatus.ACTIVE
+
+    # 扫描日期持久化，重新读取后同一天不再扫描
+    expiry_sweeper.invalidate()
+    assert expiry_sweeper.last_swept_date() == today + timedelta(days=2)
+    with db.instrument() as stats:
+        assert expiry_sweeper.sweep_if_needed(today + timedelta(days=1)) == 0
+    stats.assert_max_queries(0)
+
+
+def test_write_paths_and_readers_use_expired_status(db):
+    yesterday = date.today() - timedelta(days=1)
+    bread = item_service.create_item(name='面包', expiry_date=yesterday)
+    egg = item_service.create_item(name='鸡蛋', expiry_date=date.today() + timedelta(days=2))
+    assert bread.status == ItemStatus.EXPIRED
+
+    item_service.mark_as_consumed(bread.id)
+    item_service.restore_item(bread.id)
+    assert item_service.get_item(bread.id).status == ItemStatus.EXPIRED
+
+    stats = statistics_service.get_expiry_stats()
+    assert stats['expired'] == 1 and stats['soon_expiring'] == 1
+    # 已过期的物品仍在库存中，排在已消耗的物品之前
+    assert [item.name for item in item_service.get_inventory_by_name('面包')] == ['面包']
+    item_service.mark_as_consumed(egg.id)
+    assert [item.name for item in item_service.get_items()] == ['面包', '鸡蛋']
+
+
+def test_correcting_expiry_date_restores_active_status(db):
+    yesterday = date.today() - timedelta(days=1)
+    milk = item_service.create_item(name='鲜牛奶', expiry_date=yesterday)
+    egg = item_service.create_item(name='鸡蛋', quantity=2, expiry_date=yesterday)
+    assert milk.status == egg.status == ItemStatus.EXPIRED
+
+    # 录错的过期日期修正后恢复为使用中
+    assert item_service.update_item(milk.id, expiry_date=date.today() + timedelta(days=10))
+    assert item_service.get_item(milk.id).status == ItemStatus.ACTIVE
+
+    # 原子增减数量的语句使用同样的规则
+    assert item_service.update_item_quantity(egg.id, -1)['status'] == ItemStatus.EXPIRED
+    with db_service.session_scope() as session:
+        session.execute(update(Item).where(Item.id == egg.id).values(expiry_date=date.today()))
+    assert item_service.update_item_quantity(egg.id, 1)['status'] == ItemStatus.ACTIVE
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""测试 - 订单文件导入"""
+import io
+from datetime import date
+
+import pytest
+
+from app.services import import_service as import_module
+from app.services.import_service import JsonOrderParser, OrderParser, get_parser, import_service, register_parser
+from app.services.item_service import item_service
+from app.services.wiki_service import wiki_service
+
+CSV_ORDER = """订单号,商品名称,数量,单位,下单时间,保质期至
+A001,鲜牛奶,2,盒,2024-05-01 10:30,
+A001,鸡蛋,12,个,2024-05-01 10:30,2024-05-20
+A002,,1,,2024-05-02,
+A002,面包,abc,,2024-05-02,
+"""
+
+
+def test_import_csv_and_reimport_is_deduplicated(db):
+    wiki_service.create_wiki(name='鲜牛奶', default_unit='盒', suggested_expiry_days=7)
+
+    result = import_service.import_file(io.StringIO(CSV_ORDER), source_app='hema')
+
+    assert result['done'] and result['processed'] == 4
+    assert result['inserted'] == 2
+    assert result['errors'] == 2 and len(result['error_messages']) == 2
+    # 数量无效的面包不会创建 Wiki
+    assert result['created_wikis'] == 1
+    assert wiki_service.get_wiki_by_name('面包') is None
+
+    milk = item_service.get_inventory_by_name('鲜牛奶')[0]
+    assert milk.quantity == 2 and milk.source_app == 'hema' and milk.source_order_id == 'A001'
+    assert milk.purchase_date == date(2024, 5, 1)
+    # 过期日期由 Wiki 的建议保质期推算
+    assert milk.expiry_date == date(2024, 5, 8)
+    assert milk.wiki_id is not None
+
+    again = import_service.import_file(io.StringIO(CSV_ORDER), source_app='hema')
+    assert again['inserted'] == 0 and again['duplicates'] == 2
+    assert len(item_service.get_items()) == 2
+
+
+def test_import_matches_wiki_by_normalized_name(db):
+    wiki_service.create_wiki(name='鲜牛奶', default_unit='盒')
+    orders = '[{"order_id": "B1", "name": " 鲜 牛奶 "}]'
+
+    result = import_service.import_file(io.StringIO(orders), parser=JsonOrderParser())
+
+    assert result['inserted'] == 1 and result['created_wikis'] == 0
+    item = item_service.get_items()[0]
+    assert item.name == '鲜牛奶' and item.unit == '盒'
+
+
+def test_json_array_streams_in_batches(db, monkeypatch):
+    monkeypatch.setattr(JsonOrderParser, 'READ_SIZE', 16)
+    orders = '[\n' + ',\n'.join(
+        f'{{"order_id": "C{i}", "name": "物品{i % 3}", "quantity": {i + 1}}}' for i in range(10)
+    ) + '\n]'
+    events = []
+
+    result = import_service.import_file(
+        io.StringIO(orders), parser=JsonOrderParser(), chunk_size=4, on_progress=events.append,
+    )
+
+    assert [e['processed'] for e in events] == [4, 8, 10]
+    assert [e['done'] for e in events] == [False, False, True]
+    assert result['inserted'] == 10 and result['created_wikis'] == 3
+
+
+def test_same_name_lines_in_one_order_are_all_imported(db):
+    orders = "订单号,商品名称,数量\nF1,酸奶,1\nF1,酸奶,1\nF1,酸奶,2\nF2,酸奶,1\n"
+
+    assert import_service.import_file(io.StringIO(orders))['inserted'] == 4
+    again = import_service.import_file(io.StringIO(orders), chunk_size=1)
+    assert again['inserted'] == 0 and again['duplicates'] == 4
+
+
+def test_lines_without_order_id_are_deduplicated(db):
+    orders = "商品名称,数量,下单时间\n苹果,3,2024-05-01\n苹果,3,2024-05-01\n苹果,2,2024-05-01\n"
+
+    assert import_service.import_file(io.StringIO(orders))['inserted'] == 3
+    assert import_service.import_file(io.StringIO(orders))['duplicates'] == 3
+    assert len(item_service.get_inventory_by_name('苹果')) == 3
+
+
+@pytest.fixture
+def fixed_parser():
+    """注册测试用解析器，结束后从全局注册表中移除"""
+    @register_parser
+    class FixedParser(OrderParser):
+        source_app = 'test-app'
+        extensions = ('.txt',)
+
+        def parse(self, stream):
+            for line in stream:
+                yield {'name': line.strip(), 'source_order_id': 'E1'}
+
+    yield FixedParser
+    import_module._PARSERS.pop('test-app:.txt', None)
+
+
+def test_json_lines_and_custom_parser(db, tmp_path, fixed_parser):
+    path = tmp_path / 'orders.jsonl'
+    path.write_text('{"order_id": "D1", "name": "苹果"}\n\n{"order_id": "D1", "name": "香蕉"}\n', encoding='utf-8')
+    assert import_service.import_file(str(path))['inserted'] == 2
+
+    assert isinstance(get_parser('test-app', 'order.txt'), fixed_parser)
+    result = import_service.import_file(io.StringIO('橙子\n梨\n'), parser=fixed_parser())
+    assert result['inserted'] == 2
+    assert {item.source_app for item in item_service.get_inventory_by_name('梨')} == {'test-app'}
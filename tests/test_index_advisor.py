@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""测试 - 热点查询的索引"""
+from datetime import date, timedelta
+
+from app.services import index_advisor
+from app.services.item_service import item_service
+
+
+def test_hot_queries_use_composite_and_partial_indexes(db):
+    today = date.today()
+    for days in (-2, 1, 5, 30):
+        item_service.create_item(name='鲜牛奶', expiry_date=today + timedelta(days=days))
+
+    report = index_advisor.review()
+    indexes = {}
+    for query in report['queries']:
+        indexes.setdefault(query['name'], set()).update(query['indexes'])
+
+    assert 'ix_items_status_expiry' in indexes['get_expiring_items']
+    assert 'ix_items_reminder_pending' in indexes['get_items_needing_reminder']
+    assert 'ix_items_name_lower' in indexes['get_inventory_by_name']
+    assert 'ix_items_stock_by_name' in indexes['recipe_inventory']
+    # 单列 status 等索引已被复合索引取代
+    assert report['redundant'] == []
+    with db.engine.connect() as conn:
+        names = {index['name'] for index in index_advisor.list_indexes(conn, 'items')}
+    assert not names & {'ix_items_status', 'ix_items_consumed_at', 'ix_items_reminder_date', 'ix_items_name'}
+
+
+def test_redundant_index_detection(db):
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql("CREATE INDEX ix_items_status ON items (status)")
+        try:
+            redundant = index_advisor.redundant_indexes(conn, 'items')
+        finally:
+            conn.exec_driver_sql("DROP INDEX ix_items_status")
+    assert [item['index'] for item in redundant] == ['ix_items_status']
+    assert index_advisor.analyze_plan(['SCAN items', 'USE TEMP B-TREE FOR ORDER BY']) == {
+        'indexes': [], 'full_scans': ['items'], 'temp_sort': True,
+    }
@@ -1,29 +1,139 @@
 # -*- coding: utf-8 -*-
-"""测试脚本 - 检查物品数据加载"""
-import os
-os.chdir('h:\\code\\vibe-fridge')
-
-from app.utils.logger import setup_logger
-from app.services.database import init_database
-from app.services.item_service import item_service
-
-logger = setup_logger(__name__)
-
-# 初始化数据库
-init_database()
-
-# 获取所有物品
-items = item_service.get_items()
-logger.info(f'获取到 {len(items)} 个物品')
-
-for item in items:
-    logger.info(f'ID: {item.id}, Name: {item.name!r}, Category: {item.category.value}')
-
-if items:
-    # 检查第一个物品的属性
-    item = items[0]
-    logger.info(f'第一个物品详情:')
-    logger.info(f'  has name: {hasattr(item, "name")}')
-    logger.info(f'  name value: {item.name!r}')
-    logger.info(f'  has category: {hasattr(item, "category")}')
-    logger.info(f'  category value: {item.category}')
+"""测试 - 检查物品数据加载"""
+import threading
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import update
+
+from app.models.item import Item, ItemStatus
+from app.services.item_service import item_service, statistics_service
+
+
+def test_get_items_loads_seeded_items(seeded_db):
+    items = item_service.get_items()
+
+    assert items
+    for item in items:
+        assert item.id
+        assert item.name
+        # 分类通过物品 Wiki 关联获取
+        assert item.wiki is not None
+        assert item.wiki.category is not None
+
+
+def test_create_and_get_item(seeded_db):
+    expiry = date.today() + timedelta(days=5)
+    created = item_service.create_item(name='酸奶', category='食品', quantity=3, expiry_date=expiry)
+    assert created is not None
+
+    item = item_service.get_item(created.id)
+    assert item.name == '酸奶'
+    assert item.quantity == 3
+    assert item.status == ItemStatus.ACTIVE
+    assert item.days_until_expiry == 5
+    assert item.wiki.category.name == '食品'
+
+
+def test_consume_and_restore_item(db):
+    created = item_service.create_item(name='面包', category='食品')
+
+    assert item_service.mark_as_consumed(created.id)
+    assert item_service.get_item(created.id).status == ItemStatus.CONSUMED
+
+    assert item_service.restore_item(created.id)
+    assert item_service.get_item(created.id).status == ItemStatus.ACTIVE
+
+
+def test_update_item_quantity(db):
+    created = item_service.create_item(name='鸡蛋', category='食品', quantity=2)
+
+    assert item_service.update_item_quantity(created.id, 3) == {'quantity': 5, 'status': ItemStatus.ACTIVE}
+    assert item_service.get_item(created.id).quantity == 5
+    assert item_service.update_item_quantity(created.id, -10) is None
+    assert item_service.update_item_quantity('missing', 1) is None
+
+    # 状态在同一条 UPDATE 中同步
+    assert item_service.update_item_quantity(created.id, -5) == {'quantity': 0, 'status': ItemStatus.CONSUMED}
+    expired = item_service.create_item(name='牛奶', expiry_date=date.today() - timedelta(days=1))
+    assert item_service.update_item_quantity(expired.id, 1)['status'] == ItemStatus.EXPIRED
+
+
+def test_update_item_quantity_is_atomic(db):
+    created = item_service.create_item(name='鸡蛋', quantity=0)
+
+    def tap():
+        for _ in range(10):
+            item_service.update_item_quantity(created.id, 1)
+
+    threads = [threading.Thread(target=tap) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert item_service.get_item(created.id).quantity == 40
+
+
+def test_get_expiring_items(db):
+    today = date.today()
+    item_service.create_item(name='牛奶', category='食品', expiry_date=today + timedelta(days=2))
+    item_service.create_item(name='大米', category='食品', expiry_date=today + timedelta(days=200))
+
+    names = [item.name for item in item_service.get_expiring_items(days=7)]
+    assert names == ['牛奶']
+
+
+def test_statistics(seeded_db):
+    category_stats = statistics_service.get_category_stats()
+    expiry_stats = statistics_service.get_expiry_stats()
+
+    assert sum(category_stats.values()) > 0
+    assert set(expiry_stats) == {'expired', 'soon_expiring', 'weekly_stats'}
+
+
+def test_batch_actions_by_ids_and_filters(db):
+    today = date.today()
+    milk = item_service.create_item(name='牛奶', category='食品', expiry_date=today + timedelta(days=1), tags=['早餐'])
+    bread = item_service.create_item(name='面包', category='食品', expiry_date=today + timedelta(days=2), tags=['早餐'])
+    rice = item_service.create_item(name='大米', category='食品', expiry_date=today + timedelta(days=200))
+
+    with db.instrument() as stats:
+        consumed = item_service.consume_items(expiry_from=today, expiry_to=today + timedelta(days=3))
+    stats.assert_max_queries(1)
+    assert {row['id'] for row in consumed} == {milk.id, bread.id}
+    assert all(row['status'] == ItemStatus.CONSUMED for row in consumed)
+    # 已消耗的物品不会被重复处理
+    assert item_service.consume_items([milk.id]) == []
+
+    restored = item_service.restore_items(tags=['早餐'])
+    assert {row['id'] for row in restored} == {milk.id, bread.id}
+
+    retagged = item_service.retag_items([rice.id, bread.id], add_tags=['囤货'], remove_tags=['早餐'])
+    assert len(retagged) == 2
+    assert {tag.name for tag in item_service.get_item(bread.id).tags} == {'囤货'}
+
+    deleted = item_service.delete_items(tags=['囤货'])
+    assert {row['name'] for row in deleted} == {'大米', '面包'}
+    assert [item.id for item in item_service.get_items()] == [milk.id]
+
+
+def test_batch_actions_require_a_filter(db):
+    item_service.create_item(name='牛奶')
+
+    assert item_service.delete_items() == []
+    assert item_service.consume_items(tags=['不存在的标签']) == []
+    assert len(item_service.get_items()) == 1
+
+
+def test_consume_items_leaves_wasted_items_unchanged(db):
+    milk = item_service.create_item(name='牛奶')
+    bread = item_service.create_item(name='面包')
+    wasted_at = datetime.utcnow() - timedelta(days=5)
+    with db.session_scope() as session:
+        session.execute(update(Item).where(Item.id == bread.id).values(status=ItemStatus.WASTED, consumed_at=wasted_at))
+
+    consumed = item_service.consume_items([milk.id, bread.id])
+
+    assert [row['id'] for row in consumed] == [milk.id]
+    bread = item_service.get_item(bread.id)
+    assert bread.status == ItemStatus.WASTED and bread.consumed_at == wasted_at
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""测试 - 日志格式化与服务操作日志"""
+import json
+import logging
+
+from app.utils.logger import (
+    JsonFormatter, OPERATION_LOGGER_NAME, _ensure_logging_configured, log_operation, setup_logger,
+)
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_json_formatter_includes_operation_fields():
+    record = logging.LogRecord('test', logging.INFO, __file__, 1, '更新 %s', ('牛奶',), None)
+    record.operation = 'update'
+    record.rows = 1
+
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload['message'] == '更新 牛奶'
+    assert payload['level'] == 'INFO'
+    assert payload['operation'] == 'update'
+    assert payload['rows'] == 1
+    assert 'duration_ms' not in payload
+
+
+def test_log_operation_records_failure_with_id():
+    handler = _ListHandler()
+    op_logger = logging.getLogger(OPERATION_LOGGER_NAME)
+    op_logger.addHandler(handler)
+    try:
+        @log_operation('delete', 'item', id_arg='item_id')
+        def delete_item(item_id):
+            return False
+
+        assert delete_item('abc') is False
+    finally:
+        op_logger.removeHandler(handler)
+
+    record = handler.records[-1]
+    assert record.levelno == logging.WARNING
+    assert (record.operation, record.entity, record.id) == ('delete', 'item', 'abc')
+    assert record.outcome == 'failure'
+    assert record.rows == 0
+    assert record.duration_ms >= 0
+
+
+def test_shared_queue_handler_enqueues_propagated_records_once(monkeypatch):
+    parent = setup_logger('vibe-fridge')
+    child = setup_logger('vibe-fridge.test-child')
+    handler = _ensure_logging_configured()
+    enqueued = []
+    monkeypatch.setattr(handler, 'enqueue', enqueued.append)
+
+    child.warning('只写一次')
+    parent.warning('父记录器')
+
+    @log_operation('delete', 'item', id_arg='item_id')
+    def delete_item(item_id):
+        return False
+
+    delete_item('abc')
+    assert [record.getMessage() for record in enqueued][:2] == ['只写一次', '父记录器']
+    assert len(enqueued) == 3
+
+
+def test_log_operation_records_missing_result_below_warning():
+    @log_operation('get', 'item', id_arg='item_id')
+    def get_item(item_id):
+        return None
+
+    handler = _ListHandler()
+    op_logger = logging.getLogger(OPERATION_LOGGER_NAME)
+    op_logger.addHandler(handler)
+    previous_level = op_logger.level
+    op_logger.setLevel(logging.INFO)
+    try:
+        assert get_item('missing') is None
+    finally:
+        op_logger.setLevel(previous_level)
+        op_logger.removeHandler(handler)
+
+    record = handler.records[-1]
+    assert record.levelno == logging.INFO
+    assert (record.id, record.outcome, record.rows) == ('missing', 'not_found', 0)
+
+
+def test_log_operation_reads_id_from_returned_object():
+    class _Result:
+        def __init__(self):
+            self.id = 'abc'
+
+    @log_operation('create', 'item')
+    def create_item():
+        return _Result()
+
+    handler = _ListHandler()
+    op_logger = logging.getLogger(OPERATION_LOGGER_NAME)
+    op_logger.addHandler(handler)
+    previous_level = op_logger.level
+    op_logger.setLevel(logging.INFO)
+    try:
+        create_item()
+    finally:
+        op_logger.setLevel(previous_level)
+        op_logger.removeHandler(handler)
+
+    assert (handler.records[-1].id, handler.records[-1].outcome) == ('abc', 'success')
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""测试 - 数据库迁移：UUID 主键的旧表重建为整数主键"""
+from sqlalchemy import create_engine, inspect
+
+from app.models import Base
+from app.models.item import source_line_key
+from app.services.database import _migrate_database
+
+# 整数主键迁移之前的表结构（UUID 主键与外键）
+LEGACY_SCHEMA = (
+    """CREATE TABLE item_wiki_categories (
+        id VARCHAR(36) NOT NULL, name VARCHAR(50) NOT NULL, icon VARCHAR(50), color VARCHAR(20),
+        sort_order INTEGER NOT NULL, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL,
+        PRIMARY KEY (id))""",
+    """CREATE TABLE item_wikis (
+        id VARCHAR(36) NOT NULL, name VARCHAR(100) NOT NULL, description TEXT, category_id VARCHAR(36),
+        default_unit VARCHAR(20), suggested_expiry_days INTEGER, storage_location VARCHAR(100), notes TEXT,
+        image_path VARCHAR(255), created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL,
+        PRIMARY KEY (id), FOREIGN KEY(category_id) REFERENCES item_wiki_categories (id))""",
+    """CREATE TABLE tags (
+        id VARCHAR(36) NOT NULL, name VARCHAR(50) NOT NULL, color VARCHAR(20), created_at DATETIME NOT NULL,
+        PRIMARY KEY (id))""",
+    """CREATE TABLE items (
+        id VARCHAR(36) NOT NULL, wiki_id VARCHAR(36), name VARCHAR(100) NOT NULL, description TEXT,
+        quantity INTEGER NOT NULL, unit VARCHAR(20), purchase_date DATE, expiry_date DATE, reminder_date DATE,
+        status VARCHAR(8) NOT NULL, is_reminder_enabled BOOLEAN NOT NULL, consumed_at DATETIME,
+        predicted_expiry_date DATE, prediction_confidence FLOAT, image_path VARCHAR(255),
+        source_app VARCHAR(50), source_order_id VARCHAR(100), created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL, PRIMARY KEY (id), FOREIGN KEY(wiki_id) REFERENCES item_wikis (id))""",
+    "CREATE INDEX ix_items_status ON items (status)",
+    """CREATE TABLE item_tags (
+        item_id VARCHAR(36) NOT NULL, tag_id VARCHAR(36) NOT NULL, created_at DATETIME NOT NULL,
+        PRIMARY KEY (item_id, tag_id), FOREIGN KEY(item_id) REFERENCES items (id),
+        FOREIGN KEY(tag_id) REFERENCES tags (id))""",
+    "CREATE INDEX ix_item_tags_tag_item ON item_tags (tag_id, item_id)",
+)
+
+NOW = '2024-01-01 00:00:00.000000'
+
+
+def test_legacy_uuid_tables_are_rebuilt_with_integer_keys(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql("INSERT INTO item_wiki_categories VALUES ('c-1', '乳制品', NULL, NULL, 0, ?, ?)", (NOW, NOW))
+        conn.exec_driver_sql(
+            "INSERT INTO item_wikis (id, name, category_id, created_at, updated_at) VALUES ('w-1', '鲜牛奶', 'c-1', ?, ?)",
+            (NOW, NOW),
+        )
+        conn.exec_driver_sql("INSERT INTO tags VALUES ('t-1', '早餐', NULL, ?)", (NOW,))
+        for item_id, wiki_id, order_id in (('i-1', 'w-1', 'A1'), ('i-2', None, None), ('i-3', 'w-1', None)):
+            conn.exec_driver_sql(
+                "INSERT INTO items (id, wiki_id, name, quantity, status, is_reminder_enabled, source_app, "
+                "source_order_id, created_at, updated_at) VALUES (?, ?, '鲜牛奶', 1, 'ACTIVE', 1, 'hema', ?, ?, ?)",
+                (item_id, wiki_id, order_id, NOW, NOW),
+            )
+        conn.exec_driver_sql("INSERT INTO item_tags VALUES ('i-3', 't-1', ?)", (NOW,))
+
+    # 与 init_database 相同：先建缺失的表，再迁移
+    Base.metadata.create_all(engine)
+    _migrate_database(engine)
+
+    inspector = inspect(engine)
+    assert {'pk', 'id', 'wiki_pk'} <= {col['name'] for col in inspector.get_columns('items')}
+    assert 'wiki_id' not in {col['name'] for col in inspector.get_columns('items')}
+    assert not set(inspector.get_table_names()) & {'items_old', 'item_tags_old', 'item_wikis_old'}
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(
+            "SELECT items.pk, items.id, item_wikis.id, item_wiki_categories.name FROM items "
+            "LEFT JOIN item_wikis ON item_wikis.pk = items.wiki_pk "
+            "LEFT JOIN item_wiki_categories ON item_wiki_categories.pk = item_wikis.category_pk ORDER BY items.pk"
+        ).fetchall()
+        # 整数主键沿用旧表的 rowid，UUID 保持不变
+        assert rows == [(1, 'i-1', 'w-1', '乳制品'), (2, 'i-2', None, None), (3, 'i-3', 'w-1', '乳制品')]
+        assert conn.exec_driver_sql(
+            "SELECT items.id, tags.name FROM item_tags "
+            "JOIN items ON items.pk = item_tags.item_pk JOIN tags ON tags.pk = item_tags.tag_pk"
+        ).fetchall() == [('i-3', '早餐')]
+        # 旧版本导入的订单物品生成与重新导入时一致的去重键
+        keyed = conn.exec_driver_sql("SELECT id, source_line_key FROM items WHERE source_line_key IS NOT NULL")
+        assert keyed.fetchall() == [('i-1', source_line_key('order', 'A1', '鲜牛奶', 1))]
+        indexes = {row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {'ix_items_wiki_pk', 'ix_items_status_expiry', 'ix_item_tags_tag_item', 'ux_items_source_line'} <= indexes
+    assert 'ix_items_status' not in indexes
+
+    # 再次迁移不做任何修改
+    _migrate_database(engine)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT count(*) FROM items").scalar() == 3
+    engine.dispose()
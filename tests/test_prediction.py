@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""测试 - 过期日期批量预测"""
+import json
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip('pandas')
+
+from app.services.item_service import item_service  # noqa: E402
+from app.services.prediction_service import PredictionService  # noqa: E402
+from app.services.wiki_service import wiki_service  # noqa: E402
+
+PURCHASED = date(2024, 5, 1)
+
+
+def _history(name, shelf_lives, category_id=None):
+    if not wiki_service.get_wiki_by_name(name):
+        wiki_service.create_wiki(name=name, category_id=category_id)
+    for days in shelf_lives:
+        item_service.create_item(name=name, purchase_date=PURCHASED, expiry_date=PURCHASED + timedelta(days=days))
+
+
+def test_train_predict_and_persist(db, tmp_path):
+    category = wiki_service.create_category(name='乳制品')
+    _history('鲜牛奶', [7, 7, 7, 7], category_id=category.id)
+    _history('酸奶', [14, 14, 14], category_id=category.id)
+    wiki_service.create_wiki(name='奶酪', category_id=category.id)
+    wiki_service.create_wiki(name='面粉', suggested_expiry_days=180)
+
+    service = PredictionService(model_path=str(tmp_path / 'model.json'))
+    assert service.train() == 7
+
+    today = date.today()
+    milk = item_service.create_item(name='鲜牛奶', purchase_date=today)
+    cheese = item_service.create_item(name='奶酪', purchase_date=today)
+    flour = item_service.create_item(name='面粉', purchase_date=today)
+    unknown = item_service.create_item(name='神秘物品', purchase_date=today)
+
+    assert service.predict_active_items() == 11
+
+    milk = item_service.get_item(milk.id)
+    assert milk.predicted_expiry_date == today + timedelta(days=7)
+    # 同一 Wiki 样本完全一致，置信度只受样本数影响
+    assert milk.prediction_confidence == pytest.approx(4 / 9, abs=1e-3)
+
+    # 奶酪没有历史样本，使用分类分布（7 天与 14 天的几何平均附近）
+    cheese = item_service.get_item(cheese.id)
+    assert today + timedelta(days=9) <= cheese.predicted_expiry_date <= today + timedelta(days=11)
+    assert 0 < cheese.prediction_confidence < milk.prediction_confidence
+
+    assert item_service.get_item(flour.id).predicted_expiry_date == today + timedelta(days=180)
+    assert item_service.get_item(flour.id).prediction_confidence == pytest.approx(0.4)
+    assert item_service.get_item(unknown.id).predicted_expiry_date is not None
+
+    # 重新加载模型文件即可预测，不需要再训练
+    reloaded = PredictionService(model_path=str(tmp_path / 'model.json'))
+    assert reloaded.model.sample_count == 7
+    assert reloaded.model.trained_until is not None
+
+
+def test_incremental_training_only_adds_new_samples(db, tmp_path):
+    _history('鸡蛋', [30, 30, 30])
+    service = PredictionService(model_path=str(tmp_path / 'model.json'))
+    assert service.train() == 3
+    assert service.train() == 0
+
+    _history('面包', [3])
+    assert service.train() == 1
+    assert service.model.sample_count == 4
+    assert service.train(full=True) == 4
+
+    # 没有过期日期的物品在消耗后以消耗时间作为样本
+    bread = item_service.create_item(name='面包', purchase_date=date.today() - timedelta(days=2))
+    item_service.mark_as_consumed(bread.id)
+    assert service.train() == 1
+
+    # 恢复后再次消耗不会重复计入
+    assert item_service.restore_item(bread.id)
+    item_service.mark_as_consumed(bread.id)
+    assert service.train() == 0
+    # 模型文件只保存汇总统计，不随物品数量增长
+    assert set(json.loads((tmp_path / 'model.json').read_text(encoding='utf-8'))) == {
+        'version', 'trained_until', 'global', 'wiki', 'category',
+    }
+
+    # 移入归档表的物品仍作为样本参与训练
+    assert item_service.cleanup_consumed_items(days=0) == 1
+    assert service.train() == 0
+    assert service.train(full=True) == 5
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""测试 - 采样分析器"""
+import time
+
+from app.utils.profiler import SamplingProfiler
+
+
+def _busy_loop(duration):
+    end = time.perf_counter() + duration
+    total = 0
+    while time.perf_counter() < end:
+        total += 1
+    return total
+
+
+def test_profiler_writes_tagged_collapsed_stacks(tmp_path):
+    profiler = SamplingProfiler(interval=0.002, output_dir=tmp_path, tag_func=lambda: 'main')
+    profiler.start()
+    _busy_loop(0.2)
+    path = profiler.stop()
+
+    assert path is not None and path.parent == tmp_path
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(' ', 1)
+    assert int(count) > 0
+    assert stack.startswith('[main];')
+    assert any('_busy_loop' in line for line in lines)
+
+
+def test_profiler_without_samples_writes_nothing(tmp_path):
+    profiler = SamplingProfiler(output_dir=tmp_path)
+    assert profiler.stop() is None
+    assert not list(tmp_path.iterdir())
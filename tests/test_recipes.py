@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""测试 - 菜谱与库存匹配"""
+from datetime import date, timedelta
+
+from app.services.item_service import item_service
+from app.services.recipe_service import ingredient_weight, recipe_matcher, recipe_service
+
+
+def _titles(**kwargs):
+    return [recipe['title'] for recipe in recipe_matcher.recommend(**kwargs)]
+
+
+def test_ingredient_weight():
+    assert ingredient_weight(None) == 1.0
+    assert ingredient_weight(10) == 1.0
+    assert ingredient_weight(0) == 2.0
+    assert 1.0 < ingredient_weight(3) < ingredient_weight(1) < 2.0
+
+
+def test_recommend_ranks_by_coverage_and_expiry(db):
+    today = date.today()
+    recipe_service.create_recipe('番茄炒蛋', ['番茄', '鸡蛋', {'name': '葱', 'optional': True}])
+    recipe_service.create_recipe('牛奶蒸蛋', ['鲜牛奶', '鸡蛋'])
+    recipe_service.create_recipe('红烧肉', ['五花肉', '冰糖'])
+    item_service.create_item(name='鸡蛋', expiry_date=today + timedelta(days=20))
+    item_service.create_item(name='番茄', expiry_date=today + timedelta(days=10))
+    item_service.create_item(name='鲜牛奶', expiry_date=today + timedelta(days=1))
+    # 已过期的物品不计入库存
+    item_service.create_item(name='五花肉', expiry_date=today - timedelta(days=1))
+
+    results = recipe_matcher.recommend()
+
+    # 两道菜食材都齐全，临期的牛奶使牛奶蒸蛋排在前面；可选的葱不影响覆盖率
+    assert [r['title'] for r in results] == ['牛奶蒸蛋', '番茄炒蛋']
+    assert results[0]['coverage'] == 1.0 and results[0]['expiring'] == ['鲜牛奶']
+    assert results[1]['score'] == 1.0 and results[1]['missing'] == []
+    assert recipe_matcher.get_stats() == {
+        'available_ingredients': 3, 'makeable_recipes': 2, 'expiring_ingredients': 1,
+    }
+
+
+def test_matcher_follows_inventory_and_recipe_events(db):
+    recipe_service.create_recipe('蛋花汤', ['鸡蛋', '紫菜'])
+    egg = item_service.create_item(name='鸡蛋')
+    recipe_matcher.ensure_loaded()
+
+    assert _titles() == ['蛋花汤']
+    assert _titles(min_coverage=1) == []
+
+    item_service.create_item(name=' 紫 菜')
+    assert _titles(min_coverage=1) == ['蛋花汤']
+
+    # 库存变化只用一次汇总查询刷新受影响的食材
+    with db.instrument() as stats:
+        recipe_matcher._on_items_changed('updated', names=['紫菜'])
+    stats.assert_max_queries(1)
+
+    item_service.mark_as_consumed(egg.id)
+    assert recipe_matcher.recommend()[0]['missing'] == ['鸡蛋']
+
+    added = recipe_service.create_recipe('紫菜包饭', ['紫菜', '米饭'])
+    assert '紫菜包饭' in _titles()
+    assert recipe_service.delete_recipe(added['id'])
+    assert _titles() == ['蛋花汤']
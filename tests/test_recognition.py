@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""测试 - 图片识别任务队列"""
+import shutil
+import threading
+from datetime import date
+
+import pytest
+
+from app.services.recognition_service import (
+    RecognitionJob, RecognitionQueue, Recognizer, SidecarTextRecognizer, parse_recognized_text,
+)
+
+ORDER_TEXT = """盒马订单
+鲜牛奶 950ml ×2 ¥12.90
+鸡蛋 x12 个
+苹果 3 斤 ￥15.00
+实付 ¥27.90
+"""
+
+LABEL_TEXT = """生产日期: 2024.05.01
+保质期: 6个月
+"""
+
+
+class BlockingRecognizer(Recognizer):
+    """在释放前一直阻塞的识别器，用于测试并发与取消"""
+
+    name = 'blocking'
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def recognize(self, image_path):
+        self.release.wait(5)
+        return '面包 ×1'
+
+
+def _image(tmp_path, name, content=b'image', text=ORDER_TEXT):
+    path = tmp_path / f'{name}.png'
+    path.write_bytes(content)
+    (tmp_path / f'{name}.txt').write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_parse_order_and_date_label():
+    order = parse_recognized_text(ORDER_TEXT)
+    assert order['items'] == [
+        {'name': '鲜牛奶 950ml', 'quantity': 2, 'unit': None},
+        {'name': '鸡蛋', 'quantity': 12, 'unit': '个'},
+        {'name': '苹果', 'quantity': 3, 'unit': '斤'},
+    ]
+
+    label = parse_recognized_text(LABEL_TEXT)
+    assert label['production_date'] == date(2024, 5, 1)
+    assert label['shelf_life_days'] == 180
+    assert label['expiry_date'] == date(2024, 10, 28)
+
+    assert parse_recognized_text('2024年5月1日\n有效期至 2024/06/01')['expiry_date'] == date(2024, 6, 1)
+
+
+@pytest.mark.parametrize('use_processes', [False, True])
+def test_queue_recognizes_and_caches_by_image_hash(tmp_path, use_processes):
+    recognition = RecognitionQueue(SidecarTextRecognizer(), max_workers=2, use_processes=use_processes)
+    try:
+        first = recognition.submit(_image(tmp_path, 'order'))
+        assert first.wait(30) and first.status == RecognitionJob.DONE
+        assert [item['name'] for item in first.result['items']] == ['鲜牛奶 950ml', '鸡蛋', '苹果']
+        assert {'queue', 'hash', 'recognize', 'parse', 'total'} <= set(first.timings)
+
+        # 相同内容的图片命中缓存（即使没有对应的 .txt 文件）
+        copy = tmp_path / 'copy.png'
+        shutil.copy(first.image_path, copy)
+        second = recognition.submit(str(copy))
+        assert second.wait(30) and second.cached and second.result['items'] == first.result['items']
+
+        missing = recognition.submit(str(tmp_path / 'missing.png'))
+        assert missing.wait(30) and missing.status == RecognitionJob.FAILED
+
+        metrics = recognition.metrics()
+        assert metrics['done'] == 2 and metrics['cache_hits'] == 1 and metrics['failed'] == 1
+        assert metrics['stages']['recognize']['count'] == 1
+    finally:
+        recognition.shutdown()
+
+
+def test_bounded_concurrency_and_cancellation(tmp_path):
+    recognizer = BlockingRecognizer()
+    finished = []
+    recognition = RecognitionQueue(recognizer, max_workers=1, use_processes=False)
+    try:
+        running = recognition.submit(_image(tmp_path, 'a', b'a'), callback=finished.append)
+        queued = recognition.submit(_image(tmp_path, 'b', b'b'), callback=finished.append)
+
+        assert not running.wait(0.2)
+        assert queued.status == RecognitionJob.PENDING
+        assert queued.cancel() and queued.status == RecognitionJob.CANCELLED
+
+        recognizer.release.set()
+        assert running.wait(5) and running.status == RecognitionJob.DONE
+        assert not running.cancel()
+        assert finished == [queued, running]
+        assert recognition.metrics()['cancelled'] == 1
+    finally:
+        recognizer.release.set()
+        recognition.shutdown()
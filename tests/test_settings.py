@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""测试 - 应用设置"""
+from datetime import date, timedelta
+
+import pytest
+
+from app.services.item_service import item_service
+from app.services.settings_service import (
+    EXPIRY_REMINDER_ENABLED, REMINDER_DAYS_BEFORE, THEME_COLOR, settings_service,
+)
+from app.utils.events import SETTINGS_CHANGED, event_bus
+
+
+def test_settings_are_typed_cached_and_persisted(db):
+    assert settings_service.get(REMINDER_DAYS_BEFORE) == 3
+    assert settings_service.get(EXPIRY_REMINDER_ENABLED) is True
+
+    events = []
+    handler = lambda **kwargs: events.append(kwargs)
+    event_bus.subscribe(SETTINGS_CHANGED, handler)
+    try:
+        assert settings_service.set(EXPIRY_REMINDER_ENABLED, 'false')
+        assert settings_service.set(THEME_COLOR, 'blue')
+        assert settings_service.set(THEME_COLOR, 'blue')
+    finally:
+        event_bus.unsubscribe(SETTINGS_CHANGED, handler)
+    assert [event['key'] for event in events] == [EXPIRY_REMINDER_ENABLED, THEME_COLOR]
+
+    with pytest.raises(ValueError):
+        settings_service.set(REMINDER_DAYS_BEFORE, 'abc')
+    with pytest.raises(ValueError):
+        settings_service.get('unknown.key')
+
+    # 读取只访问缓存；重新加载后从数据库恢复
+    with db.instrument() as stats:
+        for _ in range(100):
+            settings_service.get(THEME_COLOR)
+    stats.assert_max_queries(0)
+    settings_service.invalidate()
+    assert settings_service.get(EXPIRY_REMINDER_ENABLED) is False
+    assert settings_service.get(THEME_COLOR) == 'blue'
+    assert settings_service.reset(THEME_COLOR)
+    assert settings_service.get(THEME_COLOR) == 'default'
+
+
+def test_reminder_lead_time_recomputes_reminder_dates(db):
+    expiry = date.today() + timedelta(days=10)
+    milk = item_service.create_item(name='鲜牛奶', expiry_date=expiry)
+    assert milk.reminder_date == expiry - timedelta(days=3)
+
+    settings_service.set(REMINDER_DAYS_BEFORE, 7)
+
+    assert item_service.get_item(milk.id).reminder_date == expiry - timedelta(days=7)
+    # 修改过期日期时使用新的提前天数
+    assert item_service.update_item(milk.id, expiry_date=expiry + timedelta(days=1))
+    assert item_service.get_item(milk.id).reminder_date == expiry - timedelta(days=6)
+
+    settings_service.set(REMINDER_DAYS_BEFORE, 11)
+    assert [item.id for item in item_service.get_items_needing_reminder()] == [milk.id]
+    settings_service.set(EXPIRY_REMINDER_ENABLED, False)
+    assert item_service.get_items_needing_reminder() == []
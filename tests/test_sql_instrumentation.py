@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""测试 - SQL 执行统计"""
+import pytest
+
+from app.services.item_service import item_service
+from app.services.sql_instrumentation import fingerprint
+
+
+def test_fingerprint_collapses_literals():
+    assert fingerprint("SELECT * FROM items WHERE name = 'milk' AND quantity > 3") == \
+        "SELECT * FROM items WHERE name = ? AND quantity > ?"
+    assert fingerprint("DELETE FROM items WHERE id IN (?, ?, ?)") == \
+        "DELETE FROM items WHERE id IN (?, ...)"
+
+
+def test_instrument_counts_queries_and_rows(seeded_db):
+    with seeded_db.instrument() as stats:
+        items = item_service.get_items()
+
+    report = stats.report()
+    assert report['query_count'] == 1
+    assert report['rows'] >= len(items)
+    stats.assert_max_queries(1)
+    with pytest.raises(AssertionError):
+        stats.assert_max_queries(0)
+
+
+def test_instrument_stops_after_context(seeded_db):
+    with seeded_db.instrument() as stats:
+        pass
+    item_service.get_items()
+
+    assert stats.query_count == 0
+
+
+def test_nested_instrumentation_counts_each_query_once(seeded_db):
+    with seeded_db.instrument() as outer:
+        with seeded_db.instrument() as inner:
+            items = item_service.get_items()
+        item_service.get_items(limit=1)
+
+    assert inner.report()['query_count'] == 1
+    assert inner.report()['rows'] == len(items)
+    assert outer.report()['query_count'] == 2
+    assert outer.report()['rows'] == len(items) + 1
+
+
+def test_instrument_counts_rows_returned_by_dml_returning(seeded_db):
+    item_ids = [item.id for item in item_service.get_items()[:3]]
+
+    with seeded_db.instrument() as stats:
+        deleted = item_service.delete_items(item_ids)
+
+    assert len(deleted) == 3
+    returning = [
+        query for query in stats.report()['queries']
+        if query['fingerprint'].startswith('DELETE FROM items') and 'RETURNING' in query['fingerprint']
+    ]
+    assert [query['rows'] for query in returning] == [3]
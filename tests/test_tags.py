@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""测试 - 标签服务"""
+import pytest
+
+from app.models.item import ItemStatus
+from app.services.database import db_service
+from app.services.item_service import item_service
+from app.services.tag_service import tag_service, normalize_tag_names
+
+
+def _create_items(*names):
+    return [item_service.create_item(name=name).id for name in names]
+
+
+def test_normalize_tag_names():
+    assert normalize_tag_names([' 早餐 ', '早餐', '', None, '冷藏']) == ['早餐', '冷藏']
+
+
+def test_create_item_with_tags(db):
+    item = item_service.create_item(name='牛奶', tags=['早餐', '冷藏', '早餐'])
+
+    assert sorted(tag.name for tag in item.tags) == ['冷藏', '早餐']
+    assert sorted(tag.name for tag in item_service.get_item(item.id).tags) == ['冷藏', '早餐']
+
+
+def test_bulk_add_and_remove_tags(db):
+    item_ids = _create_items('牛奶', '面包', '鸡蛋')
+
+    assert tag_service.add_tags(item_ids, ['早餐', '冷藏']) == 6
+    # 重复添加会被忽略
+    assert tag_service.add_tags(item_ids, ['早餐']) == 0
+
+    assert tag_service.remove_tags(item_ids[:2], ['冷藏']) == 2
+    assert tag_service.remove_tags(item_ids, ['不存在']) == 0
+    assert tag_service.get_tag_counts() == {'早餐': 3, '冷藏': 1}
+
+
+def test_find_items_by_any_and_all_tags(db):
+    milk, bread, eggs = _create_items('牛奶', '面包', '鸡蛋')
+    tag_service.add_tags([milk, bread], ['早餐'])
+    tag_service.add_tags([milk, eggs], ['冷藏'])
+
+    assert sorted(tag_service.find_item_ids(['早餐', '冷藏'], match='any')) == sorted([milk, bread, eggs])
+    assert tag_service.find_item_ids(['早餐', '冷藏'], match='all') == [milk]
+    assert tag_service.find_item_ids(['早餐', '不存在'], match='all') == []
+
+    item_service.mark_as_consumed(bread)
+    assert tag_service.find_item_ids(['早餐'], status=ItemStatus.ACTIVE) == [milk]
+
+    names = [item.name for item in item_service.get_items(tags=['早餐', '冷藏'], tag_match='all')]
+    assert names == ['牛奶']
+
+
+def test_update_item_replaces_tags(db):
+    item = item_service.create_item(name='牛奶', tags=['早餐', '冷藏'])
+
+    assert item_service.update_item(item.id, tags=['冷藏', '乳制品'])
+    assert sorted(tag.name for tag in item_service.get_item(item.id).tags) == ['乳制品', '冷藏']
+
+
+def test_add_tags_uses_constant_queries(db):
+    item_ids = _create_items(*[f'物品{i}' for i in range(20)])
+    tag_service.add_tags(item_ids[:1], ['早餐'])
+
+    with db.instrument() as stats:
+        tag_service.add_tags(item_ids, ['早餐', '冷藏', '零食'])
+    # 读取新标签ID + 插入标签 + 插入关联，与物品数量无关
+    stats.assert_max_queries(3)
+
+
+def test_rolled_back_tags_are_not_cached(db):
+    with pytest.raises(RuntimeError):
+        with db_service.session_scope() as session:
+            assert tag_service.resolve_tag_pks(session, ['早餐'])
+            raise RuntimeError('回滚')
+
+    # 回滚的标签主键不能留在缓存中，否则关联会被静默忽略
+    item = item_service.create_item(name='牛奶', tags=['早餐'])
+    assert [tag.name for tag in item_service.get_item(item.id).tags] == ['早餐']
+    assert tag_service.add_tags([item.id], ['早餐', '冷藏']) == 1
+
+
+def test_set_tags_raises_inside_caller_session(db):
+    # 复用调用方的会话时不吞掉异常，由调用方回滚
+    with pytest.raises(ValueError):
+        with db_service.session_scope() as session:
+            tag_service.set_tags('不存在', ['早餐'], session=session)
+    assert tag_service.get_tag_counts(status=None) == {}
+    assert not tag_service.set_tags('不存在', ['早餐'])
@@ -1,61 +1,26 @@
 # -*- coding: utf-8 -*-
-"""测试脚本 - 检查 ItemListItem UI 组件"""
-import os
-os.chdir('h:\\code\\vibe-fridge')
+"""测试 - 物品列表项的显示文本（app.ui.item_display，不依赖 Kivy 窗口）"""
+from datetime import timedelta
 
-from app.utils.logger import setup_logger
-from app.services.database import init_database
 from app.services.item_service import item_service
+from app.ui.item_display import category_name, days_text, headline_text, status_text
+from app.utils.clock import app_clock
 
-logger = setup_logger(__name__)
 
-# 初始化数据库
-init_database()
+def test_list_item_texts_follow_days_until_expiry():
+    assert status_text(None) == '无过期'
+    assert [status_text(days) for days in (-1, 0, 3, 4)] == ['已过期', '即将过期', '即将过期', '正常']
+    assert [days_text(days) for days in (-2, 0, 5)] == ['过期2天', '今天过期', '剩余5天']
+    assert headline_text('鸡蛋', 12) == '鸡蛋 ×12'
+    assert headline_text('鸡蛋', 1) == '鸡蛋'
 
-# 获取所有物品
-items = item_service.get_items()
-logger.info(f'获取到 {len(items)} 个物品')
 
-if items:
-    item = items[0]
-    logger.info(f'测试 ItemListItem 组件:')
-    logger.info(f'  item.id = {item.id!r}')
-    logger.info(f'  item.name = {item.name!r}')
-    logger.info(f'  item.category = {item.category!r}')
-    logger.info(f'  item.category.value = {item.category.value!r}')
-    logger.info(f'  item.expiry_date = {item.expiry_date!r}')
-    logger.info(f'  item.quantity = {item.quantity!r}')
-    logger.info(f'  item.status = {item.status!r}')
+def test_list_item_category_from_wiki(seeded_db):
+    created = item_service.create_item(name='鸡蛋', category='食品', quantity=12,
+                                       expiry_date=app_clock.today() + timedelta(days=30))
+    item = item_service.get_item(created.id)
 
-    # 模拟 ItemListItem 的初始化逻辑
-    item_name = item.name
-    category = item.category.value
-    expiry_date = item.expiry_date.strftime('%Y-%m-%d') if item.expiry_date else '无'
-
-    if item.expiry_date:
-        from datetime import date
-        today = date.today()
-        delta = item.expiry_date - today
-        days_until_expiry = delta.days
-    else:
-        days_until_expiry = 0
-
-    quantity = item.quantity
-    status = item.status.value
-    is_consumed = status == 'consumed'
-
-    logger.info(f'模拟 ItemListItem 初始化:')
-    logger.info(f'  item_name = {item_name!r}')
-    logger.info(f'  category = {category!r}')
-    logger.info(f'  expiry_date = {expiry_date!r}')
-    logger.info(f'  days_until_expiry = {days_until_expiry}')
-    logger.info(f'  quantity = {quantity!r}')
-    logger.info(f'  status = {status!r}')
-    logger.info(f'  is_consumed = {is_consumed}')
-
-    # 构建 headline_text
-    headline_text = f"{item_name}"
-    if quantity > 1:
-        headline_text += f" ×{quantity}"
-
-    logger.info(f'  headline_text = {headline_text!r}')
+    assert category_name(item) == '食品'
+    assert status_text(app_clock.days_until(item.expiry_date)) == '正常'
+    unfiled = item_service.get_item(item_service.create_item(name='神秘物品').id)
+    assert category_name(unfiled) == '其他'
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""测试 - Wiki 默认值索引"""
+from datetime import date, timedelta
+
+from app.services.item_service import item_service
+from app.services.wiki_defaults import normalize_item_name, wiki_defaults
+from app.services.wiki_service import wiki_service
+
+
+def test_normalize_item_name():
+    assert normalize_item_name(' 鲜 牛奶 ') == normalize_item_name('鲜牛奶')
+    assert normalize_item_name('ＡＢＣ') == 'abc'
+
+
+def test_lookup_and_prefix_search_without_queries(seeded_db):
+    wiki_defaults.ensure_loaded()
+
+    with seeded_db.instrument() as stats:
+        milk = wiki_defaults.lookup(' 鲜牛奶')
+        prefixed = wiki_defaults.prefix_search('酸')
+        defaults = wiki_defaults.resolve_defaults('鸡蛋', purchase_date=date(2024, 5, 1))
+    stats.assert_max_queries(0)
+
+    assert milk['default_unit'] == '盒' and milk['category_name'] == '食品'
+    assert [entry['name'] for entry in prefixed] == ['酸奶']
+    assert defaults['unit'] == '个'
+    assert defaults['expiry_date'] == date(2024, 5, 31)
+    assert defaults['storage_location'] == '冷藏'
+    assert wiki_defaults.resolve_defaults('不存在的物品')['wiki'] is None
+
+
+def test_index_follows_wiki_change_events(db):
+    wiki_defaults.ensure_loaded()
+    created = wiki_service.create_wiki(name='豆腐', default_unit='块', suggested_expiry_days=3)
+    assert wiki_defaults.lookup('豆腐')['id'] == created['id']
+
+    wiki_service.update_wiki(created['id'], name='北豆腐', suggested_expiry_days=5)
+    assert wiki_defaults.lookup('豆腐') is None
+    assert wiki_defaults.lookup('北豆腐')['suggested_expiry_days'] == 5
+
+    wiki_service.delete_wiki(created['id'])
+    assert wiki_defaults.lookup('北豆腐') is None
+
+
+def test_lookup_during_reload_sees_previous_index(seeded_db, monkeypatch):
+    wiki_defaults.ensure_loaded()
+    add_entries = wiki_defaults._add_entries
+    seen = []
+
+    def add_and_lookup(*args, **kwargs):
+        # 模拟其他线程在重新加载的过程中查询
+        seen.append(wiki_defaults.lookup('酸奶'))
+        add_entries(*args, **kwargs)
+
+    monkeypatch.setattr(wiki_defaults, '_add_entries', add_and_lookup)
+    assert wiki_defaults.load() > 0
+    assert seen and seen[0]['name'] == '酸奶'
+    assert [entry['name'] for entry in wiki_defaults.prefix_search('酸')] == ['酸奶']
+
+
+def test_create_item_uses_wiki_defaults(seeded_db):
+    purchased = date.today() - timedelta(days=1)
+    item = item_service.create_item(name='酸奶', purchase_date=purchased)
+
+    assert item.unit == '瓶'
+    # 过期日期只在调用方要求时按建议保质期推算
+    assert item.expiry_date is None
+    suggested = item_service.create_item(name='酸奶', purchase_date=purchased, use_suggested_expiry=True)
+    assert suggested.expiry_date == purchased + timedelta(days=21)
+
+    explicit = item_service.create_item(name='酸奶', unit='杯', expiry_date=date(2030, 1, 1))
+    assert explicit.unit == '杯' and explicit.expiry_date == date(2030, 1, 1)
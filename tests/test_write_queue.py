@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""测试 - 后台合并写入队列"""
+from app.models.item import ItemStatus
+from app.services.item_service import item_service
+from app.services.write_queue import WriteBehindQueue
+
+
+def test_coalesces_mutations_into_one_transaction(db):
+    queue = WriteBehindQueue(interval_ms=1000)
+    egg = item_service.create_item(name='鸡蛋', quantity=2)
+    milk = item_service.create_item(name='鲜牛奶', quantity=1)
+    results = []
+
+    def callback(item_id, ok, error):
+        results.append((item_id, ok))
+
+    try:
+        with db.instrument() as stats:
+            # 消耗后又恢复相互抵消，不产生写入
+            queue.consume(milk.id, callback)
+            queue.restore(milk.id, callback)
+            for _ in range(3):
+                queue.change_quantity(egg.id, 1, callback)
+            queue.update_fields(egg.id, callback, is_reminder_enabled=False)
+            assert queue.has_pending(egg.id)
+            assert queue.flush(5)
+        stats.assert_max_queries(0, fingerprint_contains='UPDATE items SET status')
+    finally:
+        queue.shutdown()
+
+    assert results == [(milk.id, True)] * 2 + [(egg.id, True)] * 4
+    assert item_service.get_item(milk.id).status == ItemStatus.ACTIVE
+    updated = item_service.get_item(egg.id)
+    assert updated.quantity == 5 and not updated.is_reminder_enabled
+    metrics = queue.metrics()
+    assert metrics['batches'] == 1 and metrics['written'] == 1 and metrics['coalesced'] == 4
+
+
+def test_reports_failures_through_callback(db):
+    queue = WriteBehindQueue(interval_ms=0)
+    egg = item_service.create_item(name='鸡蛋', quantity=1)
+    results = {}
+
+    def callback(item_id, ok, error):
+        results[item_id] = (ok, error)
+
+    try:
+        queue.change_quantity(egg.id, -5, callback)
+        queue.consume('missing', callback)
+        queue.flush(5)
+        queue.consume(egg.id, callback)
+        queue.flush(5)
+    finally:
+        queue.shutdown()
+
+    assert results['missing'] == (False, '物品不存在')
+    assert results[egg.id] == (True, None)
+    consumed = item_service.get_item(egg.id)
+    assert consumed.quantity == 1 and consumed.status == ItemStatus.CONSUMED
+    assert queue.metrics()['failed'] == 2
+
+
+def test_restore_with_quantity_change_keeps_statement_status(db):
+    queue = WriteBehindQueue(interval_ms=1000)
+    egg = item_service.create_item(name='鸡蛋', quantity=1)
+    milk = item_service.create_item(name='鲜牛奶', quantity=1)
+    item_service.mark_as_consumed(egg.id)
+    item_service.mark_as_consumed(milk.id)
+
+    try:
+        # 恢复后数量减到 0：仍为已消耗，不能被恢复覆盖为使用中
+        queue.restore(egg.id)
+        queue.change_quantity(egg.id, -1)
+        queue.restore(milk.id)
+        queue.change_quantity(milk.id, 2)
+        assert queue.flush(5)
+    finally:
+        queue.shutdown()
+
+    egg = item_service.get_item(egg.id)
+    assert egg.quantity == 0 and egg.status == ItemStatus.CONSUMED
+    milk = item_service.get_item(milk.id)
+    assert milk.quantity == 3 and milk.status == ItemStatus.ACTIVE and milk.consumed_at is None